@@ -67,6 +67,7 @@ __all__ = [
     "zone",
     "zonetypes",
     "zonefile",
+    "zonesnapshot",
 ]
 
 from dns.version import version as __version__  # noqa
@@ -98,3 +98,25 @@ class Backend:  # pragma: no cover
 
     async def wait_for(self, awaitable, timeout):
         raise NotImplementedError
+
+    def make_event(self):
+        raise NotImplementedError
+
+    def make_lock(self):
+        raise NotImplementedError
+
+    def current_loop(self):
+        """Return an object identifying the running event loop."""
+        raise NotImplementedError
+
+    def loop_is_closed(self, loop):
+        """Has the event loop identified by *loop*, which was returned by
+        ``current_loop()``, finished for good?
+        """
+        raise NotImplementedError
+
+    async def gather(self, *awaitables):
+        raise NotImplementedError
+
+    def spawn(self, awaitable):
+        raise NotImplementedError
@@ -3,8 +3,10 @@
 """asyncio library query support"""
 
 import asyncio
+import collections
 import socket
 import sys
+from typing import Set
 
 import dns._asyncbackend
 import dns._features
@@ -13,6 +15,12 @@ import dns.inet
 
 _is_win32 = sys.platform == "win32"
 
+# The maximum number of datagrams a socket keeps while nothing is reading it.
+_MAX_BUFFERED_DATAGRAMS = 1024
+
+# Tasks started by Backend.spawn(), which must be referenced until done.
+_background_tasks: Set[asyncio.Task] = set()
+
 
 def _get_running_loop():
     try:
@@ -25,6 +33,7 @@ class _DatagramProtocol:
     def __init__(self):
         self.transport = None
         self.recvfrom = None
+        self.buffered = collections.deque(maxlen=_MAX_BUFFERED_DATAGRAMS)
 
     def connection_made(self, transport):
         self.transport = transport
@@ -32,6 +41,10 @@ class _DatagramProtocol:
     def datagram_received(self, data, addr):
         if self.recvfrom and not self.recvfrom.done():
             self.recvfrom.set_result((data, addr))
+        else:
+            # Keep it for the next recvfrom(), as the kernel would, so that
+            # sockets shared by many queries do not lose responses.
+            self.buffered.append((data, addr))
 
     def error_received(self, exc):  # pragma: no cover
         if self.recvfrom and not self.recvfrom.done():
@@ -76,6 +89,8 @@ class DatagramSocket(dns._asyncbackend.DatagramSocket):
 
     async def recvfrom(self, size, timeout):
         # ignore size as there's no way I know to tell protocol about it
+        if self.protocol.buffered:
+            return self.protocol.buffered.popleft()
         done = _get_running_loop().create_future()
         try:
             assert self.protocol.recvfrom is None
@@ -274,3 +289,23 @@ class Backend(dns._asyncbackend.Backend):
 
     async def wait_for(self, awaitable, timeout):
         return await _maybe_wait_for(awaitable, timeout)
+
+    def make_event(self):
+        return asyncio.Event()
+
+    def make_lock(self):
+        return asyncio.Lock()
+
+    def current_loop(self):
+        return asyncio.get_running_loop()
+
+    def loop_is_closed(self, loop):
+        return loop.is_closed()
+
+    async def gather(self, *awaitables):
+        await asyncio.gather(*awaitables)
+
+    def spawn(self, awaitable):
+        task = asyncio.ensure_future(awaitable)
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
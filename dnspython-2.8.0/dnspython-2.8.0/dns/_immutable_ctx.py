@@ -69,6 +69,20 @@ def immutable(cls):
                 def __setstate__(self, *args, **kwargs):
                     super().__setstate__(*args, **kwargs)
 
+            else:
+
+                def __setstate__(self, state):
+                    # Unpickling would otherwise set slots with setattr(), which
+                    # an immutable object refuses.
+                    if isinstance(state, tuple):
+                        (dict_state, slot_state) = state
+                    else:
+                        (dict_state, slot_state) = (state, None)
+                    for values in (dict_state, slot_state):
+                        if values:
+                            for name, value in values.items():
+                                object.__setattr__(self, name, value)
+
         # make ncls have the same name and module as cls
         ncls.__name__ = cls.__name__
         ncls.__qualname__ = cls.__qualname__
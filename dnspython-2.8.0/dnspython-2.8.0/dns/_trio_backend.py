@@ -253,3 +253,33 @@ class Backend(dns._asyncbackend.Backend):
         raise dns.exception.Timeout(
             timeout=timeout
         )  # pragma: no cover  lgtm[py/unreachable-statement]
+
+    def make_event(self):
+        return trio.Event()
+
+    def make_lock(self):
+        return trio.Lock()
+
+    def current_loop(self):
+        return trio.lowlevel.current_trio_token()
+
+    def loop_is_closed(self, loop):
+        try:
+            loop.run_sync_soon(lambda: None)
+        except trio.RunFinishedError:
+            return True
+        return False
+
+    async def gather(self, *awaitables):
+        async def run(awaitable):
+            await awaitable
+
+        async with trio.open_nursery() as nursery:
+            for awaitable in awaitables:
+                nursery.start_soon(run, awaitable)
+
+    def spawn(self, awaitable):
+        async def run():
+            await awaitable
+
+        trio.lowlevel.spawn_system_task(run)
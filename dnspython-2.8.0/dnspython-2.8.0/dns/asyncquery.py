@@ -24,9 +24,10 @@ import socket
 import struct
 import time
 import urllib.parse
-from typing import Any, Dict, Optional, Tuple, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 
 import dns.asyncbackend
+import dns.entropy
 import dns.exception
 import dns.inet
 import dns.message
@@ -45,7 +46,11 @@ from dns.query import (
     UDPMode,
     _check_status,
     _compute_times,
+    _early_data_allowed,
+    _hedged_destinations,
+    _hedged_response,
     _matches_destination,
+    _PooledResponse,
     _remaining,
     have_doh,
     make_ssl_context,
@@ -313,6 +318,86 @@ async def udp_with_fallback(
         return (response, True)
 
 
+async def udp_hedged(
+    q: dns.message.Message,
+    where: str,
+    hedge_where: str,
+    hedge_delay: float,
+    timeout: float | None = None,
+    port: int = 53,
+    hedge_port: int = 53,
+    source: str | None = None,
+    source_port: int = 0,
+    one_rr_per_rrset: bool = False,
+    ignore_trailing: bool = False,
+    backend: dns.asyncbackend.Backend | None = None,
+) -> Tuple[dns.message.Message, bool]:
+    """Send a query via UDP, and if no response arrives quickly, send it to a
+    second nameserver too, and return whichever response arrives first.
+
+    *backend*, a ``dns.asyncbackend.Backend``, or ``None``.  If ``None``,
+    the default, then dnspython will use the default backend.
+
+    Raises ``ValueError`` if the backend requires datagram sockets to be
+    connected, as the hedged query is sent from the same socket to a
+    different address.
+
+    See :py:func:`dns.query.udp_hedged()` for the documentation of the other
+    parameters, exceptions, and return type of this method.
+    """
+    wire = q.to_wire()
+    (af, destination, hedge_destination, _) = _hedged_destinations(
+        where, port, hedge_where, hedge_port, source, source_port
+    )
+    (begin_time, expiration) = _compute_times(timeout)
+    hedge_expiration = begin_time + hedge_delay
+    if expiration is not None and hedge_expiration >= expiration:
+        # We'd never send the hedged query.
+        hedge_expiration = expiration
+    destinations = [destination]
+    # When the query was sent to each destination, to time its response.
+    sent_times = [begin_time]
+    if not backend:
+        backend = dns.asyncbackend.get_default_backend()
+    if backend.datagram_connection_required():
+        raise ValueError("hedging needs a backend with unconnected datagram sockets")
+    stuple = _source_tuple(af, source, source_port)
+    async with await backend.make_socket(af, socket.SOCK_DGRAM, 0, stuple) as s:
+        await send_udp(s, wire, destination, expiration)
+        while True:
+            try:
+                if len(destinations) == 1:
+                    (rwire, from_address) = await s.recvfrom(
+                        65535, _timeout(hedge_expiration)
+                    )
+                else:
+                    (rwire, from_address) = await s.recvfrom(
+                        65535, _timeout(expiration)
+                    )
+            except dns.exception.Timeout:
+                if len(destinations) == 1 and hedge_expiration != expiration:
+                    (_, sent_time) = await send_udp(
+                        s, wire, hedge_destination, expiration
+                    )
+                    destinations.append(hedge_destination)
+                    sent_times.append(sent_time)
+                    continue
+                raise
+            result = _hedged_response(
+                q,
+                rwire,
+                af,
+                from_address,
+                destinations,
+                one_rr_per_rrset,
+                ignore_trailing,
+            )
+            if result is not None:
+                (r, index) = result
+                r.time = time.time() - sent_times[index]
+                return (r, index == 1)
+
+
 async def send_tcp(
     sock: dns.asyncbackend.StreamSocket,
     what: dns.message.Message | bytes,
@@ -342,14 +427,23 @@ async def _read_exactly(sock, count, expiration):
     """Read the specified number of bytes from stream.  Keep trying until we
     either get the desired amount, or we hit EOF.
     """
-    s = b""
+    # As in dns.query._net_read(), avoid concatenating bytes when the data
+    # arrives in more than one chunk.
+    buffer = None
     while count > 0:
         n = await sock.recv(count, _timeout(expiration))
         if n == b"":
             raise EOFError("EOF")
-        count = count - len(n)
-        s = s + n
-    return s
+        count -= len(n)
+        if buffer is None:
+            if count == 0:
+                return n
+            buffer = bytearray(n)
+        else:
+            buffer += n
+    if buffer is None:
+        return b""
+    return bytes(buffer)
 
 
 async def receive_tcp(
@@ -393,6 +487,7 @@ async def tcp(
     ignore_trailing: bool = False,
     sock: dns.asyncbackend.StreamSocket | None = None,
     backend: dns.asyncbackend.Backend | None = None,
+    pool: Optional["ConnectionPool"] = None,
 ) -> dns.message.Message:
     """Return the response obtained after sending a query via TCP.
 
@@ -404,10 +499,26 @@ async def tcp(
     *backend*, a ``dns.asyncbackend.Backend``, or ``None``.  If ``None``,
     the default, then dnspython will use the default backend.
 
+    *pool*, a ``dns.asyncquery.ConnectionPool``, or ``None``.  If not ``None``,
+    and no socket is provided, the query is sent on a persistent connection
+    from the pool.
+
     See :py:func:`dns.query.tcp()` for the documentation of the other
     parameters, exceptions, and return type of this method.
     """
 
+    if pool is not None and not sock:
+        return await pool.tcp(
+            q,
+            where,
+            timeout,
+            port,
+            source,
+            source_port,
+            one_rr_per_rrset,
+            ignore_trailing,
+            backend,
+        )
     wire = q.to_wire()
     (begin_time, expiration) = _compute_times(timeout)
     if sock:
@@ -457,6 +568,7 @@ async def tls(
     ssl_context: ssl.SSLContext | None = None,
     server_hostname: str | None = None,
     verify: bool | str = True,
+    pool: Optional["ConnectionPool"] = None,
 ) -> dns.message.Message:
     """Return the response obtained after sending a query via TLS.
 
@@ -470,9 +582,29 @@ async def tls(
     *backend*, a ``dns.asyncbackend.Backend``, or ``None``.  If ``None``,
     the default, then dnspython will use the default backend.
 
+    *pool*, a ``dns.asyncquery.ConnectionPool``, or ``None``.  If not ``None``,
+    and no socket is provided, the query is sent on a persistent connection
+    from the pool, and the TLS handshake is only done when a connection is
+    opened.
+
     See :py:func:`dns.query.tls()` for the documentation of the other
     parameters, exceptions, and return type of this method.
     """
+    if pool is not None and not sock:
+        return await pool.tls(
+            q,
+            where,
+            timeout,
+            port,
+            source,
+            source_port,
+            one_rr_per_rrset,
+            ignore_trailing,
+            backend,
+            ssl_context,
+            server_hostname,
+            verify,
+        )
     (begin_time, expiration) = _compute_times(timeout)
     if sock:
         cm: contextlib.AbstractAsyncContextManager = NullContext(sock)
@@ -513,6 +645,345 @@ async def tls(
         return response
 
 
+class _PooledConnection:
+    """A persistent TCP or TLS connection on which queries are pipelined.
+
+    Responses are matched to queries by message id.  There is no separate
+    reader task; one of the waiting queries reads the stream on behalf of all
+    of them until it finishes, and then hands the reading over to another.
+    """
+
+    def __init__(
+        self, backend: dns.asyncbackend.Backend, sock: dns.asyncbackend.StreamSocket
+    ) -> None:
+        self.backend = backend
+        self.sock = sock
+        self.write_lock = backend.make_lock()
+        self.pending: Dict[int, _PooledResponse] = {}
+        self.reading = False
+        self.broken = False
+        self.last_used = time.time()
+
+    def idle(self, now: float, idle_timeout: float) -> bool:
+        return not self.pending and now - self.last_used >= idle_timeout
+
+    async def close(self) -> None:
+        if not self.broken:
+            self.broken = True
+            for response in self.pending.values():
+                response.event.set()
+        await self.sock.close()
+
+    async def query(
+        self, q: dns.message.Message, expiration: float | None
+    ) -> Tuple[bytes, float]:
+        if self.broken:
+            raise EOFError("connection closed")
+        while q.id in self.pending:
+            q.id = dns.entropy.random_16()
+        response = _PooledResponse(self.backend.make_event())
+        self.pending[q.id] = response
+        self.last_used = time.time()
+        try:
+            tcpmsg = q.to_wire(prepend_length=True)
+            async with self.write_lock:
+                try:
+                    await self.sock.sendall(tcpmsg, _timeout(expiration))
+                except Exception:
+                    # A partial write leaves the stream unusable.
+                    await self.close()
+                    raise
+            while response.wire is None:
+                if self.broken:
+                    raise EOFError("connection closed")
+                remaining = _remaining(expiration)
+                if self.reading:
+                    # Wait for our response, or for the reader to stop reading.
+                    response.event = self.backend.make_event()
+                    try:
+                        await self.backend.wait_for(response.event.wait(), remaining)
+                    except dns.exception.Timeout:
+                        pass
+                else:
+                    await self._read(response, expiration)
+            return (response.wire, response.received)
+        finally:
+            del self.pending[q.id]
+            self.last_used = time.time()
+            if not self.reading:
+                # Hand the reading over to one of the other waiting queries.
+                for other in self.pending.values():
+                    if other.wire is None:
+                        other.event.set()
+                        break
+
+    async def _read(self, response: _PooledResponse, expiration: float | None) -> None:
+        self.reading = True
+        try:
+            while response.wire is None:
+                try:
+                    # Timing out before anything is read leaves the stream
+                    # usable by other queries.
+                    ldata = await self.sock.recv(2, _timeout(expiration))
+                except dns.exception.Timeout:
+                    return
+                try:
+                    if ldata == b"":
+                        raise EOFError("EOF")
+                    if len(ldata) == 1:
+                        ldata += await _read_exactly(self.sock, 1, expiration)
+                    (l,) = struct.unpack("!H", ldata)
+                    wire = await _read_exactly(self.sock, l, expiration)
+                except Exception:
+                    await self.close()
+                    raise
+                if len(wire) < 2:
+                    continue
+                other = self.pending.get(struct.unpack("!H", wire[:2])[0])
+                if other is not None and other.wire is None:
+                    other.wire = wire
+                    other.received = time.time()
+                    other.event.set()
+        finally:
+            self.reading = False
+
+
+class ConnectionPool:
+    """A pool of persistent TCP and DNS-over-TLS connections for asynchronous
+    queries.  A pool should only be used with one event loop.
+
+    See :py:class:`dns.query.ConnectionPool` for the documentation of the
+    parameters.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 2,
+        max_pipelined: int = 64,
+        idle_timeout: float = 30.0,
+    ) -> None:
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.max_connections = max_connections
+        self.max_pipelined = max_pipelined
+        self.idle_timeout = idle_timeout
+        self._connections: Dict[Any, List[_PooledConnection]] = {}
+        self._connecting: Dict[Any, int] = {}
+        self._waiters: List[Any] = []
+        self._ssl_contexts: Dict[Any, ssl.SSLContext] = {}
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+    async def close(self) -> None:
+        """Close all connections.  The pool cannot be used afterwards."""
+        self._closed = True
+        connections = [c for cs in self._connections.values() for c in cs]
+        self._connections = {}
+        self._wake_waiters()
+        for connection in connections:
+            await connection.close()
+
+    def connection_count(self) -> int:
+        """Return the number of open connections in the pool."""
+        return sum(len(cs) for cs in self._connections.values())
+
+    def _wake_waiters(self) -> None:
+        for event in self._waiters:
+            event.set()
+        self._waiters = []
+
+    async def _prune(self) -> None:
+        now = time.time()
+        for key, connections in list(self._connections.items()):
+            keep = []
+            for connection in connections:
+                if connection.broken or connection.idle(now, self.idle_timeout):
+                    await connection.close()
+                else:
+                    keep.append(connection)
+            if keep:
+                self._connections[key] = keep
+            else:
+                del self._connections[key]
+
+    async def _acquire(
+        self,
+        key: Any,
+        backend: dns.asyncbackend.Backend,
+        connect: Any,
+        expiration: float | None,
+    ) -> Tuple[_PooledConnection, bool]:
+        while True:
+            if self._closed:
+                raise RuntimeError("connection pool is closed")
+            await self._prune()
+            connections = self._connections.get(key, [])
+            connecting = self._connecting.get(key, 0)
+            best = min(connections, key=lambda c: len(c.pending), default=None)
+            at_limit = len(connections) + connecting >= self.max_connections
+            # Only pipeline more than max_pipelined queries on a connection if
+            # no more connections may be made.
+            if best is not None and (
+                len(best.pending) < self.max_pipelined or (at_limit and connecting == 0)
+            ):
+                best.last_used = time.time()
+                return (best, True)
+            if not at_limit:
+                break
+            # Wait for the connections which are being established.
+            event = backend.make_event()
+            self._waiters.append(event)
+            try:
+                await backend.wait_for(event.wait(), _remaining(expiration))
+            finally:
+                if event in self._waiters:
+                    self._waiters.remove(event)
+        self._connecting[key] = connecting + 1
+        try:
+            sock = await connect()
+        finally:
+            self._connecting[key] -= 1
+            if self._connecting[key] == 0:
+                del self._connecting[key]
+            self._wake_waiters()
+        if self._closed:
+            await sock.close()
+            raise RuntimeError("connection pool is closed")
+        connection = _PooledConnection(backend, sock)
+        self._connections.setdefault(key, []).append(connection)
+        return (connection, False)
+
+    async def _query(
+        self,
+        q: dns.message.Message,
+        key: Any,
+        backend: dns.asyncbackend.Backend,
+        connect: Any,
+        timeout: float | None,
+        one_rr_per_rrset: bool,
+        ignore_trailing: bool,
+    ) -> dns.message.Message:
+        (begin_time, expiration) = _compute_times(timeout)
+        while True:
+            (connection, reused) = await self._acquire(
+                key, backend, lambda: connect(_timeout(expiration)), expiration
+            )
+            try:
+                (wire, received_time) = await connection.query(q, expiration)
+                break
+            except (EOFError, OSError):
+                # The server may have closed an idle connection just as we
+                # reused it; retry on another one.
+                if not reused:
+                    raise
+        r = dns.message.from_wire(
+            wire,
+            keyring=q.keyring,
+            request_mac=q.mac,
+            one_rr_per_rrset=one_rr_per_rrset,
+            ignore_trailing=ignore_trailing,
+        )
+        r.time = received_time - begin_time
+        if not q.is_response(r):
+            raise BadResponse
+        return r
+
+    async def tcp(
+        self,
+        q: dns.message.Message,
+        where: str,
+        timeout: float | None = None,
+        port: int = 53,
+        source: str | None = None,
+        source_port: int = 0,
+        one_rr_per_rrset: bool = False,
+        ignore_trailing: bool = False,
+        backend: dns.asyncbackend.Backend | None = None,
+    ) -> dns.message.Message:
+        """Return the response obtained after sending a query via TCP on a
+        pooled connection.
+
+        See :py:func:`dns.asyncquery.tcp()` for the documentation of the
+        parameters, exceptions, and return type of this method.
+        """
+        af = dns.inet.af_for_address(where)
+        stuple = _source_tuple(af, source, source_port)
+        dtuple = (where, port)
+        if not backend:
+            backend = dns.asyncbackend.get_default_backend()
+        the_backend = backend
+
+        async def connect(timeout):
+            return await the_backend.make_socket(
+                af, socket.SOCK_STREAM, 0, stuple, dtuple, timeout
+            )
+
+        key = ("tcp", backend.name(), dtuple, stuple)
+        return await self._query(
+            q, key, backend, connect, timeout, one_rr_per_rrset, ignore_trailing
+        )
+
+    async def tls(
+        self,
+        q: dns.message.Message,
+        where: str,
+        timeout: float | None = None,
+        port: int = 853,
+        source: str | None = None,
+        source_port: int = 0,
+        one_rr_per_rrset: bool = False,
+        ignore_trailing: bool = False,
+        backend: dns.asyncbackend.Backend | None = None,
+        ssl_context: ssl.SSLContext | None = None,
+        server_hostname: str | None = None,
+        verify: bool | str = True,
+    ) -> dns.message.Message:
+        """Return the response obtained after sending a query via TLS on a
+        pooled connection.  The TLS handshake is only done when a connection
+        is opened.
+
+        See :py:func:`dns.asyncquery.tls()` for the documentation of the
+        parameters, exceptions, and return type of this method.
+        """
+        af = dns.inet.af_for_address(where)
+        stuple = _source_tuple(af, source, source_port)
+        dtuple = (where, port)
+        if not backend:
+            backend = dns.asyncbackend.get_default_backend()
+        if ssl_context is None:
+            ssl_context = self._ssl_contexts.get((server_hostname, verify))
+            if ssl_context is None:
+                ssl_context = make_ssl_context(
+                    verify, server_hostname is not None, ["dot"]
+                )
+                self._ssl_contexts[(server_hostname, verify)] = ssl_context
+        the_backend = backend
+        context = ssl_context
+
+        async def connect(timeout):
+            return await the_backend.make_socket(
+                af,
+                socket.SOCK_STREAM,
+                0,
+                stuple,
+                dtuple,
+                timeout,
+                context,
+                server_hostname,
+            )
+
+        key = ("tls", backend.name(), dtuple, stuple, context, server_hostname)
+        return await self._query(
+            q, key, backend, connect, timeout, one_rr_per_rrset, ignore_trailing
+        )
+
+
 def _maybe_get_resolver(
     resolver: Optional["dns.asyncresolver.Resolver"],  # pyright: ignore
 ) -> "dns.asyncresolver.Resolver":  # pyright: ignore
@@ -527,6 +998,34 @@ def _maybe_get_resolver(
     return resolver
 
 
+def _make_https_client(
+    backend: dns.asyncbackend.Backend,
+    local_address: str | None,
+    local_port: int,
+    http_version: HTTPVersion,
+    verify: bool | str | ssl.SSLContext,
+    bootstrap_address: str | None,
+    resolver: Optional["dns.asyncresolver.Resolver"] = None,  # pyright: ignore
+    family: int = socket.AF_UNSPEC,
+) -> Any:
+    """Make an ``httpx.AsyncClient`` for DNS-over-HTTPS queries."""
+    h1 = http_version in (HTTPVersion.H1, HTTPVersion.DEFAULT)
+    h2 = http_version in (HTTPVersion.H2, HTTPVersion.DEFAULT)
+    transport = backend.get_transport_class()(
+        local_address=local_address,
+        http1=h1,
+        http2=h2,
+        verify=verify,
+        local_port=local_port,
+        bootstrap_address=bootstrap_address,
+        resolver=resolver,
+        family=family,
+    )
+    return httpx.AsyncClient(  # pyright: ignore
+        http1=h1, http2=h2, verify=verify, transport=transport  # type: ignore
+    )
+
+
 async def https(
     q: dns.message.Message,
     where: str,
@@ -621,9 +1120,6 @@ async def https(
     wire = q.to_wire()
     headers = {"accept": "application/dns-message"}
 
-    h1 = http_version in (HTTPVersion.H1, HTTPVersion.DEFAULT)
-    h2 = http_version in (HTTPVersion.H2, HTTPVersion.DEFAULT)
-
     backend = dns.asyncbackend.get_default_backend()
 
     if source is None:
@@ -636,19 +1132,15 @@ async def https(
     if client:
         cm: contextlib.AbstractAsyncContextManager = NullContext(client)
     else:
-        transport = backend.get_transport_class()(
-            local_address=local_address,
-            http1=h1,
-            http2=h2,
-            verify=verify,
-            local_port=local_port,
-            bootstrap_address=bootstrap_address,
-            resolver=resolver,
-            family=family,
-        )
-
-        cm = httpx.AsyncClient(  # pyright: ignore
-            http1=h1, http2=h2, verify=verify, transport=transport  # type: ignore
+        cm = _make_https_client(
+            backend,
+            local_address,
+            local_port,
+            http_version,
+            verify,
+            bootstrap_address,
+            resolver,
+            family,
         )
 
     async with cm as the_client:
@@ -819,7 +1311,9 @@ async def quic(
                     where, port, source, source_port
                 )
             (start, expiration) = _compute_times(timeout)
-            stream = await the_connection.make_stream(timeout)  # pyright: ignore
+            stream = await the_connection.make_stream(  # pyright: ignore
+                timeout, early_data=_early_data_allowed(q)
+            )
             async with stream:
                 await stream.send(wire, True)
                 wire = await stream.receive(_remaining(expiration))
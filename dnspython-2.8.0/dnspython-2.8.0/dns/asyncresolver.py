@@ -18,14 +18,17 @@
 """Asynchronous DNS stub resolver."""
 
 import socket
+import struct
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Tuple
 
 import dns._ddr
 import dns.asyncbackend
 import dns.asyncquery
+import dns.entropy
 import dns.exception
 import dns.inet
+import dns.message
 import dns.name
 import dns.nameserver
 import dns.query
@@ -68,11 +71,67 @@ class Resolver(dns.resolver.BaseResolver):
         type of this method.
         """
 
-        resolution = dns.resolver._Resolution(
-            self, qname, rdtype, rdclass, tcp, raise_on_no_answer, search
-        )
         if not backend:
             backend = dns.asyncbackend.get_default_backend()
+        key = None
+        if self.coalesce:
+            key = self._coalescing_key(
+                qname, rdtype, rdclass, tcp, raise_on_no_answer, search
+            )
+        if key is None:
+            resolution = dns.resolver._Resolution(
+                self, qname, rdtype, rdclass, tcp, raise_on_no_answer, search
+            )
+            return await self._resolve(
+                resolution, source, source_port, lifetime, backend
+            )
+        # Events only work in the event loop they were made in, so only
+        # resolutions in the same loop are coalesced.
+        key = (backend.current_loop(), key)
+        start = time.time()
+        while True:
+            (flight, leader) = self._join_in_flight(key, backend.make_event)
+            if leader:
+                break
+            timeout = self._in_flight_timeout(start, lifetime)
+            try:
+                await backend.wait_for(flight.event.wait(), timeout)
+            except dns.exception.Timeout:
+                raise dns.resolver.LifetimeTimeout(
+                    timeout=time.time() - start, errors=[]
+                )
+            answer = flight.result_for_follower()
+            if answer is not None:
+                return answer
+            # The leader was interrupted or ran out of time, so try again,
+            # maybe as the leader, for the rest of our lifetime.
+        try:
+            resolution = dns.resolver._Resolution(
+                self, qname, rdtype, rdclass, tcp, raise_on_no_answer, search
+            )
+            flight.answer = await self._resolve(
+                resolution,
+                source,
+                source_port,
+                self._in_flight_timeout(start, lifetime),
+                backend,
+            )
+            return flight.answer
+        except BaseException as ex:
+            flight.exception = ex
+            raise
+        finally:
+            self._finish_in_flight(key, flight)
+
+    async def _resolve(
+        self,
+        resolution: dns.resolver._Resolution,
+        source: str | None,
+        source_port: int,
+        lifetime: float | None,
+        backend: dns.asyncbackend.Backend,
+        multiplexers: Dict[Tuple[str, int], "_DatagramMultiplexer"] | None = None,
+    ) -> dns.resolver.Answer:
         start = time.time()
         while True:
             (request, answer) = resolution.next_request()
@@ -82,6 +141,10 @@ class Resolver(dns.resolver.BaseResolver):
             # object, including in cases where its length is 0.
             if answer is not None:
                 # cache hit!
+                if resolution.refresh is not None:
+                    backend.spawn(
+                        self._refresh(resolution.refresh, source, source_port, backend)
+                    )
                 return answer
             assert request is not None  # needed for type checking
             done = False
@@ -90,15 +153,41 @@ class Resolver(dns.resolver.BaseResolver):
                 if backoff:
                     await backend.sleep(backoff)
                 timeout = self._compute_timeout(start, lifetime, resolution.errors)
+                multiplexer = None
+                if multiplexers and not tcp:
+                    if isinstance(nameserver, dns.nameserver.Do53Nameserver):
+                        multiplexer = multiplexers.get(
+                            (nameserver.address, nameserver.port)
+                        )
+                hedge = None
+                if (
+                    self.hedge_delay is not None
+                    and multiplexer is None
+                    and not backend.datagram_connection_required()
+                ):
+                    hedge = resolution.hedge_nameserver()
                 try:
-                    response = await nameserver.async_query(
-                        request,
-                        timeout=timeout,
-                        source=source,
-                        source_port=source_port,
-                        max_size=tcp,
-                        backend=backend,
-                    )
+                    if multiplexer:
+                        response = await multiplexer.query(request, timeout)
+                    elif hedge is not None:
+                        response = await self._hedged_query(
+                            resolution,
+                            hedge,
+                            request,
+                            timeout,
+                            source,
+                            source_port,
+                            backend,
+                        )
+                    else:
+                        response = await nameserver.async_query(
+                            request,
+                            timeout=timeout,
+                            source=source,
+                            source_port=source_port,
+                            max_size=tcp,
+                            backend=backend,
+                        )
                 except Exception as ex:
                     (_, done) = resolution.query_result(None, ex)
                     continue
@@ -110,6 +199,153 @@ class Resolver(dns.resolver.BaseResolver):
                 if answer is not None:
                     return answer
 
+    async def _hedged_query(
+        self,
+        resolution: dns.resolver._Resolution,
+        hedge: dns.nameserver.Do53Nameserver,
+        request: dns.message.QueryMessage,
+        timeout: float,
+        source: str | None,
+        source_port: int,
+        backend: dns.asyncbackend.Backend,
+    ) -> dns.message.Message:
+        nameserver = resolution.nameserver
+        assert isinstance(nameserver, dns.nameserver.Do53Nameserver)
+        assert self.hedge_delay is not None
+        try:
+            (response, from_hedge) = await dns.asyncquery.udp_hedged(
+                request,
+                nameserver.address,
+                hedge.address,
+                self.hedge_delay,
+                timeout,
+                nameserver.port,
+                hedge.port,
+                source,
+                source_port,
+                backend=backend,
+            )
+        except dns.exception.Timeout as ex:
+            self._hedge_timed_out(resolution, hedge, timeout, ex)
+            raise
+        return self._hedge_answered(resolution, hedge, response, from_hedge)
+
+    async def _refresh(
+        self,
+        refresh: Tuple[dns.resolver.CacheBase, dns.resolver.CacheKey],
+        source: str | None,
+        source_port: int,
+        backend: dns.asyncbackend.Backend,
+    ) -> None:
+        (cache, key) = refresh
+        try:
+            await self._resolve(
+                self._refresh_resolution(key), source, source_port, None, backend
+            )
+        except Exception:
+            # The cached answer will expire normally.
+            pass
+        finally:
+            cache.release_refresh(key)
+
+    async def resolve_many(
+        self,
+        queries: Iterable[Tuple[dns.name.Name | str, dns.rdatatype.RdataType | str]],
+        rdclass: dns.rdataclass.RdataClass | str = dns.rdataclass.IN,
+        tcp: bool = False,
+        source: str | None = None,
+        raise_on_no_answer: bool = True,
+        source_port: int = 0,
+        lifetime: float | None = None,
+        search: bool | None = None,
+        backend: dns.asyncbackend.Backend | None = None,
+        max_in_flight: int = 100,
+    ) -> List[Tuple[Any, dns.resolver.Answer | Exception]]:
+        """Resolve many questions concurrently.
+
+        *queries*, an iterable of ``(qname, rdtype)`` tuples, where *qname* is
+        a ``dns.name.Name`` or ``str`` and *rdtype* is an ``int`` or ``str``.
+        Duplicate questions are only resolved once.
+
+        *max_in_flight*, an ``int``, the maximum number of resolutions in
+        progress at any time.  The default is 100.
+
+        *backend*, a ``dns.asyncbackend.Backend``, or ``None``.  If ``None``,
+        the default, then dnspython will use the default backend.
+
+        The other parameters are as for ``resolve()``, except that
+        *source_port* is only used for queries which do not use a shared
+        socket.
+
+        UDP queries to each ordinary DNS nameserver all share one datagram
+        socket, and responses are matched to queries by message id and
+        question.  Other kinds of queries, e.g. TCP retries after truncation
+        or DNS-over-HTTPS, are made as ``resolve()`` would make them.
+
+        Returns a list with a ``(query, result)`` tuple for each of the
+        *queries*, in the same order.  *query* is the tuple from *queries*,
+        and *result* is either a ``dns.resolver.Answer`` or the exception that
+        ``resolve()`` would have raised for it.
+        """
+
+        if not backend:
+            backend = dns.asyncbackend.get_default_backend()
+        queries = list(queries)
+        # For each query, either its normalized key or the exception that
+        # normalizing it raised.
+        normalized: List[Any] = []
+        for query in queries:
+            (qname, rdtype) = query
+            try:
+                if isinstance(qname, str):
+                    qname = dns.name.from_text(qname, None)
+                normalized.append((qname, dns.rdatatype.RdataType.make(rdtype)))
+            except Exception as ex:
+                normalized.append(ex)
+        keys = list(
+            dict.fromkeys(key for key in normalized if not isinstance(key, Exception))
+        )
+        results: Dict[Any, dns.resolver.Answer | Exception] = {}
+
+        async def worker():
+            while keys:
+                key = keys.pop()
+                try:
+                    resolution = dns.resolver._Resolution(
+                        self, key[0], key[1], rdclass, tcp, raise_on_no_answer, search
+                    )
+                    results[key] = await self._resolve(
+                        resolution, source, source_port, lifetime, backend, multiplexers
+                    )
+                except Exception as ex:
+                    results[key] = ex
+
+        multiplexers: Dict[Tuple[str, int], _DatagramMultiplexer] = {}
+        try:
+            if not tcp:
+                for nameserver in self._enrich_nameservers(
+                    self._nameservers, self.nameserver_ports, self.port
+                ):
+                    if not isinstance(nameserver, dns.nameserver.Do53Nameserver):
+                        continue
+                    where = (nameserver.address, nameserver.port)
+                    if where not in multiplexers:
+                        multiplexers[where] = await _DatagramMultiplexer.open(
+                            backend, nameserver.address, nameserver.port, source
+                        )
+            # Go in the order given, as the workers take keys from the end.
+            keys.reverse()
+            await backend.gather(
+                *[worker() for _ in range(min(max(max_in_flight, 1), len(keys)))]
+            )
+        finally:
+            for multiplexer in multiplexers.values():
+                await multiplexer.close()
+        return [
+            (query, key if isinstance(key, Exception) else results[key])
+            for query, key in zip(queries, normalized, strict=True)
+        ]
+
     async def resolve_address(
         self, ipaddr: str, *args: Any, **kwargs: Any
     ) -> dns.resolver.Answer:
@@ -260,6 +496,142 @@ class Resolver(dns.resolver.BaseResolver):
             pass
 
 
+class _PendingQuery:
+    def __init__(self, request: dns.message.QueryMessage, event: Any) -> None:
+        self.request = request
+        self.event = event
+        self.begin = 0.0
+        self.result: dns.message.Message | Exception | None = None
+
+
+class _DatagramMultiplexer:
+    """One datagram socket shared by many concurrent UDP queries to a nameserver.
+
+    Responses are matched to queries by message id and question.  There is no
+    separate reader task; one of the waiting queries reads the socket on behalf
+    of all of them until it finishes, and then hands the reading over to
+    another.
+    """
+
+    def __init__(
+        self,
+        backend: dns.asyncbackend.Backend,
+        sock: dns.asyncbackend.DatagramSocket,
+        destination: Any,
+        connected: bool,
+    ) -> None:
+        self.backend = backend
+        self.sock = sock
+        self.destination = destination
+        self.connected = connected
+        self.pending: Dict[int, _PendingQuery] = {}
+        self.reading = False
+
+    @classmethod
+    async def open(
+        cls,
+        backend: dns.asyncbackend.Backend,
+        address: str,
+        port: int,
+        source: str | None,
+    ) -> "_DatagramMultiplexer":
+        af = dns.inet.af_for_address(address)
+        stuple = dns.asyncquery._source_tuple(af, source, 0)
+        connected = backend.datagram_connection_required()
+        dtuple = (address, port) if connected else None
+        sock = await backend.make_socket(af, socket.SOCK_DGRAM, 0, stuple, dtuple)
+        destination = dns.inet.low_level_address_tuple((address, port), af)
+        return cls(backend, sock, destination, connected)
+
+    async def close(self) -> None:
+        await self.sock.close()
+
+    async def query(
+        self, request: dns.message.QueryMessage, timeout: float
+    ) -> dns.message.Message:
+        while request.id in self.pending:
+            request.id = dns.entropy.random_16()
+        pending = _PendingQuery(request, self.backend.make_event())
+        self.pending[request.id] = pending
+        try:
+            pending.begin = time.time()
+            expiration = pending.begin + timeout
+            await self.sock.sendto(
+                request.to_wire(),
+                None if self.connected else self.destination,
+                timeout,
+            )
+            while pending.result is None:
+                remaining = expiration - time.time()
+                if remaining <= 0:
+                    raise dns.exception.Timeout(timeout=timeout)
+                if self.reading:
+                    # Wait for our response, or for the reader to stop reading.
+                    pending.event = self.backend.make_event()
+                    try:
+                        await self.backend.wait_for(pending.event.wait(), remaining)
+                    except dns.exception.Timeout:
+                        pass
+                else:
+                    await self._read(pending, expiration)
+        finally:
+            del self.pending[request.id]
+            if not self.reading:
+                # Hand the reading over to one of the other waiting queries.
+                for other in self.pending.values():
+                    if other.result is None:
+                        other.event.set()
+                        break
+        if isinstance(pending.result, Exception):
+            raise pending.result
+        return pending.result
+
+    async def _read(self, pending: _PendingQuery, expiration: float) -> None:
+        self.reading = True
+        try:
+            while pending.result is None:
+                remaining = expiration - time.time()
+                if remaining <= 0:
+                    return
+                try:
+                    (wire, from_address) = await self.sock.recvfrom(65535, remaining)
+                except dns.exception.Timeout:
+                    return
+                self._dispatch(wire, from_address)
+        finally:
+            self.reading = False
+
+    def _dispatch(self, wire: bytes, from_address: Any) -> None:
+        if len(wire) < 2 or not dns.query._matches_destination(
+            self.sock.family, from_address, self.destination, True
+        ):
+            return
+        pending = self.pending.get(struct.unpack("!H", wire[:2])[0])
+        if pending is None or pending.result is not None:
+            return
+        request = pending.request
+        try:
+            response = dns.message.from_wire(
+                wire,
+                keyring=request.keyring,
+                request_mac=request.mac,
+                raise_on_truncation=True,
+            )
+        except dns.message.Truncated as ex:
+            if request.is_response(ex.message()):
+                pending.result = ex
+                pending.event.set()
+            return
+        except Exception:
+            # Ignore garbage, as dns.query.udp() does with ignore_errors.
+            return
+        # is_response() checks the question too.
+        if request.is_response(response):
+            response.time = time.time() - pending.begin
+            pending.result = response
+            pending.event.set()
+
+
 default_resolver = None
 
 
@@ -20,8 +20,9 @@
 import contextlib
 import enum
 import io
+import threading
 import time
-from typing import Any, Dict, List, Tuple, cast
+from typing import Any, Dict, List, Set, Tuple, cast
 
 import dns.edns
 import dns.entropy
@@ -140,10 +141,17 @@ IndexType = Dict[IndexKeyType, dns.rrset.RRset]
 SectionType = int | str | List[dns.rrset.RRset]
 
 
+# Serializes the decoding of sections of messages read with from_wire(lazy=True),
+# as such messages may be shared between threads, e.g. by a resolver cache.
+_lazy_lock = threading.Lock()
+
+
 class Message:
     """A DNS message."""
 
     _section_enum = MessageSection
+    # Set on queries made by a QueryTemplate, which can render them.
+    _template: "QueryTemplate | None" = None
 
     def __init__(self, id: int | None = None):
         if id is None:
@@ -151,7 +159,10 @@ class Message:
         else:
             self.id = id
         self.flags = 0
-        self.sections: List[List[dns.rrset.RRset]] = [[], [], [], []]
+        self._sections: List[List[dns.rrset.RRset]] = [[], [], [], []]
+        # Sections of a message read with from_wire(lazy=True) which have
+        # not been decoded yet, mapped to how to decode them.
+        self._lazy: Dict[int, Tuple[bytes, int, int, bool, Set[int]]] | None = None
         self.opt: dns.rrset.RRset | None = None
         self.request_payload = 0
         self.pad = 0
@@ -167,41 +178,86 @@ class Message:
         self.time = 0.0
         self.wire: bytes | None = None
 
+    @property
+    def sections(self) -> List[List[dns.rrset.RRset]]:
+        """The list of the message's sections."""
+        if self._lazy:
+            for number in list(self._lazy):
+                self._decode_section(number)
+        return self._sections
+
+    @sections.setter
+    def sections(self, v):
+        self._lazy = None
+        self._sections = v
+
+    def _section(self, number: int) -> List[dns.rrset.RRset]:
+        if self._lazy and number in self._lazy:
+            self._decode_section(number)
+        return self._sections[number]
+
+    def _set_section(self, number: int, v: List[dns.rrset.RRset]) -> None:
+        if self._lazy:
+            self._lazy.pop(number, None)
+        self._sections[number] = v
+
+    def _decode_section(self, number: int) -> None:
+        with _lazy_lock:
+            if not self._lazy or number not in self._lazy:
+                # Another thread decoded it while we waited for the lock.
+                return
+            (wire, offset, count, one_rr_per_rrset, skip) = self._lazy[number]
+            reader = _WireReader(wire, None, one_rr_per_rrset=one_rr_per_rrset)
+            reader.message = self
+            reader.parser.seek(offset)
+            # Decode into a new list, so that if the section is malformed,
+            # it stays undecoded and raises the same error when accessed again.
+            self._sections[number] = []
+            try:
+                reader._get_section(number, count, skip)
+            except Exception:
+                self._sections[number] = []
+                if self.index is not None:
+                    for key in [key for key in self.index if key[0] == number]:
+                        del self.index[key]
+                raise
+            del self._lazy[number]
+
     @property
     def question(self) -> List[dns.rrset.RRset]:
         """The question section."""
-        return self.sections[0]
+        return self._section(0)
 
     @question.setter
     def question(self, v):
-        self.sections[0] = v
+        self._set_section(0, v)
 
     @property
     def answer(self) -> List[dns.rrset.RRset]:
         """The answer section."""
-        return self.sections[1]
+        return self._section(1)
 
     @answer.setter
     def answer(self, v):
-        self.sections[1] = v
+        self._set_section(1, v)
 
     @property
     def authority(self) -> List[dns.rrset.RRset]:
         """The authority section."""
-        return self.sections[2]
+        return self._section(2)
 
     @authority.setter
     def authority(self, v):
-        self.sections[2] = v
+        self._set_section(2, v)
 
     @property
     def additional(self) -> List[dns.rrset.RRset]:
         """The additional data section."""
-        return self.sections[3]
+        return self._section(3)
 
     @additional.setter
     def additional(self, v):
-        self.sections[3] = v
+        self._set_section(3, v)
 
     def __repr__(self):
         return "<DNS message, ID " + repr(self.id) + ">"
@@ -325,7 +381,7 @@ class Message:
         Returns an ``int``.
         """
 
-        for i, our_section in enumerate(self.sections):
+        for i, our_section in enumerate(self._sections):
             if section is our_section:
                 return self._section_enum(i)
         raise ValueError("unknown section")
@@ -343,7 +399,7 @@ class Message:
         """
 
         section = self._section_enum.make(number)
-        return self.sections[section]
+        return self._section(section)
 
     def find_rrset(
         self,
@@ -613,6 +669,13 @@ class Message:
             max_size = 512
         elif max_size > 65535:
             max_size = 65535
+        if self._template is not None and not kw:
+            wire = self._template._render(self)
+            if wire is not None and len(wire) <= max_size:
+                self.wire = wire
+                if prepend_length:
+                    wire = len(wire).to_bytes(2, "big") + wire
+                return wire
         r = dns.renderer.Renderer(self.id, self.flags, max_size, origin)
         opt_reserve = self._compute_opt_reserve()
         r.reserve(opt_reserve)
@@ -1123,6 +1186,8 @@ class _WireReader:
     continue_on_error: try to extract as much information as possible from
     the message, accumulating MessageErrors in the *errors* attribute instead of
     raising them.
+    lazy: Only find the records of the answer, authority, and additional
+    sections, decoding each section when it is first accessed?
     """
 
     def __init__(
@@ -1135,6 +1200,7 @@ class _WireReader:
         keyring=None,
         multi=False,
         continue_on_error=False,
+        lazy=False,
     ):
         self.parser = dns.wire.Parser(wire)
         self.message = None
@@ -1145,6 +1211,7 @@ class _WireReader:
         self.keyring = keyring
         self.multi = multi
         self.continue_on_error = continue_on_error
+        self.lazy = lazy
         self.errors = []
 
     def _get_question(self, section_number, qcount):
@@ -1152,7 +1219,7 @@ class _WireReader:
         the question section.
         """
         assert self.message is not None
-        section = self.message.sections[section_number]
+        section = self.message._sections[section_number]
         for _ in range(qcount):
             qname = self.parser.get_name(self.message.origin)
             (rdtype, rdclass) = self.parser.get_struct("!HH")
@@ -1166,17 +1233,66 @@ class _WireReader:
     def _add_error(self, e):
         self.errors.append(MessageError(e, self.parser.current))
 
-    def _get_section(self, section_number, count):
+    def _skip_rr(self):
+        """Skip over the next record."""
+        self.parser.skip_name()
+        (_, _, _, rdlen) = self.parser.get_struct("!HHIH")
+        self.parser.seek(self.parser.current + rdlen)
+
+    def _index_section(self, section_number, count):
+        """Find the next I{count} records without decoding them, and arrange
+        for the specified section to be decoded when it is first accessed.
+        OPT and TSIG records are read now, as they apply to the whole message.
+        """
+        assert self.message is not None
+        wire = self.parser.wire
+        offset = self.parser.current
+        special = set()
+        for i in range(count):
+            rr_start = self.parser.current
+            self.parser.skip_name()
+            header = self.parser.current
+            if self.parser.remaining() < 10:
+                raise dns.exception.FormError
+            rdtype = int.from_bytes(wire[header : header + 2], "big")
+            if rdtype in (dns.rdatatype.OPT, dns.rdatatype.TSIG):
+                special.add(i)
+                # Going back is safe, as nothing after the owner name has
+                # been read.
+                self.parser.seek(rr_start)
+                self._get_section(section_number, count, only=i)
+            else:
+                rdlen = int.from_bytes(wire[header + 8 : header + 10], "big")
+                self.parser.seek(header + 10 + rdlen)
+        if len(special) < count:
+            if self.message._lazy is None:
+                self.message._lazy = {}
+            self.message._lazy[section_number] = (
+                wire,
+                offset,
+                count,
+                self.one_rr_per_rrset,
+                special,
+            )
+
+    def _get_section(self, section_number, count, skip=(), only=None):
         """Read the next I{count} records from the wire data and add them to
         the specified section.
 
         section_number: the section of the message to which to add records
         count: the number of records to read
+        skip: the positions of records to skip over
+        only: if not None, the position of the only record to read, the
+        parser being at its start
         """
         assert self.message is not None
-        section = self.message.sections[section_number]
+        section = self.message._sections[section_number]
         force_unique = self.one_rr_per_rrset
-        for i in range(count):
+        positions = range(count) if only is None else (only,)
+        for i in positions:
+            if i in skip:
+                self._skip_rr()
+                continue
             rr_start = self.parser.current
             absolute_name = self.parser.get_name()
             if self.message.origin is not None:
@@ -1276,6 +1392,7 @@ class _WireReader:
         (id, flags, qcount, ancount, aucount, adcount) = self.parser.get_struct(
             "!HHHHHH"
         )
+        counts = (ancount, aucount, adcount)
         factory = _message_factory_from_opcode(dns.opcode.from_flags(flags))
         self.message = factory(id=id)
         self.message.flags = dns.flags.Flag(flags)
@@ -1288,9 +1405,16 @@ class _WireReader:
             self._get_question(MessageSection.QUESTION, qcount)
             if self.question_only:
                 return self.message
-            self._get_section(MessageSection.ANSWER, ancount)
-            self._get_section(MessageSection.AUTHORITY, aucount)
-            self._get_section(MessageSection.ADDITIONAL, adcount)
+            sections = (
+                MessageSection.ANSWER,
+                MessageSection.AUTHORITY,
+                MessageSection.ADDITIONAL,
+            )
+            for section_number, count in zip(sections, counts, strict=True):
+                if self.lazy:
+                    self._index_section(section_number, count)
+                else:
+                    self._get_section(section_number, count)
             if not self.ignore_trailing and self.parser.remaining() != 0:
                 raise TrailingJunk
             if self.multi and self.message.tsig_ctx and not self.message.had_tsig:
@@ -1316,6 +1440,7 @@ def from_wire(
     ignore_trailing: bool = False,
     raise_on_truncation: bool = False,
     continue_on_error: bool = False,
+    lazy: bool = False,
 ) -> Message:
     """Convert a DNS wire format message into a message object.
 
@@ -1357,6 +1482,14 @@ def from_wire(
     recommended only for DNS analysis tools, or for use in a server as part of an error
     handling path.  The default is ``False``.
 
+    *lazy*, a ``bool``.  If ``True``, only the header, the question section, and
+    any OPT or TSIG record are decoded at once.  The records of the answer,
+    authority, and additional sections are only found, and each of those sections
+    is decoded when it is first accessed, so the cost of reading a response
+    depends on what is used rather than on its size.  Errors in a section's
+    records are raised when it is accessed.  *lazy* is ignored if *xfr* or
+    *continue_on_error* is ``True``.  The default is ``False``.
+
     Raises ``dns.message.ShortHeader`` if the message is less than 12 octets long.
 
     Raises ``dns.message.TrailingJunk`` if there were octets in the message past the end
@@ -1393,6 +1526,7 @@ def from_wire(
         keyring,
         multi,
         continue_on_error,
+        lazy and not (xfr or continue_on_error),
     )
     try:
         m = reader.read()
@@ -1845,6 +1979,205 @@ def make_query(
     return m
 
 
+class QueryTemplate:
+    """A query precompiled to wire format, for making many queries which
+    differ only in their name and id.
+
+    The parameters are as for :py:func:`dns.message.make_query()`, except that
+    there is no padding, as it depends on the length of the name.
+
+    ``to_wire()`` splices an encoded name and id into the precompiled wire
+    format, which is much faster than making a query with ``make_query()``
+    and rendering it.  Queries made with ``make_query()`` are rendered the
+    same way, unless they have been changed so that the template no longer
+    describes them, e.g. by adding TSIG or changing the EDNS options.
+    """
+
+    def __init__(
+        self,
+        rdtype: dns.rdatatype.RdataType | str,
+        rdclass: dns.rdataclass.RdataClass | str = dns.rdataclass.IN,
+        use_edns: int | bool | None = None,
+        want_dnssec: bool = False,
+        ednsflags: int | None = None,
+        payload: int | None = None,
+        request_payload: int | None = None,
+        options: List[dns.edns.Option] | None = None,
+        flags: int = dns.flags.RD,
+        idna_codec: dns.name.IDNACodec | None = None,
+    ):
+        self.rdtype = dns.rdatatype.RdataType.make(rdtype)
+        self.rdclass = dns.rdataclass.RdataClass.make(rdclass)
+        self.idna_codec = idna_codec
+        prototype = make_query(
+            dns.name.root,
+            self.rdtype,
+            self.rdclass,
+            use_edns,
+            want_dnssec,
+            ednsflags,
+            payload,
+            request_payload,
+            options,
+            id=0,
+            flags=flags,
+        )
+        self.flags = prototype.flags
+        self.request_payload = prototype.request_payload
+        self._opt_rdata: dns.rdata.Rdata | None = None
+        self._ednsflags = 0
+        if prototype.opt is not None:
+            self._opt_rdata = prototype.opt[0]
+            self._ednsflags = prototype.opt.ttl
+        wire = prototype.to_wire()
+        # The wire format is the id, the rest of the header, the root name,
+        # and then the question's type and class, and the OPT record, if any.
+        self._header = wire[2:12]
+        self._trailer = wire[13:]
+
+    def to_wire(self, qname: dns.name.Name | str, id: int | None = None) -> bytes:
+        """Return the wire format of a query.
+
+        *qname*, a ``dns.name.Name`` or ``str``, the query name.
+
+        *id*, an ``int`` or ``None``, the query id.  The default is ``None``,
+        which generates a random query id.
+
+        Returns a ``bytes``.
+        """
+        if isinstance(qname, str):
+            qname = dns.name.from_text(qname, idna_codec=self.idna_codec)
+        if id is None:
+            id = dns.entropy.random_16()
+        return (
+            id.to_bytes(2, "big")
+            + self._header
+            + cast(bytes, qname.to_wire())
+            + self._trailer
+        )
+
+    def make_query(
+        self, qname: dns.name.Name | str, id: int | None = None
+    ) -> "QueryMessage":
+        """Make a query message, as :py:func:`dns.message.make_query()` would.
+
+        *qname*, a ``dns.name.Name`` or ``str``, the query name.
+
+        *id*, an ``int`` or ``None``, the query id.  The default is ``None``,
+        which generates a random query id.
+
+        Returns a ``dns.message.QueryMessage``.
+        """
+        if isinstance(qname, str):
+            qname = dns.name.from_text(qname, idna_codec=self.idna_codec)
+        m = QueryMessage(id=id)
+        m.flags = self.flags
+        m.find_rrset(
+            m.question, qname, self.rdclass, self.rdtype, create=True, force_unique=True
+        )
+        if self._opt_rdata is not None:
+            # Each query gets its own OPT RRset, as it is mutable.
+            m.opt = dns.rrset.from_rdata(
+                dns.name.root, self._ednsflags, self._opt_rdata
+            )
+            m.request_payload = self.request_payload
+        m._template = self
+        return m
+
+    def _render(self, m: Message) -> bytes | None:
+        # Return the wire format of m, or None if it is not described by this
+        # template.
+        if (
+            m.flags != self.flags
+            or m.tsig is not None
+            or m.pad
+            or len(m.question) != 1
+            or m.answer
+            or m.authority
+            or m.additional
+        ):
+            return None
+        if m.opt is None:
+            if self._opt_rdata is not None:
+                return None
+        elif (
+            len(m.opt) != 1
+            or m.opt[0] is not self._opt_rdata
+            or m.opt.ttl != self._ednsflags
+        ):
+            return None
+        question = m.question[0]
+        if (
+            question.rdtype != self.rdtype
+            or question.rdclass != self.rdclass
+            or question.covers != dns.rdatatype.NONE
+            or len(question) != 0
+            or not question.name.is_absolute()
+        ):
+            return None
+        return (
+            m.id.to_bytes(2, "big")
+            + self._header
+            + cast(bytes, question.name.to_wire())
+            + self._trailer
+        )
+
+
+_query_templates: Dict[Any, QueryTemplate] = {}
+_MAX_QUERY_TEMPLATES = 1000
+
+
+def get_query_template(
+    rdtype: dns.rdatatype.RdataType | str,
+    rdclass: dns.rdataclass.RdataClass | str = dns.rdataclass.IN,
+    use_edns: int | bool | None = None,
+    want_dnssec: bool = False,
+    ednsflags: int | None = None,
+    payload: int | None = None,
+    request_payload: int | None = None,
+    options: List[dns.edns.Option] | None = None,
+    flags: int = dns.flags.RD,
+) -> QueryTemplate:
+    """Return a shared :py:class:`dns.message.QueryTemplate` with the
+    specified parameters, making it if necessary.
+
+    Templates are cached, keyed by their parameters, with EDNS options
+    compared by their wire format.
+    """
+    if options:
+        options_key: Any = tuple((option.otype, option.to_wire()) for option in options)
+    else:
+        options_key = options
+    key = (
+        rdtype,
+        rdclass,
+        use_edns,
+        want_dnssec,
+        ednsflags,
+        payload,
+        request_payload,
+        options_key,
+        int(flags),
+    )
+    template = _query_templates.get(key)
+    if template is None:
+        template = QueryTemplate(
+            rdtype,
+            rdclass,
+            use_edns,
+            want_dnssec,
+            ednsflags,
+            payload,
+            request_payload,
+            options,
+            flags,
+        )
+        if len(_query_templates) >= _MAX_QUERY_TEMPLATES:
+            _query_templates.clear()
+        _query_templates[key] = template
+    return template
+
+
 class CopyMode(enum.Enum):
     """
     How should sections be copied when making an update response?
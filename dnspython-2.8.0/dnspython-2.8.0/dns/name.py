@@ -17,11 +17,13 @@
 
 """DNS Names."""
 
+import contextlib
+import contextvars
 import copy
 import encodings.idna  # type: ignore
 import functools
 import struct
-from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import dns._features
 import dns.enum
@@ -784,7 +786,7 @@ class Name:
             raise AbsoluteConcatenation
         labels = list(self.labels)
         labels.extend(list(other.labels))
-        return Name(labels)
+        return _make_name(labels)
 
     def relativize(self, origin: "Name") -> "Name":
         """If the name is a subdomain of *origin*, return a new name which is
@@ -798,7 +800,7 @@ class Name:
         """
 
         if origin is not None and self.is_subdomain(origin):
-            return Name(self[: -len(origin)])
+            return _make_name(self[: -len(origin)])
         else:
             return self
 
@@ -972,7 +974,7 @@ def from_unicode(
 
     if (len(labels) == 0 or labels[-1] != b"") and origin is not None:
         labels.extend(list(origin.labels))
-    return Name(labels)
+    return _make_name(labels)
 
 
 def is_all_ascii(text: str) -> bool:
@@ -1066,7 +1068,66 @@ def from_text(
             labels.append(b"")
     if (len(labels) == 0 or labels[-1] != b"") and origin is not None:
         labels.extend(list(origin.labels))
-    return Name(labels)
+    return _make_name(labels)
+
+
+class _InternTable:
+    """The names and labels shared within an interning() context."""
+
+    __slots__ = ["names", "labels"]
+
+    def __init__(self) -> None:
+        self.names: Dict[Tuple[bytes, ...], Name] = {}
+        self.labels: Dict[bytes, bytes] = {}
+
+    def get(self, labels: Iterable[bytes]) -> Name:
+        key = tuple(labels)
+        name = self.names.get(key)
+        if name is None:
+            shared = self.labels.setdefault
+            name = Name([shared(label, label) for label in key])
+            self.names[key] = name
+        return name
+
+
+_intern_table: contextvars.ContextVar[_InternTable | None] = contextvars.ContextVar(
+    "_intern_table", default=None
+)
+
+
+def _make_name(labels: List[bytes] | Tuple[bytes, ...]) -> Name:
+    table = _intern_table.get()
+    if table is None:
+        return Name(labels)
+    return table.get(labels)
+
+
+@contextlib.contextmanager
+def interning() -> Iterator[None]:
+    """Share names made within the context.
+
+    While the context is active, the names made by ``dns.name.from_text()``,
+    ``dns.name.from_unicode()``, ``dns.name.from_wire()`` and
+    ``dns.name.from_wire_parser()``, and by relativizing and concatenating
+    names, are interned: equal names share one ``dns.name.Name`` object, and
+    equal labels share one ``bytes``.  This is for building large collections of
+    names, such as loading a zone, where the same owner names, targets and
+    suffixes are read many times.
+
+    Names are compared case-sensitively for sharing, so the case of each name is
+    preserved.  The table is kept for the duration of the context, and names
+    made within it remain shared after it exits.  Contexts nest, sharing the
+    outermost table, and are local to a thread or asynchronous task.
+    """
+
+    if _intern_table.get() is not None:
+        yield
+        return
+    token = _intern_table.set(_InternTable())
+    try:
+        yield
+    finally:
+        _intern_table.reset(token)
 
 
 # we need 'dns.wire.Parser' quoted as dns.name and dns.wire depend on each other.
@@ -1102,7 +1163,7 @@ def from_wire_parser(parser: "dns.wire.Parser") -> Name:
                 raise BadLabelType
             count = parser.get_uint8()
         labels.append(b"")
-    return Name(labels)
+    return _make_name(labels)
 
 
 def from_wire(message: bytes, current: int) -> Tuple[Name, int]:
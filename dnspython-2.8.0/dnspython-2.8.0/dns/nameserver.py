@@ -1,9 +1,28 @@
+import threading
+import warnings
+from typing import Any, Dict, Tuple
 from urllib.parse import urlparse
 
 import dns.asyncbackend
 import dns.asyncquery
 import dns.message
 import dns.query
+import dns.quic
+
+
+def _discard_closed_loops(resources: Dict[Any, Tuple[Any, Any]], what: str) -> None:
+    # Forget the resources kept for event loops which have closed, which can
+    # no longer be closed properly.  *resources* maps each loop to a
+    # (backend, resource) tuple.
+    for loop, (backend, _) in list(resources.items()):
+        if backend.loop_is_closed(loop):
+            del resources[loop]
+            warnings.warn(
+                f"{what} used with a closed event loop were not closed; "
+                "call async_close() before the loop is closed",
+                ResourceWarning,
+                stacklevel=2,
+            )
 
 
 class Nameserver:
@@ -75,8 +94,20 @@ class AddressAndPortNameserver(Nameserver):
 
 
 class Do53Nameserver(AddressAndPortNameserver):
-    def __init__(self, address: str, port: int = 53):
+    def __init__(
+        self,
+        address: str,
+        port: int = 53,
+        pool: dns.query.ConnectionPool | None = None,
+        async_pool: dns.asyncquery.ConnectionPool | None = None,
+        udp_socket_pool: dns.query.UDPSocketPool | None = None,
+    ):
         super().__init__(address, port)
+        self.pool = pool
+        self.async_pool = async_pool
+        if udp_socket_pool is None:
+            udp_socket_pool = dns.query.get_default_udp_socket_pool()
+        self.udp_socket_pool = udp_socket_pool
 
     def kind(self):
         return "Do53"
@@ -101,6 +132,7 @@ class Do53Nameserver(AddressAndPortNameserver):
                 source_port=source_port,
                 one_rr_per_rrset=one_rr_per_rrset,
                 ignore_trailing=ignore_trailing,
+                pool=self.pool,
             )
         else:
             response = dns.query.udp(
@@ -115,6 +147,7 @@ class Do53Nameserver(AddressAndPortNameserver):
                 ignore_trailing=ignore_trailing,
                 ignore_errors=True,
                 ignore_unexpected=True,
+                socket_pool=self.udp_socket_pool,
             )
         return response
 
@@ -140,6 +173,7 @@ class Do53Nameserver(AddressAndPortNameserver):
                 backend=backend,
                 one_rr_per_rrset=one_rr_per_rrset,
                 ignore_trailing=ignore_trailing,
+                pool=self.async_pool,
             )
         else:
             response = await dns.asyncquery.udp(
@@ -174,10 +208,83 @@ class DoHNameserver(Nameserver):
         self.verify = verify
         self.want_get = want_get
         self.http_version = http_version
+        # HTTP clients are made when first needed, and are then shared by all
+        # queries so that connections are reused and concurrent queries are
+        # multiplexed as HTTP/2 streams.  They are keyed by source address.
+        self._lock = threading.Lock()
+        self._clients: Dict[str | None, Any] = {}
+        # Asynchronous clients only work with the event loop they were made
+        # with, so each loop has its own, kept with the loop's backend.
+        self._async_clients: Dict[Any, Tuple[Any, Dict[str | None, Any]]] = {}
 
     def kind(self):
         return "DoH"
 
+    def _uses_httpx(self) -> bool:
+        return dns.query.have_doh and self.http_version != dns.query.HTTPVersion.H3
+
+    def _client(self, source: str | None, source_port: int) -> Any:
+        # The connections of a shared client cannot all be bound to one
+        # source port.
+        if source_port != 0 or not self._uses_httpx():
+            return None
+        with self._lock:
+            client = self._clients.get(source)
+            if client is None:
+                client = dns.query._make_https_client(
+                    source, 0, self.http_version, self.verify, self.bootstrap_address
+                )
+                self._clients[source] = client
+            return client
+
+    def _async_client(
+        self, source: str | None, source_port: int, backend: dns.asyncbackend.Backend
+    ) -> Any:
+        if source_port != 0 or not self._uses_httpx():
+            return None
+        loop = backend.current_loop()
+        with self._lock:
+            if loop not in self._async_clients:
+                _discard_closed_loops(self._async_clients, f"HTTP clients of {self}")
+                self._async_clients[loop] = (backend, {})
+            clients = self._async_clients[loop][1]
+            client = clients.get(source)
+            if client is None:
+                client = dns.asyncquery._make_https_client(
+                    backend,
+                    source,
+                    0,
+                    self.http_version,
+                    self.verify,
+                    self.bootstrap_address,
+                )
+                clients[source] = client
+            return client
+
+    def close(self) -> None:
+        """Close the HTTP clients used by :py:meth:`query`."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients = {}
+        for client in clients:
+            client.close()
+
+    async def async_close(self) -> None:
+        """Close the HTTP clients used by :py:meth:`async_query` with the
+        running event loop.
+
+        Each event loop the nameserver is used with has clients of its own,
+        which should be closed by calling this method from that loop before
+        it is closed.  The clients of loops which have been closed are
+        discarded, with a ``ResourceWarning``, when the nameserver is next
+        used with a new loop.
+        """
+        loop = dns.asyncbackend.get_default_backend().current_loop()
+        with self._lock:
+            (_, clients) = self._async_clients.pop(loop, (None, {}))
+        for client in clients.values():
+            await client.aclose()
+
     def is_always_max_size(self) -> bool:
         return True
 
@@ -215,6 +322,7 @@ class DoHNameserver(Nameserver):
             verify=self.verify,
             post=(not self.want_get),
             http_version=self.http_version,
+            session=self._client(source, source_port),
         )
 
     async def async_query(
@@ -240,6 +348,7 @@ class DoHNameserver(Nameserver):
             verify=self.verify,
             post=(not self.want_get),
             http_version=self.http_version,
+            client=self._async_client(source, source_port, backend),
         )
 
 
@@ -250,10 +359,14 @@ class DoTNameserver(AddressAndPortNameserver):
         port: int = 853,
         hostname: str | None = None,
         verify: bool | str = True,
+        pool: dns.query.ConnectionPool | None = None,
+        async_pool: dns.asyncquery.ConnectionPool | None = None,
     ):
         super().__init__(address, port)
         self.hostname = hostname
         self.verify = verify
+        self.pool = pool
+        self.async_pool = async_pool
 
     def kind(self):
         return "DoT"
@@ -277,6 +390,7 @@ class DoTNameserver(AddressAndPortNameserver):
             ignore_trailing=ignore_trailing,
             server_hostname=self.hostname,
             verify=self.verify,
+            pool=self.pool,
         )
 
     async def async_query(
@@ -299,6 +413,7 @@ class DoTNameserver(AddressAndPortNameserver):
             ignore_trailing=ignore_trailing,
             server_hostname=self.hostname,
             verify=self.verify,
+            pool=self.async_pool,
         )
 
 
@@ -313,10 +428,101 @@ class DoQNameserver(AddressAndPortNameserver):
         super().__init__(address, port)
         self.verify = verify
         self.server_hostname = server_hostname
+        # QUIC managers are made when first needed, and are then kept so that
+        # queries share a connection, each using a stream of its own.  Session
+        # tickets and tokens are kept here rather than by a manager, so a new
+        # connection can resume the TLS session and send its first query as
+        # 0-RTT early data even after the manager is closed.
+        self._lock = threading.Lock()
+        self._session_tickets: Dict[Any, Any] = {}
+        self._tokens: Dict[Any, Any] = {}
+        self._manager: Any = None
+        # An asynchronous manager only works with the event loop it was made
+        # with, so each loop has its own, kept with the loop's backend.
+        self._async_managers: Dict[Any, Tuple[Any, Any]] = {}
 
     def kind(self):
         return "DoQ"
 
+    def _connection(self) -> Any:
+        if not dns.quic.have_quic:
+            return None
+        with self._lock:
+            if self._manager is None:
+                self._manager = dns.quic.SyncQuicManager(
+                    verify_mode=self.verify,
+                    server_name=self.server_hostname,
+                    session_tickets=self._session_tickets,
+                    tokens=self._tokens,
+                )
+            manager = self._manager
+        return manager.connect(self.address, self.port)
+
+    def _async_connection(self, backend: dns.asyncbackend.Backend) -> Any:
+        # Trio connections run in a nursery, which cannot outlive the query,
+        # so only asyncio connections are shared.
+        if not dns.quic.have_quic or backend.name() != "asyncio":
+            return None
+        loop = backend.current_loop()
+        with self._lock:
+            if loop not in self._async_managers:
+                _discard_closed_loops(
+                    self._async_managers, f"QUIC connections of {self}"
+                )
+                manager = dns.quic.AsyncioQuicManager(
+                    verify_mode=self.verify,
+                    server_name=self.server_hostname,
+                    session_tickets=self._session_tickets,
+                    tokens=self._tokens,
+                )
+                self._async_managers[loop] = (backend, manager)
+            manager = self._async_managers[loop][1]
+        return manager.connect(self.address, self.port)
+
+    def get_statistics_snapshot(self) -> Any:
+        """Return a ``dns.quic.QuicStatistics`` with the sum of the statistics
+        of the QUIC managers used by :py:meth:`query` and
+        :py:meth:`async_query` since they were last closed.
+        """
+        if not dns.quic.have_quic:
+            raise dns.query.NoDOQ("DNS-over-QUIC is not available.")
+        statistics = dns.quic.QuicStatistics()
+        with self._lock:
+            managers = [self._manager]
+            managers.extend(manager for (_, manager) in self._async_managers.values())
+        for manager in managers:
+            if manager is not None:
+                snapshot = manager.get_statistics_snapshot()
+                for name, value in vars(snapshot).items():
+                    setattr(statistics, name, getattr(statistics, name) + value)
+        return statistics
+
+    def close(self) -> None:
+        """Close the connections used by :py:meth:`query`.  Saved session
+        tickets are kept.
+        """
+        with self._lock:
+            manager = self._manager
+            self._manager = None
+        if manager is not None:
+            manager.close()
+
+    async def async_close(self) -> None:
+        """Close the connections used by :py:meth:`async_query` with the
+        running event loop.  Saved session tickets are kept.
+
+        Each event loop the nameserver is used with has connections of its
+        own, which should be closed by calling this method from that loop
+        before it is closed.  The connections of loops which have been closed
+        are discarded, with a ``ResourceWarning``, when the nameserver is next
+        used with a new loop.
+        """
+        loop = dns.asyncbackend.get_default_backend().current_loop()
+        with self._lock:
+            (_, manager) = self._async_managers.pop(loop, (None, None))
+        if manager is not None:
+            await manager.close()
+
     def query(
         self,
         request: dns.message.QueryMessage,
@@ -334,6 +540,7 @@ class DoQNameserver(AddressAndPortNameserver):
             timeout=timeout,
             one_rr_per_rrset=one_rr_per_rrset,
             ignore_trailing=ignore_trailing,
+            connection=self._connection(),
             verify=self.verify,
             server_hostname=self.server_hostname,
         )
@@ -356,6 +563,8 @@ class DoQNameserver(AddressAndPortNameserver):
             timeout=timeout,
             one_rr_per_rrset=one_rr_per_rrset,
             ignore_trailing=ignore_trailing,
+            connection=self._async_connection(backend),
             verify=self.verify,
+            backend=backend,
             server_hostname=self.server_hostname,
         )
@@ -17,25 +17,44 @@
 
 """Talk to a DNS server."""
 
+import atexit
 import base64
+import collections
 import contextlib
 import enum
 import errno
+import heapq
 import os
 import random
 import selectors
 import socket
 import struct
+import threading
 import time
 import urllib.parse
-from typing import Any, Callable, Dict, Optional, Tuple, cast
+import weakref
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 import dns._features
 import dns._tls_util
+import dns.entropy
 import dns.exception
 import dns.inet
 import dns.message
 import dns.name
+import dns.opcode
 import dns.quic
 import dns.rdata
 import dns.rdataclass
@@ -111,6 +130,10 @@ if _have_httpx:
                     source = None
                 try:
                     sock = make_socket(af, socket.SOCK_STREAM, source)
+                    # As httpcore's own backend does.  Otherwise, on a reused
+                    # connection, a request written in several pieces can wait
+                    # for a delayed acknowledgement.
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
                     attempt_expiration = _expiration_for_this_attempt(2.0, expiration)
                     _connect(
                         sock,
@@ -253,6 +276,8 @@ def _addresses_equal(af, a1, a2):
     # Convert the first value of the tuple, which is a textual format
     # address into binary form, so that we are not confused by different
     # textual representations of the same address
+    if a1 == a2:
+        return True
     try:
         n1 = dns.inet.inet_pton(af, a1[0])
         n2 = dns.inet.inet_pton(af, a2[0])
@@ -410,6 +435,153 @@ def _make_socket(
         return make_socket(af, type, source)
 
 
+# How many randomly chosen ports to try when binding a pooled socket, before
+# letting the operating system choose.
+_BIND_ATTEMPTS = 10
+
+
+class UDPSocketPool:
+    """A pool of nonblocking datagram sockets which :py:func:`dns.query.udp`
+    reuses instead of making a socket for every query.
+
+    Each socket is bound to a randomly chosen port when it is made, and is
+    closed after *max_uses* queries, so source port randomization is kept
+    while the cost of making, binding, and closing a socket is paid less
+    often.  A socket is only returned to the pool after a query which got a
+    response, so a late response to a query which timed out cannot be seen by
+    a later query.  A pool may be shared by many threads.
+
+    *max_uses*, an ``int``, the number of queries a socket is used for before
+    it is closed.  The default is 100.
+
+    *max_idle*, an ``int``, the number of unused sockets of each address
+    family which are kept.  The default is 64.
+    """
+
+    def __init__(self, max_uses: int = 100, max_idle: int = 64) -> None:
+        self.max_uses = max_uses
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: Dict[int, List[Tuple[socket.socket, int]]] = {}
+        _udp_socket_pools.add(self)
+
+    def _make_socket(self, af: socket.AddressFamily | int) -> socket.socket:
+        if af == socket.AF_INET:
+            address = "0.0.0.0"
+        else:
+            address = "::"
+        for _ in range(_BIND_ATTEMPTS):
+            port = dns.entropy.between(1024, 65535)
+            source = dns.inet.low_level_address_tuple((address, port), af)
+            try:
+                return make_socket(af, socket.SOCK_DGRAM, source)
+            except OSError as e:
+                if e.errno not in (errno.EADDRINUSE, errno.EACCES):
+                    raise
+        return make_socket(af, socket.SOCK_DGRAM)
+
+    def _put(self, af: socket.AddressFamily | int, s: socket.socket, uses: int) -> None:
+        if uses < self.max_uses:
+            with self._lock:
+                idle = self._idle.setdefault(af, [])
+                if len(idle) < self.max_idle:
+                    idle.append((s, uses))
+                    return
+        s.close()
+
+    def close(self) -> None:
+        """Close all unused sockets."""
+        with self._lock:
+            idle = [s for sockets in self._idle.values() for (s, _) in sockets]
+            self._idle = {}
+        for s in idle:
+            s.close()
+
+    def _forget(self) -> None:
+        # The sockets are shared with our parent process, so close our copies
+        # without reading from them.
+        self._lock = threading.Lock()
+        self.close()
+
+    # This is defined last, as it hides the socket module in the class body.
+    def socket(self, af: socket.AddressFamily | int) -> "_PooledSocket":
+        """Return a context manager which provides a socket of the address
+        family *af* from the pool.  The socket is returned to the pool when the
+        context exits normally, and is closed if an exception is raised.
+        """
+        with self._lock:
+            idle = self._idle.get(af)
+            if idle:
+                (s, uses) = idle.pop()
+            else:
+                s = None
+                uses = 0
+        if s is None:
+            s = self._make_socket(af)
+        else:
+            _drain(s)
+        return _PooledSocket(self, af, s, uses)
+
+
+class _PooledSocket:
+    def __init__(
+        self,
+        pool: UDPSocketPool,
+        af: socket.AddressFamily | int,
+        s: socket.socket,
+        uses: int,
+    ) -> None:
+        self.pool = pool
+        self.af = af
+        self.socket = s
+        self.uses = uses
+
+    def __enter__(self) -> socket.socket:
+        return self.socket
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.pool._put(self.af, self.socket, self.uses + 1)
+        else:
+            self.socket.close()
+        return False
+
+
+def _drain(s: socket.socket) -> None:
+    # Discard any datagrams which arrived after the socket's last query.
+    while True:
+        try:
+            s.recvfrom(65535)
+        except OSError:
+            return
+
+
+_udp_socket_pools: "weakref.WeakSet[UDPSocketPool]" = weakref.WeakSet()
+
+
+def _forget_udp_socket_pools() -> None:
+    for pool in list(_udp_socket_pools):
+        pool._forget()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_udp_socket_pools)
+
+_default_udp_socket_pool = UDPSocketPool()
+# Close the default pool's sockets at exit, rather than leaving them for the
+# garbage collector.
+atexit.register(_default_udp_socket_pool.close)
+
+
+def get_default_udp_socket_pool() -> UDPSocketPool:
+    """Return the process-wide UDP socket pool.
+
+    Its unused sockets are closed when the process exits, and may be closed
+    sooner with its ``close()`` method; the pool remains usable afterwards.
+    """
+    return _default_udp_socket_pool
+
+
 def _maybe_get_resolver(
     resolver: Optional["dns.resolver.Resolver"],  # pyright: ignore
 ) -> "dns.resolver.Resolver":  # pyright: ignore
@@ -440,6 +612,33 @@ class HTTPVersion(enum.IntEnum):
     H3 = 3
 
 
+def _make_https_client(
+    local_address: str | None,
+    local_port: int,
+    http_version: HTTPVersion,
+    verify: bool | str | ssl.SSLContext,
+    bootstrap_address: str | None,
+    resolver: Optional["dns.resolver.Resolver"] = None,  # pyright: ignore
+    family: int = socket.AF_UNSPEC,
+) -> Any:
+    """Make an ``httpx.Client`` for DNS-over-HTTPS queries."""
+    h1 = http_version in (HTTPVersion.H1, HTTPVersion.DEFAULT)
+    h2 = http_version in (HTTPVersion.H2, HTTPVersion.DEFAULT)
+    transport = _HTTPTransport(
+        local_address=local_address,
+        http1=h1,
+        http2=h2,
+        verify=verify,
+        local_port=local_port,
+        bootstrap_address=bootstrap_address,
+        resolver=resolver,
+        family=family,  # pyright: ignore
+    )
+    return httpx.Client(  # type: ignore
+        http1=h1, http2=h2, verify=verify, transport=transport  # type: ignore
+    )
+
+
 def https(
     q: dns.message.Message,
     where: str,
@@ -569,9 +768,6 @@ def https(
     wire = q.to_wire()
     headers = {"accept": "application/dns-message"}
 
-    h1 = http_version in (HTTPVersion.H1, HTTPVersion.DEFAULT)
-    h2 = http_version in (HTTPVersion.H2, HTTPVersion.DEFAULT)
-
     # set source port and source address
 
     if the_source is None:
@@ -584,19 +780,14 @@ def https(
     if session:
         cm: contextlib.AbstractContextManager = contextlib.nullcontext(session)
     else:
-        transport = _HTTPTransport(
-            local_address=local_address,
-            http1=h1,
-            http2=h2,
-            verify=verify,
-            local_port=local_port,
-            bootstrap_address=bootstrap_address,
-            resolver=resolver,
-            family=family,  # pyright: ignore
-        )
-
-        cm = httpx.Client(  # type: ignore
-            http1=h1, http2=h2, verify=verify, transport=transport  # type: ignore
+        cm = _make_https_client(
+            local_address,
+            local_port,
+            http_version,
+            verify,
+            bootstrap_address,
+            resolver,
+            family,
         )
     with cm as session:
         # see https://tools.ietf.org/html/rfc8484#section-4.1.1 for DoH
@@ -909,6 +1100,7 @@ def udp(
     raise_on_truncation: bool = False,
     sock: Any | None = None,
     ignore_errors: bool = False,
+    socket_pool: UDPSocketPool | None = None,
 ) -> dns.message.Message:
     """Return the response obtained after sending a query via UDP.
 
@@ -949,6 +1141,10 @@ def udp(
     mismatches occur, ignore them and keep listening for a valid response.
     The default is ``False``.
 
+    *socket_pool*, a ``dns.query.UDPSocketPool`` or ``None``.  If not ``None``,
+    and neither a socket nor a source address or port is specified, a socket
+    from the pool is used.
+
     Returns a ``dns.message.Message``.
     """
 
@@ -961,7 +1157,10 @@ def udp(
         cm: contextlib.AbstractContextManager = contextlib.nullcontext(sock)
     else:
         assert af is not None
-        cm = make_socket(af, socket.SOCK_DGRAM, source)
+        if socket_pool is not None and source is None:
+            cm = socket_pool.socket(af)
+        else:
+            cm = make_socket(af, socket.SOCK_DGRAM, source)
     with cm as s:
         send_udp(s, wire, destination, expiration)
         (r, received_time) = receive_udp(
@@ -1076,25 +1275,337 @@ def udp_with_fallback(
         return (response, True)
 
 
+def _hedged_destinations(where, port, hedge_where, hedge_port, source, source_port):
+    (af, destination, source) = _destination_and_source(
+        where, port, source, source_port, True
+    )
+    if dns.inet.af_for_address(hedge_where) != af:
+        raise ValueError("different address families for where and hedge_where")
+    hedge_destination = dns.inet.low_level_address_tuple((hedge_where, hedge_port), af)
+    return (af, destination, hedge_destination, source)
+
+
+def _hedged_response(
+    q, wire, af, from_address, destinations, one_rr_per_rrset, ignore_trailing
+):
+    # Return a (response, index) tuple if wire is a response to q from the
+    # destination with the given index in destinations, and None otherwise.
+    index = next(
+        (
+            i
+            for i, destination in enumerate(destinations)
+            if _matches_destination(af, from_address, destination, True)
+        ),
+        None,
+    )
+    if index is None:
+        return None
+    try:
+        r = dns.message.from_wire(
+            wire,
+            keyring=q.keyring,
+            request_mac=q.mac,
+            one_rr_per_rrset=one_rr_per_rrset,
+            ignore_trailing=ignore_trailing,
+            raise_on_truncation=True,
+        )
+    except dns.message.Truncated as e:
+        r = e.message()
+    except Exception:
+        return None
+    if not q.is_response(r):
+        return None
+    return (r, index)
+
+
+def udp_hedged(
+    q: dns.message.Message,
+    where: str,
+    hedge_where: str,
+    hedge_delay: float,
+    timeout: float | None = None,
+    port: int = 53,
+    hedge_port: int = 53,
+    source: str | None = None,
+    source_port: int = 0,
+    one_rr_per_rrset: bool = False,
+    ignore_trailing: bool = False,
+) -> Tuple[dns.message.Message, bool]:
+    """Send a query via UDP, and if no response arrives quickly, send it to a
+    second nameserver too, and return whichever response arrives first.
+
+    The query is sent to *where*.  If no response has arrived after
+    *hedge_delay* seconds, the same query is also sent to *hedge_where* from
+    the same socket.  Datagrams from other sources, datagrams which cannot
+    be parsed, and messages which are not a response to the query are
+    ignored, as with ``udp()`` when *ignore_unexpected* and *ignore_errors*
+    are ``True``.
+
+    *hedge_where*, a ``str`` containing an IPv4 or IPv6 address of the same
+    family as *where*, the nameserver to send the hedged query to.
+
+    *hedge_delay*, a ``float``, the number of seconds to wait for a response
+    before sending the hedged query.
+
+    *hedge_port*, an ``int``, the port to send the hedged query to.  The
+    default is 53.
+
+    See :py:func:`dns.query.udp()` for the documentation of the other
+    parameters.
+
+    A truncated response is returned like any other, so callers should check
+    its TC flag.
+
+    The response's *time* is measured from when the query was sent to the
+    nameserver which answered it, so it is the round trip time to *where* or
+    to *hedge_where*.
+
+    Returns a ``(dns.message.Message, bool)`` tuple of the response and
+    whether it came from *hedge_where*.
+    """
+
+    wire = q.to_wire()
+    (af, destination, hedge_destination, source) = _hedged_destinations(
+        where, port, hedge_where, hedge_port, source, source_port
+    )
+    (begin_time, expiration) = _compute_times(timeout)
+    hedge_expiration = begin_time + hedge_delay
+    if expiration is not None and hedge_expiration >= expiration:
+        # We'd never send the hedged query.
+        hedge_expiration = expiration
+    destinations = [destination]
+    # When the query was sent to each destination, to time its response.
+    sent_times = [begin_time]
+    assert af is not None
+    with make_socket(af, socket.SOCK_DGRAM, source) as s:
+        send_udp(s, wire, destination, expiration)
+        while True:
+            try:
+                if len(destinations) == 1:
+                    (rwire, from_address) = _udp_recv(s, 65535, hedge_expiration)
+                else:
+                    (rwire, from_address) = _udp_recv(s, 65535, expiration)
+            except dns.exception.Timeout:
+                if len(destinations) == 1 and hedge_expiration != expiration:
+                    (_, sent_time) = send_udp(s, wire, hedge_destination, expiration)
+                    destinations.append(hedge_destination)
+                    sent_times.append(sent_time)
+                    continue
+                raise
+            result = _hedged_response(
+                q,
+                rwire,
+                af,
+                from_address,
+                destinations,
+                one_rr_per_rrset,
+                ignore_trailing,
+            )
+            if result is not None:
+                (r, index) = result
+                r.time = time.time() - sent_times[index]
+                return (r, index == 1)
+
+
+# The receive buffer size udp_batch() asks for on sockets it makes, so that a
+# burst of responses isn't dropped before we get around to reading it.
+_BATCH_RECEIVE_BUFFER_SIZE = 1 << 20
+
+
+def _batch_response(
+    q, wire, one_rr_per_rrset, ignore_trailing, raise_on_truncation, lazy=False
+):
+    # Return the response, or the Truncated exception, if wire is a response
+    # to q, and None otherwise.
+    try:
+        r = dns.message.from_wire(
+            wire,
+            keyring=q.keyring,
+            request_mac=q.mac,
+            one_rr_per_rrset=one_rr_per_rrset,
+            ignore_trailing=ignore_trailing,
+            raise_on_truncation=raise_on_truncation,
+            lazy=lazy,
+        )
+    except dns.message.Truncated as e:
+        if q.is_response(e.message()):
+            return e
+        return None
+    except Exception:
+        return None
+    if not q.is_response(r):
+        return None
+    return r
+
+
+def udp_batch(
+    queries: Iterable[dns.message.Message],
+    where: str,
+    timeout: float | None = None,
+    port: int = 53,
+    source: str | None = None,
+    source_port: int = 0,
+    one_rr_per_rrset: bool = False,
+    ignore_trailing: bool = False,
+    raise_on_truncation: bool = False,
+    sock: Any | None = None,
+    max_in_flight: int = 256,
+) -> List[dns.message.Message | Exception]:
+    """Send many queries via UDP from one socket, and return their responses.
+
+    Up to *max_in_flight* queries are outstanding at once.  Queries are sent
+    back to back without waiting, and whenever the socket is readable every
+    datagram waiting on it is read before any more are sent.  Responses are
+    matched to queries by message id, so a query whose id is the same as that
+    of an outstanding query is given a new id.  Datagrams from other sources,
+    datagrams which cannot be parsed, and messages which are not a response to
+    a query are ignored, as with ``udp()`` when *ignore_unexpected* and
+    *ignore_errors* are ``True``.
+
+    *queries*, an iterable of ``dns.message.Message``, the queries to send.
+
+    *timeout*, a ``float`` or ``None``, the number of seconds to wait for the
+    response to each query, counted from when that query is sent.  If
+    ``None``, the default, wait forever.
+
+    *max_in_flight*, an ``int``, the maximum number of queries awaiting a
+    response.  The default is 256.
+
+    See :py:func:`dns.query.udp()` for the documentation of the other
+    parameters.
+
+    Returns a list with an entry for each query, in the order of *queries*.
+    An entry is the ``dns.message.Message`` response, or the exception
+    which prevented one, e.g. ``dns.exception.Timeout``, or
+    ``dns.message.Truncated`` if *raise_on_truncation* is ``True``.
+    """
+
+    queries = list(queries)
+    results: List[Any] = [None] * len(queries)
+    sent_times = [0.0] * len(queries)
+    max_in_flight = min(max(max_in_flight, 1), 65536)
+    (af, destination, source) = _destination_and_source(
+        where, port, source, source_port, True
+    )
+    if sock:
+        cm: contextlib.AbstractContextManager = contextlib.nullcontext(sock)
+    else:
+        assert af is not None
+        cm = make_socket(af, socket.SOCK_DGRAM, source)
+    with cm as s, selectors.DefaultSelector() as selector:
+        if not sock:
+            try:
+                s.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_RCVBUF, _BATCH_RECEIVE_BUFFER_SIZE
+                )
+            except OSError:  # pragma: no cover
+                pass
+        selector.register(s, selectors.EVENT_READ)
+        # Map the ids of outstanding queries to their indices in queries.
+        pending: Dict[int, int] = {}
+        # (expiration, index) tuples of sent queries in the order sent, which
+        # is also the order in which they expire.
+        expirations: Deque[Tuple[float, int]] = collections.deque()
+        next_index = 0
+        while next_index < len(queries) or pending:
+            blocked = False
+            while next_index < len(queries) and len(pending) < max_in_flight:
+                q = queries[next_index]
+                while q.id in pending:
+                    q.id = dns.entropy.random_16()
+                try:
+                    s.sendto(q.to_wire(), destination)
+                except BlockingIOError:
+                    blocked = True
+                    break
+                except OSError as e:
+                    results[next_index] = e
+                    next_index += 1
+                    continue
+                now = time.time()
+                sent_times[next_index] = now
+                pending[q.id] = next_index
+                if timeout is not None:
+                    expirations.append((now + timeout, next_index))
+                next_index += 1
+            if blocked:
+                selector.modify(s, selectors.EVENT_READ | selectors.EVENT_WRITE)
+            if expirations:
+                selector.select(max(expirations[0][0] - time.time(), 0.0))
+            else:
+                selector.select()
+            if blocked:
+                selector.modify(s, selectors.EVENT_READ)
+            while pending:
+                try:
+                    (wire, from_address) = s.recvfrom(65535)
+                except BlockingIOError:
+                    break
+                except OSError:
+                    # E.g. an ICMP port unreachable for one of our queries.
+                    # The query it was for will time out.
+                    continue
+                received_time = time.time()
+                if len(wire) < 2 or not _matches_destination(
+                    af, from_address, destination, True
+                ):
+                    continue
+                index = pending.get(struct.unpack("!H", wire[:2])[0])
+                if index is None:
+                    continue
+                q = queries[index]
+                result = _batch_response(
+                    q, wire, one_rr_per_rrset, ignore_trailing, raise_on_truncation
+                )
+                if result is None:
+                    continue
+                if isinstance(result, dns.message.Message):
+                    result.time = received_time - sent_times[index]
+                del pending[q.id]
+                results[index] = result
+            now = time.time()
+            while expirations and expirations[0][0] <= now:
+                (_, index) = expirations.popleft()
+                if results[index] is None:
+                    del pending[queries[index].id]
+                    results[index] = dns.exception.Timeout()
+    return results
+
+
 def _net_read(sock, count, expiration):
     """Read the specified number of bytes from sock.  Keep trying until we
     either get the desired amount, or we hit EOF.
     A Timeout exception will be raised if the operation is not completed
     by the expiration time.
     """
-    s = b""
-    while count > 0:
+    # Usually one recv() gets everything.  If it doesn't, the rest is received
+    # directly into a buffer of the right size, rather than concatenating
+    # chunks, which copies everything received so far for each chunk.
+    buffer = None
+    received = 0
+    while received < count:
         try:
-            n = sock.recv(count)
-            if n == b"":
-                raise EOFError("EOF")
-            count -= len(n)
-            s += n
+            if buffer is None:
+                data = sock.recv(count)
+                if data == b"":
+                    raise EOFError("EOF")
+                if len(data) == count:
+                    return data
+                buffer = bytearray(count)
+                buffer[: len(data)] = data
+                received = len(data)
+            else:
+                n = sock.recv_into(memoryview(buffer)[received:])
+                if n == 0:
+                    raise EOFError("EOF")
+                received += n
         except (BlockingIOError, ssl.SSLWantReadError):
             _wait_for_readable(sock, expiration)
         except ssl.SSLWantWriteError:  # pragma: no cover
             _wait_for_writable(sock, expiration)
-    return s
+    if buffer is None:
+        return b""
+    return bytes(buffer)
 
 
 def _net_write(sock, data, expiration):
@@ -1211,6 +1722,7 @@ def tcp(
     one_rr_per_rrset: bool = False,
     ignore_trailing: bool = False,
     sock: Any | None = None,
+    pool: Optional["ConnectionPool"] = None,
 ) -> dns.message.Message:
     """Return the response obtained after sending a query via TCP.
 
@@ -1241,9 +1753,24 @@ def tcp(
     if a socket is provided, it must be a nonblocking connected stream
     socket, and *where*, *port*, *source* and *source_port* are ignored.
 
+    *pool*, a ``dns.query.ConnectionPool``, or ``None``.  If not ``None``, and
+    no socket is provided, the query is sent on a persistent connection from
+    the pool.
+
     Returns a ``dns.message.Message``.
     """
 
+    if pool is not None and not sock:
+        return pool.tcp(
+            q,
+            where,
+            timeout,
+            port,
+            source,
+            source_port,
+            one_rr_per_rrset,
+            ignore_trailing,
+        )
     wire = q.to_wire()
     (begin_time, expiration) = _compute_times(timeout)
     if sock:
@@ -1335,6 +1862,7 @@ def tls(
     ssl_context: ssl.SSLContext | None = None,
     server_hostname: str | None = None,
     verify: bool | str = True,
+    pool: Optional["ConnectionPool"] = None,
 ) -> dns.message.Message:
     """Return the response obtained after sending a query via TLS.
 
@@ -1379,10 +1907,28 @@ def tls(
     verification is done; if a `str` then it specifies the path to a certificate file or
     directory which will be used for verification.
 
+    *pool*, a ``dns.query.ConnectionPool``, or ``None``.  If not ``None``, and
+    no socket is provided, the query is sent on a persistent connection from
+    the pool, and the TLS handshake is only done when a connection is opened.
+
     Returns a ``dns.message.Message``.
 
     """
 
+    if pool is not None and not sock:
+        return pool.tls(
+            q,
+            where,
+            timeout,
+            port,
+            source,
+            source_port,
+            one_rr_per_rrset,
+            ignore_trailing,
+            ssl_context,
+            server_hostname,
+            verify,
+        )
     if sock:
         #
         # If a socket was provided, there's no special TLS handling needed.
@@ -1430,6 +1976,386 @@ def tls(
     )
 
 
+class _PooledResponse:
+    def __init__(self, event: Any = None) -> None:
+        self.event = event
+        self.wire: bytes | None = None
+        self.received = 0.0
+
+
+class _PooledConnection:
+    """A persistent TCP or TLS connection on which queries are pipelined.
+
+    Responses are matched to queries by message id, so they may arrive in any
+    order, as RFC 7766 allows.  There is no reader thread; one of the waiting
+    queries reads the stream on behalf of all of them.
+    """
+
+    def __init__(self, sock: Any) -> None:
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        # Serializes all I/O, as an SSL socket must not be used by more than
+        # one thread at a time.
+        self.io_lock = threading.Lock()
+        self.pending: Dict[int, _PooledResponse] = {}
+        # The number of queries the pool has given this connection to, which
+        # may not have been added to pending yet.  It is protected by the
+        # pool's lock.
+        self.users = 0
+        self.reading = False
+        self.broken = False
+        self.last_used = time.time()
+
+    def idle(self, now: float, idle_timeout: float) -> bool:
+        return self.users == 0 and now - self.last_used >= idle_timeout
+
+    def close(self) -> None:
+        with self.lock:
+            self.broken = True
+            self.condition.notify_all()
+        try:
+            # Wake up a query waiting for the stream to become readable.
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def query(
+        self, q: dns.message.Message, expiration: float | None
+    ) -> Tuple[bytes, float]:
+        with self.lock:
+            if self.broken:
+                raise EOFError("connection closed")
+            while q.id in self.pending:
+                q.id = dns.entropy.random_16()
+            response = _PooledResponse()
+            self.pending[q.id] = response
+            self.last_used = time.time()
+        try:
+            tcpmsg = q.to_wire(prepend_length=True)
+            if not self.io_lock.acquire(timeout=_lock_timeout(expiration)):
+                raise dns.exception.Timeout
+            try:
+                _net_write(self.sock, tcpmsg, expiration)
+            except Exception:
+                # A partial write leaves the stream unusable.
+                self.close()
+                raise
+            finally:
+                self.io_lock.release()
+            with self.lock:
+                while response.wire is None:
+                    if self.broken:
+                        raise EOFError("connection closed")
+                    if self.reading:
+                        self.condition.wait(_remaining(expiration))
+                        continue
+                    self.reading = True
+                    self.lock.release()
+                    try:
+                        self._read(expiration)
+                    finally:
+                        self.lock.acquire()
+                        self.reading = False
+                        self.condition.notify_all()
+                return (response.wire, response.received)
+        finally:
+            with self.lock:
+                del self.pending[q.id]
+                self.last_used = time.time()
+
+    def _read(self, expiration: float | None) -> None:
+        # Waiting for the stream to become readable consumes nothing, so
+        # timing out here leaves the connection usable by other queries.
+        if not (isinstance(self.sock, ssl.SSLSocket) and self.sock.pending()):
+            _wait_for_readable(self.sock, expiration)
+        try:
+            if not self.io_lock.acquire(timeout=_lock_timeout(expiration)):
+                raise dns.exception.Timeout
+            try:
+                ldata = _net_read(self.sock, 2, expiration)
+                (l,) = struct.unpack("!H", ldata)
+                wire = _net_read(self.sock, l, expiration)
+            finally:
+                self.io_lock.release()
+        except Exception:
+            self.close()
+            raise
+        if len(wire) < 2:
+            return
+        with self.lock:
+            response = self.pending.get(struct.unpack("!H", wire[:2])[0])
+            if response is not None and response.wire is None:
+                response.wire = wire
+                response.received = time.time()
+
+
+def _lock_timeout(expiration):
+    timeout = _remaining(expiration)
+    if timeout is None:
+        return -1
+    return timeout
+
+
+class ConnectionPool:
+    """A pool of persistent TCP and DNS-over-TLS connections.
+
+    Idle connections are kept open and reused, and several queries may be
+    outstanding on one connection at the same time, with responses matched to
+    queries by message id as RFC 7766 allows.  A pool may be shared by many
+    threads, and connections are keyed by destination, source, and TLS
+    parameters.
+
+    *max_connections*, an ``int``, the maximum number of connections that will
+    be opened to a single destination.  The default is 2.
+
+    *max_pipelined*, an ``int``, the number of outstanding queries on a
+    connection above which another connection is opened, if
+    *max_connections* allows it.  The default is 64.
+
+    *idle_timeout*, a ``float``, the number of seconds a connection with no
+    outstanding queries is kept open.  The default is 30.0.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 2,
+        max_pipelined: int = 64,
+        idle_timeout: float = 30.0,
+    ) -> None:
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.max_connections = max_connections
+        self.max_pipelined = max_pipelined
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._connections: Dict[Any, List[_PooledConnection]] = {}
+        self._connecting: Dict[Any, int] = {}
+        self._ssl_contexts: Dict[Any, ssl.SSLContext] = {}
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        """Close all connections.  The pool cannot be used afterwards."""
+        with self._lock:
+            self._closed = True
+            connections = [c for cs in self._connections.values() for c in cs]
+            self._connections = {}
+            self._condition.notify_all()
+        for connection in connections:
+            connection.close()
+
+    def connection_count(self) -> int:
+        """Return the number of open connections in the pool."""
+        with self._lock:
+            return sum(len(cs) for cs in self._connections.values())
+
+    def _prune(self, now: float) -> List[_PooledConnection]:
+        # Must be called with the lock held.  Returns the connections to close.
+        closing = []
+        for key, connections in list(self._connections.items()):
+            keep = []
+            for connection in connections:
+                if connection.broken or connection.idle(now, self.idle_timeout):
+                    closing.append(connection)
+                else:
+                    keep.append(connection)
+            if keep:
+                self._connections[key] = keep
+            else:
+                del self._connections[key]
+        return closing
+
+    def _acquire(
+        self, key: Any, connect: Callable[[], Any], expiration: float | None
+    ) -> Tuple[_PooledConnection, bool]:
+        closing: List[_PooledConnection] = []
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("connection pool is closed")
+                closing.extend(self._prune(time.time()))
+                connections = self._connections.get(key, [])
+                connecting = self._connecting.get(key, 0)
+                best = min(connections, key=lambda c: c.users, default=None)
+                at_limit = len(connections) + connecting >= self.max_connections
+                # Only pipeline more than max_pipelined queries on a connection
+                # if no more connections may be made.
+                if best is not None and (
+                    best.users < self.max_pipelined or (at_limit and connecting == 0)
+                ):
+                    best.users += 1
+                    best.last_used = time.time()
+                    break
+                if not at_limit:
+                    best = None
+                    self._connecting[key] = connecting + 1
+                    break
+                # Wait for the connections which are being established.
+                self._condition.wait(_remaining(expiration))
+        for connection in closing:
+            connection.close()
+        if best is not None:
+            return (best, True)
+        sock = None
+        try:
+            sock = connect()
+        finally:
+            with self._lock:
+                self._connecting[key] -= 1
+                if self._connecting[key] == 0:
+                    del self._connecting[key]
+                if sock is not None:
+                    if self._closed:
+                        sock.close()
+                        raise RuntimeError("connection pool is closed")
+                    best = _PooledConnection(sock)
+                    best.users = 1
+                    self._connections.setdefault(key, []).append(best)
+                self._condition.notify_all()
+        assert best is not None
+        return (best, False)
+
+    def _query(
+        self,
+        q: dns.message.Message,
+        key: Any,
+        connect: Callable[[float | None], Any],
+        timeout: float | None,
+        one_rr_per_rrset: bool,
+        ignore_trailing: bool,
+    ) -> dns.message.Message:
+        (begin_time, expiration) = _compute_times(timeout)
+        while True:
+            (connection, reused) = self._acquire(
+                key, lambda: connect(expiration), expiration
+            )
+            try:
+                (wire, received_time) = connection.query(q, expiration)
+                break
+            except (EOFError, OSError):
+                # The server may have closed an idle connection just as we
+                # reused it; retry on another one.
+                if not reused:
+                    raise
+            finally:
+                with self._lock:
+                    connection.users -= 1
+        r = dns.message.from_wire(
+            wire,
+            keyring=q.keyring,
+            request_mac=q.mac,
+            one_rr_per_rrset=one_rr_per_rrset,
+            ignore_trailing=ignore_trailing,
+        )
+        r.time = received_time - begin_time
+        if not q.is_response(r):
+            raise BadResponse
+        return r
+
+    def tcp(
+        self,
+        q: dns.message.Message,
+        where: str,
+        timeout: float | None = None,
+        port: int = 53,
+        source: str | None = None,
+        source_port: int = 0,
+        one_rr_per_rrset: bool = False,
+        ignore_trailing: bool = False,
+    ) -> dns.message.Message:
+        """Return the response obtained after sending a query via TCP on a
+        pooled connection.
+
+        See :py:func:`dns.query.tcp()` for the documentation of the parameters,
+        exceptions, and return type of this method.
+        """
+        (af, destination, source) = _destination_and_source(
+            where, port, source, source_port, True
+        )
+        assert af is not None
+
+        def connect(expiration):
+            s = make_socket(af, socket.SOCK_STREAM, source)
+            try:
+                _connect(s, destination, expiration)
+            except Exception:
+                s.close()
+                raise
+            return s
+
+        key = ("tcp", destination, source)
+        return self._query(q, key, connect, timeout, one_rr_per_rrset, ignore_trailing)
+
+    def tls(
+        self,
+        q: dns.message.Message,
+        where: str,
+        timeout: float | None = None,
+        port: int = 853,
+        source: str | None = None,
+        source_port: int = 0,
+        one_rr_per_rrset: bool = False,
+        ignore_trailing: bool = False,
+        ssl_context: ssl.SSLContext | None = None,
+        server_hostname: str | None = None,
+        verify: bool | str = True,
+    ) -> dns.message.Message:
+        """Return the response obtained after sending a query via TLS on a
+        pooled connection.  The TLS handshake is only done when a connection
+        is opened.
+
+        See :py:func:`dns.query.tls()` for the documentation of the parameters,
+        exceptions, and return type of this method.
+        """
+        (af, destination, source) = _destination_and_source(
+            where, port, source, source_port, True
+        )
+        assert af is not None
+        if ssl_context is None:
+            with self._lock:
+                ssl_context = self._ssl_contexts.get((server_hostname, verify))
+                if ssl_context is None:
+                    ssl_context = make_ssl_context(
+                        verify, server_hostname is not None, ["dot"]
+                    )
+                    self._ssl_contexts[(server_hostname, verify)] = ssl_context
+        context = ssl_context
+
+        def connect(expiration):
+            s = make_ssl_socket(
+                af,
+                socket.SOCK_STREAM,
+                ssl_context=context,
+                server_hostname=server_hostname,
+                source=source,
+            )
+            try:
+                _connect(s, destination, expiration)
+                _tls_handshake(s, expiration)
+            except Exception:
+                s.close()
+                raise
+            return s
+
+        key = ("tls", destination, source, context, server_hostname)
+        return self._query(q, key, connect, timeout, one_rr_per_rrset, ignore_trailing)
+
+
+def _early_data_allowed(q):
+    # Only queries are safe to replay, so only they may be sent as 0-RTT early
+    # data (RFC 9250 section 4.5).
+    return q.opcode() == dns.opcode.QUERY
+
+
 def quic(
     q: dns.message.Message,
     where: str,
@@ -1510,7 +2436,9 @@ def quic(
                 where, port, source, source_port
             )
         (start, expiration) = _compute_times(timeout)
-        with the_connection.make_stream(timeout) as stream:  # pyright: ignore
+        with the_connection.make_stream(  # pyright: ignore
+            timeout, early_data=_early_data_allowed(q)
+        ) as stream:
             stream.send(wire, True)
             wire = stream.receive(_remaining(expiration))
         finish = time.time()
@@ -1784,3 +2712,518 @@ def inbound_xfr(
         _connect(s, destination, expiration)
         for _ in _inbound_xfr(txn_manager, s, query, serial, timeout, expiration):
             pass
+
+
+class EngineQuery:
+    """A query being run by a :py:class:`dns.query.QueryEngine`.
+
+    *query*, the ``dns.message.Message`` which was sent.
+
+    *context*, the object given when the query was started, for the caller's
+    own use.
+
+    *response*, the ``dns.message.Message`` response, or ``None``.  For a zone
+    transfer, this is the last response message.
+
+    *exception*, the exception which prevented a response, or ``None``.
+
+    *done*, a ``bool``, which is ``True`` once the query has finished.
+    """
+
+    def __init__(
+        self, kind: str, q: dns.message.Message, where: str, context: Any
+    ) -> None:
+        self.kind = kind
+        self.query = q
+        self.where = where
+        self.context = context
+        self.response: dns.message.Message | None = None
+        self.exception: Exception | None = None
+        self.done = False
+        self.sock: Any = None
+        self.destination: Any = None
+        self.start = time.time()
+        self.expiration: float | None = None
+        self.one_rr_per_rrset = False
+        self.ignore_trailing = False
+        self.raise_on_truncation = False
+        self.lazy = False
+        # TCP
+        self.connected = False
+        self.outgoing = b""
+        self.incoming = bytearray()
+        # Zone transfers
+        self.inbound: dns.xfr.Inbound | None = None
+        self.origin: dns.name.Name | None = None
+        self.tsig_ctx: Any = None
+        self.timeout: float | None = None
+        self.lifetime_expiration: float | None = None
+
+    def result(self) -> dns.message.Message:
+        """Return the response, or raise the exception which prevented one."""
+        if not self.done:
+            raise ValueError("the query has not finished")
+        if self.exception is not None:
+            raise self.exception
+        assert self.response is not None
+        return self.response
+
+
+class QueryEngine:
+    """Run many UDP and TCP queries, and zone transfers, at once from a single
+    thread.
+
+    Queries are started with ``udp()``, ``tcp()``, and ``inbound_xfr()``, which
+    send as much as they can without blocking and return a
+    :py:class:`dns.query.EngineQuery`.  ``poll()`` and ``run()`` then wait for
+    all of the outstanding queries with one selector, and return them as they
+    finish.
+
+    UDP queries are multiplexed over a few nonblocking sockets for each
+    address family and source address, and responses are matched to queries
+    by socket and message id, so a query whose id is the same as that of an
+    outstanding query on its socket is given a new id.  Each TCP query and
+    zone transfer has its own connection.
+
+    *udp_sockets*, an ``int``, the maximum number of UDP sockets for each
+    address family and source address.  The default is 4.
+
+    An engine is not thread-safe.
+    """
+
+    def __init__(self, udp_sockets: int = 4) -> None:
+        self.udp_sockets = max(udp_sockets, 1)
+        self._selector = selectors.DefaultSelector()
+        self._udp: Dict[Any, List[socket.socket]] = {}
+        self._next_udp = 0
+        # Map (socket, message id) to the outstanding UDP query.
+        self._pending: Dict[Tuple[socket.socket, int], EngineQuery] = {}
+        # Queries which could not be sent yet because their socket's buffer
+        # was full.
+        self._unsent: Dict[socket.socket, Deque[EngineQuery]] = {}
+        self._outstanding: Set[EngineQuery] = set()
+        self._finished: List[EngineQuery] = []
+        # (expiration, sequence, query) tuples.  An entry is stale if its
+        # query has finished or has a different expiration.
+        self._expirations: List[Tuple[float, int, EngineQuery]] = []
+        self._sequence = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        """Close all sockets, abandoning any outstanding queries and rolling
+        back their zone transfers."""
+        for eq in list(self._outstanding):
+            self._finish(eq, None, EOFError("engine closed"))
+        for socks in self._udp.values():
+            for sock in socks:
+                self._selector.unregister(sock)
+                sock.close()
+        self._udp = {}
+        self._finished = []
+        self._selector.close()
+
+    def outstanding(self) -> int:
+        """The number of queries which have not finished, including finished
+        queries which have not yet been returned by ``poll()``."""
+        return len(self._outstanding) + len(self._finished)
+
+    def udp(
+        self,
+        q: dns.message.Message,
+        where: str,
+        timeout: float | None = None,
+        port: int = 53,
+        source: str | None = None,
+        one_rr_per_rrset: bool = False,
+        ignore_trailing: bool = False,
+        raise_on_truncation: bool = False,
+        context: Any = None,
+        lazy: bool = False,
+    ) -> EngineQuery:
+        """Start a UDP query.
+
+        *context*, any object, is stored in the returned query for the
+        caller's use.
+
+        *lazy*, a ``bool``.  If ``True``, the response is read with
+        ``dns.message.from_wire(lazy=True)``, so its sections are only decoded
+        when they are accessed.
+
+        See :py:func:`dns.query.udp()` for the documentation of the other
+        parameters.  There is no *source_port*, as the engine's sockets are
+        shared and bound to random ports.  Datagrams from other sources,
+        datagrams which cannot be parsed, and messages which are not a
+        response to the query are ignored.
+
+        Returns a :py:class:`dns.query.EngineQuery`.
+        """
+        eq = EngineQuery("udp", q, where, context)
+        eq.one_rr_per_rrset = one_rr_per_rrset
+        eq.ignore_trailing = ignore_trailing
+        eq.raise_on_truncation = raise_on_truncation
+        eq.lazy = lazy
+        self._outstanding.add(eq)
+        try:
+            (af, eq.destination, _) = _destination_and_source(
+                where, port, source, 0, True
+            )
+            assert af is not None
+            sock = self._udp_socket(af, source)
+            while (sock, q.id) in self._pending:
+                q.id = dns.entropy.random_16()
+            eq.sock = sock
+            self._pending[(sock, q.id)] = eq
+            self._set_expiration(eq, _compute_times(timeout)[1])
+            unsent = self._unsent.get(sock)
+            if unsent:
+                unsent.append(eq)
+            else:
+                self._udp_send(eq)
+        except Exception as ex:
+            self._finish(eq, None, ex)
+        return eq
+
+    def tcp(
+        self,
+        q: dns.message.Message,
+        where: str,
+        timeout: float | None = None,
+        port: int = 53,
+        source: str | None = None,
+        source_port: int = 0,
+        one_rr_per_rrset: bool = False,
+        ignore_trailing: bool = False,
+        context: Any = None,
+        lazy: bool = False,
+    ) -> EngineQuery:
+        """Start a TCP query on a new connection.
+
+        *context*, any object, is stored in the returned query for the
+        caller's use.
+
+        *lazy*, a ``bool``.  If ``True``, the response is read with
+        ``dns.message.from_wire(lazy=True)``, so its sections are only decoded
+        when they are accessed.
+
+        See :py:func:`dns.query.tcp()` for the documentation of the other
+        parameters.
+
+        Returns a :py:class:`dns.query.EngineQuery`.
+        """
+        eq = EngineQuery("tcp", q, where, context)
+        eq.one_rr_per_rrset = one_rr_per_rrset
+        eq.ignore_trailing = ignore_trailing
+        eq.lazy = lazy
+        self._start_tcp(eq, port, source, source_port, _compute_times(timeout)[1])
+        return eq
+
+    def inbound_xfr(
+        self,
+        where: str,
+        txn_manager: dns.transaction.TransactionManager,
+        query: dns.message.Message | None = None,
+        port: int = 53,
+        timeout: float | None = None,
+        lifetime: float | None = None,
+        source: str | None = None,
+        source_port: int = 0,
+        context: Any = None,
+    ) -> EngineQuery:
+        """Start an inbound zone transfer over TCP, which is applied via a
+        transaction from the *txn_manager* when it finishes.
+
+        *context*, any object, is stored in the returned query for the
+        caller's use.
+
+        See :py:func:`dns.query.inbound_xfr()` for the documentation of the
+        other parameters.  IXFR over UDP is not supported.
+
+        Returns a :py:class:`dns.query.EngineQuery`.
+        """
+        if query is None:
+            (query, serial) = dns.xfr.make_query(txn_manager)
+        else:
+            serial = dns.xfr.extract_serial_from_query(query)
+        eq = EngineQuery("xfr", query, where, context)
+        eq.one_rr_per_rrset = query.question[0].rdtype == dns.rdatatype.IXFR
+        eq.origin = txn_manager.from_wire_origin()
+        eq.timeout = timeout
+        eq.lifetime_expiration = _compute_times(lifetime)[1]
+        eq.inbound = dns.xfr.Inbound(
+            txn_manager, query.question[0].rdtype, serial, False
+        )
+        self._start_tcp(eq, port, source, source_port, self._message_expiration(eq))
+        return eq
+
+    def poll(self, timeout: float | None = None) -> List[EngineQuery]:
+        """Wait until at least one query has finished, or until *timeout*
+        seconds have passed, and return the queries which have finished since
+        the last call.
+
+        *timeout*, a ``float`` or ``None``, the maximum number of seconds to
+        wait.  If ``None``, the default, wait until a query finishes.  If no
+        queries are outstanding, ``poll()`` returns at once.
+
+        Returns a list of :py:class:`dns.query.EngineQuery`.
+        """
+        (_, expiration) = _compute_times(timeout)
+        while not self._finished and self._outstanding:
+            wait = _remaining(expiration)
+            deadline = self._next_expiration()
+            if deadline is not None:
+                until_deadline = max(deadline - time.time(), 0.0)
+                if wait is None or until_deadline < wait:
+                    wait = until_deadline
+            for key, events in self._selector.select(wait):
+                if key.data is None:
+                    sock = cast(socket.socket, key.fileobj)
+                    if events & selectors.EVENT_WRITE:
+                        self._udp_flush(sock)
+                    if events & selectors.EVENT_READ:
+                        self._udp_read(sock)
+                else:
+                    self._tcp_ready(key.data, events)
+            self._expire(time.time())
+            if expiration is not None and time.time() >= expiration:
+                break
+        finished = self._finished
+        self._finished = []
+        return finished
+
+    def run(self) -> Iterator[EngineQuery]:
+        """Return an iterator which yields each outstanding query as it
+        finishes, until none are left.  More queries may be started while
+        iterating.
+        """
+        while self._outstanding or self._finished:
+            yield from self.poll()
+
+    def _finish(
+        self,
+        eq: EngineQuery,
+        response: dns.message.Message | None,
+        ex: Exception | None,
+    ) -> None:
+        if eq.done:
+            return
+        eq.done = True
+        eq.response = response
+        eq.exception = ex
+        self._outstanding.discard(eq)
+        self._finished.append(eq)
+        if eq.kind == "udp":
+            if eq.sock is not None:
+                self._pending.pop((eq.sock, eq.query.id), None)
+                unsent = self._unsent.get(eq.sock)
+                if unsent and eq in unsent:
+                    unsent.remove(eq)
+        elif eq.sock is not None:
+            self._selector.unregister(eq.sock)
+            eq.sock.close()
+        eq.sock = None
+        if eq.inbound is not None:
+            # This rolls back the transaction if the transfer did not finish.
+            eq.inbound.__exit__(None, None, None)
+            eq.inbound = None
+
+    def _set_expiration(self, eq: EngineQuery, expiration: float | None) -> None:
+        eq.expiration = expiration
+        if expiration is not None:
+            self._sequence += 1
+            heapq.heappush(self._expirations, (expiration, self._sequence, eq))
+
+    def _next_expiration(self) -> float | None:
+        while self._expirations:
+            (expiration, _, eq) = self._expirations[0]
+            if not eq.done and eq.expiration == expiration:
+                return expiration
+            heapq.heappop(self._expirations)
+        return None
+
+    def _expire(self, now: float) -> None:
+        while True:
+            expiration = self._next_expiration()
+            if expiration is None or expiration > now:
+                return
+            (_, _, eq) = heapq.heappop(self._expirations)
+            self._finish(eq, None, dns.exception.Timeout())
+
+    def _message_expiration(self, eq: EngineQuery) -> float | None:
+        # The timeout applies to each message of a zone transfer, within the
+        # transfer's lifetime.
+        (_, expiration) = _compute_times(eq.timeout)
+        if expiration is None or (
+            eq.lifetime_expiration is not None and expiration > eq.lifetime_expiration
+        ):
+            expiration = eq.lifetime_expiration
+        return expiration
+
+    def _udp_socket(self, af: int, source: str | None) -> socket.socket:
+        socks = self._udp.setdefault((af, source), [])
+        if len(socks) < self.udp_sockets:
+            address = None
+            if source:
+                address = dns.inet.low_level_address_tuple((source, 0), af)
+            sock = make_socket(af, socket.SOCK_DGRAM, address)
+            self._selector.register(sock, selectors.EVENT_READ)
+            socks.append(sock)
+            return sock
+        self._next_udp += 1
+        return socks[self._next_udp % len(socks)]
+
+    def _udp_send(self, eq: EngineQuery) -> bool:
+        # Returns False if the socket's buffer is full.
+        try:
+            eq.sock.sendto(eq.query.to_wire(), eq.destination)
+        except BlockingIOError:
+            self._unsent.setdefault(eq.sock, collections.deque()).append(eq)
+            self._selector.modify(eq.sock, selectors.EVENT_READ | selectors.EVENT_WRITE)
+            return False
+        except Exception as ex:
+            self._finish(eq, None, ex)
+            return True
+        eq.start = time.time()
+        return True
+
+    def _udp_flush(self, sock: socket.socket) -> None:
+        unsent = self._unsent.pop(sock, None)
+        self._selector.modify(sock, selectors.EVENT_READ)
+        while unsent:
+            eq = unsent.popleft()
+            if not self._udp_send(eq):
+                # _udp_send() queued it again; keep the original order.
+                self._unsent[sock].extend(unsent)
+                return
+
+    def _udp_read(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                (wire, from_address) = sock.recvfrom(65535)
+            except BlockingIOError:
+                return
+            except OSError:
+                # E.g. an ICMP port unreachable for one of our queries.  The
+                # query it was for will time out.
+                continue
+            received_time = time.time()
+            if len(wire) < 2:
+                continue
+            eq = self._pending.get((sock, struct.unpack("!H", wire[:2])[0]))
+            if eq is None or not _matches_destination(
+                sock.family, from_address, eq.destination, True
+            ):
+                continue
+            result = _batch_response(
+                eq.query,
+                wire,
+                eq.one_rr_per_rrset,
+                eq.ignore_trailing,
+                eq.raise_on_truncation,
+                eq.lazy,
+            )
+            if result is None:
+                continue
+            if isinstance(result, dns.message.Message):
+                result.time = received_time - eq.start
+                self._finish(eq, result, None)
+            else:
+                self._finish(eq, None, result)
+
+    def _start_tcp(
+        self,
+        eq: EngineQuery,
+        port: int,
+        source: str | None,
+        source_port: int,
+        expiration: float | None,
+    ) -> None:
+        self._outstanding.add(eq)
+        try:
+            (af, destination, source) = _destination_and_source(
+                eq.where, port, source, source_port, True
+            )
+            assert af is not None
+            eq.sock = make_socket(af, socket.SOCK_STREAM, source)
+            eq.outgoing = eq.query.to_wire(prepend_length=True)
+            self._selector.register(eq.sock, selectors.EVENT_WRITE, eq)
+            err = eq.sock.connect_ex(destination)
+            if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+                raise OSError(err, os.strerror(err))
+            self._set_expiration(eq, expiration)
+        except Exception as ex:
+            self._finish(eq, None, ex)
+
+    def _tcp_ready(self, eq: EngineQuery, events: int) -> None:
+        try:
+            if events & selectors.EVENT_WRITE:
+                if not eq.connected:
+                    err = eq.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if err != 0:
+                        raise OSError(err, os.strerror(err))
+                    eq.connected = True
+                try:
+                    sent = eq.sock.send(eq.outgoing)
+                except BlockingIOError:
+                    sent = 0
+                eq.outgoing = eq.outgoing[sent:]
+                if not eq.outgoing:
+                    self._selector.modify(eq.sock, selectors.EVENT_READ, eq)
+            if events & selectors.EVENT_READ:
+                try:
+                    data = eq.sock.recv(65535)
+                except BlockingIOError:
+                    return
+                if not data:
+                    raise EOFError("EOF")
+                eq.incoming += data
+                while not eq.done and len(eq.incoming) >= 2:
+                    (l,) = struct.unpack("!H", eq.incoming[:2])
+                    if len(eq.incoming) < 2 + l:
+                        break
+                    wire = bytes(memoryview(eq.incoming)[2 : 2 + l])
+                    del eq.incoming[: 2 + l]
+                    self._tcp_message(eq, wire)
+        except Exception as ex:
+            self._finish(eq, None, ex)
+
+    def _tcp_message(self, eq: EngineQuery, wire: bytes) -> None:
+        q = eq.query
+        if eq.inbound is None:
+            r = dns.message.from_wire(
+                wire,
+                keyring=q.keyring,
+                request_mac=q.mac,
+                one_rr_per_rrset=eq.one_rr_per_rrset,
+                ignore_trailing=eq.ignore_trailing,
+                lazy=eq.lazy,
+            )
+            r.time = time.time() - eq.start
+            if not q.is_response(r):
+                raise BadResponse
+            self._finish(eq, r, None)
+            return
+        r = dns.message.from_wire(
+            wire,
+            keyring=q.keyring,
+            request_mac=q.mac,
+            xfr=True,
+            origin=eq.origin,
+            tsig_ctx=eq.tsig_ctx,
+            multi=True,
+            one_rr_per_rrset=eq.one_rr_per_rrset,
+        )
+        eq.response = r
+        eq.tsig_ctx = r.tsig_ctx
+        if eq.inbound.process_message(r):
+            if q.keyring and not r.had_tsig:
+                raise dns.exception.FormError("missing TSIG")
+            r.time = time.time() - eq.start
+            self._finish(eq, r, None)
+        else:
+            self._set_expiration(eq, self._message_expiration(eq))
@@ -12,6 +12,7 @@ if dns._features.have("doq"):
     from dns.quic._asyncio import AsyncioQuicStream as AsyncioQuicStream
     from dns.quic._common import AsyncQuicConnection  # pyright: ignore
     from dns.quic._common import AsyncQuicManager as AsyncQuicManager
+    from dns.quic._common import QuicStatistics as QuicStatistics
     from dns.quic._sync import SyncQuicConnection  # pyright: ignore
     from dns.quic._sync import SyncQuicStream  # pyright: ignore
     from dns.quic._sync import SyncQuicManager as SyncQuicManager
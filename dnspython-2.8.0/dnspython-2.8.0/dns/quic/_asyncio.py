@@ -187,6 +187,7 @@ class AsyncioQuicConnection(AsyncQuicConnection):
                     if stream:
                         await stream._add_input(event.data, event.end_stream)
             elif isinstance(event, aioquic.quic.events.HandshakeCompleted):
+                self._handshake_completed(event)
                 self._handshake_complete.set()
             elif isinstance(event, aioquic.quic.events.ConnectionTerminated):
                 self._done = True
@@ -213,16 +214,18 @@ class AsyncioQuicConnection(AsyncQuicConnection):
         self._receiver_task = asyncio.Task(self._receiver())
         self._sender_task = asyncio.Task(self._sender())
 
-    async def make_stream(self, timeout=None):
-        try:
-            await asyncio.wait_for(self._handshake_complete.wait(), timeout)
-        except TimeoutError:
-            raise dns.exception.Timeout
+    async def make_stream(self, timeout=None, early_data=False):
+        if self._wait_for_handshake(early_data):
+            try:
+                await asyncio.wait_for(self._handshake_complete.wait(), timeout)
+            except TimeoutError:
+                raise dns.exception.Timeout
         if self._done:
             raise UnexpectedEOF
         stream_id = self._connection.get_next_available_stream_id(False)
         stream = AsyncioQuicStream(self, stream_id)
         self._streams[stream_id] = stream
+        self._stream_made(not self._handshake_complete.is_set())
         return stream
 
     async def close(self):
@@ -250,9 +253,23 @@ class AsyncioQuicConnection(AsyncQuicConnection):
 
 class AsyncioQuicManager(AsyncQuicManager):
     def __init__(
-        self, conf=None, verify_mode=ssl.CERT_REQUIRED, server_name=None, h3=False
+        self,
+        conf=None,
+        verify_mode=ssl.CERT_REQUIRED,
+        server_name=None,
+        h3=False,
+        session_tickets=None,
+        tokens=None,
     ):
-        super().__init__(conf, verify_mode, AsyncioQuicConnection, server_name, h3)
+        super().__init__(
+            conf,
+            verify_mode,
+            AsyncioQuicConnection,
+            server_name,
+            h3,
+            session_tickets,
+            tokens,
+        )
 
     def connect(
         self, address, port=853, source=None, source_port=0, want_session_ticket=True
@@ -264,13 +281,16 @@ class AsyncioQuicManager(AsyncQuicManager):
             connection.run()
         return connection
 
-    async def __aenter__(self):
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    async def close(self):
         # Copy the iterator into a list as exiting things will mutate the connections
         # table.
         connections = list(self._connections.values())
         for connection in connections:
             await connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
         return False
@@ -27,9 +27,67 @@ class UnexpectedEOF(Exception):
     pass
 
 
+class QuicStatistics:
+    """Counts of the work done by a QUIC manager.
+
+    *connections*, the number of connections made.
+
+    *reused_connections*, the number of times an open connection was reused
+    instead of making a new one.
+
+    *resumed_sessions*, the number of connections whose TLS session was
+    resumed with a saved session ticket.
+
+    *early_data_accepted*, the number of connections whose 0-RTT early data was
+    accepted by the server.
+
+    *streams*, the number of streams opened.
+
+    *early_data_streams*, the number of streams opened before the handshake
+    completed, whose queries were sent as 0-RTT early data.
+    """
+
+    def __init__(
+        self,
+        connections=0,
+        reused_connections=0,
+        resumed_sessions=0,
+        early_data_accepted=0,
+        streams=0,
+        early_data_streams=0,
+    ):
+        self.connections = connections
+        self.reused_connections = reused_connections
+        self.resumed_sessions = resumed_sessions
+        self.early_data_accepted = early_data_accepted
+        self.streams = streams
+        self.early_data_streams = early_data_streams
+
+    def reset(self):
+        self.connections = 0
+        self.reused_connections = 0
+        self.resumed_sessions = 0
+        self.early_data_accepted = 0
+        self.streams = 0
+        self.early_data_streams = 0
+
+    def clone(self):
+        return QuicStatistics(
+            self.connections,
+            self.reused_connections,
+            self.resumed_sessions,
+            self.early_data_accepted,
+            self.streams,
+            self.early_data_streams,
+        )
+
+
 class Buffer:
+    # The data is kept in a bytearray, as appending to a bytearray and deleting
+    # from its start don't copy the data which is already there.
+
     def __init__(self):
-        self._buffer = b""
+        self._buffer = bytearray()
         self._seen_end = False
 
     def put(self, data, is_end):
@@ -51,14 +109,14 @@ class Buffer:
 
     def get(self, amount):
         assert self.have(amount)
-        data = self._buffer[:amount]
-        self._buffer = self._buffer[amount:]
+        data = bytes(memoryview(self._buffer)[:amount])
+        del self._buffer[:amount]
         return data
 
     def get_all(self):
         assert self.seen_end()
-        data = self._buffer
-        self._buffer = b""
+        data = bytes(self._buffer)
+        self._buffer = bytearray()
         return data
 
 
@@ -165,6 +223,9 @@ class BaseQuicConnection:
         self._closed = False
         self._manager = manager
         self._streams = {}
+        # Set by the manager if we have a session ticket which lets us send
+        # data before the handshake completes.
+        self._early_data_allowed = False
         if manager is not None and manager.is_h3():
             self._h3_conn = aioquic.h3.connection.H3Connection(connection, False)
         else:
@@ -186,6 +247,21 @@ class BaseQuicConnection:
     def is_h3(self):
         return self._h3_conn is not None
 
+    def _wait_for_handshake(self, early_data):
+        # Streams for queries which may be sent as 0-RTT early data can be
+        # made before the handshake completes.
+        return not (early_data and self._early_data_allowed)
+
+    def _stream_made(self, early):
+        if self._manager is not None:
+            self._manager.stream_made(early)
+
+    def _handshake_completed(self, event):
+        if self._manager is not None:
+            self._manager.handshake_completed(
+                event.session_resumed, event.early_data_accepted
+            )
+
     def close_stream(self, stream_id):
         del self._streams[stream_id]
 
@@ -217,19 +293,35 @@ class BaseQuicConnection:
 
 
 class AsyncQuicConnection(BaseQuicConnection):
-    async def make_stream(self, timeout: float | None = None) -> Any:
+    async def make_stream(
+        self, timeout: float | None = None, early_data: bool = False
+    ) -> Any:
         pass
 
 
 class BaseQuicManager:
     def __init__(
-        self, conf, verify_mode, connection_factory, server_name=None, h3=False
+        self,
+        conf,
+        verify_mode,
+        connection_factory,
+        server_name=None,
+        h3=False,
+        session_tickets=None,
+        tokens=None,
     ):
         self._connections = {}
         self._connection_factory = connection_factory
-        self._session_tickets = {}
-        self._tokens = {}
+        # The session tickets and tokens may be shared with other managers, so
+        # that they outlive this one.
+        if session_tickets is None:
+            session_tickets = {}
+        self._session_tickets = session_tickets
+        if tokens is None:
+            tokens = {}
+        self._tokens = tokens
         self._h3 = h3
+        self._statistics = QuicStatistics()
         if conf is None:
             verify_path = None
             if isinstance(verify_mode, str):
@@ -262,14 +354,25 @@ class BaseQuicManager:
     ):
         connection = self._connections.get((address, port))
         if connection is not None:
-            return (connection, False)
+            if not connection._done:
+                self._statistics.reused_connections += 1
+                return (connection, False)
+            # The connection failed or was closed by the server, so forget it and
+            # make a new one.
+            del self._connections[(address, port)]
+            connection._manager = None
         conf = self._conf
+        early_data_allowed = False
         if want_session_ticket:
             try:
                 session_ticket = self._session_tickets.pop((address, port))
                 # We found a session ticket, so make a configuration that uses it.
                 conf = copy.copy(conf)
                 conf.session_ticket = session_ticket
+                early_data_allowed = (
+                    session_ticket.is_valid
+                    and session_ticket.max_early_data_size is not None
+                )
             except KeyError:
                 # No session ticket.
                 pass
@@ -304,7 +407,9 @@ class BaseQuicManager:
         connection = self._connection_factory(
             qconn, address, port, source, source_port, self
         )
+        connection._early_data_allowed = early_data_allowed
         self._connections[(address, port)] = connection
+        self._statistics.connections += 1
         return (connection, True)
 
     def closed(self, address, port):
@@ -316,6 +421,23 @@ class BaseQuicManager:
     def is_h3(self):
         return self._h3
 
+    def stream_made(self, early):
+        self._statistics.streams += 1
+        if early:
+            self._statistics.early_data_streams += 1
+
+    def handshake_completed(self, session_resumed, early_data_accepted):
+        if session_resumed:
+            self._statistics.resumed_sessions += 1
+        if early_data_accepted:
+            self._statistics.early_data_accepted += 1
+
+    def get_statistics_snapshot(self):
+        """Return a ``dns.quic.QuicStatistics`` with a snapshot of the
+        manager's statistics.
+        """
+        return self._statistics.clone()
+
     def save_session_ticket(self, address, port, ticket):
         # We rely on dictionaries keys() being in insertion order here.  We
         # can't just popitem() as that would be LIFO which is the opposite of
@@ -324,7 +446,7 @@ class BaseQuicManager:
         if l >= MAX_SESSION_TICKETS:
             keys_to_delete = list(self._session_tickets.keys())[0:SESSIONS_TO_DELETE]
             for key in keys_to_delete:
-                del self._session_tickets[key]
+                self._session_tickets.pop(key, None)
         self._session_tickets[(address, port)] = ticket
 
     def save_token(self, address, port, token):
@@ -335,7 +457,7 @@ class BaseQuicManager:
         if l >= MAX_SESSION_TICKETS:
             keys_to_delete = list(self._tokens.keys())[0:SESSIONS_TO_DELETE]
             for key in keys_to_delete:
-                del self._tokens[key]
+                self._tokens.pop(key, None)
         self._tokens[(address, port)] = token
 
 
@@ -197,6 +197,7 @@ class SyncQuicConnection(BaseQuicConnection):
                     if stream:
                         stream._add_input(event.data, event.end_stream)
             elif isinstance(event, aioquic.quic.events.HandshakeCompleted):
+                self._handshake_completed(event)
                 self._handshake_complete.set()
             elif isinstance(event, aioquic.quic.events.ConnectionTerminated):
                 with self._lock:
@@ -230,15 +231,17 @@ class SyncQuicConnection(BaseQuicConnection):
         self._worker_thread = threading.Thread(target=self._worker)
         self._worker_thread.start()
 
-    def make_stream(self, timeout=None):
-        if not self._handshake_complete.wait(timeout):
-            raise dns.exception.Timeout
+    def make_stream(self, timeout=None, early_data=False):
+        if self._wait_for_handshake(early_data):
+            if not self._handshake_complete.wait(timeout):
+                raise dns.exception.Timeout
         with self._lock:
             if self._done:
                 raise UnexpectedEOF
             stream_id = self._connection.get_next_available_stream_id(False)
             stream = SyncQuicStream(self, stream_id)
             self._streams[stream_id] = stream
+        self._stream_made(not self._handshake_complete.is_set())
         return stream
 
     def close_stream(self, stream_id):
@@ -260,9 +263,23 @@ class SyncQuicConnection(BaseQuicConnection):
 
 class SyncQuicManager(BaseQuicManager):
     def __init__(
-        self, conf=None, verify_mode=ssl.CERT_REQUIRED, server_name=None, h3=False
+        self,
+        conf=None,
+        verify_mode=ssl.CERT_REQUIRED,
+        server_name=None,
+        h3=False,
+        session_tickets=None,
+        tokens=None,
     ):
-        super().__init__(conf, verify_mode, SyncQuicConnection, server_name, h3)
+        super().__init__(
+            conf,
+            verify_mode,
+            SyncQuicConnection,
+            server_name,
+            h3,
+            session_tickets,
+            tokens,
+        )
         self._lock = threading.Lock()
 
     def connect(
@@ -294,13 +311,28 @@ class SyncQuicManager(BaseQuicManager):
         with self._lock:
             super().save_token(address, port, token)
 
-    def __enter__(self):
-        return self
+    def stream_made(self, early):
+        with self._lock:
+            super().stream_made(early)
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
+    def handshake_completed(self, session_resumed, early_data_accepted):
+        with self._lock:
+            super().handshake_completed(session_resumed, early_data_accepted)
+
+    def get_statistics_snapshot(self):
+        with self._lock:
+            return super().get_statistics_snapshot()
+
+    def close(self):
         # Copy the iterator into a list as exiting things will mutate the connections
         # table.
         connections = list(self._connections.values())
         for connection in connections:
             connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
         return False
@@ -162,6 +162,7 @@ class TrioQuicConnection(AsyncQuicConnection):
                     if stream:
                         await stream._add_input(event.data, event.end_stream)
             elif isinstance(event, aioquic.quic.events.HandshakeCompleted):
+                self._handshake_completed(event)
                 self._handshake_complete.set()
             elif isinstance(event, aioquic.quic.events.ConnectionTerminated):
                 self._done = True
@@ -189,18 +190,20 @@ class TrioQuicConnection(AsyncQuicConnection):
             nursery.start_soon(self._worker)
         self._run_done.set()
 
-    async def make_stream(self, timeout=None):
+    async def make_stream(self, timeout=None, early_data=False):
         if timeout is None:
             context = NullContext(None)
         else:
             context = trio.move_on_after(timeout)
         with context:
-            await self._handshake_complete.wait()
+            if self._wait_for_handshake(early_data):
+                await self._handshake_complete.wait()
             if self._done:
                 raise UnexpectedEOF
             stream_id = self._connection.get_next_available_stream_id(False)
             stream = TrioQuicStream(self, stream_id)
             self._streams[stream_id] = stream
+            self._stream_made(not self._handshake_complete.is_set())
             return stream
         raise dns.exception.Timeout
 
@@ -224,8 +227,18 @@ class TrioQuicManager(AsyncQuicManager):
         verify_mode=ssl.CERT_REQUIRED,
         server_name=None,
         h3=False,
+        session_tickets=None,
+        tokens=None,
     ):
-        super().__init__(conf, verify_mode, TrioQuicConnection, server_name, h3)
+        super().__init__(
+            conf,
+            verify_mode,
+            TrioQuicConnection,
+            server_name,
+            h3,
+            session_tickets,
+            tokens,
+        )
         self._nursery = nursery
 
     def connect(
@@ -238,13 +251,16 @@ class TrioQuicManager(AsyncQuicManager):
             self._nursery.start_soon(connection.run)
         return connection
 
-    async def __aenter__(self):
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    async def close(self):
         # Copy the iterator into a list as exiting things will mutate the connections
         # table.
         connections = list(self._connections.values())
         for connection in connections:
             await connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
         return False
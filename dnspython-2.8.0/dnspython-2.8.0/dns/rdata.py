@@ -131,7 +131,7 @@ _constify = dns.immutable.constify
 class Rdata:
     """Base class for all DNS rdata types."""
 
-    __slots__ = ["rdclass", "rdtype", "rdcomment"]
+    __slots__ = ["rdclass", "rdtype", "rdcomment", "_digestable"]
 
     def __init__(
         self,
@@ -148,6 +148,7 @@ class Rdata:
         self.rdclass = self._as_rdataclass(rdclass)
         self.rdtype = self._as_rdatatype(rdtype)
         self.rdcomment = None
+        self._digestable = None
 
     def _get_all_slots(self):
         return itertools.chain.from_iterable(
@@ -165,12 +166,19 @@ class Rdata:
         # attributes, and would compare badly.
         state = {}
         for slot in self._get_all_slots():
+            if slot == "_digestable":
+                # This is a cache, and is recomputed when needed.
+                continue
             state[slot] = getattr(self, slot)
+        # Some rdata classes do not declare __slots__, and keep their
+        # attributes in __dict__.
+        state.update(getattr(self, "__dict__", {}))
         return state
 
     def __setstate__(self, state):
         for slot, val in state.items():
             object.__setattr__(self, slot, val)
+        object.__setattr__(self, "_digestable", None)
         if not hasattr(self, "rdcomment"):
             # Pickled rdata from 2.0.x might not have a rdcomment, so add
             # it if needed.
@@ -261,10 +269,61 @@ class Rdata:
 
         Returns a ``bytes``.
         """
+        digestable = self._digestable
+        if digestable is None:
+            try:
+                wire = self.to_wire(canonicalize=True)
+            except dns.name.NeedAbsoluteNameOrOrigin:
+                if origin is None:
+                    raise
+                # The form relative to the root is made when it is needed.
+                digestable = (True, None)
+            else:
+                assert wire is not None  # for mypy
+                object.__setattr__(self, "_digestable", (False, wire))
+                return wire
+        elif not digestable[0]:
+            return digestable[1]
+        # The rdata has relative names.
+        if origin is None:
+            raise dns.name.NeedAbsoluteNameOrOrigin
+        if origin == dns.name.root:
+            return self._get_digestable()[1]
+        if len(digestable) == 4:
+            (_, _, last_origin, last_wire) = digestable
+            if last_origin is origin or last_origin == origin:
+                return last_wire
         wire = self.to_wire(origin=origin, canonicalize=True)
         assert wire is not None  # for mypy
+        # Keep the form for the last origin, which is usually the zone's.
+        object.__setattr__(self, "_digestable", (True, digestable[1], origin, wire))
         return wire
 
+    def _get_digestable(self) -> Tuple:
+        """Return a ``(relative, wire)`` tuple, where *wire* is the DNSSEC
+        canonical form of the rdata, with any relative names made absolute as
+        if they were relative to the root, and *relative* is ``True`` if there
+        were any relative names.
+
+        As rdata are immutable, this is computed once and kept.  If there are
+        relative names, ``to_digestable()`` adds the last origin it was given,
+        and the form for that origin, to the end of the tuple.
+        """
+        digestable = self._digestable
+        if digestable is None:
+            try:
+                wire = self.to_wire(canonicalize=True)
+                digestable = (False, wire)
+            except dns.name.NeedAbsoluteNameOrOrigin:
+                wire = self.to_wire(origin=dns.name.root, canonicalize=True)
+                digestable = (True, wire)
+            object.__setattr__(self, "_digestable", digestable)
+        elif digestable[1] is None:
+            wire = self.to_wire(origin=dns.name.root, canonicalize=True)
+            digestable = (True, wire) + digestable[2:]
+            object.__setattr__(self, "_digestable", digestable)
+        return digestable
+
     def __repr__(self):
         covers = self.covers()
         if covers == dns.rdatatype.NONE:
@@ -301,23 +360,10 @@ class Rdata:
             In the future, all ordering comparisons for rdata with
             relative names will be disallowed.
         """
-        # the next two lines are for type checkers, so they are bound
-        our = b""
-        their = b""
-        try:
-            our = self.to_digestable()
-            our_relative = False
-        except dns.name.NeedAbsoluteNameOrOrigin:
-            if _allow_relative_comparisons:
-                our = self.to_digestable(dns.name.root)
-            our_relative = True
-        try:
-            their = other.to_digestable()
-            their_relative = False
-        except dns.name.NeedAbsoluteNameOrOrigin:
-            if _allow_relative_comparisons:
-                their = other.to_digestable(dns.name.root)
-            their_relative = True
+        ours = self._get_digestable()
+        theirs = other._get_digestable()
+        (our_relative, our) = (ours[0], ours[1])
+        (their_relative, their) = (theirs[0], theirs[1])
         if _allow_relative_comparisons:
             if our_relative != their_relative:
                 # For the purpose of comparison, all rdata with at least one
@@ -340,21 +386,9 @@ class Rdata:
             return False
         if self.rdclass != other.rdclass or self.rdtype != other.rdtype:
             return False
-        our_relative = False
-        their_relative = False
-        try:
-            our = self.to_digestable()
-        except dns.name.NeedAbsoluteNameOrOrigin:
-            our = self.to_digestable(dns.name.root)
-            our_relative = True
-        try:
-            their = other.to_digestable()
-        except dns.name.NeedAbsoluteNameOrOrigin:
-            their = other.to_digestable(dns.name.root)
-            their_relative = True
-        if our_relative != their_relative:
-            return False
-        return our == their
+        ours = self._get_digestable()
+        theirs = other._get_digestable()
+        return ours[0] == theirs[0] and ours[1] == theirs[1]
 
     def __ne__(self, other):
         if not isinstance(other, Rdata):
@@ -400,7 +434,7 @@ class Rdata:
         return self._cmp(other) > 0
 
     def __hash__(self):
-        return hash(self.to_digestable(dns.name.root))
+        return hash(self._get_digestable()[1])
 
     @classmethod
     def from_text(
@@ -17,14 +17,20 @@
 
 """DNS stub resolver."""
 
+import collections
 import contextlib
+import heapq
+import itertools
+import os
 import random
 import socket
+import struct
 import sys
+import tempfile
 import threading
 import time
 import warnings
-from typing import Any, Dict, Iterator, List, Sequence, Tuple, cast
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Sequence, Tuple, cast
 from urllib.parse import urlparse
 
 import dns._ddr
@@ -418,36 +424,248 @@ class CacheBase:
         with self.lock:
             return self.statistics.clone()
 
+    def get(self, key: "CacheKey") -> Answer | None:
+        """Get the answer associated with *key*.
+
+        *key*, a ``(dns.name.Name, dns.rdatatype.RdataType, dns.rdataclass.RdataClass)``
+        tuple whose values are the query name, rdtype, and rdclass respectively.
+
+        Returns a ``dns.resolver.Answer`` or ``None``.  Subclasses must
+        implement this method.
+        """
+        raise NotImplementedError
+
+    def put(self, key: "CacheKey", value: Answer) -> None:
+        """Associate key and value in the cache.
+
+        *key*, a ``(dns.name.Name, dns.rdatatype.RdataType, dns.rdataclass.RdataClass)``
+        tuple whose values are the query name, rdtype, and rdclass respectively.
+
+        *value*, a ``dns.resolver.Answer``, the answer.
+
+        Subclasses must implement this method.
+        """
+        raise NotImplementedError
+
+    def _items(self) -> List[Tuple["CacheKey", Answer]]:
+        """Return a list of the (key, answer) tuples in the cache, in the order
+        in which they should be reinserted by ``load()``.
+
+        Subclasses must implement this method to support ``dump()``.
+        """
+        raise NotImplementedError
+
+    def claim_refresh(self, key: "CacheKey") -> bool:
+        """Should the resolver refresh the answer cached for *key*, which it
+        has just gotten from the cache, in the background?
+
+        If ``True`` is returned, the caller has claimed the refresh, and must
+        call ``release_refresh()`` when it is finished, whether or not it
+        succeeded.  The base implementation never asks for a refresh.
+        """
+        return False
+
+    def release_refresh(self, key: "CacheKey") -> None:
+        """Note that a background refresh of *key* is no longer running."""
+
+    def dump(self, path: str) -> int:
+        """Write a snapshot of the cache to the file *path*.
+
+        Each answer is stored with its response in wire format and its
+        absolute expiration time, so the snapshot can be reloaded by another
+        process with ``load()``.  The file is written to a new temporary file
+        in the same directory and then renamed, so readers never see a
+        partially written snapshot, and concurrent dumps to the same *path*
+        do not interfere with each other.  As with any file made by
+        ``tempfile.mkstemp()``, only its owner can read it.
+
+        Raises ``NotImplementedError`` if the cache does not implement
+        ``_items()``, in which case no file is written.
+
+        Returns the number of answers written.
+        """
+        now = time.time()
+        items = [(k, v) for (k, v) in self._items() if v.expiration > now]
+        (fd, tmp_path) = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self._write_snapshot(f, items)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+        return len(items)
+
+    def _write_snapshot(self, f: Any, items: List[Tuple["CacheKey", Answer]]) -> None:
+        f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, len(items)))
+        for (qname, rdtype, rdclass), answer in items:
+            wire = answer.response.wire
+            if wire is None:
+                wire = answer.response.to_wire()
+            qname_wire = qname.to_wire()
+            assert qname_wire is not None  # cache keys are absolute
+            nameserver = (answer.nameserver or "").encode()
+            f.write(
+                _SNAPSHOT_RECORD.pack(
+                    answer.expiration,
+                    rdtype,
+                    rdclass,
+                    answer.rdtype,
+                    answer.rdclass,
+                    answer.port or 0,
+                    len(qname_wire),
+                    len(nameserver),
+                    len(wire),
+                )
+            )
+            f.write(qname_wire)
+            f.write(nameserver)
+            f.write(wire)
+
+    def load(self, path: str) -> int:
+        """Add the answers in the snapshot file *path*, which was written by
+        ``dump()``, to the cache.
+
+        Answers which have already expired are skipped without parsing their
+        responses, and the other responses are decoded in full, so that a
+        malformed one is found here rather than by whoever gets it from the
+        cache.  Loaded answers keep their original absolute expiration times.
+
+        Raises ``ValueError`` if *path* is not a cache snapshot, and
+        ``dns.exception.FormError`` if a response in it is malformed.
+
+        Returns the number of answers added.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _SNAPSHOT_HEADER.size:
+            raise ValueError("not a dnspython cache snapshot")
+        (magic, version, count) = _SNAPSHOT_HEADER.unpack_from(data, 0)
+        if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+            raise ValueError("not a dnspython cache snapshot")
+        offset = _SNAPSHOT_HEADER.size
+        now = time.time()
+        loaded = 0
+        for _ in range(count):
+            (
+                expiration,
+                rdtype,
+                rdclass,
+                answer_rdtype,
+                answer_rdclass,
+                port,
+                qname_len,
+                nameserver_len,
+                wire_len,
+            ) = _SNAPSHOT_RECORD.unpack_from(data, offset)
+            offset += _SNAPSHOT_RECORD.size
+            qname_start = offset
+            offset += qname_len + nameserver_len + wire_len
+            if offset > len(data):
+                raise ValueError("truncated dnspython cache snapshot")
+            if expiration <= now:
+                continue
+            nameserver_start = qname_start + qname_len
+            wire_start = nameserver_start + nameserver_len
+            (qname, _) = dns.name.from_wire(data[qname_start:nameserver_start], 0)
+            response = dns.message.from_wire(data[wire_start:offset], keyring=False)
+            assert isinstance(response, dns.message.QueryMessage)
+            answer = Answer(
+                qname,
+                dns.rdatatype.RdataType.make(answer_rdtype),
+                dns.rdataclass.RdataClass.make(answer_rdclass),
+                response,
+                data[nameserver_start:wire_start].decode() or None,
+                port or None,
+            )
+            answer.expiration = expiration
+            key = (
+                qname,
+                dns.rdatatype.RdataType.make(rdtype),
+                dns.rdataclass.RdataClass.make(rdclass),
+            )
+            self.put(key, answer)
+            loaded += 1
+        return loaded
+
 
 CacheKey = Tuple[dns.name.Name, dns.rdatatype.RdataType, dns.rdataclass.RdataClass]
 
+# Cache snapshot format: a header of magic, version, and record count, then
+# for each answer a fixed-size record followed by the query name in wire
+# format, the nameserver text, and the response in wire format.
+_SNAPSHOT_MAGIC = b"DNSCACHE"
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("!8sHI")
+_SNAPSHOT_RECORD = struct.Struct("!dHHHHHHHI")
+
 
 class Cache(CacheBase):
     """Simple thread-safe DNS answer cache."""
 
-    def __init__(self, cleaning_interval: float = 300.0) -> None:
+    def __init__(
+        self, cleaning_interval: float = 300.0, cleaning_batch: int = 1000
+    ) -> None:
         """*cleaning_interval*, a ``float`` is the number of seconds between
         periodic cleanings.
+
+        *cleaning_batch*, an ``int``, is the maximum number of expired entries
+        removed by a single cache operation.  If more entries than this have
+        expired, cleaning continues on subsequent operations until they have
+        all been removed.
         """
 
         super().__init__()
         self.data: Dict[CacheKey, Answer] = {}
         self.cleaning_interval = cleaning_interval
+        self.cleaning_batch = max(cleaning_batch, 1)
         self.next_cleaning: float = time.time() + self.cleaning_interval
+        # A min-heap of (expiration, serial, key) tuples, so that cleaning
+        # only has to look at entries which have actually expired.  The serial
+        # number keeps heap comparisons from ever reaching the keys.  Entries
+        # for keys which have since been replaced or flushed are skipped when
+        # they reach the top of the heap.
+        self.expirations: List[Tuple[float, int, CacheKey]] = []
+        self.serial = itertools.count()
 
     def _maybe_clean(self) -> None:
         """Clean the cache if it's time to do so."""
 
         now = time.time()
         if self.next_cleaning <= now:
-            keys_to_delete = []
-            for k, v in self.data.items():
-                if v.expiration <= now:
-                    keys_to_delete.append(k)
-            for k in keys_to_delete:
+            if self._clean(now):
+                now = time.time()
+                self.next_cleaning = now + self.cleaning_interval
+
+    def _clean(self, now: float) -> bool:
+        """Remove up to *cleaning_batch* entries which have expired as of *now*.
+
+        Returns ``True`` if there are no more expired entries.
+        """
+
+        expirations = self.expirations
+        for _ in range(self.cleaning_batch):
+            if not expirations or expirations[0][0] > now:
+                return True
+            (_, _, k) = heapq.heappop(expirations)
+            v = self.data.get(k)
+            if v is not None and v.expiration <= now:
                 del self.data[k]
-            now = time.time()
-            self.next_cleaning = now + self.cleaning_interval
+        return not expirations or expirations[0][0] > now
+
+    def _index(self, key: CacheKey, value: Answer) -> None:
+        heapq.heappush(self.expirations, (value.expiration, next(self.serial), key))
+        if len(self.expirations) > 2 * len(self.data) + 64:
+            # Too many of the heap entries are stale, so rebuild it.
+            self.expirations = [
+                (v.expiration, next(self.serial), k) for k, v in self.data.items()
+            ]
+            heapq.heapify(self.expirations)
+
+    def _items(self) -> List[Tuple[CacheKey, Answer]]:
+        with self.lock:
+            return list(self.data.items())
 
     def get(self, key: CacheKey) -> Answer | None:
         """Get the answer associated with *key*.
@@ -481,6 +699,7 @@ class Cache(CacheBase):
         with self.lock:
             self._maybe_clean()
             self.data[key] = value
+            self._index(key, value)
 
     def flush(self, key: CacheKey | None = None) -> None:
         """Flush the cache.
@@ -498,16 +717,19 @@ class Cache(CacheBase):
                     del self.data[key]
             else:
                 self.data = {}
+                self.expirations = []
                 self.next_cleaning = time.time() + self.cleaning_interval
 
 
 class LRUCacheNode:
     """LRUCache node."""
 
-    def __init__(self, key, value):
+    def __init__(self, key, value, ttl=0.0):
         self.key = key
         self.value = value
+        self.ttl = ttl
         self.hits = 0
+        self.refreshing = False
         self.prev = self
         self.next = self
 
@@ -530,15 +752,44 @@ class LRUCache(CacheBase):
     resolutions.  The LRUCache has a maximum number of nodes, and when
     it is full, the least-recently used node is removed to make space
     for a new one.
+
+    The cache can also help the resolver keep popular answers fresh.  With
+    prefetching, a resolver using the cache refreshes a popular answer in the
+    background when it gets close to expiring.  With serve-stale (RFC 8767),
+    an expired answer is still returned for a while, and refreshed in the
+    background.
     """
 
-    def __init__(self, max_size: int = 100000) -> None:
+    def __init__(
+        self,
+        max_size: int = 100000,
+        prefetch_fraction: float = 0.0,
+        prefetch_min_hits: int = 1,
+        stale_ttl: float = 0.0,
+    ) -> None:
         """*max_size*, an ``int``, is the maximum number of nodes to cache;
         it must be greater than 0.
+
+        *prefetch_fraction*, a ``float``.  If an answer which has had at least
+        *prefetch_min_hits* hits is returned when less than this fraction of
+        its TTL remains, the resolver refreshes it in the background.  The
+        default is 0.0, i.e. no prefetching.  A value of 0.1 is typical.
+
+        *prefetch_min_hits*, an ``int``, how many hits make an answer popular
+        enough to be prefetched.  The default is 1.
+
+        *stale_ttl*, a ``float``, the number of seconds for which an expired
+        answer is still returned, and refreshed in the background.  The
+        returned answer's ``expiration`` is in the past, and its TTLs are
+        not adjusted.  The default is 0.0, i.e. expired answers are never
+        returned.
         """
 
         super().__init__()
         self.data: Dict[CacheKey, LRUCacheNode] = {}
+        self.prefetch_fraction = prefetch_fraction
+        self.prefetch_min_hits = prefetch_min_hits
+        self.stale_ttl = stale_ttl
         self.set_max_size(max_size)
         self.sentinel: LRUCacheNode = LRUCacheNode(None, None)
         self.sentinel.prev = self.sentinel
@@ -549,6 +800,16 @@ class LRUCache(CacheBase):
             max_size = 1
         self.max_size = max_size
 
+    def _items(self) -> List[Tuple[CacheKey, Answer]]:
+        # Least recently used first, so reloading preserves the LRU order.
+        items = []
+        with self.lock:
+            node = self.sentinel.prev
+            while node != self.sentinel:
+                items.append((node.key, node.value))
+                node = node.prev
+        return items
+
     def get(self, key: CacheKey) -> Answer | None:
         """Get the answer associated with *key*.
 
@@ -568,7 +829,7 @@ class LRUCache(CacheBase):
             # Unlink because we're either going to move the node to the front
             # of the LRU list or we're going to free it.
             node.unlink()
-            if node.value.expiration <= time.time():
+            if node.value.expiration + self.stale_ttl <= time.time():
                 del self.data[node.key]
                 self.statistics.misses += 1
                 return None
@@ -577,6 +838,38 @@ class LRUCache(CacheBase):
             node.hits += 1
             return node.value
 
+    def claim_refresh(self, key: CacheKey) -> bool:
+        """Should the resolver refresh the answer cached for *key*, which it
+        has just gotten from the cache, in the background?
+
+        This is the case if the answer is stale, or if prefetching is enabled,
+        the answer is popular, and its remaining lifetime is less than the
+        prefetch fraction of its TTL.  Only one refresh of an answer is
+        claimed at a time.
+
+        If ``True`` is returned, the caller must call ``release_refresh()``
+        when it is finished, whether or not it succeeded.
+        """
+        with self.lock:
+            node = self.data.get(key)
+            if node is None or node.refreshing:
+                return False
+            remaining = node.value.expiration - time.time()
+            if remaining > 0 and (
+                node.hits < self.prefetch_min_hits
+                or remaining >= node.ttl * self.prefetch_fraction
+            ):
+                return False
+            node.refreshing = True
+            return True
+
+    def release_refresh(self, key: CacheKey) -> None:
+        """Note that a background refresh of *key* is no longer running."""
+        with self.lock:
+            node = self.data.get(key)
+            if node is not None:
+                node.refreshing = False
+
     def get_hits_for_key(self, key: CacheKey) -> int:
         """Return the number of cache hits associated with the specified key."""
         with self.lock:
@@ -604,7 +897,7 @@ class LRUCache(CacheBase):
                 gnode = self.sentinel.prev
                 gnode.unlink()
                 del self.data[gnode.key]
-            node = LRUCacheNode(key, value)
+            node = LRUCacheNode(key, value, value.expiration - time.time())
             node.link_after(self.sentinel)
             self.data[key] = node
 
@@ -633,6 +926,384 @@ class LRUCache(CacheBase):
                 self.data = {}
 
 
+class ShardedLRUCache(CacheBase):
+    """Thread-safe, bounded, least-recently-used DNS answer cache, split into
+    independently locked shards.
+
+    Keys are distributed across the shards by hash, and each shard is an
+    ``LRUCache`` with its own lock, so threads working on different keys
+    rarely contend with each other.  This is a good choice if many threads
+    share a single resolver.  Least-recently-used eviction is done per shard,
+    so the cache as a whole is only approximately LRU.
+
+    Statistics are kept per shard and aggregated on demand.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100000,
+        shards: int = 16,
+        prefetch_fraction: float = 0.0,
+        prefetch_min_hits: int = 1,
+        stale_ttl: float = 0.0,
+    ) -> None:
+        """*max_size*, an ``int``, is the maximum number of nodes to cache;
+        it must be greater than 0.  The nodes are divided evenly among the
+        shards.
+
+        *shards*, an ``int``, is the number of shards; it must be greater
+        than 0.
+
+        *prefetch_fraction*, *prefetch_min_hits*, and *stale_ttl* are as for
+        ``LRUCache``.
+        """
+
+        super().__init__()
+        if shards < 1:
+            shards = 1
+        self.shards: List[LRUCache] = [
+            LRUCache(
+                prefetch_fraction=prefetch_fraction,
+                prefetch_min_hits=prefetch_min_hits,
+                stale_ttl=stale_ttl,
+            )
+            for _ in range(shards)
+        ]
+        self.set_max_size(max_size)
+
+    def set_max_size(self, max_size: int) -> None:
+        if max_size < 1:
+            max_size = 1
+        self.max_size = max_size
+        # Round up, so that the total capacity is never less than max_size.
+        shard_size = -(-max_size // len(self.shards))
+        for shard in self.shards:
+            shard.set_max_size(shard_size)
+
+    def _shard(self, key: CacheKey) -> LRUCache:
+        return self.shards[hash(key) % len(self.shards)]
+
+    def _items(self) -> List[Tuple[CacheKey, Answer]]:
+        items = []
+        for shard in self.shards:
+            items.extend(shard._items())
+        return items
+
+    def get(self, key: CacheKey) -> Answer | None:
+        """Get the answer associated with *key*.
+
+        Returns None if no answer is cached for the key.
+
+        *key*, a ``(dns.name.Name, dns.rdatatype.RdataType, dns.rdataclass.RdataClass)``
+        tuple whose values are the query name, rdtype, and rdclass respectively.
+
+        Returns a ``dns.resolver.Answer`` or ``None``.
+        """
+
+        return self._shard(key).get(key)
+
+    def claim_refresh(self, key: CacheKey) -> bool:
+        """Should the resolver refresh the answer cached for *key* in the
+        background?  See ``LRUCache.claim_refresh()``.
+        """
+        return self._shard(key).claim_refresh(key)
+
+    def release_refresh(self, key: CacheKey) -> None:
+        """Note that a background refresh of *key* is no longer running."""
+        self._shard(key).release_refresh(key)
+
+    def get_hits_for_key(self, key: CacheKey) -> int:
+        """Return the number of cache hits associated with the specified key."""
+        return self._shard(key).get_hits_for_key(key)
+
+    def put(self, key: CacheKey, value: Answer) -> None:
+        """Associate key and value in the cache.
+
+        *key*, a ``(dns.name.Name, dns.rdatatype.RdataType, dns.rdataclass.RdataClass)``
+        tuple whose values are the query name, rdtype, and rdclass respectively.
+
+        *value*, a ``dns.resolver.Answer``, the answer.
+        """
+
+        self._shard(key).put(key, value)
+
+    def flush(self, key: CacheKey | None = None) -> None:
+        """Flush the cache.
+
+        If *key* is not ``None``, only that item is flushed.  Otherwise the entire cache
+        is flushed.
+
+        *key*, a ``(dns.name.Name, dns.rdatatype.RdataType, dns.rdataclass.RdataClass)``
+        tuple whose values are the query name, rdtype, and rdclass respectively.
+        """
+
+        if key is not None:
+            self._shard(key).flush(key)
+        else:
+            for shard in self.shards:
+                shard.flush()
+
+    def reset_statistics(self) -> None:
+        """Reset all statistics to zero."""
+        for shard in self.shards:
+            shard.reset_statistics()
+
+    def hits(self) -> int:
+        """How many hits has the cache had?"""
+        return sum(shard.hits() for shard in self.shards)
+
+    def misses(self) -> int:
+        """How many misses has the cache had?"""
+        return sum(shard.misses() for shard in self.shards)
+
+    def get_statistics_snapshot(self) -> CacheStatistics:
+        """Return a snapshot of all the statistics, summed across the shards.
+
+        Each shard's statistics are internally consistent, but the shards are
+        not all locked at the same time, so the aggregate may include
+        activity that happened while the snapshot was being taken.
+        """
+        statistics = CacheStatistics()
+        for shard in self.shards:
+            shard_statistics = shard.get_statistics_snapshot()
+            statistics.hits += shard_statistics.hits
+            statistics.misses += shard_statistics.misses
+        return statistics
+
+
+class NegativeCache(LRUCache):
+    """Thread-safe, bounded, least-recently-used cache of negative answers.
+
+    If a resolver's *negative_cache* attribute is set to an instance of this
+    class, NXDOMAIN and "no data" answers are kept there instead of in the
+    resolver's *cache*, with their own size limit and statistics.
+
+    As described in RFC 2308, a negative answer is kept for the lesser of the
+    TTL and the MINIMUM field of the SOA record in its authority section, and
+    an answer without an SOA record is not cached at all.  The lifetime is
+    additionally capped at *max_ttl* seconds.
+    """
+
+    def __init__(self, max_size: int = 100000, max_ttl: float = 10800.0) -> None:
+        """*max_size*, an ``int``, is the maximum number of nodes to cache;
+        it must be greater than 0.
+
+        *max_ttl*, a ``float``, is the maximum number of seconds to cache a
+        negative answer.  The default is three hours, as suggested by RFC 2308.
+        """
+
+        super().__init__(max_size)
+        self.max_ttl = max_ttl
+
+    def put(self, key: CacheKey, value: Answer) -> None:
+        """Associate key and value in the cache, if *value* may be cached.
+
+        *key*, a ``(dns.name.Name, dns.rdatatype.RdataType, dns.rdataclass.RdataClass)``
+        tuple whose values are the query name, rdtype, and rdclass respectively.
+
+        *value*, a ``dns.resolver.Answer``, the negative answer.
+        """
+
+        for rrset in value.response.authority:
+            if rrset.rdtype == dns.rdatatype.SOA:
+                break
+        else:
+            # No SOA, so no negative caching TTL.
+            return
+        value.expiration = min(value.expiration, time.time() + self.max_ttl)
+        super().put(key, value)
+
+
+class NameserverStatistics:
+    """Statistics about a nameserver."""
+
+    def __init__(
+        self,
+        srtt: float | None = None,
+        rttvar: float = 0.0,
+        responses: int = 0,
+        failures: int = 0,
+        timeouts: int = 0,
+        consecutive_failures: int = 0,
+        backoff_until: float = 0.0,
+    ) -> None:
+        #: The smoothed round trip time in seconds, or ``None`` if there
+        #: have been no responses.
+        self.srtt = srtt
+        #: The round trip time variation in seconds.
+        self.rttvar = rttvar
+        #: The number of good responses.
+        self.responses = responses
+        #: The number of failures, including timeouts.
+        self.failures = failures
+        #: The number of timeouts.
+        self.timeouts = timeouts
+        #: The number of failures since the last good response.
+        self.consecutive_failures = consecutive_failures
+        #: The time until which the nameserver is avoided.
+        self.backoff_until = backoff_until
+
+    def clone(self) -> "NameserverStatistics":
+        return NameserverStatistics(
+            self.srtt,
+            self.rttvar,
+            self.responses,
+            self.failures,
+            self.timeouts,
+            self.consecutive_failures,
+            self.backoff_until,
+        )
+
+
+class NameserverTracker:
+    """Thread-safe tracker of nameserver round trip times and failures.
+
+    If a resolver's *nameserver_tracker* attribute is set to an instance of
+    this class, the resolver records the outcome of every query in it, and
+    tries nameservers fastest first instead of in the configured order.
+
+    The round trip time of each nameserver is smoothed exponentially, as in
+    RFC 6298.  A nameserver which fails or times out is avoided for a while,
+    starting at *backoff* seconds and doubling with each consecutive failure
+    up to *max_backoff* seconds; it is still tried, but only after all the
+    healthy nameservers.  Nameservers with no measurements yet are tried
+    before the others, so that they get measured.
+
+    Nameservers are identified by their text form, e.g. ``Do53:10.0.0.1@53``,
+    so one tracker may be shared by several resolvers.
+    """
+
+    def __init__(
+        self, alpha: float = 0.125, backoff: float = 1.0, max_backoff: float = 60.0
+    ) -> None:
+        """*alpha*, a ``float``, the weight given to each new round trip time
+        sample.  The default is 0.125.
+
+        *backoff*, a ``float``, the number of seconds for which a nameserver is
+        avoided after its first consecutive failure.  The default is 1.0.
+
+        *max_backoff*, a ``float``, the most seconds for which a nameserver is
+        avoided.  The default is 60.0.
+        """
+        self.lock = threading.Lock()
+        self.alpha = alpha
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statistics: Dict[str, NameserverStatistics] = {}
+
+    def _statistics(
+        self, nameserver: dns.nameserver.Nameserver
+    ) -> NameserverStatistics:
+        key = str(nameserver)
+        statistics = self.statistics.get(key)
+        if statistics is None:
+            statistics = NameserverStatistics()
+            self.statistics[key] = statistics
+        return statistics
+
+    def record_response(
+        self, nameserver: dns.nameserver.Nameserver, rtt: float
+    ) -> None:
+        """Record a good response from *nameserver* which took *rtt* seconds."""
+        with self.lock:
+            statistics = self._statistics(nameserver)
+            if statistics.srtt is None:
+                statistics.srtt = rtt
+                statistics.rttvar = rtt / 2
+            else:
+                statistics.rttvar += (
+                    abs(statistics.srtt - rtt) - statistics.rttvar
+                ) * (2 * self.alpha)
+                statistics.srtt += (rtt - statistics.srtt) * self.alpha
+            statistics.responses += 1
+            statistics.consecutive_failures = 0
+            statistics.backoff_until = 0.0
+
+    def record_failure(
+        self, nameserver: dns.nameserver.Nameserver, timeout: bool = False
+    ) -> None:
+        """Record a failure of *nameserver*; *timeout* is ``True`` if it
+        was a timeout.
+        """
+        with self.lock:
+            statistics = self._statistics(nameserver)
+            statistics.failures += 1
+            if timeout:
+                statistics.timeouts += 1
+            statistics.consecutive_failures += 1
+            backoff = min(
+                self.backoff * 2 ** min(statistics.consecutive_failures - 1, 30),
+                self.max_backoff,
+            )
+            statistics.backoff_until = time.time() + backoff
+
+    def order(
+        self, nameservers: List[dns.nameserver.Nameserver]
+    ) -> List[dns.nameserver.Nameserver]:
+        """Return *nameservers* sorted in the order they should be tried.
+
+        Unmeasured nameservers come first, then healthy ones from fastest to
+        slowest, then ones being avoided, from the one that will be avoided
+        the least time to the one that will be avoided the most.  The sort is
+        stable.
+        """
+        now = time.time()
+        with self.lock:
+
+            def sort_key(nameserver):
+                statistics = self.statistics.get(str(nameserver))
+                if statistics is None:
+                    return (0, 0.0)
+                if statistics.backoff_until > now:
+                    return (2, statistics.backoff_until)
+                if statistics.srtt is None:
+                    return (0, 0.0)
+                return (1, statistics.srtt)
+
+            return sorted(nameservers, key=sort_key)
+
+    def get_statistics_snapshot(self) -> Dict[str, NameserverStatistics]:
+        """Return a consistent snapshot of the statistics of all nameservers,
+        as a ``dict`` mapping the text form of each nameserver to its
+        ``dns.resolver.NameserverStatistics``.
+        """
+        with self.lock:
+            return {
+                key: statistics.clone() for key, statistics in self.statistics.items()
+            }
+
+    def reset_statistics(self) -> None:
+        """Forget everything about all nameservers."""
+        with self.lock:
+            self.statistics = {}
+
+
+class HedgeStatistics:
+    """Hedged query statistics"""
+
+    def __init__(self, sent: int = 0, won: int = 0) -> None:
+        self.lock = threading.Lock()
+        #: The number of hedged queries sent.
+        self.sent = sent
+        #: The number of hedged queries whose response was used.
+        self.won = won
+
+    def record(self, won: bool) -> None:
+        with self.lock:
+            self.sent += 1
+            if won:
+                self.won += 1
+
+    def reset(self) -> None:
+        with self.lock:
+            self.sent = 0
+            self.won = 0
+
+    def clone(self) -> "HedgeStatistics":
+        with self.lock:
+            return HedgeStatistics(self.sent, self.won)
+
+
 class _Resolution:
     """Helper class for dns.resolver.Resolver.resolve().
 
@@ -681,6 +1352,11 @@ class _Resolution:
         self.retry_with_tcp = False
         self.request: dns.message.QueryMessage | None = None
         self.backoff = 0.0
+        # If true, this resolution refreshes a cached answer and so must not
+        # be answered from the cache.
+        self.refreshing = False
+        # The (cache, key) of an answer the caller should refresh.
+        self.refresh: Tuple[CacheBase, CacheKey] | None = None
 
     def next_request(
         self,
@@ -698,16 +1374,27 @@ class _Resolution:
             self.qname = self.qnames.pop(0)
 
             # Do we know the answer?
-            if self.resolver.cache:
-                answer = self.resolver.cache.get(
-                    (self.qname, self.rdtype, self.rdclass)
-                )
+            negative_cache = self.resolver._get_negative_cache()
+            caches = [self.resolver.cache]
+            if negative_cache is not self.resolver.cache:
+                caches.append(negative_cache)
+            if self.refreshing:
+                caches = []
+                negative_cache = None
+            for cache in caches:
+                if not cache:
+                    continue
+                key = (self.qname, self.rdtype, self.rdclass)
+                answer = cache.get(key)
                 if answer is not None:
                     if answer.rrset is None and self.raise_on_no_answer:
                         raise NoAnswer(response=answer.response)
                     else:
+                        if isinstance(cache, CacheBase) and cache.claim_refresh(key):
+                            self.refresh = (cache, key)
                         return (None, answer)
-                answer = self.resolver.cache.get(
+            if negative_cache:
+                answer = negative_cache.get(
                     (self.qname, dns.rdatatype.ANY, self.rdclass)
                 )
                 if answer is not None and answer.response.rcode() == dns.rcode.NXDOMAIN:
@@ -717,21 +1404,23 @@ class _Resolution:
                     continue
 
             # Build the request
-            request = dns.message.make_query(self.qname, self.rdtype, self.rdclass)
+            flags = self.resolver.flags
+            template = dns.message.get_query_template(
+                self.rdtype,
+                self.rdclass,
+                self.resolver.edns,
+                ednsflags=self.resolver.ednsflags,
+                payload=self.resolver.payload,
+                options=self.resolver.ednsoptions,
+                flags=dns.flags.RD if flags is None else flags,
+            )
+            request = template.make_query(self.qname)
             if self.resolver.keyname is not None:
                 request.use_tsig(
                     self.resolver.keyring,
                     self.resolver.keyname,
                     algorithm=self.resolver.keyalgorithm,
                 )
-            request.use_edns(
-                self.resolver.edns,
-                self.resolver.ednsflags,
-                self.resolver.payload,
-                options=self.resolver.ednsoptions,
-            )
-            if self.resolver.flags is not None:
-                request.flags = self.resolver.flags
 
             self.nameservers = self.resolver._enrich_nameservers(
                 self.resolver._nameservers,
@@ -740,6 +1429,10 @@ class _Resolution:
             )
             if self.resolver.rotate:
                 random.shuffle(self.nameservers)
+            if self.resolver.nameserver_tracker is not None:
+                self.nameservers = self.resolver.nameserver_tracker.order(
+                    self.nameservers
+                )
             self.current_nameservers = self.nameservers[:]
             self.errors = []
             self.nameserver = None
@@ -785,6 +1478,9 @@ class _Resolution:
         # returns an (answer: Answer, end_loop: bool) tuple.
         #
         assert self.nameserver is not None
+        tracker = self.resolver.nameserver_tracker
+        if tracker is not None:
+            self._track(tracker, response, ex)
         if ex:
             # Exception during I/O or from_wire()
             assert response is None
@@ -839,8 +1535,12 @@ class _Resolution:
                 # The nameserver is no good, take it out of the mix.
                 self.nameservers.remove(self.nameserver)
                 return (None, False)
-            if self.resolver.cache:
-                self.resolver.cache.put((self.qname, self.rdtype, self.rdclass), answer)
+            if answer.rrset is None:
+                cache = self.resolver._get_negative_cache()
+            else:
+                cache = self.resolver.cache
+            if cache:
+                cache.put((self.qname, self.rdtype, self.rdclass), answer)
             if answer.rrset is None and self.raise_on_no_answer:
                 raise NoAnswer(response=answer.response)
             return (answer, True)
@@ -865,8 +1565,9 @@ class _Resolution:
                 self.nameservers.remove(self.nameserver)
                 return (None, False)
             self.nxdomain_responses[self.qname] = response
-            if self.resolver.cache:
-                self.resolver.cache.put(
+            negative_cache = self.resolver._get_negative_cache()
+            if negative_cache:
+                negative_cache.put(
                     (self.qname, dns.rdatatype.ANY, self.rdclass), answer
                 )
             # Make next_nameserver() return None, so caller breaks its
@@ -902,6 +1603,294 @@ class _Resolution:
             )
             return (None, False)
 
+    def hedge_nameserver(self) -> dns.nameserver.Do53Nameserver | None:
+        """Return the nameserver to send a hedged query to if the current
+        attempt is slow, or ``None`` if the attempt cannot be hedged.
+        """
+        if self.tcp_attempt or not self.current_nameservers:
+            return None
+        nameserver = self.nameserver
+        hedge = self.current_nameservers[0]
+        if (
+            isinstance(nameserver, dns.nameserver.Do53Nameserver)
+            and isinstance(hedge, dns.nameserver.Do53Nameserver)
+            and dns.inet.af_for_address(nameserver.address)
+            == dns.inet.af_for_address(hedge.address)
+        ):
+            return hedge
+        return None
+
+    def use_hedge(self, hedge: dns.nameserver.Do53Nameserver) -> None:
+        """Make the nameserver a hedged query was sent to the current one, so
+        its outcome is attributed to it by ``query_result()``.
+        """
+        self.current_nameservers.remove(hedge)
+        self.nameserver = hedge
+
+    def _track(
+        self,
+        tracker: NameserverTracker,
+        response: dns.message.Message | None,
+        ex: Exception | None,
+    ) -> None:
+        assert self.nameserver is not None
+        if ex:
+            # Truncation is not the nameserver's fault.
+            if not isinstance(ex, dns.message.Truncated):
+                tracker.record_failure(
+                    self.nameserver, isinstance(ex, dns.exception.Timeout)
+                )
+        else:
+            assert response is not None
+            if response.rcode() in (
+                dns.rcode.NOERROR,
+                dns.rcode.NXDOMAIN,
+                dns.rcode.YXDOMAIN,
+            ):
+                tracker.record_response(self.nameserver, response.time)
+            else:
+                tracker.record_failure(self.nameserver)
+
+
+class _BulkQuery:
+    """The state of one of the resolutions being run by _BulkResolution."""
+
+    def __init__(
+        self,
+        key: Tuple[dns.name.Name, dns.rdatatype.RdataType],
+        resolution: _Resolution,
+        request: dns.message.QueryMessage,
+    ) -> None:
+        self.key = key
+        self.resolution = resolution
+        self.request = request
+        self.start = 0.0
+        self.nameserver: dns.nameserver.Nameserver | None = None
+        self.tcp = False
+        self.send_at = 0.0
+
+
+_BulkResult = Tuple[Tuple[dns.name.Name, dns.rdatatype.RdataType], Answer | Exception]
+
+
+class _BulkResolution:
+    """Helper class for dns.resolver.Resolver.resolve_many().
+
+    Runs many _Resolution objects at once from a single thread.  UDP and TCP
+    queries to ``dns.nameserver.Do53Nameserver`` nameservers are run by a
+    ``dns.query.QueryEngine``, which waits for all of them with one selector.
+    Any other kind of query, e.g. DNS-over-HTTPS, or a TCP query to a
+    nameserver with a connection pool, is made synchronously.
+
+    The generator methods yield (key, answer-or-exception) tuples as
+    resolutions complete.
+    """
+
+    def __init__(
+        self,
+        resolver: "Resolver",
+        rdclass: dns.rdataclass.RdataClass | str,
+        tcp: bool,
+        source: str | None,
+        raise_on_no_answer: bool,
+        source_port: int,
+        lifetime: float | None,
+        search: bool | None,
+        max_in_flight: int,
+        sockets: int,
+    ) -> None:
+        self.resolver = resolver
+        self.rdclass = rdclass
+        self.tcp = tcp
+        self.source = source
+        self.raise_on_no_answer = raise_on_no_answer
+        self.source_port = source_port
+        self.lifetime = lifetime
+        self.search = search
+        self.max_in_flight = max(max_in_flight, 1)
+        self.engine = dns.query.QueryEngine(sockets)
+        self.active = 0
+        self.delayed: List[_BulkQuery] = []
+
+    def close(self) -> None:
+        self.engine.close()
+
+    def run(
+        self, keys: Iterable[Tuple[dns.name.Name, dns.rdatatype.RdataType]]
+    ) -> Iterator[_BulkResult]:
+        # Check the cache for everything first, so cached answers are
+        # returned without waiting for any network activity.
+        waiting: Deque[_BulkQuery] = collections.deque()
+        for key in keys:
+            try:
+                resolution = _Resolution(
+                    self.resolver,
+                    key[0],
+                    key[1],
+                    self.rdclass,
+                    self.tcp,
+                    self.raise_on_no_answer,
+                    self.search,
+                )
+                (request, answer) = resolution.next_request()
+            except Exception as ex:
+                yield (key, ex)
+                continue
+            if answer is not None:
+                self.resolver._maybe_refresh(resolution, self.source, self.source_port)
+                yield (key, answer)
+            else:
+                assert request is not None
+                waiting.append(_BulkQuery(key, resolution, request))
+        while waiting or self.active or self.delayed:
+            while waiting and self.active < self.max_in_flight:
+                bq = waiting.popleft()
+                bq.start = time.time()
+                self.active += 1
+                yield from self._next_attempt(bq)
+            if not (self.engine.outstanding() or self.delayed):
+                continue
+            timeout = None
+            if self.delayed:
+                send_at = min(bq.send_at for bq in self.delayed)
+                timeout = max(send_at - time.time(), 0.0)
+            if self.engine.outstanding():
+                for eq in self.engine.poll(timeout):
+                    yield from self._handle(eq.context, eq.response, eq.exception)
+            else:
+                assert timeout is not None
+                time.sleep(timeout)
+            now = time.time()
+            for bq in [bq for bq in self.delayed if bq.send_at <= now]:
+                self.delayed.remove(bq)
+                yield from self._send(bq)
+
+    def _done(self, bq: _BulkQuery, result: Answer | Exception) -> _BulkResult:
+        self.active -= 1
+        return (bq.key, result)
+
+    def _next_attempt(self, bq: _BulkQuery) -> Iterator[_BulkResult]:
+        try:
+            (bq.nameserver, bq.tcp, backoff) = bq.resolution.next_nameserver()
+        except Exception as ex:
+            yield self._done(bq, ex)
+            return
+        if backoff:
+            bq.send_at = time.time() + backoff
+            self.delayed.append(bq)
+        else:
+            yield from self._send(bq)
+
+    def _send(self, bq: _BulkQuery) -> Iterator[_BulkResult]:
+        assert bq.nameserver is not None
+        try:
+            timeout = self.resolver._compute_timeout(
+                bq.start, self.lifetime, bq.resolution.errors
+            )
+        except Exception as ex:
+            yield self._done(bq, ex)
+            return
+        nameserver = bq.nameserver
+        if isinstance(nameserver, dns.nameserver.Do53Nameserver) and not (
+            bq.tcp and nameserver.pool is not None
+        ):
+            if bq.tcp:
+                self.engine.tcp(
+                    bq.request,
+                    nameserver.address,
+                    timeout,
+                    nameserver.port,
+                    self.source,
+                    self.source_port,
+                    context=bq,
+                    lazy=True,
+                )
+            else:
+                self.engine.udp(
+                    bq.request,
+                    nameserver.address,
+                    timeout,
+                    nameserver.port,
+                    self.source,
+                    raise_on_truncation=True,
+                    context=bq,
+                    lazy=True,
+                )
+            # Errors, including those in starting the query, are reported by
+            # the engine's poll().
+            return
+        # We can't multiplex this kind of query, so do it synchronously.
+        try:
+            response = nameserver.query(
+                bq.request,
+                timeout=timeout,
+                source=self.source,
+                source_port=self.source_port,
+                max_size=bq.tcp,
+            )
+        except Exception as ex:
+            yield from self._handle(bq, None, ex)
+            return
+        yield from self._handle(bq, response, None)
+
+    def _handle(
+        self,
+        bq: _BulkQuery,
+        response: dns.message.Message | None,
+        ex: Exception | None,
+    ) -> Iterator[_BulkResult]:
+        if response is not None:
+            # The engine reads responses lazily.  Decode the sections the
+            # resolver uses now, so that a malformed one counts against the
+            # nameserver.  The additional section is only decoded if the
+            # caller reads it, unless the answer may be cached, as an error
+            # in it would then be raised to whoever got it from the cache.
+            try:
+                response.section_from_number(dns.message.ANSWER)
+                response.section_from_number(dns.message.AUTHORITY)
+                if self.resolver._get_negative_cache() is not None:
+                    response.section_from_number(dns.message.ADDITIONAL)
+            except Exception as e:
+                (response, ex) = (None, e)
+        try:
+            (answer, done) = bq.resolution.query_result(response, ex)
+            if answer is None and done:
+                # NXDOMAIN, so move on to the next name to try.
+                (request, answer) = bq.resolution.next_request()
+                if request is not None:
+                    bq.request = request
+        except Exception as e:
+            yield self._done(bq, e)
+            return
+        if answer is not None:
+            self.resolver._maybe_refresh(bq.resolution, self.source, self.source_port)
+            yield self._done(bq, answer)
+        else:
+            yield from self._next_attempt(bq)
+
+
+class _InFlight:
+    """A resolution whose result is shared by all coalesced callers."""
+
+    def __init__(self, event: Any) -> None:
+        self.event = event
+        self.answer: Answer | None = None
+        self.exception: BaseException | None = None
+
+    def result_for_follower(self) -> Answer | None:
+        """Return the answer, or raise the exception, of the resolution for a
+        caller which waited for it, or return ``None`` if the caller should
+        resolve on its own.  That is the case if the resolution was
+        interrupted (e.g. cancelled), or if it ran out of the lifetime of the
+        caller which started it, as the waiting caller's lifetime may be
+        longer.
+        """
+        if isinstance(self.exception, LifetimeTimeout):
+            return None
+        if isinstance(self.exception, Exception):
+            raise self.exception
+        return self.answer
+
 
 class BaseResolver:
     """DNS stub resolver."""
@@ -925,6 +1914,10 @@ class BaseResolver:
     ednsoptions: List[dns.edns.Option] | None
     payload: int
     cache: Any
+    negative_cache: Any
+    nameserver_tracker: NameserverTracker | None
+    hedge_delay: float | None
+    coalesce: bool
     flags: int | None
     retry_servfail: bool
     rotate: bool
@@ -945,6 +1938,9 @@ class BaseResolver:
         on Windows systems.)
         """
 
+        self._in_flight: Dict[Any, _InFlight] = {}
+        self._in_flight_lock = threading.Lock()
+        self.hedge_statistics = HedgeStatistics()
         self.reset()
         if configure:
             if sys.platform == "win32":  # pragma: no cover
@@ -973,6 +1969,10 @@ class BaseResolver:
         self.ednsoptions = None
         self.payload = 0
         self.cache = None
+        self.negative_cache = None
+        self.nameserver_tracker = None
+        self.hedge_delay = None
+        self.coalesce = False
         self.flags = None
         self.retry_servfail = False
         self.rotate = False
@@ -1084,6 +2084,13 @@ class BaseResolver:
             raise LifetimeTimeout(timeout=duration, errors=errors)
         return min(lifetime - duration, self.timeout)
 
+    def _get_negative_cache(self) -> Any:
+        # Negative answers go in the negative cache if there is one, and
+        # otherwise share the cache with positive answers.
+        if self.negative_cache is not None:
+            return self.negative_cache
+        return self.cache
+
     def _get_qnames_to_try(
         self, qname: dns.name.Name, search: bool | None
     ) -> List[dns.name.Name]:
@@ -1182,6 +2189,112 @@ class BaseResolver:
 
         self.flags = flags
 
+    def _coalescing_key(
+        self,
+        qname: dns.name.Name | str,
+        rdtype: dns.rdatatype.RdataType | str,
+        rdclass: dns.rdataclass.RdataClass | str,
+        tcp: bool,
+        raise_on_no_answer: bool,
+        search: bool | None,
+    ) -> Any:
+        """Return the key under which identical resolutions are coalesced,
+        or ``None`` if the arguments are bad, in which case the resolution
+        will raise the appropriate error itself.
+
+        The source address and port are not part of the key, as callers
+        which join a resolution use those of the caller which started it,
+        and nor is the lifetime, as each caller waits for the resolution
+        for no longer than its own lifetime.
+        """
+        try:
+            if isinstance(qname, str):
+                qname = dns.name.from_text(qname, None)
+            rdtype = dns.rdatatype.RdataType.make(rdtype)
+            rdclass = dns.rdataclass.RdataClass.make(rdclass)
+        except Exception:
+            return None
+        return (qname, rdtype, rdclass, tcp, raise_on_no_answer, search)
+
+    def _hedge_timed_out(
+        self,
+        resolution: _Resolution,
+        hedge: dns.nameserver.Do53Nameserver,
+        timeout: float,
+        ex: Exception,
+    ) -> None:
+        """Note that a possibly hedged query timed out.  If the hedged query
+        was sent, the timeout of the first nameserver is recorded here, and
+        the caller records the timeout of *hedge*.
+        """
+        assert self.hedge_delay is not None
+        if self.hedge_delay < timeout:
+            self.hedge_statistics.record(False)
+            resolution.query_result(None, ex)
+            resolution.use_hedge(hedge)
+
+    def _hedge_answered(
+        self,
+        resolution: _Resolution,
+        hedge: dns.nameserver.Do53Nameserver,
+        response: dns.message.Message,
+        from_hedge: bool,
+    ) -> dns.message.Message:
+        """Note the response to a possibly hedged query, and return it, or
+        raise ``dns.message.Truncated`` if it is truncated.
+        """
+        assert self.hedge_delay is not None
+        if from_hedge:
+            self.hedge_statistics.record(True)
+            resolution.use_hedge(hedge)
+        elif response.time >= self.hedge_delay:
+            self.hedge_statistics.record(False)
+        if response.flags & dns.flags.TC:
+            raise dns.message.Truncated(message=response)
+        return response
+
+    def get_hedge_statistics_snapshot(self) -> HedgeStatistics:
+        """Return a consistent snapshot of the hedged query statistics."""
+        return self.hedge_statistics.clone()
+
+    def _refresh_resolution(self, key: CacheKey) -> _Resolution:
+        """Make a resolution which refreshes the answer cached for *key*."""
+        resolution = _Resolution(self, key[0], key[1], key[2], False, False, False)
+        resolution.refreshing = True
+        return resolution
+
+    def _join_in_flight(self, key: Any, make_event: Any) -> Tuple[_InFlight, bool]:
+        """Find the in-flight resolution for *key*, starting one with an event
+        made by *make_event* if there isn't one.
+
+        Returns an ``(_InFlight, bool)`` tuple, where the ``bool`` is ``True``
+        if the caller started the resolution and so must perform it and then
+        call ``_finish_in_flight()``.
+        """
+        with self._in_flight_lock:
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                return (flight, False)
+            flight = _InFlight(make_event())
+            self._in_flight[key] = flight
+            return (flight, True)
+
+    def _finish_in_flight(self, key: Any, flight: _InFlight) -> None:
+        with self._in_flight_lock:
+            del self._in_flight[key]
+        flight.event.set()
+
+    def _in_flight_timeout(self, start: float, lifetime: float | None) -> float:
+        """Return how long a caller which started at *start* may still wait
+        for an in-flight resolution, or raise ``LifetimeTimeout`` if its
+        *lifetime* has expired.
+        """
+        lifetime = self.lifetime if lifetime is None else lifetime
+        duration = max(time.time() - start, 0)
+        if duration >= lifetime:
+            raise LifetimeTimeout(timeout=duration, errors=[])
+        return lifetime - duration
+
     @classmethod
     def _enrich_nameservers(
         cls,
@@ -1240,6 +2353,12 @@ class BaseResolver:
         self._nameservers = nameservers
 
 
+# The most background refreshes synchronous resolvers run at once.  Further
+# refreshes are skipped, and the answer is refreshed when it is next used.
+_MAX_REFRESH_THREADS = 4
+_refresh_threads = threading.BoundedSemaphore(_MAX_REFRESH_THREADS)
+
+
 class Resolver(BaseResolver):
     """DNS stub resolver."""
 
@@ -1306,9 +2425,52 @@ class Resolver(BaseResolver):
 
         """
 
-        resolution = _Resolution(
-            self, qname, rdtype, rdclass, tcp, raise_on_no_answer, search
-        )
+        key = None
+        if self.coalesce:
+            key = self._coalescing_key(
+                qname, rdtype, rdclass, tcp, raise_on_no_answer, search
+            )
+        if key is None:
+            resolution = _Resolution(
+                self, qname, rdtype, rdclass, tcp, raise_on_no_answer, search
+            )
+            return self._resolve(resolution, source, source_port, lifetime)
+        start = time.time()
+        while True:
+            (flight, leader) = self._join_in_flight(key, threading.Event)
+            if leader:
+                break
+            if not flight.event.wait(self._in_flight_timeout(start, lifetime)):
+                raise LifetimeTimeout(timeout=time.time() - start, errors=[])
+            answer = flight.result_for_follower()
+            if answer is not None:
+                return answer
+            # The leader was interrupted or ran out of time, so try again,
+            # maybe as the leader, for the rest of our lifetime.
+        try:
+            resolution = _Resolution(
+                self, qname, rdtype, rdclass, tcp, raise_on_no_answer, search
+            )
+            flight.answer = self._resolve(
+                resolution,
+                source,
+                source_port,
+                self._in_flight_timeout(start, lifetime),
+            )
+            return flight.answer
+        except BaseException as ex:
+            flight.exception = ex
+            raise
+        finally:
+            self._finish_in_flight(key, flight)
+
+    def _resolve(
+        self,
+        resolution: _Resolution,
+        source: str | None,
+        source_port: int,
+        lifetime: float | None,
+    ) -> Answer:
         start = time.time()
         while True:
             (request, answer) = resolution.next_request()
@@ -1318,6 +2480,7 @@ class Resolver(BaseResolver):
             # object, including in cases where its length is 0.
             if answer is not None:
                 # cache hit!
+                self._maybe_refresh(resolution, source, source_port)
                 return answer
             assert request is not None  # needed for type checking
             done = False
@@ -1326,14 +2489,22 @@ class Resolver(BaseResolver):
                 if backoff:
                     time.sleep(backoff)
                 timeout = self._compute_timeout(start, lifetime, resolution.errors)
+                hedge = None
+                if self.hedge_delay is not None:
+                    hedge = resolution.hedge_nameserver()
                 try:
-                    response = nameserver.query(
-                        request,
-                        timeout=timeout,
-                        source=source,
-                        source_port=source_port,
-                        max_size=tcp,
-                    )
+                    if hedge is not None:
+                        response = self._hedged_query(
+                            resolution, hedge, request, timeout, source, source_port
+                        )
+                    else:
+                        response = nameserver.query(
+                            request,
+                            timeout=timeout,
+                            source=source,
+                            source_port=source_port,
+                            max_size=tcp,
+                        )
                 except Exception as ex:
                     (_, done) = resolution.query_result(None, ex)
                     continue
@@ -1345,6 +2516,148 @@ class Resolver(BaseResolver):
                 if answer is not None:
                     return answer
 
+    def _hedged_query(
+        self,
+        resolution: _Resolution,
+        hedge: dns.nameserver.Do53Nameserver,
+        request: dns.message.QueryMessage,
+        timeout: float,
+        source: str | None,
+        source_port: int,
+    ) -> dns.message.Message:
+        nameserver = resolution.nameserver
+        assert isinstance(nameserver, dns.nameserver.Do53Nameserver)
+        assert self.hedge_delay is not None
+        try:
+            (response, from_hedge) = dns.query.udp_hedged(
+                request,
+                nameserver.address,
+                hedge.address,
+                self.hedge_delay,
+                timeout,
+                nameserver.port,
+                hedge.port,
+                source,
+                source_port,
+            )
+        except dns.exception.Timeout as ex:
+            self._hedge_timed_out(resolution, hedge, timeout, ex)
+            raise
+        return self._hedge_answered(resolution, hedge, response, from_hedge)
+
+    def _maybe_refresh(
+        self, resolution: _Resolution, source: str | None, source_port: int
+    ) -> None:
+        """If the cache asked for the answer *resolution* got from it to be
+        refreshed, start doing that in a background thread.
+
+        At most ``_MAX_REFRESH_THREADS`` refreshes run at once; if that many
+        are already running, the claim on the answer is released so that a
+        later use of it can refresh it instead.
+        """
+        if resolution.refresh is not None:
+            refresh = resolution.refresh
+            resolution.refresh = None
+            if not _refresh_threads.acquire(blocking=False):
+                (cache, key) = refresh
+                cache.release_refresh(key)
+                return
+            threading.Thread(
+                target=self._refresh,
+                args=(refresh, source, source_port),
+                daemon=True,
+            ).start()
+
+    def _refresh(
+        self,
+        refresh: Tuple[CacheBase, CacheKey],
+        source: str | None,
+        source_port: int,
+    ) -> None:
+        (cache, key) = refresh
+        try:
+            self._resolve(self._refresh_resolution(key), source, source_port, None)
+        except Exception:
+            # The cached answer will expire normally.
+            pass
+        finally:
+            cache.release_refresh(key)
+            _refresh_threads.release()
+
+    def resolve_many(
+        self,
+        queries: Iterable[Tuple[dns.name.Name | str, dns.rdatatype.RdataType | str]],
+        rdclass: dns.rdataclass.RdataClass | str = dns.rdataclass.IN,
+        tcp: bool = False,
+        source: str | None = None,
+        raise_on_no_answer: bool = True,
+        source_port: int = 0,
+        lifetime: float | None = None,
+        search: bool | None = None,
+        max_in_flight: int = 100,
+        sockets: int = 4,
+    ) -> Iterator[Tuple[Any, Answer | Exception]]:
+        """Resolve many questions at once.
+
+        *queries*, an iterable of ``(qname, rdtype)`` tuples, where *qname* is
+        a ``dns.name.Name`` or ``str`` and *rdtype* is an ``int`` or ``str``.
+        Duplicate questions are only resolved once.
+
+        *max_in_flight*, an ``int``, the maximum number of resolutions in
+        progress at any time.  The default is 100.
+
+        *sockets*, an ``int``, the maximum number of UDP sockets per address
+        family over which queries are multiplexed.  The default is 4.
+
+        The other parameters are as for ``resolve()``, except that
+        *source_port* is not used for UDP queries to ordinary DNS
+        nameservers, since the multiplexed UDP sockets are bound to random
+        ports.
+
+        All the questions are first checked against the cache.  UDP and TCP
+        queries to ordinary DNS nameservers are then started without waiting
+        for earlier ones to finish, and are all waited for by a
+        ``dns.query.QueryEngine``.  Other kinds of queries, e.g.
+        DNS-over-HTTPS, or TCP queries to a nameserver with a connection
+        pool, are made synchronously.
+
+        Returns an iterator which yields a ``(query, result)`` tuple for each
+        of the *queries* as its resolution completes, in no particular order.
+        *query* is the tuple from *queries*, and *result* is either a
+        ``dns.resolver.Answer`` or the exception that ``resolve()`` would
+        have raised for it.
+        """
+
+        unique: Dict[Tuple[dns.name.Name, dns.rdatatype.RdataType], List[Any]] = {}
+        for query in queries:
+            (qname, rdtype) = query
+            try:
+                if isinstance(qname, str):
+                    qname = dns.name.from_text(qname, None)
+                rdtype = dns.rdatatype.RdataType.make(rdtype)
+            except Exception as ex:
+                yield (query, ex)
+                continue
+            unique.setdefault((qname, rdtype), []).append(query)
+        bulk = _BulkResolution(
+            self,
+            rdclass,
+            tcp,
+            source,
+            raise_on_no_answer,
+            source_port,
+            lifetime,
+            search,
+            max_in_flight,
+            sockets,
+        )
+        try:
+            for key, result in bulk.run(unique.keys()):
+                for query in unique[key]:
+                    yield (query, result)
+        finally:
+            bulk.close()
+
     def query(
         self,
         qname: dns.name.Name | str,
@@ -18,6 +18,7 @@
 """Tokenize DNS zone file format"""
 
 import io
+import re
 import sys
 from typing import Any, List, Tuple
 
@@ -704,3 +705,138 @@ class Tokenizer:
         if not token.is_identifier():
             raise dns.exception.SyntaxError("expecting an identifier")
         return dns.ttl.from_text(token.value)
+
+
+# A token that BufferedTokenizer can read without the character by character
+# path: optional leading whitespace, then an identifier without escapes which
+# ends at a delimiter, a quoted string without escapes, a newline, or a comment
+# running to the end of the line.
+_FAST_TOKEN = re.compile(
+    r'([ \t]*)(?:([^ \t\n;()"\\]+)(?=[ \t\n;()"]|\Z)|"([^"\\\n]*)"|(\n)|;([^\n]*)\n)'
+)
+
+
+class BufferedTokenizer(Tokenizer):
+    """A DNS zone file format tokenizer which reads its input in large blocks.
+
+    The tokens, line numbers, and errors are the same as those of
+    ``Tokenizer``, but common tokens are found with a regular expression
+    instead of a character at a time, which makes reading a large zone file
+    much faster.  Escapes, parentheses, and comments which are wanted as tokens
+    are handled as ``Tokenizer`` does.
+
+    As a block of input is read before any of it is tokenized, this tokenizer is
+    not suitable for interactive input.
+    """
+
+    _block_size = 65536
+
+    def __init__(
+        self,
+        f: Any = sys.stdin,
+        filename: str | None = None,
+        idna_codec: dns.name.IDNACodec | None = None,
+    ):
+        super().__init__(f, filename, idna_codec)
+        self._buffer = ""
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        """Read the next block of input, which ends at the end of a line unless
+        it is the end of the input.
+
+        Returns ``False`` at the end of the input.
+        """
+
+        block = self.file.read(self._block_size)
+        if block and block[-1] != "\n":
+            block += self.file.readline()
+        self._buffer = block
+        self._pos = 0
+        return block != ""
+
+    def _get_char(self) -> str:
+        """Read a character from input."""
+
+        if self.ungotten_char is None:
+            if self.eof:
+                c = ""
+            elif self._pos >= len(self._buffer) and not self._fill():
+                self.eof = True
+                c = ""
+            else:
+                c = self._buffer[self._pos]
+                self._pos += 1
+                if c == "\n":
+                    self.line_number += 1
+        else:
+            c = self.ungotten_char
+            self.ungotten_char = None
+        return c
+
+    def get(self, want_leading: bool = False, want_comment: bool = False) -> Token:
+        if self.ungotten_token is not None:
+            return super().get(want_leading, want_comment)
+        if self.quoting:
+            if self.ungotten_char != '"':
+                return super().get(want_leading, want_comment)
+            # Finish the quoted string read by the previous call, as
+            # Tokenizer.get() does, which also skips any whitespace after it.
+            self.ungotten_char = None
+            self.quoting = False
+            self.delimiters = _DELIMITERS
+            self.skip_whitespace()
+            want_leading = False
+        c = self.ungotten_char
+        if c:
+            # The ungotten character is always the last one read from the
+            # buffer, so put it back there.
+            self.ungotten_char = None
+            self._pos -= 1
+            if c == "\n":
+                self.line_number -= 1
+        elif c == "" or (
+            self._pos >= len(self._buffer) and (self.eof or not self._fill())
+        ):
+            return super().get(want_leading, want_comment)
+        buffer = self._buffer
+        m = _FAST_TOKEN.match(buffer, self._pos)
+        if m is None:
+            return super().get(want_leading, want_comment)
+        (leading, identifier, quoted, eol, comment) = m.groups()
+        if (identifier is None and quoted is None) and (
+            self.multiline or (comment is not None and want_comment)
+        ):
+            # Newlines are whitespace in multiline mode.
+            return super().get(want_leading, want_comment)
+        if leading and want_leading:
+            self._pos += len(leading)
+            self._unget_char(self._get_char())
+            return Token(WHITESPACE, " ")
+        if identifier is not None:
+            # Read the delimiter after the identifier and unget it, as
+            # Tokenizer.get() does.
+            end = m.end()
+            if end < len(buffer):
+                c = buffer[end]
+                self._pos = end + 1
+                if c == "\n":
+                    self.line_number += 1
+                self.ungotten_char = c
+            else:
+                self._pos = end
+                self._unget_char(self._get_char())
+            return Token(IDENTIFIER, identifier)
+        if quoted is not None:
+            # Leave the closing quote ungotten and the tokenizer quoting, as
+            # Tokenizer.get() does.
+            self._pos = m.end()
+            self.ungotten_char = '"'
+            self.quoting = True
+            self.delimiters = _QUOTING_DELIMITERS
+            return Token(QUOTED_STRING, quoted)
+        self._pos = m.end()
+        self.line_number += 1
+        if eol is not None:
+            return Token(EOL, "\n")
+        return Token(EOL, "\n", comment=comment)
@@ -66,6 +66,32 @@ class Parser:
             name = name.relativize(origin)
         return name
 
+    def skip_name(self) -> None:
+        """Skip over a possibly compressed name without decoding it.
+
+        Compression pointers are not followed, so they are not checked.
+        """
+        wire = self.wire
+        current = self.current
+        while True:
+            if current >= self.end:
+                raise dns.exception.FormError
+            count = wire[current]
+            if count == 0:
+                current += 1
+                break
+            elif count < 64:
+                current += count + 1
+            elif count >= 192:
+                current += 2
+                break
+            else:
+                raise dns.name.BadLabelType
+        if current > self.end:
+            raise dns.exception.FormError
+        self.current = current
+        self.furthest = max(self.furthest, current)
+
     def seek(self, where: int) -> None:
         # Note that seeking to the end is OK!  (If you try to read
         # after such a seek, you'll get an exception as expected.)
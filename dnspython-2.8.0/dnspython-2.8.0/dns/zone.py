@@ -18,9 +18,11 @@
 """DNS Zones."""
 
 import contextlib
+import heapq
 import io
 import os
 import struct
+import tempfile
 from typing import (
     Any,
     Callable,
@@ -33,6 +35,7 @@ from typing import (
     cast,
 )
 
+import dns.btree
 import dns.exception
 import dns.grange
 import dns.immutable
@@ -49,6 +52,7 @@ import dns.tokenizer
 import dns.transaction
 import dns.ttl
 import dns.zonefile
+import dns.zonesnapshot
 from dns.zonetypes import DigestHashAlgorithm, DigestScheme, _digest_hashers
 
 
@@ -116,6 +120,101 @@ def _validate_name(
     return name
 
 
+# How much wire format Zone.to_wire() collects before writing it.
+_WRITE_BUFFER_SIZE = 65536
+
+
+# How many sorted runs _sorted_names() merges at once.
+_MERGE_FAN_IN = 64
+
+# How much of a sorted run is read at a time when merging.
+_RUN_BUFFER_SIZE = 4096
+
+
+def _write_run(f: Any, names: Iterable[dns.name.Name]) -> Tuple[int, int]:
+    # Append a run of names to f, returning its start and end offsets.  Each
+    # name is written as its length, its label count, and its labels.
+    f.seek(0, io.SEEK_END)
+    start = f.tell()
+    buffer = bytearray()
+    for name in names:
+        record = bytearray((len(name.labels),))
+        for label in name.labels:
+            record.append(len(label))
+            record += label
+        buffer += len(record).to_bytes(2, "big")
+        buffer += record
+        if len(buffer) >= _WRITE_BUFFER_SIZE:
+            f.write(buffer)
+            buffer.clear()
+    f.write(buffer)
+    return (start, f.tell())
+
+
+def _read_run(f: Any, start: int, end: int) -> Iterator[dns.name.Name]:
+    # Read the run of names between offsets start and end of f.  Several runs
+    # in the same file may be read at once, so we seek before every read.
+    buffer = b""
+    while start < end:
+        f.seek(start)
+        data = f.read(min(_RUN_BUFFER_SIZE, end - start))
+        if not data:
+            raise EOFError
+        start += len(data)
+        buffer += data
+        offset = 0
+        while offset + 2 <= len(buffer):
+            length = int.from_bytes(buffer[offset : offset + 2], "big")
+            if offset + 2 + length > len(buffer):
+                break
+            i = offset + 3
+            labels = []
+            for _ in range(buffer[offset + 2]):
+                labels.append(buffer[i + 1 : i + 1 + buffer[i]])
+                i += 1 + buffer[i]
+            offset += 2 + length
+            yield dns.name.Name(labels)
+        buffer = buffer[offset:]
+
+
+def _sorted_names(
+    names: Iterable[dns.name.Name], chunk_size: int
+) -> Iterator[dns.name.Name]:
+    """Sort names in DNSSEC order, holding at most *chunk_size* of them at once.
+
+    The names are sorted in chunks, and each chunk except the last is written
+    as a sorted run to a temporary file.  If there are many runs, they are
+    merged in groups of ``_MERGE_FAN_IN`` into longer runs in a second
+    temporary file, and so on, until few enough are left to merge with the
+    last chunk.  At most two files are open, however many names there are.
+    """
+
+    with tempfile.TemporaryFile() as f, tempfile.TemporaryFile() as spare:
+        runs: List[Tuple[int, int]] = []
+        chunk: List[dns.name.Name] = []
+        for name in names:
+            chunk.append(name)
+            if len(chunk) == chunk_size:
+                chunk.sort()
+                runs.append(_write_run(f, chunk))
+                chunk = []
+        chunk.sort()
+        while len(runs) >= _MERGE_FAN_IN:
+            spare.seek(0)
+            spare.truncate()
+            merged = []
+            for i in range(0, len(runs), _MERGE_FAN_IN):
+                group = runs[i : i + _MERGE_FAN_IN]
+                merged.append(
+                    _write_run(
+                        spare, heapq.merge(*[_read_run(f, *run) for run in group])
+                    )
+                )
+            (f, spare) = (spare, f)
+            runs = merged
+        yield from heapq.merge(chunk, *[_read_run(f, *run) for run in runs])
+
+
 class Zone(dns.transaction.TransactionManager):
     """A DNS zone.
 
@@ -631,6 +730,7 @@ class Zone(dns.transaction.TransactionManager):
         nl: str | None = None,
         want_comments: bool = False,
         want_origin: bool = False,
+        sort_chunk_size: int | None = None,
     ) -> None:
         """Write a zone to a file.
 
@@ -657,6 +757,14 @@ class Zone(dns.transaction.TransactionManager):
         *want_origin*, a ``bool``.  If ``True``, emit a $ORIGIN line at
         the start of the file.  If ``False``, the default, do not emit
         one.
+
+        *sort_chunk_size*, an ``int`` or ``None``.  If the names are sorted,
+        the zone has more than this many names, and its nodes are not
+        already kept in order (as they are in a ``dns.btreezone.Zone``), then
+        the names are sorted in chunks of this many names, which are written
+        to temporary files and merged, so the memory needed for sorting does
+        not grow with the size of the zone.  If ``None``, the default, all of
+        the names are sorted in memory.
         """
 
         if isinstance(f, str):
@@ -691,13 +799,8 @@ class Zone(dns.transaction.TransactionManager):
                     f.write(l)
                     f.write(nl)
 
-            if sorted:
-                names = list(self.keys())
-                names.sort()
-            else:
-                names = self.keys()
-            for n in names:
-                l = self[n].to_text(
+            for n, node in self._nodes_for_writing(sorted, sort_chunk_size):
+                l = node.to_text(
                     n,
                     origin=self.origin,  # pyright: ignore
                     relativize=relativize,  # pyright: ignore
@@ -751,6 +854,95 @@ class Zone(dns.transaction.TransactionManager):
         temp_buffer.close()
         return return_value
 
+    def to_wire(
+        self, f: Any, sorted: bool = True, sort_chunk_size: int | None = None
+    ) -> None:
+        """Write a zone's records to a file in DNS wire format.
+
+        The records are written one after another, each in the uncompressed
+        wire format used in DNS messages, with an absolute owner name.  They
+        are collected in a buffer of bounded size and written to *f* in
+        blocks.
+
+        *f*, a binary file, or a ``str``.  If *f* is a string, it is treated
+        as the name of a file to open.
+
+        *sorted*, a ``bool``.  If True, the default, then the records
+        will be written with their names sorted in DNSSEC order from
+        least to greatest.  Otherwise the names will be written in
+        whatever order they happen to have in the zone's dictionary.
+
+        *sort_chunk_size*, an ``int`` or ``None``, as for ``to_file()``.
+
+        Raises ``dns.zone.UnknownOrigin`` if the zone's origin is not known.
+        """
+
+        if self.origin is None:
+            raise UnknownOrigin
+        if isinstance(f, str):
+            cm: contextlib.AbstractContextManager = open(f, "wb")
+        else:
+            cm = contextlib.nullcontext(f)
+        with cm as f:
+            # Rendering needs a seekable output, so render into a buffer.
+            buffer = io.BytesIO()
+            for n, node in self._nodes_for_writing(sorted, sort_chunk_size):
+                for rdataset in node:
+                    rdataset.to_wire(n, buffer, None, self.origin, want_shuffle=False)
+                if buffer.tell() >= _WRITE_BUFFER_SIZE:
+                    f.write(buffer.getvalue())
+                    buffer.seek(0)
+                    buffer.truncate()
+            f.write(buffer.getvalue())
+
+    def _nodes_for_writing(
+        self, sorted: bool, sort_chunk_size: int | None
+    ) -> Iterator[Tuple[dns.name.Name, dns.node.Node]]:
+        # Yield the zone's names and nodes, in DNSSEC order if sorted is true.
+        if isinstance(self.nodes, dns.btree.BTreeDict):
+            # A BTree is already in order.
+            with self.nodes.cursor() as cursor:
+                while True:
+                    elt = cursor.next()
+                    if elt is None:
+                        break
+                    yield (elt.key(), elt.value())
+            return
+        if not sorted:
+            names: Iterable[dns.name.Name] = self.keys()
+        elif sort_chunk_size is None:
+            names = list(self.keys())
+            names.sort()
+        else:
+            names = _sorted_names(self.keys(), sort_chunk_size)
+        for name in names:
+            yield (name, self.nodes[name])
+
+    def to_snapshot(self, f: Any) -> None:
+        """Write a binary snapshot of the zone, which
+        ``dns.zone.from_snapshot()`` can load without parsing all of it.
+
+        The snapshot stores the zone's names and rdata in uncompressed wire
+        format, with an index of the names.  See ``dns.zonesnapshot`` for
+        details of the format.
+
+        *f*, a binary file, or a ``str`` or ``os.PathLike``.  If it is not a
+        file, it is treated as the name of a file to open.
+
+        Raises ``dns.zone.UnknownOrigin`` if the zone's origin is not known.
+        """
+
+        if self.origin is None:
+            raise UnknownOrigin
+        if isinstance(f, (str, os.PathLike)):
+            cm: contextlib.AbstractContextManager = open(f, "wb")
+        else:
+            cm = contextlib.nullcontext(f)
+        with cm as f:
+            dns.zonesnapshot.write(
+                f, self.items(), self.origin, self.rdclass, self.relativize
+            )
+
     def check_origin(self) -> None:
         """Do some simple checking of the zone's origin.
 
@@ -1218,6 +1410,7 @@ def _from_text(
     check_origin: bool = True,
     idna_codec: dns.name.IDNACodec | None = None,
     allow_directives: bool | Iterable[str] = True,
+    processes: int = 1,
 ) -> Zone:
     # See the comments for the public APIs from_text() and from_file() for
     # details.
@@ -1230,19 +1423,35 @@ def _from_text(
         filename = "<string>"
     zone = zone_factory(origin, rdclass, relativize=relativize)
     with zone.writer(True) as txn:
-        tok = dns.tokenizer.Tokenizer(text, filename, idna_codec=idna_codec)
-        reader = dns.zonefile.Reader(
-            tok,
-            rdclass,
-            txn,
-            allow_include=allow_include,
-            allow_directives=allow_directives,
-        )
-        try:
-            reader.read()
-        except dns.zonefile.UnknownOrigin:
-            # for backwards compatibility
-            raise UnknownOrigin
+        if processes > 1 and zone.origin is not None:
+            if not isinstance(text, str):
+                text = text.read()
+            if isinstance(text, bytes):
+                text = text.decode()
+            dns.zonefile.read_parallel(
+                text,
+                rdclass,
+                txn,
+                processes,
+                filename,
+                allow_include,
+                allow_directives,
+                idna_codec,
+            )
+        else:
+            tok = dns.tokenizer.BufferedTokenizer(text, filename, idna_codec=idna_codec)
+            reader = dns.zonefile.Reader(
+                tok,
+                rdclass,
+                txn,
+                allow_include=allow_include,
+                allow_directives=allow_directives,
+            )
+            try:
+                reader.read()
+            except dns.zonefile.UnknownOrigin:
+                # for backwards compatibility
+                raise UnknownOrigin
     # Now that we're done reading, do some basic checking of the zone.
     if check_origin:
         zone.check_origin()
@@ -1260,6 +1469,7 @@ def from_text(
     check_origin: bool = True,
     idna_codec: dns.name.IDNACodec | None = None,
     allow_directives: bool | Iterable[str] = True,
+    processes: int = 1,
 ) -> Zone:
     """Build a zone object from a zone file format string.
 
@@ -1301,6 +1511,12 @@ def from_text(
     name.  If a non-empty iterable, then only the listed directives (including the
     ``$``) are allowed.
 
+    *processes*, an ``int``.  If greater than 1, and the origin is specified, the
+    zone is read by that many worker processes using
+    ``dns.zonefile.read_parallel()``, which splits the zone file at records which
+    have an owner name after its first ``$TTL`` directive.  The zone is the same as
+    when it is read in this process.  The default is 1.
+
     Raises ``dns.zone.NoSOA`` if there is no SOA RRset.
 
     Raises ``dns.zone.NoNS`` if there is no NS RRset.
@@ -1320,6 +1536,7 @@ def from_text(
         check_origin,
         idna_codec,
         allow_directives,
+        processes,
     )
 
 
@@ -1334,6 +1551,7 @@ def from_file(
     check_origin: bool = True,
     idna_codec: dns.name.IDNACodec | None = None,
     allow_directives: bool | Iterable[str] = True,
+    processes: int = 1,
 ) -> Zone:
     """Read a zone file and build a zone object.
 
@@ -1375,6 +1593,12 @@ def from_file(
     name.  If a non-empty iterable, then only the listed directives (including the
     ``$``) are allowed.
 
+    *processes*, an ``int``.  If greater than 1, and the origin is specified, the
+    zone is read by that many worker processes using
+    ``dns.zonefile.read_parallel()``, which splits the zone file at records which
+    have an owner name after its first ``$TTL`` directive.  The zone is the same as
+    when it is read in this process.  The default is 1.
+
     Raises ``dns.zone.NoSOA`` if there is no SOA RRset.
 
     Raises ``dns.zone.NoNS`` if there is no NS RRset.
@@ -1402,10 +1626,55 @@ def from_file(
             check_origin,
             idna_codec,
             allow_directives,
+            processes,
         )
     assert False  # make mypy happy  lgtm[py/unreachable-statement]
 
 
+def from_snapshot(f: Any, zone_factory: Any = Zone, lazy: bool = True) -> Zone:
+    """Load a zone from a snapshot written by ``dns.zone.Zone.to_snapshot()``.
+
+    *f*, a binary file, or a ``str`` or ``os.PathLike``.  If it is not a file, it
+    is treated as the name of a file to open.  A real file is mapped into memory
+    with ``mmap``.
+
+    *zone_factory*, the zone factory to use or ``None``.  If ``None``, then
+    ``dns.zone.Zone`` will be used.  The value may be any class or callable
+    that returns a subclass of ``dns.zone.Zone``.
+
+    *lazy*, a ``bool``.  If ``True``, the default, and the zone factory is
+    ``dns.zone.Zone``, the zone's nodes are read from the snapshot when they are
+    first used, so loading takes about the same time whatever the size of the
+    zone.  The snapshot must not be modified while the zone is in use.
+    Otherwise, all of the nodes are read when the zone is loaded.
+
+    The zone's origin, class, and relativization are the ones it had when it was
+    written.  Rdata are stored in wire format, so their text form is that of the
+    same rdata read from a DNS message, which may differ in minor ways (e.g. the
+    case of hexadecimal digits) from the zone file they were first read from.
+
+    Raises ``dns.zonesnapshot.BadSnapshot`` if the snapshot is malformed or its
+    version is not supported.
+
+    Returns a subclass of ``dns.zone.Zone``.
+    """
+
+    if zone_factory is None:
+        zone_factory = Zone
+    nodes = dns.zonesnapshot.SnapshotNodes(f, Zone.node_factory)
+    zone = zone_factory(nodes.origin, nodes.rdclass, relativize=nodes.relativize)
+    if lazy and zone_factory is Zone:
+        # Other zone classes, e.g. dns.versioned.Zone, keep their nodes in
+        # versions, and would copy the mapping anyway.
+        zone.nodes = nodes
+    else:
+        with zone.writer(True) as txn:
+            for name, node in nodes.items():
+                for rdataset in node:
+                    txn.replace(name, rdataset)
+    return zone
+
+
 def from_xfr(
     xfr: Any,
     zone_factory: Any = Zone,
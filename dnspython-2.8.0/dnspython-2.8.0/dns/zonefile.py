@@ -17,6 +17,7 @@
 
 """DNS Zones."""
 
+import concurrent.futures
 import re
 import sys
 from typing import Any, Iterable, List, Set, Tuple, cast
@@ -27,6 +28,7 @@ import dns.name
 import dns.node
 import dns.rdata
 import dns.rdataclass
+import dns.rdataset
 import dns.rdatatype
 import dns.rdtypes.ANY.SOA
 import dns.rrset
@@ -85,6 +87,24 @@ def _upper_dollarize(s):
     return s
 
 
+def _allowed_directives(
+    allow_include: bool, allow_directives: bool | Iterable[str]
+) -> Set[str]:
+    if allow_directives is True:
+        allowed = {"$GENERATE", "$ORIGIN", "$TTL"}
+        if allow_include:
+            allowed.add("$INCLUDE")
+        return allowed
+    elif allow_directives is False:
+        # allow_include was ignored in earlier releases if allow_directives was
+        # False, so we continue that.
+        return set()
+    else:
+        # Note that if directives are explicitly specified, then allow_include
+        # is ignored.
+        return set(_upper_dollarize(d) for d in allow_directives)
+
+
 class Reader:
     """Read a DNS zone file into a transaction."""
 
@@ -119,19 +139,7 @@ class Reader:
         self.txn = txn
         self.saved_state: List[SavedStateType] = []
         self.current_file: Any | None = None
-        self.allowed_directives: Set[str]
-        if allow_directives is True:
-            self.allowed_directives = {"$GENERATE", "$ORIGIN", "$TTL"}
-            if allow_include:
-                self.allowed_directives.add("$INCLUDE")
-        elif allow_directives is False:
-            # allow_include was ignored in earlier releases if allow_directives was
-            # False, so we continue that.
-            self.allowed_directives = set()
-        else:
-            # Note that if directives are explicitly specified, then allow_include
-            # is ignored.
-            self.allowed_directives = set(_upper_dollarize(d) for d in allow_directives)
+        self.allowed_directives = _allowed_directives(allow_include, allow_directives)
         self.force_name = force_name
         self.force_ttl = force_ttl
         self.force_rdclass = force_rdclass
@@ -538,7 +546,7 @@ class Reader:
                             )
                         )
                         self.current_file = open(filename, encoding="utf-8")
-                        self.tok = dns.tokenizer.Tokenizer(self.current_file, filename)
+                        self.tok = type(self.tok)(self.current_file, filename)
                         self.current_origin = new_origin
                     elif c == "$GENERATE":
                         self._generate_line()
@@ -558,6 +566,250 @@ class Reader:
             raise ex.with_traceback(tb) from None
 
 
+# Parallel reading.
+#
+# The text is split into chunks at lines which start a record with an owner
+# name, so no chunk depends on the last owner name of the one before.  Only the
+# current origin and the default TTL are carried from one chunk to the next, and
+# splitting only starts after a $TTL directive, as until then the TTL of a
+# record without one depends on the records before it.  Each chunk is read by a
+# Reader in a worker process into a _ChunkTransaction, which records the
+# rdatasets that would have been added.  These are then added to the real
+# transaction in order, so its checks see the same sequence of changes as when
+# reading serially.
+
+# Smaller chunks cost more to hand to a worker than they save.
+_MIN_CHUNK_SIZE = 65536
+
+# Quoted strings, escapes, comments, and parentheses, which decide whether a
+# line ends inside a multi-line record.
+_SPLIT_SPECIAL = re.compile(r'"(?:[^"\\\n]|\\.)*"|\\.|;|[()"]')
+
+
+def _split(
+    text: str,
+    origin: dns.name.Name,
+    allowed_directives: Set[str],
+    idna_codec: dns.name.IDNACodec | None,
+    chunk_size: int,
+) -> List[Tuple[str, int, dns.name.Name | None, int]]:
+    """Split zone file text into chunks of about *chunk_size* characters which
+    can be read independently.
+
+    Returns a list of ``(text, line number, origin, default TTL)`` tuples, one
+    for each chunk, where the origin and default TTL are the ones in effect at
+    its start.  The default TTL of the first chunk is -1 if none is known.
+    """
+
+    chunks: List[Tuple[str, int, dns.name.Name | None, int]] = []
+    current_origin: dns.name.Name | None = origin
+    default_ttl = -1
+    chunk_start = 0
+    chunk_line = 1
+    chunk_origin = current_origin
+    chunk_ttl = default_ttl
+    depth = 0
+    line_number = 1
+    start = 0
+    end = len(text)
+    while start < end:
+        newline = text.find("\n", start)
+        if newline < 0:
+            newline = end
+        line = text[start:newline]
+        c = line[:1]
+        if (
+            depth == 0
+            and default_ttl >= 0
+            and start - chunk_start >= chunk_size
+            and c
+            and c not in ' \t\r;$()"'
+        ):
+            chunks.append(
+                (text[chunk_start:start], chunk_line, chunk_origin, chunk_ttl)
+            )
+            chunk_start = start
+            chunk_line = line_number
+            chunk_origin = current_origin
+            chunk_ttl = default_ttl
+        if "(" in line or ")" in line or '"' in line or "\\" in line:
+            if line.endswith("\\"):
+                # Possibly an escaped newline; leave the rest in one chunk.
+                break
+            special = ""
+            for m in _SPLIT_SPECIAL.finditer(line):
+                special = m.group()
+                if special == ";":
+                    break
+                elif special == "(":
+                    depth += 1
+                elif special == ")":
+                    depth -= 1
+                elif special == '"':
+                    # An unterminated quoted string.
+                    break
+            if depth < 0 or special == '"':
+                break
+        if depth == 0 and c == "$" and allowed_directives:
+            tok = dns.tokenizer.Tokenizer(line, idna_codec=idna_codec)
+            try:
+                directive = tok.get().value.upper()
+                if directive == "$ORIGIN" and directive in allowed_directives:
+                    current_origin = tok.get_name()
+                    tok.get_eol()
+                elif directive == "$TTL" and directive in allowed_directives:
+                    token = tok.get()
+                    if not token.is_identifier():
+                        break
+                    default_ttl = dns.ttl.from_text(token.value)
+                    tok.get_eol()
+            except dns.exception.DNSException:
+                break
+        start = newline + 1
+        line_number += 1
+    chunks.append((text[chunk_start:], chunk_line, chunk_origin, chunk_ttl))
+    return chunks
+
+
+class _ChunkTransaction:
+    """Record the rdatasets a Reader adds to a transaction, merging the
+    consecutive records of each rdataset.
+    """
+
+    def __init__(
+        self,
+        origin: dns.name.Name,
+        relativize: bool,
+        rdclass: dns.rdataclass.RdataClass,
+    ):
+        self.manager = RRSetsReaderManager(origin, relativize, rdclass)
+        self.rdatasets: List[Tuple[dns.name.Name, dns.rdataset.Rdataset]] = []
+
+    def check_put_rdataset(self, check):
+        pass
+
+    def _set_origin(self, origin):
+        pass
+
+    def add(self, name, ttl, rd):
+        if self.rdatasets:
+            (last_name, rdataset) = self.rdatasets[-1]
+            if (
+                last_name == name
+                and rdataset.rdtype == rd.rdtype
+                and rdataset.covers == rd.covers()
+            ):
+                rdataset.add(rd, ttl)
+                return
+        self.rdatasets.append((name, dns.rdataset.from_rdata(ttl, rd)))
+
+
+def _read_chunk(args):
+    (
+        text,
+        line_number,
+        current_origin,
+        default_ttl,
+        filename,
+        origin,
+        relativize,
+        rdclass,
+        allow_include,
+        allow_directives,
+        idna_codec,
+    ) = args
+    txn = _ChunkTransaction(origin, relativize, rdclass)
+    tok = dns.tokenizer.BufferedTokenizer(text, filename, idna_codec=idna_codec)
+    tok.line_number = line_number
+    reader = Reader(
+        tok,
+        rdclass,
+        cast(dns.transaction.Transaction, txn),
+        allow_include=allow_include,
+        allow_directives=allow_directives,
+        default_ttl=default_ttl if default_ttl >= 0 else None,
+    )
+    reader.current_origin = current_origin
+    reader.last_name = current_origin
+    try:
+        reader.read()
+    except Exception as e:
+        return (txn.rdatasets, e)
+    return (txn.rdatasets, None)
+
+
+def read_parallel(
+    text: str,
+    rdclass: dns.rdataclass.RdataClass,
+    txn: dns.transaction.Transaction,
+    processes: int,
+    filename: str = "<string>",
+    allow_include: bool = False,
+    allow_directives: bool | Iterable[str] = True,
+    idna_codec: dns.name.IDNACodec | None = None,
+) -> None:
+    """Read zone file text into a transaction using a pool of processes.
+
+    The result is the same as that of reading the text with a ``Reader``,
+    including any exception raised, but the text is split into chunks at
+    records which have an owner name, which are read in *processes* worker
+    processes.  Splitting only begins after the first ``$TTL`` directive, so a
+    zone file without one is read by a single worker.
+
+    *text*, a ``str``, the zone file text.
+
+    *rdclass*, a ``dns.rdataclass.RdataClass``, the zone's rdata class.
+
+    *txn*, a ``dns.transaction.Transaction``, the transaction to add the records
+    to.  Its origin must be known.
+
+    *processes*, an ``int``, the number of worker processes.
+
+    The *filename*, *allow_include*, *allow_directives*, and *idna_codec*
+    parameters are as for ``dns.zone.from_text()``.
+
+    Raises ``dns.zonefile.UnknownOrigin`` if the transaction's origin is not
+    known.
+    """
+
+    (origin, relativize, _) = txn.manager.origin_information()
+    if origin is None:
+        raise UnknownOrigin
+    chunks = _split(
+        text,
+        origin,
+        _allowed_directives(allow_include, allow_directives),
+        idna_codec,
+        max(len(text) // (processes * 4), _MIN_CHUNK_SIZE),
+    )
+    txn.check_put_rdataset(_check_cname_and_other_data)
+    args = [
+        (
+            chunk,
+            line_number,
+            current_origin,
+            default_ttl,
+            filename,
+            origin,
+            relativize,
+            rdclass,
+            allow_include,
+            allow_directives,
+            idna_codec,
+        )
+        for (chunk, line_number, current_origin, default_ttl) in chunks
+    ]
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        try:
+            for rdatasets, error in executor.map(_read_chunk, args):
+                for name, rdataset in rdatasets:
+                    txn.add(name, rdataset)
+                if error is not None:
+                    raise error
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
 class RRsetsReaderTransaction(dns.transaction.Transaction):
     def __init__(self, manager, replacement, read_only):
         assert not read_only
@@ -740,7 +992,7 @@ def read_rrsets(
         rdtype = None
     manager = RRSetsReaderManager(origin, relativize, default_rdclass)
     with manager.writer(True) as txn:
-        tok = dns.tokenizer.Tokenizer(text, "<input>", idna_codec=idna_codec)
+        tok = dns.tokenizer.BufferedTokenizer(text, "<input>", idna_codec=idna_codec)
         reader = Reader(
             tok,
             default_rdclass,
@@ -0,0 +1,337 @@
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+"""DNS zone snapshots.
+
+A snapshot is a binary image of a zone which can be loaded without parsing
+all of it.  It starts with a header::
+
+    magic "DNSZSNAP", version (16 bits), flags (16 bits), rdclass (16 bits),
+    node count (64 bits), origin length (8 bits), origin in wire format
+
+followed by an index of node offsets (64 bits each), sorted by the
+case-folded uncompressed wire format of the node names, and then the nodes
+themselves, in the same order.  Each node is::
+
+    name length (8 bits), name in wire format, rdataset count (16 bits),
+    rdatasets
+
+and each rdataset is::
+
+    rdtype (16 bits), covers (16 bits), TTL (32 bits), rdata count (16 bits),
+    rdatas, each a 16 bit length followed by uncompressed wire format
+
+All integers are in network byte order, and all names are absolute.
+"""
+
+import contextlib
+import mmap
+import os
+import struct
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+import dns.exception
+import dns.name
+import dns.node
+import dns.rdata
+import dns.rdataclass
+import dns.rdataset
+import dns.rdatatype
+import dns.wire
+
+MAGIC = b"DNSZSNAP"
+VERSION = 1
+
+# Flags
+RELATIVIZE = 0x0001
+
+_HEADER = struct.Struct("!8sHHHQB")
+_OFFSET = struct.Struct("!Q")
+_RDATASET = struct.Struct("!HHIH")
+
+
+class BadSnapshot(dns.exception.FormError):
+    """The zone snapshot is malformed or has an unsupported version."""
+
+
+def write(
+    f: Any,
+    items: Iterable[Tuple[dns.name.Name, dns.node.Node]],
+    origin: dns.name.Name,
+    rdclass: dns.rdataclass.RdataClass,
+    relativize: bool,
+) -> None:
+    """Write a zone snapshot.
+
+    *f*, a binary file, where to write the snapshot.
+
+    *items*, an iterable of ``(dns.name.Name, dns.node.Node)`` tuples, the
+    zone's nodes.
+
+    *origin*, a ``dns.name.Name``, the zone's origin.
+
+    *rdclass*, a ``dns.rdataclass.RdataClass``, the zone's class.
+
+    *relativize*, a ``bool``, are the zone's names relativized to its origin?
+    """
+
+    records: List[Tuple[bytes, bytes]] = []
+    for name, node in items:
+        wire = name.to_wire(origin=origin)
+        assert wire is not None
+        parts = [bytes((len(wire),)), wire, len(node.rdatasets).to_bytes(2, "big")]
+        for rdataset in node.rdatasets:
+            parts.append(
+                _RDATASET.pack(
+                    rdataset.rdtype, rdataset.covers, rdataset.ttl, len(rdataset)
+                )
+            )
+            for rd in rdataset:
+                rdata_wire = rd.to_wire(origin=origin)
+                assert rdata_wire is not None
+                parts.append(len(rdata_wire).to_bytes(2, "big"))
+                parts.append(rdata_wire)
+        records.append((wire.lower(), b"".join(parts)))
+    records.sort(key=lambda record: record[0])
+    origin_wire = origin.to_wire()
+    assert origin_wire is not None
+    flags = RELATIVIZE if relativize else 0
+    f.write(
+        _HEADER.pack(MAGIC, VERSION, flags, rdclass, len(records), len(origin_wire))
+    )
+    f.write(origin_wire)
+    offset = _HEADER.size + len(origin_wire) + _OFFSET.size * len(records)
+    index = bytearray()
+    for _, record in records:
+        index += _OFFSET.pack(offset)
+        offset += len(record)
+    f.write(index)
+    for _, record in records:
+        f.write(record)
+
+
+def _open(f: Any) -> Any:
+    # Map a snapshot file into memory if we can, otherwise read it.
+    if isinstance(f, (str, os.PathLike)):
+        cm: contextlib.AbstractContextManager = open(f, "rb")
+    else:
+        cm = contextlib.nullcontext(f)
+    with cm as f:
+        try:
+            fileno = f.fileno()
+        except (AttributeError, OSError):
+            return f.read()
+        if os.fstat(fileno).st_size == 0:
+            raise BadSnapshot("the snapshot is empty")
+        return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+
+class SnapshotNodes(MutableMapping):
+    """A zone node mapping backed by a zone snapshot.
+
+    Nodes are read from the snapshot when they are first looked up, and kept
+    in the mapping from then on.  Nodes may be added, replaced, and deleted
+    as in any other mapping; the snapshot itself is never changed.
+
+    The snapshot must not be modified while the mapping is in use.
+    """
+
+    __slots__ = [
+        "origin",
+        "rdclass",
+        "relativize",
+        "node_factory",
+        "_buffer",
+        "_count",
+        "_index",
+        "_nodes",
+        "_deleted",
+        "_new",
+    ]
+
+    def __init__(self, f: Any, node_factory: Callable[[], dns.node.Node]):
+        """Open a zone snapshot.
+
+        *f*, a binary file or a ``str`` or ``os.PathLike``, the snapshot.  If
+        it is a real file, it is mapped into memory with ``mmap``, otherwise it
+        is read.
+
+        *node_factory*, a callable returning a new ``dns.node.Node``, used to
+        make the nodes read from the snapshot.
+
+        Raises ``dns.zonesnapshot.BadSnapshot`` if the snapshot header is
+        malformed or has an unsupported version.
+        """
+
+        super().__init__()
+        buffer = _open(f)
+        try:
+            (magic, version, flags, rdclass, count, origin_length) = (
+                _HEADER.unpack_from(buffer)
+            )
+        except struct.error:
+            raise BadSnapshot("the snapshot header is truncated")
+        if magic != MAGIC:
+            raise BadSnapshot("not a zone snapshot")
+        if version != VERSION:
+            raise BadSnapshot(f"unsupported snapshot version {version}")
+        index = _HEADER.size + origin_length
+        if index + count * _OFFSET.size > len(buffer):
+            raise BadSnapshot("the snapshot index is truncated")
+        try:
+            origin = dns.name.from_wire_parser(
+                dns.wire.Parser(buffer[_HEADER.size : index])
+            )
+        except dns.exception.FormError:
+            raise BadSnapshot("the snapshot origin is malformed")
+        self.origin = origin
+        self.rdclass = dns.rdataclass.RdataClass.make(rdclass)
+        self.relativize = bool(flags & RELATIVIZE)
+        self.node_factory = node_factory
+        self._buffer = buffer
+        self._count = count
+        self._index = index
+        self._nodes: Dict[dns.name.Name, dns.node.Node] = {}
+        # Names in the snapshot which have been deleted from the mapping.
+        self._deleted: Set[dns.name.Name] = set()
+        # Names in the mapping which are not in the snapshot.
+        self._new: Set[dns.name.Name] = set()
+
+    def _offset(self, i: int) -> int:
+        if i == self._count:
+            return len(self._buffer)
+        return _OFFSET.unpack_from(self._buffer, self._index + i * _OFFSET.size)[0]
+
+    def _wire_name(self, i: int) -> bytes:
+        offset = self._offset(i)
+        return self._buffer[offset + 1 : offset + 1 + self._buffer[offset]]
+
+    def _name(self, wire: bytes) -> dns.name.Name:
+        name = dns.name.from_wire_parser(dns.wire.Parser(wire))
+        if self.relativize:
+            name = name.relativize(self.origin)
+        return name
+
+    def _find(self, name: dns.name.Name) -> int:
+        # Return the position of name in the snapshot, or -1.
+        if name.is_absolute() == self.relativize:
+            return -1
+        try:
+            wire = name.to_wire(origin=self.origin)
+        except dns.name.NameTooLong:
+            return -1
+        assert wire is not None
+        key = wire.lower()
+        lo = 0
+        hi = self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._wire_name(mid).lower() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._wire_name(lo).lower() == key:
+            return lo
+        return -1
+
+    def _read_node(self, i: int) -> dns.node.Node:
+        node = self.node_factory()
+        parser = dns.wire.Parser(self._buffer[self._offset(i) : self._offset(i + 1)])
+        origin = self.origin if self.relativize else None
+        try:
+            parser.seek(1 + parser.get_uint8())
+            for _ in range(parser.get_uint16()):
+                (rdtype, covers, ttl, count) = parser.get_struct(_RDATASET.format)
+                rdtype = dns.rdatatype.RdataType.make(rdtype)
+                covers = dns.rdatatype.RdataType.make(covers)
+                rdataset = dns.rdataset.Rdataset(self.rdclass, rdtype, covers, ttl)
+                for _ in range(count):
+                    with parser.restrict_to(parser.get_uint16()):
+                        rd = dns.rdata.from_wire_parser(
+                            self.rdclass, rdtype, parser, origin
+                        )
+                    rdataset.add(rd)
+                node.rdatasets.append(rdataset)
+        except dns.exception.FormError:
+            raise BadSnapshot("a snapshot node is malformed")
+        return node
+
+    def __getitem__(self, key):
+        node = self._nodes.get(key)
+        if node is not None:
+            return node
+        if key in self._deleted:
+            raise KeyError(key)
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        node = self._read_node(i)
+        self._nodes[key] = node
+        return node
+
+    def __setitem__(self, key, value):
+        if key not in self._nodes and key not in self._new:
+            if key in self._deleted:
+                self._deleted.remove(key)
+            elif self._find(key) < 0:
+                self._new.add(key)
+        self._nodes[key] = value
+
+    def __delitem__(self, key):
+        if key in self._new:
+            self._new.remove(key)
+        elif key not in self._deleted and self._find(key) >= 0:
+            self._deleted.add(key)
+        else:
+            raise KeyError(key)
+        self._nodes.pop(key, None)
+
+    def __contains__(self, key):
+        if key in self._nodes:
+            return True
+        return key not in self._deleted and self._find(key) >= 0
+
+    def __iter__(self) -> Iterator[dns.name.Name]:
+        for i in range(self._count):
+            name = self._name(self._wire_name(i))
+            if name not in self._deleted:
+                yield name
+        yield from list(self._new)
+
+    def __len__(self):
+        return self._count - len(self._deleted) + len(self._new)
+
+    def _iter_items(self) -> Iterator[Tuple[dns.name.Name, dns.node.Node]]:
+        # Read each node by its position, rather than looking its name up.
+        for i in range(self._count):
+            name = self._name(self._wire_name(i))
+            if name in self._deleted:
+                continue
+            node = self._nodes.get(name)
+            if node is None:
+                node = self._read_node(i)
+                self._nodes[name] = node
+            yield (name, node)
+        for name in list(self._new):
+            yield (name, self._nodes[name])
+
+    def items(self):
+        return _ItemsView(self)
+
+    def values(self):
+        return _ValuesView(self)
+
+    def is_loaded(self, key: dns.name.Name) -> bool:
+        """Has the node for *key* been read from the snapshot (or set)?"""
+        return key in self._nodes
+
+
+class _ItemsView(ItemsView):
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class _ValuesView(ValuesView):
+    def __iter__(self):
+        for _, node in self._mapping._iter_items():
+            yield node
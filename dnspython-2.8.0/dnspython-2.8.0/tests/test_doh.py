@@ -14,6 +14,7 @@
 # WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
 # ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT
 # OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+import asyncio
 import random
 import socket
 import unittest
@@ -27,8 +28,10 @@ try:
 except Exception:
     _have_ssl = False
 
+import dns.asyncbackend
 import dns.edns
 import dns.message
+import dns.nameserver
 import dns.query
 import dns.quic
 import dns.rdatatype
@@ -180,6 +183,20 @@ class DNSOverHTTPSTestCaseHttpx(unittest.TestCase):
         self.assertTrue("8.8.8.8" in seen)
         self.assertTrue("8.8.4.4" in seen)
 
+    @tests.util.retry_on_timeout
+    def test_nameserver_shares_client(self):
+        nameserver = dns.nameserver.DoHNameserver(
+            random.choice(KNOWN_ANYCAST_DOH_RESOLVER_URLS)
+        )
+        try:
+            for _ in range(2):
+                q = dns.message.make_query("example.com.", dns.rdatatype.A)
+                r = nameserver.query(q, 4, None, 0)
+                self.assertTrue(q.is_response(r))
+            self.assertEqual(len(nameserver._clients), 1)
+        finally:
+            nameserver.close()
+
     @tests.util.retry_on_timeout
     def test_padded_get(self):
         nameserver_url = random.choice(KNOWN_PAD_AWARE_DOH_RESOLVER_URLS)
@@ -197,6 +214,54 @@ class DNSOverHTTPSTestCaseHttpx(unittest.TestCase):
         self.assertTrue(has_pad)
 
 
+@unittest.skipUnless(dns.query._have_httpx, "Python httpx cannot be imported")
+class DoHNameserverClientTestCase(unittest.TestCase):
+    def test_client_is_shared(self):
+        nameserver = dns.nameserver.DoHNameserver("https://dns.google/dns-query")
+        client = nameserver._client(None, 0)
+        self.assertIsInstance(client, httpx.Client)
+        self.assertIs(nameserver._client(None, 0), client)
+        self.assertIsNot(nameserver._client("127.0.0.1", 0), client)
+        nameserver.close()
+        self.assertIsNot(nameserver._client(None, 0), client)
+        nameserver.close()
+
+    def test_async_clients_per_loop(self):
+        nameserver = dns.nameserver.DoHNameserver("https://dns.google/dns-query")
+        backend = dns.asyncbackend.get_backend("asyncio")
+
+        async def run():
+            client = nameserver._async_client(None, 0, backend)
+            self.assertIsInstance(client, httpx.AsyncClient)
+            self.assertIs(nameserver._async_client(None, 0, backend), client)
+            return client
+
+        first = asyncio.run(run())
+        # The first loop is closed, so its client is discarded with a warning.
+        with self.assertWarns(ResourceWarning):
+            second = asyncio.run(run())
+        self.assertIsNot(first, second)
+        self.assertEqual(len(nameserver._async_clients), 1)
+
+        async def close():
+            nameserver._async_client(None, 0, backend)
+            await nameserver.async_close()
+
+        with self.assertWarns(ResourceWarning):
+            asyncio.run(close())
+        self.assertEqual(nameserver._async_clients, {})
+
+    def test_no_client_with_source_port(self):
+        nameserver = dns.nameserver.DoHNameserver("https://dns.google/dns-query")
+        self.assertIsNone(nameserver._client(None, 12345))
+
+    def test_no_client_for_h3(self):
+        nameserver = dns.nameserver.DoHNameserver(
+            "https://dns.google/dns-query", http_version=dns.query.HTTPVersion.H3
+        )
+        self.assertIsNone(nameserver._client(None, 0))
+
+
 @unittest.skipUnless(
     dns.quic.have_quic and tests.util.is_internet_reachable() and _have_ssl,
     "Aioquic cannot be imported; no DNS over HTTP3 (DOH3)",
@@ -9,7 +9,9 @@ import dns._features
 import dns.asyncbackend
 import dns.asyncquery
 import dns.message
+import dns.nameserver
 import dns.query
+import dns.quic
 import dns.rcode
 
 from .util import have_ipv4, have_ipv6, here
@@ -46,6 +48,97 @@ def test_basic_sync():
             assert r.rcode() == dns.rcode.REFUSED
 
 
+@pytest.mark.skipif(not have_quic, reason="requires aioquic")
+def test_nameserver_shares_connection():
+    q = dns.message.make_query("www.example.", "A")
+    for address in addresses:
+        with Server(address=address) as server:
+            port = server.doq_address[1]
+            nameserver = dns.nameserver.DoQNameserver(
+                address, port, verify=here("tls/ca.crt")
+            )
+            for _ in range(2):
+                r = nameserver.query(q, 2, None, 0)
+                assert r.rcode() == dns.rcode.REFUSED
+            statistics = nameserver.get_statistics_snapshot()
+            assert statistics.connections == 1
+            assert statistics.reused_connections == 1
+            assert statistics.streams == 2
+            # A new connection resumes the session, and sends its query as
+            # early data.
+            nameserver.close()
+            r = nameserver.query(q, 2, None, 0)
+            assert r.rcode() == dns.rcode.REFUSED
+            statistics = nameserver.get_statistics_snapshot()
+            assert statistics.connections == 1
+            assert statistics.resumed_sessions == 1
+            assert statistics.early_data_streams == 1
+            nameserver.close()
+
+
+@pytest.mark.skipif(not have_quic, reason="requires aioquic")
+def test_nameserver_async_connections_per_loop():
+    q = dns.message.make_query("www.example.", "A")
+    backend = dns.asyncbackend.get_backend("asyncio")
+    with Server(address=addresses[0]) as server:
+        port = server.doq_address[1]
+        nameserver = dns.nameserver.DoQNameserver(
+            addresses[0], port, verify=here("tls/ca.crt")
+        )
+
+        async def run(close):
+            r = await nameserver.async_query(q, 2, None, 0, False, backend)
+            assert r.rcode() == dns.rcode.REFUSED
+            if close:
+                await nameserver.async_close()
+
+        asyncio.run(run(False))
+        # The first loop was closed without closing its connection, which is
+        # discarded with a warning.
+        with pytest.warns(ResourceWarning):
+            asyncio.run(run(True))
+        assert nameserver._async_managers == {}
+
+
+@pytest.mark.skipif(not dns._features.have("doq"), reason="requires aioquic")
+def test_manager_replaces_finished_connection():
+    session_tickets = {}
+    manager = dns.quic.AsyncioQuicManager(
+        verify_mode=False, session_tickets=session_tickets
+    )
+    # The connections are never run, so nothing is sent.
+    (first, made) = manager._connect("127.0.0.1", 853)
+    assert made
+    (again, made) = manager._connect("127.0.0.1", 853)
+    assert again is first and not made
+    first._done = True
+    (second, made) = manager._connect("127.0.0.1", 853)
+    assert second is not first and made
+    statistics = manager.get_statistics_snapshot()
+    assert statistics.connections == 2
+    assert statistics.reused_connections == 1
+    # Session tickets are saved in the store the manager was given.
+    manager.save_session_ticket("127.0.0.1", 853, "ticket")
+    assert session_tickets == {("127.0.0.1", 853): "ticket"}
+
+
+@pytest.mark.skipif(not dns._features.have("doq"), reason="requires aioquic")
+def test_buffer():
+    from dns.quic._common import Buffer, UnexpectedEOF
+
+    buffer = Buffer()
+    buffer.put(b"\x00\x03ab", False)
+    assert buffer.have(2)
+    assert buffer.get(2) == b"\x00\x03"
+    assert not buffer.have(3)
+    buffer.put(b"cde", True)
+    data = buffer.get(3)
+    assert data == b"abc" and isinstance(data, bytes)
+    with pytest.raises(UnexpectedEOF):
+        buffer.have(3)
+    assert buffer.get_all() == b"de"
+
+
 async def amain(address, port):
     q = dns.message.make_query("www.example.", "A")
     r = await dns.asyncquery.quic(q, address, port=port, verify=here("tls/ca.crt"))
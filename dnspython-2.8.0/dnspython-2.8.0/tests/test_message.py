@@ -1055,5 +1055,198 @@ www.dnspython.org. 300 IN A 1.2.3.4
         self.assertEqual(r.extended_errors(), options)
 
 
+class QueryTemplateTestCase(unittest.TestCase):
+    variants = [
+        {},
+        {"use_edns": 0},
+        {"use_edns": 0, "payload": 4096, "want_dnssec": True},
+        {"ednsflags": dns.flags.DO, "request_payload": 512},
+        {"options": [dns.edns.ECSOption("10.0.0.0", 24)]},
+        {"rdclass": "CH", "flags": 0},
+    ]
+
+    def test_same_wire_as_make_query(self):
+        for kwargs in self.variants:
+            template = dns.message.QueryTemplate("AAAA", **kwargs)
+            for name in ["www.dnspython.org.", "Mixed.Case.example.", "."]:
+                expected = dns.message.make_query(name, "AAAA", id=1234, **kwargs)
+                self.assertEqual(template.to_wire(name, 1234), expected.to_wire())
+                q = template.make_query(name, id=1234)
+                self.assertEqual(q, expected)
+                self.assertEqual(q.request_payload, expected.request_payload)
+                self.assertEqual(q.to_wire(), expected.to_wire())
+                self.assertEqual(q.wire, expected.wire)
+
+    def test_random_id(self):
+        template = dns.message.QueryTemplate("A")
+        wire = template.to_wire("www.dnspython.org")
+        q = dns.message.from_wire(wire)
+        self.assertEqual(q.question[0].name, dns.name.from_text("www.dnspython.org"))
+        self.assertEqual(q.flags, dns.flags.RD)
+
+    def test_prepend_length(self):
+        q = dns.message.QueryTemplate("A").make_query("www.dnspython.org")
+        wire = q.to_wire()
+        length = len(wire).to_bytes(2, "big")
+        self.assertEqual(q.to_wire(prepend_length=True), length + wire)
+
+    def test_changed_query(self):
+        template = dns.message.QueryTemplate("A", use_edns=0)
+        origin = dns.name.from_text("example")
+        a = dns.rrset.from_text("a.", 300, "IN", "A", "10.0.0.1")
+        changes = [
+            lambda q: q.use_edns(0, options=[dns.edns.ECSOption("10.0.0.0", 24)]),
+            lambda q: q.use_edns(0, pad=128),
+            lambda q: q.use_edns(None),
+            lambda q: setattr(q, "ednsflags", dns.flags.DO),
+            lambda q: setattr(q, "flags", q.flags | dns.flags.CD),
+            lambda q: q.answer.append(a),
+            lambda q: setattr(q.question[0], "name", dns.name.from_text("a", None)),
+        ]
+        for change in changes:
+            q = template.make_query("www.dnspython.org", id=1)
+            expected = dns.message.make_query(
+                "www.dnspython.org", "A", use_edns=0, id=1
+            )
+            change(q)
+            change(expected)
+            self.assertEqual(q.to_wire(origin), expected.to_wire(origin))
+
+    def test_tsig(self):
+        keyring = dns.tsigkeyring.from_text({"keyname.": "NjHwPsMKjdN++dOfE5iAiQ=="})
+        q = dns.message.QueryTemplate("A").make_query("www.dnspython.org")
+        q.use_tsig(keyring)
+        r = dns.message.from_wire(q.to_wire(), keyring=keyring)
+        self.assertTrue(r.had_tsig)
+
+    def test_get_query_template(self):
+        ecs = dns.edns.ECSOption("10.0.0.0", 24)
+        template = dns.message.get_query_template("A", use_edns=0, options=[ecs])
+        self.assertIs(
+            dns.message.get_query_template(
+                "A", use_edns=0, options=[dns.edns.ECSOption("10.0.0.0", 24)]
+            ),
+            template,
+        )
+        self.assertIsNot(dns.message.get_query_template("A", use_edns=0), template)
+        self.assertIsNot(
+            dns.message.get_query_template("A", use_edns=0, options=[ecs], flags=0),
+            template,
+        )
+
+
+class LazyFromWireTestCase(unittest.TestCase):
+    def make_response(self):
+        q = dns.message.make_query("www.dnspython.org", "A", use_edns=0)
+        r = dns.message.make_response(q)
+        r.answer.append(
+            dns.rrset.from_text(
+                "www.dnspython.org.", 300, "IN", "A", "10.0.0.1", "10.0.0.2"
+            )
+        )
+        r.authority.append(
+            dns.rrset.from_text("dnspython.org.", 300, "IN", "NS", "ns1.dnspython.org.")
+        )
+        r.additional.append(
+            dns.rrset.from_text("ns1.dnspython.org.", 300, "IN", "A", "10.0.0.53")
+        )
+        return r
+
+    def test_same_as_eager(self):
+        wire = self.make_response().to_wire()
+        eager = dns.message.from_wire(wire)
+        lazy = dns.message.from_wire(wire, lazy=True)
+        self.assertEqual(lazy, eager)
+        self.assertEqual(lazy.to_text(), eager.to_text())
+        self.assertEqual(lazy.edns, 0)
+
+    def test_tsig(self):
+        keyring = dns.tsigkeyring.from_text({"keyname.": "NjHwPsMKjdN++dOfE5iAiQ=="})
+        r = self.make_response()
+        r.use_tsig(keyring)
+        wire = r.to_wire()
+        lazy = dns.message.from_wire(wire, keyring=keyring, lazy=True)
+        self.assertTrue(lazy.had_tsig)
+        self.assertEqual(lazy, dns.message.from_wire(wire, keyring=keyring))
+
+    def test_sections_decoded_on_demand(self):
+        lazy = dns.message.from_wire(self.make_response().to_wire(), lazy=True)
+        self.assertEqual(len(lazy.question), 1)
+        self.assertEqual(
+            set(lazy._lazy),
+            {dns.message.ANSWER, dns.message.AUTHORITY, dns.message.ADDITIONAL},
+        )
+        rrset = lazy.find_rrset(
+            lazy.answer,
+            dns.name.from_text("www.dnspython.org."),
+            dns.rdataclass.IN,
+            dns.rdatatype.A,
+        )
+        self.assertEqual(len(rrset), 2)
+        self.assertEqual(
+            set(lazy._lazy), {dns.message.AUTHORITY, dns.message.ADDITIONAL}
+        )
+        self.assertEqual(len(lazy.section_from_number(dns.message.AUTHORITY)), 1)
+        self.assertEqual(set(lazy._lazy), {dns.message.ADDITIONAL})
+        self.assertEqual(len(lazy.sections), 4)
+        self.assertFalse(lazy._lazy)
+
+    def test_assign_section(self):
+        lazy = dns.message.from_wire(self.make_response().to_wire(), lazy=True)
+        lazy.answer = []
+        self.assertEqual(lazy.answer, [])
+        self.assertEqual(len(lazy.additional), 1)
+
+    def test_bad_rdata_deferred(self):
+        r = dns.message.make_response(dns.message.make_query("example.", "A"))
+        r.additional.append(dns.rrset.from_text("example.", 300, "IN", "A", "10.0.0.1"))
+        wire = bytearray(r.to_wire())
+        # Make the A record's rdata one byte short.
+        wire[-6:-4] = (3).to_bytes(2, "big")
+        del wire[-1]
+        with self.assertRaises(dns.exception.FormError):
+            dns.message.from_wire(bytes(wire))
+        lazy = dns.message.from_wire(bytes(wire), lazy=True)
+        self.assertEqual(lazy.answer, [])
+        with self.assertRaises(dns.exception.FormError):
+            lazy.additional
+
+    def test_bad_rdata_raised_again(self):
+        r = dns.message.make_response(dns.message.make_query("example.", "A"))
+        r.additional.append(
+            dns.rrset.from_text("example.", 300, "IN", "A", "10.0.0.1", "10.0.0.2")
+        )
+        wire = bytearray(r.to_wire())
+        # Make the second A record's rdata one byte short.
+        wire[-6:-4] = (3).to_bytes(2, "big")
+        del wire[-1]
+        lazy = dns.message.from_wire(bytes(wire), lazy=True)
+        for _ in range(2):
+            with self.assertRaises(dns.exception.FormError):
+                lazy.additional
+        self.assertEqual(lazy._sections[dns.message.ADDITIONAL], [])
+        self.assertNotIn(dns.message.ADDITIONAL, [key[0] for key in lazy.index.keys()])
+
+    def test_opt_in_answer(self):
+        r = dns.message.make_response(dns.message.make_query("example.", "A"))
+        r.use_edns(0)
+        wire = bytearray(r.to_wire())
+        # Move the OPT record from the additional to the answer section.
+        wire[6:8] = (1).to_bytes(2, "big")
+        wire[10:12] = (0).to_bytes(2, "big")
+        with self.assertRaises(dns.message.BadEDNS):
+            dns.message.from_wire(bytes(wire), lazy=True)
+
+    def test_trailing_junk(self):
+        wire = self.make_response().to_wire() + b"junk"
+        with self.assertRaises(dns.message.TrailingJunk):
+            dns.message.from_wire(wire, lazy=True)
+
+    def test_ignored_for_xfr(self):
+        wire = self.make_response().to_wire()
+        m = dns.message.from_wire(wire, xfr=True, lazy=True)
+        self.assertIsNone(m._lazy)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1269,6 +1269,43 @@ class NameTestCase(unittest.TestCase):
         assert origin.successor(origin, True) == origin
         assert origin.predecessor(origin, True) == origin
 
+    def test_interning(self):
+        with dns.name.interning():
+            n1 = dns.name.from_text("www.dnspython.org.")
+            n2 = dns.name.from_text("www", dns.name.from_text("dnspython.org."))
+            (n3, _) = dns.name.from_wire(b"\x03www\x09dnspython\x03org\x00", 0)
+            n4 = dns.name.from_text("ftp.www.dnspython.org.").relativize(
+                dns.name.from_text("ftp", None).concatenate(n1)
+            )
+            n5 = dns.name.from_text("mail.dnspython.org.")
+            upper = dns.name.from_text("WWW.dnspython.org.")
+        self.assertIs(n1, n2)
+        self.assertIs(n1, n3)
+        self.assertEqual(n4, dns.name.empty)
+        self.assertIs(n1[1], n5[1])
+        self.assertEqual(n1, upper)
+        self.assertIsNot(n1, upper)
+        self.assertEqual(upper.to_text(), "WWW.dnspython.org.")
+        self.assertIsNot(dns.name.from_text("www.dnspython.org."), n1)
+
+    def test_interning_nested(self):
+        with dns.name.interning():
+            n1 = dns.name.from_text("www.dnspython.org.")
+            with dns.name.interning():
+                n2 = dns.name.from_text("www.dnspython.org.")
+            n3 = dns.name.from_text("www.dnspython.org.")
+        self.assertIs(n1, n2)
+        self.assertIs(n1, n3)
+
+    def test_interning_validates(self):
+        with dns.name.interning():
+            with self.assertRaises(dns.name.LabelTooLong):
+                dns.name.from_text("a" * 64 + ".")
+            with self.assertRaises(dns.name.NameTooLong):
+                dns.name.from_text("a" * 63 + "." + "b" * 63, None).concatenate(
+                    dns.name.from_text("c" * 63 + "." + "d" * 63 + ".")
+                )
+
     def test_predecessor_and_successor_errors(self):
         name = dns.name.from_text("name", None)
         origin = dns.name.from_text("origin", None)  # note Relative!
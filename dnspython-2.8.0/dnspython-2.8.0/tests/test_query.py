@@ -15,11 +15,14 @@
 # ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT
 # OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
 
+import asyncio
 import contextlib
 import socket
 import sys
+import threading
 import time
 import unittest
+from unittest.mock import patch
 
 try:
     import ssl
@@ -28,11 +31,14 @@ try:
 except Exception:
     have_ssl = False
 
+import dns.asyncbackend
+import dns.asyncquery
 import dns.exception
 import dns.flags
 import dns.inet
 import dns.message
 import dns.name
+import dns.nameserver
 import dns.query
 import dns.rcode
 import dns.rdataclass
@@ -676,6 +682,192 @@ class MiscTests(unittest.TestCase):
             )
 
 
+class UDPAnswerer(threading.Thread):
+    """Answer queries on a local UDP socket, optionally setting TC.
+
+    Queries for names in *drop* are not answered.
+    """
+
+    def __init__(self, truncate=False, drop=()):
+        super().__init__(daemon=True)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.truncate = truncate
+        self.drop = {dns.name.from_text(name) for name in drop}
+        self.queries = 0
+        self.sources = []
+        self.stopping = False
+
+    def run(self):
+        while not self.stopping:
+            try:
+                (wire, address) = self.sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            self.queries += 1
+            self.sources.append(address)
+            query = dns.message.from_wire(wire)
+            if query.question[0].name in self.drop:
+                continue
+            response = dns.message.make_response(query)
+            if self.truncate:
+                response.flags |= dns.flags.TC
+            self.sock.sendto(response.to_wire(), address)
+
+    def stop(self):
+        self.stopping = True
+        self.join()
+        self.sock.close()
+
+
+class HedgedQueryTests(unittest.TestCase):
+    def setUp(self):
+        self.answerer = UDPAnswerer()
+        self.answerer.start()
+        # A nameserver which never answers.
+        self.silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.silent.bind(("127.0.0.1", 0))
+        self.silent_port = self.silent.getsockname()[1]
+        self.q = dns.message.make_query("www.dnspython.org", "A")
+
+    def tearDown(self):
+        self.answerer.stop()
+        self.silent.close()
+
+    def test_first_answers(self):
+        (r, from_hedge) = dns.query.udp_hedged(
+            self.q,
+            "127.0.0.1",
+            "127.0.0.1",
+            1.0,
+            timeout=2,
+            port=self.answerer.port,
+            hedge_port=self.silent_port,
+        )
+        self.assertTrue(self.q.is_response(r))
+        self.assertFalse(from_hedge)
+        self.silent.setblocking(False)
+        with self.assertRaises(BlockingIOError):
+            self.silent.recvfrom(65535)
+
+    def test_hedge_answers(self):
+        (r, from_hedge) = dns.query.udp_hedged(
+            self.q,
+            "127.0.0.1",
+            "127.0.0.1",
+            0.5,
+            timeout=2,
+            port=self.silent_port,
+            hedge_port=self.answerer.port,
+        )
+        self.assertTrue(self.q.is_response(r))
+        self.assertTrue(from_hedge)
+        # The time is the hedged query's round trip time, without the delay.
+        self.assertLess(r.time, 0.5)
+        self.assertEqual(self.answerer.queries, 1)
+
+    def test_truncated(self):
+        answerer = UDPAnswerer(truncate=True)
+        answerer.start()
+        try:
+            (r, from_hedge) = dns.query.udp_hedged(
+                self.q,
+                "127.0.0.1",
+                "127.0.0.1",
+                0.1,
+                timeout=2,
+                port=answerer.port,
+                hedge_port=self.answerer.port,
+            )
+        finally:
+            answerer.stop()
+        self.assertTrue(r.flags & dns.flags.TC)
+        self.assertFalse(from_hedge)
+
+    def test_timeout(self):
+        with self.assertRaises(dns.exception.Timeout):
+            dns.query.udp_hedged(
+                self.q,
+                "127.0.0.1",
+                "127.0.0.1",
+                0.05,
+                timeout=0.2,
+                port=self.silent_port,
+                hedge_port=self.silent_port,
+            )
+
+    def test_delay_longer_than_timeout(self):
+        with self.assertRaises(dns.exception.Timeout):
+            dns.query.udp_hedged(
+                self.q,
+                "127.0.0.1",
+                "127.0.0.1",
+                1.0,
+                timeout=0.1,
+                port=self.silent_port,
+                hedge_port=self.answerer.port,
+            )
+        self.assertEqual(self.answerer.queries, 0)
+
+    def test_mixed_families(self):
+        with self.assertRaises(ValueError):
+            dns.query.udp_hedged(self.q, "127.0.0.1", "::1", 0.1, timeout=1)
+
+    def test_async_hedge_answers(self):
+        async def run():
+            return await dns.asyncquery.udp_hedged(
+                self.q,
+                "127.0.0.1",
+                "127.0.0.1",
+                0.5,
+                timeout=2,
+                port=self.silent_port,
+                hedge_port=self.answerer.port,
+            )
+
+        (r, from_hedge) = asyncio.run(run())
+        self.assertTrue(self.q.is_response(r))
+        self.assertTrue(from_hedge)
+        self.assertLess(r.time, 0.5)
+
+    def test_async_connected_backend(self):
+        backend = dns.asyncbackend.get_backend("asyncio")
+
+        async def run():
+            return await dns.asyncquery.udp_hedged(
+                self.q,
+                "127.0.0.1",
+                "127.0.0.1",
+                0.1,
+                timeout=2,
+                port=self.silent_port,
+                hedge_port=self.answerer.port,
+                backend=backend,
+            )
+
+        with patch.object(backend, "datagram_connection_required", return_value=True):
+            with self.assertRaises(ValueError):
+                asyncio.run(run())
+        self.assertEqual(self.answerer.queries, 0)
+
+    def test_async_timeout(self):
+        async def run():
+            return await dns.asyncquery.udp_hedged(
+                self.q,
+                "127.0.0.1",
+                "127.0.0.1",
+                0.05,
+                timeout=0.2,
+                port=self.silent_port,
+                hedge_port=self.silent_port,
+            )
+
+        with self.assertRaises(dns.exception.Timeout):
+            asyncio.run(run())
+
+
 @contextlib.contextmanager
 def mock_udp_recv(wire1, from1, wire2, from2):
     saved = dns.query._udp_recv
@@ -696,6 +888,498 @@ def mock_udp_recv(wire1, from1, wire2, from2):
         dns.query._udp_recv = saved
 
 
+class UDPSocketPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.answerer = UDPAnswerer()
+        self.answerer.start()
+
+    def tearDown(self):
+        self.answerer.stop()
+
+    def query(self, pool, **kwargs):
+        q = dns.message.make_query("www.dnspython.org", "A")
+        r = dns.query.udp(
+            q,
+            "127.0.0.1",
+            timeout=2,
+            port=self.answerer.port,
+            socket_pool=pool,
+            **kwargs,
+        )
+        self.assertTrue(q.is_response(r))
+
+    def test_socket_reused_and_recycled(self):
+        pool = dns.query.UDPSocketPool(max_uses=2)
+        for _ in range(3):
+            self.query(pool)
+        ports = [port for (_, port) in self.answerer.sources]
+        self.assertEqual(ports[0], ports[1])
+        self.assertNotEqual(ports[1], ports[2])
+        pool.close()
+
+    def test_timed_out_socket_not_reused(self):
+        pool = dns.query.UDPSocketPool()
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(("127.0.0.1", 0))
+        try:
+            q = dns.message.make_query("www.dnspython.org", "A")
+            with self.assertRaises(dns.exception.Timeout):
+                dns.query.udp(
+                    q,
+                    "127.0.0.1",
+                    timeout=0.1,
+                    port=silent.getsockname()[1],
+                    socket_pool=pool,
+                )
+            self.assertEqual(pool._idle.get(socket.AF_INET, []), [])
+        finally:
+            silent.close()
+
+    def test_stale_datagram_discarded(self):
+        pool = dns.query.UDPSocketPool()
+        self.query(pool)
+        ((s, _),) = pool._idle[socket.AF_INET]
+        # A late duplicate response must not be taken as the next answer.
+        stale = dns.message.make_response(dns.message.make_query("stale.", "A"))
+        self.answerer.sock.sendto(stale.to_wire(), s.getsockname())
+        time.sleep(0.1)
+        self.query(pool)
+        pool.close()
+
+    def test_source_not_pooled(self):
+        pool = dns.query.UDPSocketPool()
+        self.query(pool, source="127.0.0.1")
+        self.assertEqual(pool._idle, {})
+
+    def test_nameserver_uses_default_pool(self):
+        nameserver = dns.nameserver.Do53Nameserver("127.0.0.1")
+        self.assertIs(
+            nameserver.udp_socket_pool, dns.query.get_default_udp_socket_pool()
+        )
+
+    def test_default_pool_usable_after_close(self):
+        pool = dns.query.get_default_udp_socket_pool()
+        self.query(pool)
+        pool.close()
+        self.assertEqual(pool._idle, {})
+        self.query(pool)
+        pool.close()
+
+
+class NetReadTests(unittest.TestCase):
+    def setUp(self):
+        (self.reader, self.writer) = socket.socketpair()
+        self.reader.setblocking(False)
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+
+    def test_read_in_chunks(self):
+        data = bytes(range(256)) * 64
+
+        def write():
+            for i in range(0, len(data), 1000):
+                self.writer.sendall(data[i : i + 1000])
+                time.sleep(0.001)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        read = dns.query._net_read(self.reader, len(data), time.time() + 2)
+        writer.join()
+        self.assertIsInstance(read, bytes)
+        self.assertEqual(read, data)
+
+    def test_read_nothing(self):
+        self.assertEqual(dns.query._net_read(self.reader, 0, None), b"")
+
+    def test_eof(self):
+        self.writer.sendall(b"abc")
+        self.writer.close()
+        with self.assertRaises(EOFError):
+            dns.query._net_read(self.reader, 10, time.time() + 2)
+
+
+class UDPBatchTests(unittest.TestCase):
+    def setUp(self):
+        self.answerer = UDPAnswerer(drop=["lost.example."])
+        self.answerer.start()
+
+    def tearDown(self):
+        self.answerer.stop()
+
+    def batch(self, queries, timeout=2, **kwargs):
+        return dns.query.udp_batch(
+            queries, "127.0.0.1", timeout=timeout, port=self.answerer.port, **kwargs
+        )
+
+    def test_responses_in_query_order(self):
+        queries = [dns.message.make_query(f"host{i}.example.", "A") for i in range(100)]
+        responses = self.batch(queries, max_in_flight=10)
+        self.assertEqual(len(responses), 100)
+        for q, r in zip(queries, responses):
+            self.assertTrue(q.is_response(r))
+            self.assertIsNotNone(r.time)
+        self.assertEqual(len(set(self.answerer.sources)), 1)
+
+    def test_duplicate_ids_reassigned(self):
+        queries = [
+            dns.message.make_query(f"host{i}.example.", "A", id=1) for i in range(10)
+        ]
+        responses = self.batch(queries)
+        for q, r in zip(queries, responses):
+            self.assertTrue(q.is_response(r))
+        self.assertEqual(len(set(q.id for q in queries)), 10)
+
+    def test_timeout(self):
+        queries = [
+            dns.message.make_query(name, "A")
+            for name in ["a.example.", "lost.example.", "b.example."]
+        ]
+        (a, lost, b) = self.batch(queries, timeout=0.2)
+        self.assertTrue(queries[0].is_response(a))
+        self.assertIsInstance(lost, dns.exception.Timeout)
+        self.assertTrue(queries[2].is_response(b))
+
+    def test_truncation(self):
+        self.answerer.truncate = True
+        q = dns.message.make_query("www.dnspython.org", "A")
+        (r,) = self.batch([q])
+        self.assertTrue(r.flags & dns.flags.TC)
+        (e,) = self.batch([q], raise_on_truncation=True)
+        self.assertIsInstance(e, dns.message.Truncated)
+
+    def test_empty(self):
+        self.assertEqual(self.batch([]), [])
+
+
+class TCPAnswerer(threading.Thread):
+    """Answer queries on a local TCP socket.
+
+    Queries are answered in batches of *batch*, in reverse order of arrival,
+    so that pipelined responses come back out of order.  If *close* is set,
+    each connection is closed after its first batch is answered.  If
+    *respond* is set, it is called with each query and returns the list of
+    response messages to send.
+    """
+
+    def __init__(self, batch=1, close=False, respond=None):
+        super().__init__(daemon=True)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(16)
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.batch = batch
+        self.close = close
+        self.respond = respond
+        self.connections = 0
+        self.queries = 0
+        self.stopping = False
+
+    def run(self):
+        while not self.stopping:
+            try:
+                (conn, _) = self.sock.accept()
+            except socket.timeout:
+                continue
+            self.connections += 1
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        with conn:
+            conn.settimeout(5)
+            while True:
+                batch = []
+                try:
+                    while len(batch) < self.batch:
+                        ldata = conn.recv(2, socket.MSG_WAITALL)
+                        if len(ldata) < 2:
+                            return
+                        length = int.from_bytes(ldata, "big")
+                        wire = conn.recv(length, socket.MSG_WAITALL)
+                        batch.append(dns.message.from_wire(wire))
+                except OSError:
+                    return
+                self.queries += len(batch)
+                for query in reversed(batch):
+                    if self.respond:
+                        responses = self.respond(query)
+                    else:
+                        responses = [dns.message.make_response(query)]
+                    for response in responses:
+                        conn.sendall(response.to_wire(prepend_length=True))
+                if self.close:
+                    return
+
+    def stop(self):
+        self.stopping = True
+        self.join()
+        self.sock.close()
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def query(self, pool, answerer, name="www.dnspython.org"):
+        q = dns.message.make_query(name, "A")
+        r = dns.query.tcp(q, "127.0.0.1", timeout=2, port=answerer.port, pool=pool)
+        self.assertTrue(q.is_response(r))
+        return r
+
+    def test_connection_reused(self):
+        answerer = TCPAnswerer()
+        answerer.start()
+        try:
+            with dns.query.ConnectionPool() as pool:
+                for _ in range(5):
+                    self.query(pool, answerer)
+                self.assertEqual(pool.connection_count(), 1)
+            self.assertEqual(answerer.connections, 1)
+            self.assertEqual(answerer.queries, 5)
+        finally:
+            answerer.stop()
+
+    def test_pipelined_out_of_order(self):
+        answerer = TCPAnswerer(batch=4)
+        answerer.start()
+        try:
+            with dns.query.ConnectionPool(max_connections=1) as pool:
+                results = []
+
+                def run(i):
+                    results.append(self.query(pool, answerer, f"host{i}.example."))
+
+                threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            self.assertEqual(len(results), 4)
+            self.assertEqual(
+                sorted(r.question[0].name.to_text() for r in results),
+                [f"host{i}.example." for i in range(4)],
+            )
+            self.assertEqual(answerer.connections, 1)
+        finally:
+            answerer.stop()
+
+    def test_max_connections(self):
+        answerer = TCPAnswerer(batch=2)
+        answerer.start()
+        try:
+            with dns.query.ConnectionPool(max_connections=2, max_pipelined=1) as pool:
+                threads = [
+                    threading.Thread(target=self.query, args=(pool, answerer))
+                    for _ in range(4)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            self.assertEqual(answerer.queries, 4)
+            self.assertLessEqual(answerer.connections, 2)
+        finally:
+            answerer.stop()
+
+    def test_closed_connection_retried(self):
+        answerer = TCPAnswerer(close=True)
+        answerer.start()
+        try:
+            with dns.query.ConnectionPool() as pool:
+                self.query(pool, answerer)
+                # Give the server time to close the connection.
+                time.sleep(0.1)
+                self.query(pool, answerer)
+            self.assertEqual(answerer.connections, 2)
+        finally:
+            answerer.stop()
+
+    def test_idle_timeout(self):
+        answerer = TCPAnswerer()
+        answerer.start()
+        try:
+            with dns.query.ConnectionPool(idle_timeout=0) as pool:
+                self.query(pool, answerer)
+                self.query(pool, answerer)
+            self.assertEqual(answerer.connections, 2)
+        finally:
+            answerer.stop()
+
+    def test_timeout_keeps_connection(self):
+        answerer = TCPAnswerer(batch=2)
+        answerer.start()
+        try:
+            with dns.query.ConnectionPool(max_connections=1) as pool:
+                q = dns.message.make_query("www.dnspython.org", "A")
+                with self.assertRaises(dns.exception.Timeout):
+                    dns.query.tcp(
+                        q, "127.0.0.1", timeout=0.2, port=answerer.port, pool=pool
+                    )
+                # The second query completes the server's batch.  The late
+                # response to the first query is read and discarded.
+                self.query(pool, answerer)
+                self.assertEqual(pool.connection_count(), 1)
+            self.assertEqual(answerer.connections, 1)
+        finally:
+            answerer.stop()
+
+    def test_closed_pool(self):
+        pool = dns.query.ConnectionPool()
+        pool.close()
+        q = dns.message.make_query("www.dnspython.org", "A")
+        with self.assertRaises(RuntimeError):
+            dns.query.tcp(q, "127.0.0.1", timeout=2, port=53, pool=pool)
+
+    def test_async_pipelined(self):
+        answerer = TCPAnswerer(batch=4)
+        answerer.start()
+
+        async def run():
+            async with dns.asyncquery.ConnectionPool(max_connections=1) as pool:
+                queries = [
+                    dns.message.make_query(f"host{i}.example.", "A") for i in range(4)
+                ]
+                responses = await asyncio.gather(
+                    *[
+                        dns.asyncquery.tcp(
+                            q, "127.0.0.1", timeout=2, port=answerer.port, pool=pool
+                        )
+                        for q in queries
+                    ]
+                )
+                for q, r in zip(queries, responses):
+                    self.assertTrue(q.is_response(r))
+                self.assertEqual(pool.connection_count(), 1)
+
+        try:
+            asyncio.run(run())
+            self.assertEqual(answerer.connections, 1)
+        finally:
+            answerer.stop()
+
+
+def axfr_responses(query):
+    # The SOA, the rest of the zone, and the SOA again, as AXFRNanoNameserver
+    # sends them.
+    zone = dns.zone.from_text(
+        axfr_zone, origin=query.question[0].name, relativize=False
+    )
+    soa = zone.find_rrset(zone.origin, dns.rdatatype.SOA)
+    rrsets = []
+    for name, rdataset in zone.iterate_rdatasets():
+        if rdataset.rdtype != dns.rdatatype.SOA:
+            rrset = dns.rrset.RRset(name, rdataset.rdclass, rdataset.rdtype)
+            rrset.update(rdataset)
+            rrsets.append(rrset)
+    responses = []
+    for answer in ([soa], rrsets, [soa]):
+        response = dns.message.make_response(query)
+        response.flags |= dns.flags.AA
+        response.answer = answer
+        responses.append(response)
+    return responses
+
+
+class QueryEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.answerer = UDPAnswerer(drop=["lost.example."])
+        self.answerer.start()
+        self.engine = dns.query.QueryEngine(udp_sockets=2)
+
+    def tearDown(self):
+        self.engine.close()
+        self.answerer.stop()
+
+    def test_udp(self):
+        queries = [
+            dns.message.make_query(f"host{i}.example.", "A", id=1) for i in range(50)
+        ]
+        for i, q in enumerate(queries):
+            self.engine.udp(q, "127.0.0.1", 2, self.answerer.port, context=i)
+        self.assertEqual(self.engine.outstanding(), 50)
+        finished = list(self.engine.run())
+        self.assertEqual(len(finished), 50)
+        self.assertEqual(self.engine.outstanding(), 0)
+        for eq in finished:
+            self.assertIs(eq.query, queries[eq.context])
+            self.assertTrue(eq.query.is_response(eq.result()))
+            self.assertIsNotNone(eq.response.time)
+        # All the queries were sent from the two sockets.
+        self.assertEqual(len(set(self.answerer.sources)), 2)
+
+    def test_udp_timeout_and_truncation(self):
+        self.answerer.truncate = True
+        lost = self.engine.udp(
+            dns.message.make_query("lost.example.", "A"),
+            "127.0.0.1",
+            0.2,
+            self.answerer.port,
+        )
+        truncated = self.engine.udp(
+            dns.message.make_query("www.dnspython.org", "A"),
+            "127.0.0.1",
+            2,
+            self.answerer.port,
+            raise_on_truncation=True,
+        )
+        with self.assertRaises(ValueError):
+            lost.result()
+        self.assertEqual(self.engine.poll(), [truncated])
+        self.assertIsInstance(truncated.exception, dns.message.Truncated)
+        self.assertEqual(self.engine.poll(0.01), [])
+        self.assertEqual(self.engine.poll(), [lost])
+        with self.assertRaises(dns.exception.Timeout):
+            lost.result()
+        self.assertEqual(self.engine.poll(), [])
+
+    def test_tcp(self):
+        answerer = TCPAnswerer()
+        answerer.start()
+        try:
+            queries = [
+                dns.message.make_query(f"host{i}.example.", "A") for i in range(10)
+            ]
+            for q in queries:
+                self.engine.tcp(q, "127.0.0.1", 2, answerer.port)
+            finished = list(self.engine.run())
+            self.assertEqual(len(finished), 10)
+            for eq in finished:
+                self.assertTrue(eq.query.is_response(eq.result()))
+            self.assertEqual(answerer.connections, 10)
+        finally:
+            answerer.stop()
+
+    def test_tcp_connection_refused(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        q = dns.message.make_query("www.dnspython.org", "A")
+        eq = self.engine.tcp(q, "127.0.0.1", 2, port)
+        self.assertEqual(self.engine.poll(), [eq])
+        self.assertIsInstance(eq.exception, OSError)
+
+    def test_bad_address(self):
+        q = dns.message.make_query("www.dnspython.org", "A")
+        eq = self.engine.udp(q, "not-an-address")
+        self.assertTrue(eq.done)
+        self.assertEqual(self.engine.poll(), [eq])
+        self.assertIsInstance(eq.exception, ValueError)
+
+    def test_inbound_xfr(self):
+        answerer = TCPAnswerer(respond=axfr_responses)
+        answerer.start()
+        try:
+            zones = [dns.zone.Zone(f"example{i}.") for i in range(3)]
+            for zone in zones:
+                self.engine.inbound_xfr("127.0.0.1", zone, port=answerer.port)
+            for eq in self.engine.run():
+                eq.result()
+            for zone in zones:
+                expected = dns.zone.from_text(axfr_zone, origin=zone.origin)
+                self.assertEqual(zone, expected)
+        finally:
+            answerer.stop()
+
+
 class MockSock:
     def __init__(self):
         self.family = socket.AF_INET
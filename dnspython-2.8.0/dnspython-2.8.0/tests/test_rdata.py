@@ -265,6 +265,52 @@ class RdataTestCase(unittest.TestCase):
             expected_wire = rdata.to_wire(origin=origin)
             self.assertEqual(digestable_wire, expected_wire)
 
+    def test_digestable_cached(self):
+        rd = dns.rdata.from_text("IN", "MX", "10 MAIL.example.")
+        self.assertIsNone(rd._digestable)
+        self.assertEqual(hash(rd), hash(rd.to_digestable()))
+        self.assertEqual(rd._digestable, (False, rd.to_digestable()))
+        self.assertIs(rd.to_digestable(), rd._digestable[1])
+        self.assertEqual(
+            rd.to_digestable(dns.name.from_text("example")), rd._digestable[1]
+        )
+        self.assertEqual(rd, dns.rdata.from_text("IN", "MX", "10 mail.example."))
+        # The cache is not pickled.
+        rd2 = pickle.loads(pickle.dumps(rd))
+        self.assertIsNone(rd2._digestable)
+        self.assertEqual(rd2, rd)
+        self.assertEqual(hash(rd2), hash(rd))
+        # Nor kept by replace().
+        rd3 = rd.replace(exchange=dns.name.from_text("other.example."))
+        self.assertIsNone(rd3._digestable)
+        self.assertNotEqual(rd3, rd)
+
+    def test_digestable_cached_relative(self):
+        origin = dns.name.from_text("example")
+        rd = dns.rdata.from_text("IN", "NS", "ns1", origin=origin, relativize=True)
+        self.assertEqual(hash(rd), hash(rd.to_digestable(dns.name.root)))
+        self.assertEqual(rd._digestable, (True, rd.to_digestable(dns.name.root)))
+        with self.assertRaises(dns.name.NeedAbsoluteNameOrOrigin):
+            rd.to_digestable()
+        wire = rd.to_digestable(origin)
+        self.assertEqual(wire, b"\x03ns1\x07example\x00")
+        # The form for the last origin is kept too.
+        self.assertEqual(rd._digestable[2:], (origin, rd.to_digestable(origin)))
+        self.assertIs(rd.to_digestable(origin), rd._digestable[3])
+        other = dns.name.from_text("other")
+        self.assertEqual(rd.to_digestable(other), b"\x03ns1\x05other\x00")
+        self.assertEqual(rd._digestable[2], other)
+        self.assertEqual(hash(rd), hash(rd.to_digestable(dns.name.root)))
+        # The form relative to the root is only made when it is needed.
+        rd = dns.rdata.from_text("IN", "NS", "ns1", origin=origin, relativize=True)
+        self.assertEqual(rd.to_digestable(origin), b"\x03ns1\x07example\x00")
+        self.assertIsNone(rd._digestable[1])
+        self.assertEqual(hash(rd), hash(b"\x03ns1\x00"))
+        self.assertEqual(rd._digestable, (True, b"\x03ns1\x00", origin, wire))
+        absolute = dns.rdata.from_text("IN", "NS", "ns1.")
+        self.assertEqual(absolute.to_digestable(), rd.to_digestable(dns.name.root))
+        self.assertNotEqual(rd, absolute)
+
     def test_basic_relations(self):
         r1 = dns.rdata.from_text(dns.rdataclass.IN, dns.rdatatype.A, "10.0.0.1")
         r2 = dns.rdata.from_text(dns.rdataclass.IN, dns.rdatatype.A, "10.0.0.2")
@@ -308,6 +354,17 @@ class RdataTestCase(unittest.TestCase):
         p = pickle.dumps(r3)
         r4 = pickle.loads(p)
         self.assertEqual(r3, r4)
+        # Pickle rdata which keeps its attributes in __dict__, or in immutable
+        # helper objects.
+        for rdtype, text in (
+            ("OPENPGPKEY", "AQNRU3mG7TVTO2BkR47usntb102uFJtugbo6BSGvgqt4AQ=="),
+            ("APL", "1:192.168.32.0/21 !1:192.168.38.0/28"),
+            ("IPSECKEY", "10 3 2 mygateway.example.com. AQNRU3mG"),
+        ):
+            r5 = dns.rdata.from_text(dns.rdataclass.IN, rdtype, text)
+            r6 = pickle.loads(pickle.dumps(r5))
+            self.assertEqual(r5, r6)
+            self.assertEqual(r5.to_text(), r6.to_text())
 
     def test_AFSDB_properties(self):
         rd = dns.rdata.from_text(
@@ -1,11 +1,22 @@
 # Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
 
+import asyncio
+import socket
+import threading
+import time
 import unittest
+from unittest.mock import patch
 
+import dns._features
+import dns.asyncbackend
+import dns.asyncresolver
+import dns.exception
 import dns.flags
 import dns.message
 import dns.name
+import dns.nameserver
 import dns.rcode
+import dns.rdata
 import dns.rdataclass
 import dns.rdatatype
 import dns.resolver
@@ -288,6 +299,48 @@ class ResolutionTestCase(unittest.TestCase):
         self.assertFalse(tcp)
         self.assertEqual(backoff, 0.2)
 
+    def test_next_nameserver_tracker_order(self):
+        tracker = dns.resolver.NameserverTracker()
+        self.resolver.nameserver_tracker = tracker
+        ns1 = dns.nameserver.Do53Nameserver("10.0.0.1")
+        ns2 = dns.nameserver.Do53Nameserver("10.0.0.2")
+        tracker.record_response(ns1, 0.2)
+        tracker.record_response(ns2, 0.05)
+        (_, _) = self.resn.next_request()
+        (nameserver, _, _) = self.resn.next_nameserver()
+        self.assertEqual(nameserver.address, "10.0.0.2")
+        (nameserver, _, _) = self.resn.next_nameserver()
+        self.assertEqual(nameserver.address, "10.0.0.1")
+
+    def test_query_result_tracked(self):
+        tracker = dns.resolver.NameserverTracker()
+        self.resolver.nameserver_tracker = tracker
+        q = dns.message.make_query(self.qname, dns.rdatatype.A)
+        (_, _) = self.resn.next_request()
+        (_, _, _) = self.resn.next_nameserver()
+        (answer, done) = self.resn.query_result(None, dns.exception.Timeout())
+        self.assertFalse(done)
+        (_, _, _) = self.resn.next_nameserver()
+        r = self.make_address_response(q)
+        r.time = 0.03
+        (answer, done) = self.resn.query_result(r, None)
+        self.assertTrue(done)
+        stats = tracker.get_statistics_snapshot()
+        ns1 = stats["Do53:10.0.0.1@53"]
+        self.assertEqual(ns1.failures, 1)
+        self.assertEqual(ns1.timeouts, 1)
+        self.assertGreater(ns1.backoff_until, time.time())
+        ns2 = stats["Do53:10.0.0.2@53"]
+        self.assertEqual(ns2.responses, 1)
+        self.assertEqual(ns2.srtt, 0.03)
+        # The next resolution tries the server that answered first.
+        resn = dns.resolver._Resolution(
+            self.resolver, dns.name.from_text("other."), "A", "IN", False, True, False
+        )
+        (_, _) = resn.next_request()
+        (nameserver, _, _) = resn.next_nameserver()
+        self.assertEqual(nameserver.address, "10.0.0.2")
+
     def test_next_nameserver_retry_with_tcp(self):
         (request, answer) = self.resn.next_request()
         (nameserver1, tcp, backoff) = self.resn.next_nameserver()
@@ -523,3 +576,770 @@ class ResolutionTestCase(unittest.TestCase):
 
         self.assertRaises(dns.resolver.NoMetaqueries, bad1)
         self.assertRaises(dns.resolver.NoMetaqueries, bad2)
+
+    def test_query_result_nxdomain_negative_cache(self):
+        self.resolver.cache = dns.resolver.Cache()
+        self.resolver.negative_cache = dns.resolver.NegativeCache()
+        q = dns.message.make_query(self.qname, dns.rdatatype.A)
+        r = self.make_negative_response(q, True)
+        (_, _) = self.resn.next_request()
+        (_, _, _) = self.resn.next_nameserver()
+        (answer, done) = self.resn.query_result(r, None)
+        self.assertIsNone(answer)
+        self.assertTrue(done)
+        key = (self.qname, dns.rdatatype.ANY, dns.rdataclass.IN)
+        self.assertIsNone(self.resolver.cache.get(key))
+        cache_answer = self.resolver.negative_cache.get(key)
+        self.assertIs(cache_answer.response, r)
+        # The next resolution is answered from the negative cache.
+        self.resn = dns.resolver._Resolution(
+            self.resolver, self.qname, "A", "IN", False, True, False
+        )
+        with self.assertRaises(dns.resolver.NXDOMAIN) as cm:
+            self.resn.next_request()
+        self.assertIs(cm.exception.response(self.qname), r)
+        self.assertEqual(self.resolver.negative_cache.hits(), 2)
+        # Each lookup checks for a cached no data answer before NXDOMAIN.
+        self.assertEqual(self.resolver.negative_cache.misses(), 3)
+
+    def test_query_result_no_data_negative_cache(self):
+        self.resolver.cache = dns.resolver.Cache()
+        self.resolver.negative_cache = dns.resolver.NegativeCache()
+        q = dns.message.make_query(self.qname, dns.rdatatype.A)
+        r = self.make_negative_response(q)
+        (_, _) = self.resn.next_request()
+        (_, _, _) = self.resn.next_nameserver()
+        with self.assertRaises(dns.resolver.NoAnswer):
+            self.resn.query_result(r, None)
+        key = (self.qname, dns.rdatatype.A, dns.rdataclass.IN)
+        self.assertEqual(len(self.resolver.cache.data), 0)
+        cache_answer = self.resolver.negative_cache.get(key)
+        self.assertIs(cache_answer.response, r)
+        self.resn = dns.resolver._Resolution(
+            self.resolver, self.qname, "A", "IN", False, False, False
+        )
+        (request, answer) = self.resn.next_request()
+        self.assertIsNone(request)
+        self.assertIs(answer, cache_answer)
+
+    def test_negative_cache_positive_answers_go_to_cache(self):
+        self.resolver.cache = dns.resolver.Cache()
+        self.resolver.negative_cache = dns.resolver.NegativeCache()
+        q = dns.message.make_query(self.qname, dns.rdatatype.A)
+        r = self.make_address_response(q)
+        (_, _) = self.resn.next_request()
+        (_, _, _) = self.resn.next_nameserver()
+        (answer, _) = self.resn.query_result(r, None)
+        key = (self.qname, dns.rdatatype.A, dns.rdataclass.IN)
+        self.assertIs(self.resolver.cache.get(key), answer)
+        self.assertEqual(len(self.resolver.negative_cache.data), 0)
+
+    def test_negative_cache_ttls(self):
+        cache = dns.resolver.NegativeCache(max_ttl=100)
+        key = (self.qname, dns.rdatatype.ANY, dns.rdataclass.IN)
+        q = dns.message.make_query(self.qname, dns.rdatatype.A)
+        # The SOA minimum is 300, but max_ttl is 100.
+        r = self.make_negative_response(q, True)
+        answer = dns.resolver.Answer(
+            self.qname, dns.rdatatype.ANY, dns.rdataclass.IN, r
+        )
+        cache.put(key, answer)
+        self.assertIs(cache.get(key), answer)
+        self.assertLessEqual(answer.expiration, time.time() + 100)
+        # Without an SOA there is no negative TTL, so nothing is cached.
+        cache.flush()
+        r = dns.message.make_response(q)
+        r.set_rcode(dns.rcode.NXDOMAIN)
+        answer = dns.resolver.Answer(
+            self.qname, dns.rdatatype.ANY, dns.rdataclass.IN, r
+        )
+        cache.put(key, answer)
+        self.assertIsNone(cache.get(key))
+
+    def test_negative_cache_sync_and_async(self):
+        response = self.make_negative_response(
+            dns.message.make_query(self.qname, dns.rdatatype.A), True
+        )
+        nameserver = FakeNameserver(response)
+        self.resolver.nameservers = [nameserver]
+        self.resolver.negative_cache = dns.resolver.NegativeCache()
+        for _ in range(2):
+            with self.assertRaises(dns.resolver.NXDOMAIN):
+                self.resolver.resolve(self.qname, "A")
+        self.assertEqual(nameserver.queries, 1)
+
+        aresolver = dns.asyncresolver.Resolver(configure=False)
+        aresolver.nameservers = [nameserver]
+        aresolver.negative_cache = dns.resolver.NegativeCache()
+
+        async def run():
+            for _ in range(2):
+                with self.assertRaises(dns.resolver.NXDOMAIN):
+                    await aresolver.resolve(self.qname, "A")
+
+        asyncio.run(run())
+        self.assertEqual(nameserver.queries, 2)
+        self.assertEqual(aresolver.negative_cache.hits(), 1)
+
+
+class CoalescingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.qname = dns.name.from_text("www.dnspython.org.")
+        self.response = dns.message.from_text(
+            """id 1
+flags QR RD RA
+;QUESTION
+www.dnspython.org. IN A
+;ANSWER
+www.dnspython.org. 300 IN A 10.0.0.2
+"""
+        )
+
+    def test_coalesce(self):
+        nameserver = SlowNameserver(self.response)
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.coalesce = True
+        answers = []
+
+        def resolve():
+            answers.append(resolver.resolve("www.dnspython.org.", "A"))
+
+        threads = [threading.Thread(target=resolve) for _ in range(5)]
+        threads[0].start()
+        self.assertTrue(nameserver.querying.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        # Give the other threads time to join the in-flight resolution.
+        time.sleep(0.2)
+        nameserver.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(nameserver.queries, 1)
+        self.assertEqual(len(answers), 5)
+        for answer in answers:
+            self.assertIs(answer, answers[0])
+        self.assertEqual(resolver._in_flight, {})
+        # Once it has finished, the next call does its own resolution.
+        resolver.resolve(self.qname, dns.rdatatype.A)
+        self.assertEqual(nameserver.queries, 2)
+
+    def test_coalesce_different_questions(self):
+        nameserver = FakeNameserver(self.response)
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.coalesce = True
+
+        async def run():
+            return await asyncio.gather(
+                resolver.resolve(self.qname, "A"),
+                resolver.resolve(self.qname, "A", tcp=True),
+            )
+
+        (a1, a2) = asyncio.run(run())
+        self.assertIsNot(a1, a2)
+        self.assertEqual(nameserver.queries, 2)
+
+    def test_async_coalesce(self):
+        nameserver = SlowNameserver(self.response)
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.coalesce = True
+
+        async def run():
+            return await asyncio.gather(
+                *[resolver.resolve(self.qname, "A") for _ in range(5)]
+            )
+
+        answers = asyncio.run(run())
+        self.assertEqual(nameserver.queries, 1)
+        for answer in answers:
+            self.assertIs(answer, answers[0])
+        self.assertEqual(resolver._in_flight, {})
+
+    def test_async_coalesce_exception(self):
+        response = dns.message.make_response(
+            dns.message.make_query(self.qname, dns.rdatatype.A)
+        )
+        response.set_rcode(dns.rcode.NXDOMAIN)
+        nameserver = SlowNameserver(response)
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.coalesce = True
+
+        async def run():
+            return await asyncio.gather(
+                *[resolver.resolve(self.qname, "A") for _ in range(3)],
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(nameserver.queries, 1)
+        for result in results:
+            self.assertIsInstance(result, dns.resolver.NXDOMAIN)
+        self.assertEqual(resolver._in_flight, {})
+
+    def test_coalesce_follower_lifetime(self):
+        nameserver = SlowNameserver(self.response)
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.coalesce = True
+        answers = []
+        leader = threading.Thread(
+            target=lambda: answers.append(resolver.resolve(self.qname, "A"))
+        )
+        leader.start()
+        try:
+            self.assertTrue(nameserver.querying.wait(5))
+            with self.assertRaises(dns.resolver.LifetimeTimeout):
+                resolver.resolve(self.qname, "A", lifetime=0.1)
+        finally:
+            nameserver.release.set()
+            leader.join()
+        self.assertEqual(nameserver.queries, 1)
+        self.assertEqual(len(answers), 1)
+
+    def test_async_coalesce_follower_lifetime(self):
+        nameserver = SlowNameserver(self.response)
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.coalesce = True
+
+        async def run():
+            return await asyncio.gather(
+                resolver.resolve(self.qname, "A"),
+                resolver.resolve(self.qname, "A", lifetime=0.01),
+                return_exceptions=True,
+            )
+
+        (answer, ex) = asyncio.run(run())
+        self.assertIsInstance(answer, dns.resolver.Answer)
+        self.assertIsInstance(ex, dns.resolver.LifetimeTimeout)
+        self.assertEqual(nameserver.queries, 1)
+        self.assertEqual(resolver._in_flight, {})
+
+    def test_async_coalesce_leader_lifetime(self):
+        nameserver = UnreachableNameserver(self.response, 0.3)
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.coalesce = True
+
+        async def run():
+            return await asyncio.gather(
+                resolver.resolve(self.qname, "A", lifetime=0.2),
+                resolver.resolve(self.qname, "A", lifetime=5),
+                return_exceptions=True,
+            )
+
+        (ex, answer) = asyncio.run(run())
+        self.assertIsInstance(ex, dns.resolver.LifetimeTimeout)
+        # The follower's lifetime is longer, so it resolved on its own.
+        self.assertIsInstance(answer, dns.resolver.Answer)
+        self.assertEqual(nameserver.queries, 1)
+        self.assertEqual(resolver._in_flight, {})
+
+    def test_async_coalesce_per_loop(self):
+        nameserver = SlowNameserver(self.response)
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.coalesce = True
+        answers = []
+
+        def resolve():
+            answers.append(asyncio.run(resolver.resolve(self.qname, "A")))
+
+        threads = [threading.Thread(target=resolve) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Resolutions in different event loops are not coalesced.
+        self.assertEqual(len(answers), 2)
+        self.assertEqual(nameserver.queries, 2)
+        self.assertEqual(resolver._in_flight, {})
+
+    def test_async_coalesce_leader_cancelled(self):
+        nameserver = SlowNameserver(self.response)
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.coalesce = True
+
+        async def run():
+            leader = asyncio.create_task(resolver.resolve(self.qname, "A"))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(resolver.resolve(self.qname, "A"))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        answer = asyncio.run(run())
+        self.assertIsInstance(answer, dns.resolver.Answer)
+        # Only the follower's query was answered.
+        self.assertEqual(nameserver.queries, 1)
+        self.assertEqual(resolver._in_flight, {})
+
+
+class RefreshTestCase(unittest.TestCase):
+    def setUp(self):
+        self.qname = dns.name.from_text("www.dnspython.org.")
+        self.key = (self.qname, dns.rdatatype.A, dns.rdataclass.IN)
+        self.nameserver = FakeNameserver(
+            dns.message.from_text(
+                """id 1
+flags QR RD RA
+;QUESTION
+www.dnspython.org. IN A
+;ANSWER
+www.dnspython.org. 300 IN A 10.0.0.2
+"""
+            )
+        )
+
+    def wait_for_refresh(self, cache):
+        for _ in range(100):
+            node = cache.data.get(self.key)
+            if node is not None and not node.refreshing:
+                return
+            time.sleep(0.01)
+        self.fail("refresh did not finish")
+
+    def check_refresh(self, resolver, resolve):
+        cache = dns.resolver.LRUCache(prefetch_fraction=0.1, stale_ttl=60)
+        resolver.nameservers = [self.nameserver]
+        resolver.cache = cache
+        first = resolve()
+        self.assertEqual(self.nameserver.queries, 1)
+        # A fresh answer is not refreshed.
+        self.assertIs(resolve(), first)
+        self.assertEqual(self.nameserver.queries, 1)
+        # Make it stale; it is still returned, and refreshed in the background.
+        first.expiration = time.time() - 1
+        self.assertIs(resolve(), first)
+        self.wait_for_refresh(cache)
+        self.assertEqual(self.nameserver.queries, 2)
+        second = resolve()
+        self.assertIsNot(second, first)
+        self.assertGreater(second.expiration, time.time())
+        # Make it nearly expire; it is prefetched.
+        second.expiration = time.time() + 10
+        self.assertIs(resolve(), second)
+        self.wait_for_refresh(cache)
+        self.assertEqual(self.nameserver.queries, 3)
+        self.assertIsNot(resolve(), second)
+
+    def test_refresh(self):
+        resolver = dns.resolver.Resolver(configure=False)
+        self.check_refresh(resolver, lambda: resolver.resolve(self.qname, "A"))
+
+    def test_async_refresh(self):
+        resolver = dns.asyncresolver.Resolver(configure=False)
+
+        async def resolve_and_yield():
+            answer = await resolver.resolve(self.qname, "A")
+            # Let any refresh task run.
+            for _ in range(5):
+                await asyncio.sleep(0)
+            return answer
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.check_refresh(
+                resolver, lambda: loop.run_until_complete(resolve_and_yield())
+            )
+        finally:
+            loop.close()
+
+    def test_refresh_failure_releases_claim(self):
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = [self.nameserver]
+        cache = dns.resolver.LRUCache(stale_ttl=60)
+        resolver.cache = cache
+        answer = resolver.resolve(self.qname, "A")
+        answer.expiration = time.time() - 1
+        resolver.nameservers = ["127.0.0.1"]
+        resolver.lifetime = 0.1
+        resolver.port = 1
+        self.assertIs(resolver.resolve(self.qname, "A"), answer)
+        self.wait_for_refresh(cache)
+        self.assertIs(cache.get(self.key), answer)
+
+    def test_refresh_threads_bounded(self):
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = [self.nameserver]
+        cache = dns.resolver.LRUCache(stale_ttl=60)
+        resolver.cache = cache
+        answer = resolver.resolve(self.qname, "A")
+        answer.expiration = time.time() - 1
+        with patch("dns.resolver._refresh_threads", threading.BoundedSemaphore(1)):
+            self.assertTrue(dns.resolver._refresh_threads.acquire(blocking=False))
+            try:
+                # No refresh can start, so the claim is given back at once.
+                self.assertIs(resolver.resolve(self.qname, "A"), answer)
+                self.assertFalse(cache.data[self.key].refreshing)
+                self.assertEqual(self.nameserver.queries, 1)
+            finally:
+                dns.resolver._refresh_threads.release()
+            self.assertIs(resolver.resolve(self.qname, "A"), answer)
+            self.wait_for_refresh(cache)
+            self.assertEqual(self.nameserver.queries, 2)
+            # The refresh gave its thread back.
+            self.assertTrue(dns.resolver._refresh_threads.acquire(blocking=False))
+            dns.resolver._refresh_threads.release()
+
+
+class UDPResponder(threading.Thread):
+    """Answer A queries on a local UDP socket.
+
+    Names beginning with "nx" get NXDOMAIN, names beginning with "drop" get
+    no answer at all, and all other names get an A record.  Names beginning
+    with "badglue" also get a malformed A record in the additional section.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.queries = 0
+        self.addresses = set()
+        self.stopping = False
+
+    def run(self):
+        while not self.stopping:
+            try:
+                (wire, address) = self.sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            self.queries += 1
+            self.addresses.add(address)
+            query = dns.message.from_wire(wire)
+            label = query.question[0].name[0]
+            if label.startswith(b"drop"):
+                continue
+            response = dns.message.make_response(query)
+            if label.startswith(b"nx"):
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            else:
+                rrset = response.find_rrset(
+                    response.answer,
+                    query.question[0].name,
+                    dns.rdataclass.IN,
+                    dns.rdatatype.A,
+                    create=True,
+                )
+                rrset.update_ttl(300)
+                rrset.add(
+                    dns.rdata.from_text(dns.rdataclass.IN, dns.rdatatype.A, "10.0.0.1")
+                )
+                if label.startswith(b"badglue"):
+                    glue = response.find_rrset(
+                        response.additional,
+                        query.question[0].name,
+                        dns.rdataclass.IN,
+                        dns.rdatatype.A,
+                        create=True,
+                    )
+                    glue.add(
+                        dns.rdata.GenericRdata(
+                            dns.rdataclass.IN, dns.rdatatype.A, b"\x0a\x00\x00"
+                        )
+                    )
+            self.sock.sendto(response.to_wire(), address)
+
+    def stop(self):
+        self.stopping = True
+        self.join()
+        self.sock.close()
+
+
+class ResolveManyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.responder = UDPResponder()
+        self.responder.start()
+        self.resolver = dns.resolver.Resolver(configure=False)
+        self.resolver.nameservers = [
+            dns.nameserver.Do53Nameserver("127.0.0.1", self.responder.port)
+        ]
+
+    def tearDown(self):
+        self.responder.stop()
+
+    def test_resolve_many(self):
+        queries = [(f"host{i}.example.", "A") for i in range(50)]
+        results = dict(self.resolver.resolve_many(queries, max_in_flight=10))
+        self.assertEqual(set(results.keys()), set(queries))
+        for (qname, _), answer in results.items():
+            self.assertEqual(answer.qname, dns.name.from_text(qname))
+            self.assertEqual(answer[0].address, "10.0.0.1")
+        self.assertEqual(self.responder.queries, 50)
+
+    def test_resolve_many_duplicates_and_errors(self):
+        name = dns.name.from_text("a.example.")
+        queries = [
+            ("a.example.", "A"),
+            (name, dns.rdatatype.A),
+            ("a.example.", "NOSUCHTYPE"),
+            ("nx.example.", "A"),
+            ("drop.example.", "A"),
+        ]
+        results = list(self.resolver.resolve_many(queries, lifetime=0.5))
+        self.assertEqual(len(results), 5)
+        results = dict(results)
+        self.assertIs(results[queries[0]], results[queries[1]])
+        self.assertIsInstance(results[queries[2]], dns.rdatatype.UnknownRdatatype)
+        self.assertIsInstance(results[queries[3]], dns.resolver.NXDOMAIN)
+        self.assertIsInstance(results[queries[4]], dns.resolver.LifetimeTimeout)
+
+    def test_resolve_many_cache_first(self):
+        self.resolver.cache = dns.resolver.Cache()
+        self.resolver.resolve("cached.example.", "A")
+        self.assertEqual(self.responder.queries, 1)
+        queries = [("a.example.", "A"), ("cached.example.", "A")]
+        results = list(self.resolver.resolve_many(queries))
+        self.assertEqual(results[0][0], queries[1])
+        self.assertEqual(self.responder.queries, 2)
+        # The other answer is now cached too.
+        results = list(self.resolver.resolve_many(queries))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(self.responder.queries, 2)
+
+    def test_resolve_many_malformed_additional(self):
+        queries = [("badglue.example.", "A")]
+        # Without a cache, the additional section is only decoded when read.
+        [(_, answer)] = list(self.resolver.resolve_many(queries, lifetime=0.5))
+        self.assertEqual(answer[0].address, "10.0.0.1")
+        with self.assertRaises(dns.exception.FormError):
+            answer.response.additional
+        # An answer which may be cached is decoded in full first, so the
+        # malformed response is not cached.
+        self.resolver.cache = dns.resolver.Cache()
+        [(_, result)] = list(self.resolver.resolve_many(queries, lifetime=0.5))
+        self.assertIsInstance(result, dns.resolver.NoNameservers)
+        self.assertEqual(len(self.resolver.cache.data), 0)
+
+    def check_hedged(self, resolve):
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(("127.0.0.1", 0))
+        try:
+            self.resolver.nameservers = [
+                dns.nameserver.Do53Nameserver("127.0.0.1", silent.getsockname()[1]),
+                dns.nameserver.Do53Nameserver("127.0.0.1", self.responder.port),
+            ]
+            self.resolver.hedge_delay = 0.05
+            self.resolver.timeout = 1
+            answer = resolve()
+            self.assertEqual(answer.port, self.responder.port)
+            self.assertEqual(answer[0].address, "10.0.0.1")
+        finally:
+            silent.close()
+        self.assertEqual(self.responder.queries, 1)
+
+    def test_hedged(self):
+        self.check_hedged(lambda: self.resolver.resolve("a.example.", "A"))
+        stats = self.resolver.get_hedge_statistics_snapshot()
+        self.assertEqual(stats.sent, 1)
+        self.assertEqual(stats.won, 1)
+
+    def test_hedged_not_needed(self):
+        self.resolver.nameservers = [
+            dns.nameserver.Do53Nameserver("127.0.0.1", self.responder.port),
+            dns.nameserver.Do53Nameserver("127.0.0.1", 1),
+        ]
+        self.resolver.hedge_delay = 1.0
+        answer = self.resolver.resolve("a.example.", "A")
+        self.assertEqual(answer.port, self.responder.port)
+        stats = self.resolver.get_hedge_statistics_snapshot()
+        self.assertEqual(stats.sent, 0)
+        self.assertEqual(stats.won, 0)
+
+    def test_hedged_timeout(self):
+        self.resolver.nameservers = [
+            dns.nameserver.Do53Nameserver("127.0.0.1", self.responder.port),
+            dns.nameserver.Do53Nameserver("127.0.0.1", self.responder.port),
+        ]
+        self.resolver.hedge_delay = 0.05
+        self.resolver.lifetime = 0.3
+        with self.assertRaises(dns.resolver.LifetimeTimeout) as cm:
+            self.resolver.resolve("drop.example.", "A")
+        # Both nameservers of the hedged attempt get a timeout.
+        self.assertGreaterEqual(len(cm.exception.kwargs["errors"]), 2)
+        stats = self.resolver.get_hedge_statistics_snapshot()
+        self.assertGreaterEqual(stats.sent, 1)
+        self.assertEqual(stats.won, 0)
+
+    def test_async_hedged(self):
+        aresolver = dns.asyncresolver.Resolver(configure=False)
+
+        async def run():
+            return await aresolver.resolve("a.example.", "A")
+
+        def resolve():
+            aresolver.nameservers = self.resolver.nameservers
+            aresolver.hedge_delay = self.resolver.hedge_delay
+            return asyncio.run(run())
+
+        self.check_hedged(resolve)
+        stats = aresolver.get_hedge_statistics_snapshot()
+        self.assertEqual(stats.sent, 1)
+        self.assertEqual(stats.won, 1)
+
+    def test_resolve_many_not_multiplexed(self):
+        response = dns.message.from_text(
+            """id 1
+flags QR RD RA
+;QUESTION
+www.dnspython.org. IN A
+;ANSWER
+www.dnspython.org. 300 IN A 10.0.0.2
+"""
+        )
+        nameserver = FakeNameserver(response)
+        self.resolver.nameservers = [nameserver]
+        results = list(self.resolver.resolve_many([("www.dnspython.org.", "A")]))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][1][0].address, "10.0.0.2")
+        self.assertEqual(nameserver.queries, 1)
+
+    def async_resolve_many(self, *args, **kwargs):
+        aresolver = dns.asyncresolver.Resolver(configure=False)
+        aresolver.nameservers = self.resolver.nameservers
+        aresolver.cache = self.resolver.cache
+
+        async def run():
+            return await aresolver.resolve_many(*args, **kwargs)
+
+        return asyncio.run(run())
+
+    def test_async_resolve_many(self):
+        queries = [(f"host{i}.example.", "A") for i in range(50)]
+        results = self.async_resolve_many(queries, max_in_flight=10)
+        self.assertEqual([query for query, _ in results], queries)
+        for (qname, _), answer in results:
+            self.assertEqual(answer.qname, dns.name.from_text(qname))
+            self.assertEqual(answer[0].address, "10.0.0.1")
+        self.assertEqual(self.responder.queries, 50)
+        # All the queries shared one socket.
+        self.assertEqual(len(self.responder.addresses), 1)
+
+    def test_async_resolve_many_duplicates_and_errors(self):
+        name = dns.name.from_text("a.example.")
+        queries = [
+            ("a.example.", "A"),
+            ("drop.example.", "A"),
+            (name, dns.rdatatype.A),
+            ("a.example.", "NOSUCHTYPE"),
+            ("nx.example.", "A"),
+        ]
+        results = self.async_resolve_many(queries, lifetime=0.5)
+        self.assertEqual([query for query, _ in results], queries)
+        self.assertIs(results[0][1], results[2][1])
+        self.assertIsInstance(results[1][1], dns.resolver.LifetimeTimeout)
+        self.assertIsInstance(results[3][1], dns.rdatatype.UnknownRdatatype)
+        self.assertIsInstance(results[4][1], dns.resolver.NXDOMAIN)
+        self.assertEqual(self.responder.queries, 3)
+
+    def test_async_resolve_many_cache(self):
+        self.resolver.cache = dns.resolver.Cache()
+        queries = [(f"host{i}.example.", "A") for i in range(5)]
+        self.async_resolve_many(queries)
+        self.assertEqual(self.responder.queries, 5)
+        results = self.async_resolve_many(queries)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.responder.queries, 5)
+
+    @unittest.skipIf(not dns._features.have("trio"), "trio not available")
+    def test_trio_resolve_many(self):
+        import trio
+
+        aresolver = dns.asyncresolver.Resolver(configure=False)
+        aresolver.nameservers = self.resolver.nameservers
+        queries = [(f"host{i}.example.", "A") for i in range(20)] + [
+            ("nx.example.", "A")
+        ]
+
+        async def run():
+            return await aresolver.resolve_many(
+                queries, backend=dns.asyncbackend.get_backend("trio")
+            )
+
+        results = trio.run(run)
+        self.assertEqual([query for query, _ in results], queries)
+        for _, answer in results[:-1]:
+            self.assertEqual(answer[0].address, "10.0.0.1")
+        self.assertIsInstance(results[-1][1], dns.resolver.NXDOMAIN)
+        self.assertEqual(len(self.responder.addresses), 1)
+
+
+class FakeNameserver(dns.nameserver.Nameserver):
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+        self.queries = 0
+
+    def __str__(self):
+        return "fake"
+
+    def kind(self):
+        return "Fake"
+
+    def is_always_max_size(self):
+        return False
+
+    def answer_nameserver(self):
+        return "fake"
+
+    def answer_port(self):
+        return 53
+
+    def _respond(self, request):
+        self.queries += 1
+        response = dns.message.from_wire(self.response.to_wire())
+        response.id = request.id
+        return response
+
+    def query(self, request, *args, **kwargs):
+        return self._respond(request)
+
+    async def async_query(self, request, *args, **kwargs):
+        return self._respond(request)
+
+
+class UnreachableNameserver(FakeNameserver):
+    """A FakeNameserver whose asynchronous queries time out until *delay*
+    seconds after it was made.
+    """
+
+    def __init__(self, response, delay):
+        super().__init__(response)
+        self.reachable = time.time() + delay
+
+    async def async_query(self, request, timeout, *args, **kwargs):
+        if time.time() < self.reachable:
+            await asyncio.sleep(0.05)
+            raise dns.exception.Timeout(timeout=0.05)
+        return self._respond(request)
+
+
+class SlowNameserver(FakeNameserver):
+    """A FakeNameserver which takes a while to answer.
+
+    Synchronous queries wait until *release* is set, and asynchronous ones
+    sleep briefly.
+    """
+
+    def __init__(self, response):
+        super().__init__(response)
+        self.querying = threading.Event()
+        self.release = threading.Event()
+
+    def query(self, request, *args, **kwargs):
+        self.querying.set()
+        self.release.wait(5)
+        return self._respond(request)
+
+    async def async_query(self, request, *args, **kwargs):
+        await asyncio.sleep(0.1)
+        return self._respond(request)
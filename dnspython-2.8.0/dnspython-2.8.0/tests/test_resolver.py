@@ -15,9 +15,11 @@
 # ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT
 # OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
 
+import os
 import selectors
 import socket
 import sys
+import tempfile
 import time
 import unittest
 from io import StringIO
@@ -27,8 +29,10 @@ import dns.win32util
 import pytest
 
 import dns.e164
+import dns.exception
 import dns.message
 import dns.name
+import dns.nameserver
 import dns.quic
 import dns.rdataclass
 import dns.rdatatype
@@ -332,6 +336,51 @@ class BaseResolverTests(unittest.TestCase):
                 cache.get((name, dns.rdatatype.A, dns.rdataclass.IN)), answer
             )
 
+    def testCacheIncrementalCleaning(self):
+        with FakeTime() as fake_time:
+            cache = dns.resolver.Cache(cleaning_interval=1.0, cleaning_batch=3)
+            now = fake_time.time()
+            for i in range(10):
+                name = dns.name.from_text(f"example{i}.")
+                expiration = now + 1 if i < 7 else now + 100
+                answer = FakeAnswer(expiration)
+                cache.put((name, dns.rdatatype.A, dns.rdataclass.IN), answer)
+            fake_time.sleep(2)
+            # Each operation removes at most cleaning_batch expired entries.
+            cache._maybe_clean()
+            self.assertEqual(len(cache.data), 7)
+            cache._maybe_clean()
+            self.assertEqual(len(cache.data), 4)
+            cache._maybe_clean()
+            self.assertEqual(len(cache.data), 3)
+            # Everything expired has been removed, so cleaning is rescheduled.
+            self.assertEqual(cache.next_cleaning, fake_time.time() + 1.0)
+            self.assertEqual(len(cache.expirations), 3)
+
+    def testCacheCleaningSkipsReplaced(self):
+        with FakeTime() as fake_time:
+            cache = dns.resolver.Cache(cleaning_interval=1.0)
+            key = (dns.name.from_text("example."), dns.rdatatype.A, dns.rdataclass.IN)
+            cache.put(key, FakeAnswer(fake_time.time() + 1))
+            answer = FakeAnswer(fake_time.time() + 100)
+            cache.put(key, answer)
+            fake_time.sleep(2)
+            cache._maybe_clean()
+            self.assertIs(cache.get(key), answer)
+            cache.flush(key)
+            cache._maybe_clean()
+            self.assertIsNone(cache.get(key))
+
+    def testCacheExpirationIndexCompaction(self):
+        cache = dns.resolver.Cache()
+        key = (dns.name.from_text("example."), dns.rdatatype.A, dns.rdataclass.IN)
+        for _ in range(1000):
+            cache.put(key, FakeAnswer(time.time() + 100))
+        self.assertEqual(len(cache.data), 1)
+        self.assertLessEqual(len(cache.expirations), 2 * len(cache.data) + 64)
+        cache.flush()
+        self.assertEqual(len(cache.expirations), 0)
+
     def testIndexErrorOnEmptyRRsetAccess(self):
         def bad():
             message = dns.message.from_text(message_text_mx)
@@ -415,13 +464,101 @@ class BaseResolverTests(unittest.TestCase):
                     cache.get((name, dns.rdatatype.A, dns.rdataclass.IN)) is None
                 )
 
+    def testLRUServeStale(self):
+        with FakeTime() as fake_time:
+            for cache in [
+                dns.resolver.LRUCache(4, stale_ttl=10),
+                dns.resolver.ShardedLRUCache(4, stale_ttl=10),
+            ]:
+                key = (dns.name.from_text("example."), 1, 1)
+                answer = FakeAnswer(time.time() + 1)
+                cache.put(key, answer)
+                self.assertIs(cache.get(key), answer)
+                self.assertFalse(cache.claim_refresh(key))
+                fake_time.sleep(5)
+                # Stale, but still served, and needs refreshing.
+                self.assertIs(cache.get(key), answer)
+                self.assertTrue(cache.claim_refresh(key))
+                self.assertFalse(cache.claim_refresh(key))
+                cache.release_refresh(key)
+                self.assertTrue(cache.claim_refresh(key))
+                fake_time.sleep(10)
+                self.assertIsNone(cache.get(key))
+                self.assertFalse(cache.claim_refresh(key))
+
+    def testLRUPrefetch(self):
+        with FakeTime() as fake_time:
+            cache = dns.resolver.LRUCache(
+                4, prefetch_fraction=0.25, prefetch_min_hits=2
+            )
+            key = (dns.name.from_text("example."), 1, 1)
+            cache.put(key, FakeAnswer(time.time() + 100))
+            cache.get(key)
+            cache.get(key)
+            self.assertFalse(cache.claim_refresh(key))
+            fake_time.sleep(80)
+            self.assertTrue(cache.claim_refresh(key))
+            self.assertFalse(cache.claim_refresh(key))
+            # A refreshed answer replaces the claimed one.
+            cache.put(key, FakeAnswer(time.time() + 100))
+            cache.get(key)
+            fake_time.sleep(80)
+            # Not popular enough yet.
+            self.assertFalse(cache.claim_refresh(key))
+            cache.get(key)
+            self.assertTrue(cache.claim_refresh(key))
+            # Expired answers are not served without stale_ttl.
+            fake_time.sleep(20)
+            self.assertIsNone(cache.get(key))
+
+    def testCacheNeverRefreshes(self):
+        cache = dns.resolver.Cache()
+        key = (dns.name.from_text("example."), 1, 1)
+        cache.put(key, FakeAnswer(time.time() + 1))
+        self.assertFalse(cache.claim_refresh(key))
+        cache.release_refresh(key)
+
+    def test_nameserver_tracker(self):
+        with FakeTime() as fake_time:
+            tracker = dns.resolver.NameserverTracker(backoff=1, max_backoff=4)
+            fast = dns.nameserver.Do53Nameserver("10.0.0.1")
+            slow = dns.nameserver.Do53Nameserver("10.0.0.2")
+            new = dns.nameserver.Do53Nameserver("10.0.0.3")
+            tracker.record_response(fast, 0.01)
+            tracker.record_response(slow, 0.1)
+            tracker.record_response(slow, 0.2)
+            stats = tracker.get_statistics_snapshot()["Do53:10.0.0.2@53"]
+            self.assertAlmostEqual(stats.srtt, 0.1125)
+            self.assertAlmostEqual(stats.rttvar, 0.0625)
+            self.assertEqual(stats.responses, 2)
+            self.assertEqual(tracker.order([slow, fast, new]), [new, fast, slow])
+            tracker.record_failure(fast, timeout=True)
+            self.assertEqual(tracker.order([fast, slow]), [slow, fast])
+            fake_time.sleep(1.5)
+            self.assertEqual(tracker.order([slow, fast]), [fast, slow])
+            # Consecutive failures back off for longer, up to the maximum.
+            for _ in range(5):
+                tracker.record_failure(fast)
+            stats = tracker.get_statistics_snapshot()["Do53:10.0.0.1@53"]
+            self.assertEqual(stats.backoff_until, fake_time.time() + 4)
+            self.assertEqual(stats.consecutive_failures, 6)
+            self.assertEqual(stats.failures, 6)
+            self.assertEqual(stats.timeouts, 1)
+            tracker.record_response(fast, 0.01)
+            stats = tracker.get_statistics_snapshot()["Do53:10.0.0.1@53"]
+            self.assertEqual(stats.consecutive_failures, 0)
+            self.assertEqual(tracker.order([slow, fast]), [fast, slow])
+            tracker.reset_statistics()
+            self.assertEqual(tracker.get_statistics_snapshot(), {})
+
     def test_cache_flush(self):
         name1 = dns.name.from_text("name1")
         name2 = dns.name.from_text("name2")
         name3 = dns.name.from_text("name3")
         basic_cache = dns.resolver.Cache()
         lru_cache = dns.resolver.LRUCache(100)
-        for cache in [basic_cache, lru_cache]:
+        sharded_cache = dns.resolver.ShardedLRUCache(100)
+        for cache in [basic_cache, lru_cache, sharded_cache]:
             answer1 = FakeAnswer(time.time() + 10)
             answer2 = FakeAnswer(time.time() + 10)
             cache.put((name1, dns.rdatatype.A, dns.rdataclass.IN), answer1)
@@ -479,7 +616,12 @@ class BaseResolverTests(unittest.TestCase):
         self.assertTrue(on_lru_list(cache, key, answer2))
 
     def test_cache_stats(self):
-        caches = [dns.resolver.Cache(), dns.resolver.LRUCache(4)]
+        caches = [
+            dns.resolver.Cache(),
+            dns.resolver.LRUCache(4),
+            dns.resolver.ShardedLRUCache(4),
+        ]
+        lru_types = (dns.resolver.LRUCache, dns.resolver.ShardedLRUCache)
         key1 = (dns.name.from_text("key1."), dns.rdatatype.A, dns.rdataclass.IN)
         key2 = (dns.name.from_text("key2."), dns.rdatatype.A, dns.rdataclass.IN)
         for cache in caches:
@@ -489,21 +631,21 @@ class BaseResolverTests(unittest.TestCase):
             self.assertIsNone(a)
             self.assertEqual(cache.hits(), 0)
             self.assertEqual(cache.misses(), 1)
-            if isinstance(cache, dns.resolver.LRUCache):
+            if isinstance(cache, lru_types):
                 self.assertEqual(cache.get_hits_for_key(key1), 0)
             cache.put(key1, answer1)
             a = cache.get(key1)
             self.assertIs(a, answer1)
             self.assertEqual(cache.hits(), 1)
             self.assertEqual(cache.misses(), 1)
-            if isinstance(cache, dns.resolver.LRUCache):
+            if isinstance(cache, lru_types):
                 self.assertEqual(cache.get_hits_for_key(key1), 1)
             cache.put(key2, answer2)
             a = cache.get(key2)
             self.assertIsNone(a)
             self.assertEqual(cache.hits(), 1)
             self.assertEqual(cache.misses(), 2)
-            if isinstance(cache, dns.resolver.LRUCache):
+            if isinstance(cache, lru_types):
                 self.assertEqual(cache.get_hits_for_key(key2), 0)
             stats = cache.get_statistics_snapshot()
             self.assertEqual(stats.hits, 1)
@@ -513,6 +655,193 @@ class BaseResolverTests(unittest.TestCase):
             self.assertEqual(stats.hits, 0)
             self.assertEqual(stats.misses, 0)
 
+    def test_sharded_cache(self):
+        cache = dns.resolver.ShardedLRUCache(8, shards=4)
+        self.assertEqual(len(cache.shards), 4)
+        self.assertEqual(cache.max_size, 8)
+        for shard in cache.shards:
+            self.assertEqual(shard.max_size, 2)
+        keys = [
+            (dns.name.from_text(f"example{i}."), dns.rdatatype.A, dns.rdataclass.IN)
+            for i in range(8)
+        ]
+        answers = [FakeAnswer(time.time() + 10) for _ in keys]
+        for key, answer in zip(keys, answers):
+            self.assertIsNone(cache.get(key))
+            cache.put(key, answer)
+        # The same key always lands in the same shard, regardless of case.
+        upper = (dns.name.from_text("EXAMPLE0."), dns.rdatatype.A, dns.rdataclass.IN)
+        self.assertIs(cache._shard(upper), cache._shard(keys[0]))
+        found = 0
+        for key, answer in zip(keys, answers):
+            canswer = cache.get(key)
+            if canswer is not None:
+                self.assertIs(canswer, answer)
+                self.assertEqual(cache.get_hits_for_key(key), 1)
+                found += 1
+        self.assertEqual(found, sum(len(shard.data) for shard in cache.shards))
+        self.assertEqual(cache.hits(), found)
+        self.assertEqual(cache.misses(), 8 + 8 - found)
+        stats = cache.get_statistics_snapshot()
+        self.assertEqual(stats.hits, found)
+        self.assertEqual(stats.misses, 16 - found)
+        cache.flush(keys[0])
+        self.assertIsNone(cache.get(keys[0]))
+        cache.flush()
+        for shard in cache.shards:
+            self.assertEqual(len(shard.data), 0)
+        cache.reset_statistics()
+        stats = cache.get_statistics_snapshot()
+        self.assertEqual(stats.hits, 0)
+        self.assertEqual(stats.misses, 0)
+
+    def test_sharded_cache_sizes(self):
+        cache = dns.resolver.ShardedLRUCache(10, shards=0)
+        self.assertEqual(len(cache.shards), 1)
+        self.assertEqual(cache.shards[0].max_size, 10)
+        cache = dns.resolver.ShardedLRUCache(10, shards=4)
+        self.assertEqual(cache.shards[0].max_size, 3)
+        cache.set_max_size(0)
+        self.assertEqual(cache.max_size, 1)
+        self.assertEqual(cache.shards[0].max_size, 1)
+
+    def test_cache_dump_and_load(self):
+        filename = tests.util.here("cache.snapshot")
+        with FakeTime() as fake_time:
+            now = fake_time.time()
+            for cache_class in [
+                dns.resolver.Cache,
+                dns.resolver.LRUCache,
+                dns.resolver.ShardedLRUCache,
+            ]:
+                cache = cache_class()
+                keys = []
+                for i, ttl in enumerate([10, 100]):
+                    name = dns.name.from_text(f"example{i}.")
+                    message = dns.message.from_text(
+                        message_text.replace(
+                            "example. 1", f"example{i}. {ttl}"
+                        ).replace("example.", f"example{i}.")
+                    )
+                    answer = dns.resolver.Answer(
+                        name,
+                        dns.rdatatype.A,
+                        dns.rdataclass.IN,
+                        message,
+                        "10.0.0.53",
+                        53,
+                    )
+                    key = (name, dns.rdatatype.A, dns.rdataclass.IN)
+                    cache.put(key, answer)
+                    keys.append(key)
+                try:
+                    self.assertEqual(cache.dump(filename), 2)
+                    # The first answer expires before the snapshot is loaded.
+                    fake_time.sleep(50)
+                    new_cache = cache_class()
+                    self.assertEqual(new_cache.load(filename), 1)
+                finally:
+                    os.unlink(filename)
+                self.assertIsNone(new_cache.get(keys[0]))
+                answer = new_cache.get(keys[1])
+                self.assertEqual(answer.qname, keys[1][0])
+                self.assertEqual(answer.rdtype, dns.rdatatype.A)
+                self.assertEqual(answer.nameserver, "10.0.0.53")
+                self.assertEqual(answer.port, 53)
+                self.assertEqual(answer.expiration, now + 100)
+                self.assertEqual(answer.rrset, cache.get(keys[1]).rrset)
+                fake_time.now = now
+
+    def test_cache_dump_and_load_lru_order(self):
+        filename = tests.util.here("cache.snapshot")
+        cache = dns.resolver.LRUCache(4)
+        message = dns.message.from_text(message_text)
+        answer = dns.resolver.Answer(
+            message.question[0].name, dns.rdatatype.A, dns.rdataclass.IN, message
+        )
+        answer.expiration = time.time() + 100
+        for i in range(4):
+            name = dns.name.from_text(f"example{i}.")
+            cache.put((name, dns.rdatatype.A, dns.rdataclass.IN), answer)
+        # example0 is now the most recently used.
+        key = (dns.name.from_text("example0."), dns.rdatatype.A, dns.rdataclass.IN)
+        cache.get(key)
+        try:
+            cache.dump(filename)
+            new_cache = dns.resolver.LRUCache(2)
+            self.assertEqual(new_cache.load(filename), 4)
+        finally:
+            os.unlink(filename)
+        names = {key[0].to_text() for key in new_cache.data}
+        self.assertEqual(names, {"example0.", "example3."})
+
+    def test_cache_dump_temporary_file(self):
+        cache = dns.resolver.Cache()
+        message = dns.message.from_text(message_text)
+        answer = dns.resolver.Answer(
+            message.question[0].name, dns.rdatatype.A, dns.rdataclass.IN, message
+        )
+        answer.expiration = time.time() + 100
+        cache.put((answer.qname, dns.rdatatype.A, dns.rdataclass.IN), answer)
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, "cache.snapshot")
+            self.assertEqual(cache.dump(filename), 1)
+            self.assertEqual(cache.dump(filename), 1)
+            # The temporary files have all been renamed.
+            self.assertEqual(os.listdir(dirname), ["cache.snapshot"])
+            self.assertEqual(dns.resolver.Cache().load(filename), 1)
+
+    def test_cache_base_needs_subclass_methods(self):
+        class MyCache(dns.resolver.CacheBase):
+            pass
+
+        cache = MyCache()
+        key = (dns.name.from_text("example."), dns.rdatatype.A, dns.rdataclass.IN)
+        with self.assertRaises(NotImplementedError):
+            cache.get(key)
+        with tempfile.TemporaryDirectory() as dirname:
+            with self.assertRaises(NotImplementedError):
+                cache.dump(os.path.join(dirname, "cache.snapshot"))
+            self.assertEqual(os.listdir(dirname), [])
+
+    def test_cache_load_bad_snapshot(self):
+        filename = tests.util.here("cache.snapshot")
+        for contents in [b"", b"NOTACACHESNAPSHOT"]:
+            with open(filename, "wb") as f:
+                f.write(contents)
+            try:
+                with self.assertRaises(ValueError):
+                    dns.resolver.Cache().load(filename)
+            finally:
+                os.unlink(filename)
+
+    def test_cache_load_malformed_response(self):
+        message = dns.message.from_text(message_text)
+        rrset = message.find_rrset(
+            message.additional,
+            message.question[0].name,
+            dns.rdataclass.IN,
+            dns.rdatatype.A,
+            create=True,
+        )
+        rrset.add(
+            dns.rdata.GenericRdata(dns.rdataclass.IN, dns.rdatatype.A, b"\x0a\x00")
+        )
+        # Only the additional section is malformed, so a lazy read succeeds.
+        message = dns.message.from_wire(message.to_wire(), lazy=True)
+        answer = dns.resolver.Answer(
+            message.question[0].name, dns.rdatatype.A, dns.rdataclass.IN, message
+        )
+        answer.expiration = time.time() + 100
+        cache = dns.resolver.Cache()
+        cache.put((answer.qname, dns.rdatatype.A, dns.rdataclass.IN), answer)
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, "cache.snapshot")
+            self.assertEqual(cache.dump(filename), 1)
+            new_cache = dns.resolver.Cache()
+            with self.assertRaises(dns.exception.FormError):
+                new_cache.load(filename)
+
     def testEmptyAnswerSection(self):
         # TODO: dangling_cname_0_message_text was the only sample message
         #       with an empty answer section. Other than that it doesn't
@@ -24,94 +24,96 @@ Token = dns.tokenizer.Token
 
 
 class TokenizerTestCase(unittest.TestCase):
+    Tokenizer = dns.tokenizer.Tokenizer
+
     def testStr(self):
-        tok = dns.tokenizer.Tokenizer("foo")
+        tok = self.Tokenizer("foo")
         token = tok.get()
         self.assertEqual(token, Token(dns.tokenizer.IDENTIFIER, "foo"))
 
     def testQuotedString1(self):
-        tok = dns.tokenizer.Tokenizer(r'"foo"')
+        tok = self.Tokenizer(r'"foo"')
         token = tok.get()
         self.assertEqual(token, Token(dns.tokenizer.QUOTED_STRING, "foo"))
 
     def testQuotedString2(self):
-        tok = dns.tokenizer.Tokenizer(r'""')
+        tok = self.Tokenizer(r'""')
         token = tok.get()
         self.assertEqual(token, Token(dns.tokenizer.QUOTED_STRING, ""))
 
     def testQuotedString3(self):
-        tok = dns.tokenizer.Tokenizer(r'"\"foo\""')
+        tok = self.Tokenizer(r'"\"foo\""')
         token = tok.get()
         self.assertEqual(token, Token(dns.tokenizer.QUOTED_STRING, '\\"foo\\"'))
 
     def testQuotedString4(self):
-        tok = dns.tokenizer.Tokenizer(r'"foo\010bar"')
+        tok = self.Tokenizer(r'"foo\010bar"')
         token = tok.get()
         self.assertEqual(token, Token(dns.tokenizer.QUOTED_STRING, "foo\\010bar"))
 
     def testQuotedString5(self):
         with self.assertRaises(dns.exception.UnexpectedEnd):
-            tok = dns.tokenizer.Tokenizer(r'"foo')
+            tok = self.Tokenizer(r'"foo')
             tok.get()
 
     def testQuotedString6(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer(r'"foo\01')
+            tok = self.Tokenizer(r'"foo\01')
             tok.get()
 
     def testQuotedString7(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer('"foo\nbar"')
+            tok = self.Tokenizer('"foo\nbar"')
             tok.get()
 
     def testEmpty1(self):
-        tok = dns.tokenizer.Tokenizer("")
+        tok = self.Tokenizer("")
         token = tok.get()
         self.assertTrue(token.is_eof())
 
     def testEmpty2(self):
-        tok = dns.tokenizer.Tokenizer("")
+        tok = self.Tokenizer("")
         token1 = tok.get()
         token2 = tok.get()
         self.assertTrue(token1.is_eof() and token2.is_eof())
 
     def testEOL(self):
-        tok = dns.tokenizer.Tokenizer("\n")
+        tok = self.Tokenizer("\n")
         token1 = tok.get()
         token2 = tok.get()
         self.assertTrue(token1.is_eol() and token2.is_eof())
 
     def testWS1(self):
-        tok = dns.tokenizer.Tokenizer(" \n")
+        tok = self.Tokenizer(" \n")
         token1 = tok.get()
         self.assertTrue(token1.is_eol())
 
     def testWS2(self):
-        tok = dns.tokenizer.Tokenizer(" \n")
+        tok = self.Tokenizer(" \n")
         token1 = tok.get(want_leading=True)
         self.assertTrue(token1.is_whitespace())
 
     def testComment1(self):
-        tok = dns.tokenizer.Tokenizer(" ;foo\n")
+        tok = self.Tokenizer(" ;foo\n")
         token1 = tok.get()
         self.assertTrue(token1.is_eol())
 
     def testComment2(self):
-        tok = dns.tokenizer.Tokenizer(" ;foo\n")
+        tok = self.Tokenizer(" ;foo\n")
         token1 = tok.get(want_comment=True)
         token2 = tok.get()
         self.assertEqual(token1, Token(dns.tokenizer.COMMENT, "foo"))
         self.assertTrue(token2.is_eol())
 
     def testComment3(self):
-        tok = dns.tokenizer.Tokenizer(" ;foo bar\n")
+        tok = self.Tokenizer(" ;foo bar\n")
         token1 = tok.get(want_comment=True)
         token2 = tok.get()
         self.assertEqual(token1, Token(dns.tokenizer.COMMENT, "foo bar"))
         self.assertTrue(token2.is_eol())
 
     def testMultiline1(self):
-        tok = dns.tokenizer.Tokenizer("( foo\n\n bar\n)")
+        tok = self.Tokenizer("( foo\n\n bar\n)")
         tokens = list(iter(tok))
         self.assertEqual(
             tokens,
@@ -122,7 +124,7 @@ class TokenizerTestCase(unittest.TestCase):
         )
 
     def testMultiline2(self):
-        tok = dns.tokenizer.Tokenizer("( foo\n\n bar\n)\n")
+        tok = self.Tokenizer("( foo\n\n bar\n)\n")
         tokens = list(iter(tok))
         self.assertEqual(
             tokens,
@@ -135,16 +137,16 @@ class TokenizerTestCase(unittest.TestCase):
 
     def testMultiline3(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("foo)")
+            tok = self.Tokenizer("foo)")
             list(iter(tok))
 
     def testMultiline4(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("((foo)")
+            tok = self.Tokenizer("((foo)")
             list(iter(tok))
 
     def testUnget1(self):
-        tok = dns.tokenizer.Tokenizer("foo")
+        tok = self.Tokenizer("foo")
         t1 = tok.get()
         tok.unget(t1)
         t2 = tok.get()
@@ -154,144 +156,144 @@ class TokenizerTestCase(unittest.TestCase):
 
     def testUnget2(self):
         with self.assertRaises(dns.tokenizer.UngetBufferFull):
-            tok = dns.tokenizer.Tokenizer("foo")
+            tok = self.Tokenizer("foo")
             t1 = tok.get()
             tok.unget(t1)
             tok.unget(t1)
 
     def testGetEOL1(self):
-        tok = dns.tokenizer.Tokenizer("\n")
+        tok = self.Tokenizer("\n")
         t = tok.get_eol()
         self.assertEqual(t, "\n")
 
     def testGetEOL2(self):
-        tok = dns.tokenizer.Tokenizer("")
+        tok = self.Tokenizer("")
         t = tok.get_eol()
         self.assertEqual(t, "")
 
     def testEscapedDelimiter1(self):
-        tok = dns.tokenizer.Tokenizer(r"ch\ ld")
+        tok = self.Tokenizer(r"ch\ ld")
         t = tok.get()
         self.assertEqual(t.ttype, dns.tokenizer.IDENTIFIER)
         self.assertEqual(t.value, r"ch\ ld")
 
     def testEscapedDelimiter2(self):
-        tok = dns.tokenizer.Tokenizer(r"ch\032ld")
+        tok = self.Tokenizer(r"ch\032ld")
         t = tok.get()
         self.assertEqual(t.ttype, dns.tokenizer.IDENTIFIER)
         self.assertEqual(t.value, r"ch\032ld")
 
     def testEscapedDelimiter3(self):
-        tok = dns.tokenizer.Tokenizer(r"ch\ild")
+        tok = self.Tokenizer(r"ch\ild")
         t = tok.get()
         self.assertEqual(t.ttype, dns.tokenizer.IDENTIFIER)
         self.assertEqual(t.value, r"ch\ild")
 
     def testEscapedDelimiter1u(self):
-        tok = dns.tokenizer.Tokenizer(r"ch\ ld")
+        tok = self.Tokenizer(r"ch\ ld")
         t = tok.get().unescape()
         self.assertEqual(t.ttype, dns.tokenizer.IDENTIFIER)
         self.assertEqual(t.value, r"ch ld")
 
     def testEscapedDelimiter2u(self):
-        tok = dns.tokenizer.Tokenizer(r"ch\032ld")
+        tok = self.Tokenizer(r"ch\032ld")
         t = tok.get().unescape()
         self.assertEqual(t.ttype, dns.tokenizer.IDENTIFIER)
         self.assertEqual(t.value, "ch ld")
 
     def testEscapedDelimiter3u(self):
-        tok = dns.tokenizer.Tokenizer(r"ch\ild")
+        tok = self.Tokenizer(r"ch\ild")
         t = tok.get().unescape()
         self.assertEqual(t.ttype, dns.tokenizer.IDENTIFIER)
         self.assertEqual(t.value, r"child")
 
     def testGetUInt(self):
-        tok = dns.tokenizer.Tokenizer("1234")
+        tok = self.Tokenizer("1234")
         v = tok.get_int()
         self.assertEqual(v, 1234)
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer('"1234"')
+            tok = self.Tokenizer('"1234"')
             tok.get_int()
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("q1234")
+            tok = self.Tokenizer("q1234")
             tok.get_int()
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("281474976710656")
+            tok = self.Tokenizer("281474976710656")
             tok.get_uint48()
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("4294967296")
+            tok = self.Tokenizer("4294967296")
             tok.get_uint32()
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("65536")
+            tok = self.Tokenizer("65536")
             tok.get_uint16()
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("256")
+            tok = self.Tokenizer("256")
             tok.get_uint8()
         # Even though it is badly named get_int(), it's really get_unit!
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("-1234")
+            tok = self.Tokenizer("-1234")
             tok.get_int()
         # get_uint16 can do other bases too, and has a custom error
         # for base 8.
-        tok = dns.tokenizer.Tokenizer("177777")
+        tok = self.Tokenizer("177777")
         self.assertEqual(tok.get_uint16(base=8), 65535)
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("200000")
+            tok = self.Tokenizer("200000")
             tok.get_uint16(base=8)
 
     def testGetString(self):
-        tok = dns.tokenizer.Tokenizer("foo")
+        tok = self.Tokenizer("foo")
         v = tok.get_string()
         self.assertEqual(v, "foo")
-        tok = dns.tokenizer.Tokenizer('"foo"')
+        tok = self.Tokenizer('"foo"')
         v = tok.get_string()
         self.assertEqual(v, "foo")
-        tok = dns.tokenizer.Tokenizer("abcdefghij")
+        tok = self.Tokenizer("abcdefghij")
         v = tok.get_string(max_length=10)
         self.assertEqual(v, "abcdefghij")
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("abcdefghij")
+            tok = self.Tokenizer("abcdefghij")
             tok.get_string(max_length=9)
-        tok = dns.tokenizer.Tokenizer("")
+        tok = self.Tokenizer("")
         with self.assertRaises(dns.exception.SyntaxError):
             tok.get_string()
 
     def testMultiLineWithComment(self):
-        tok = dns.tokenizer.Tokenizer("( ; abc\n)")
+        tok = self.Tokenizer("( ; abc\n)")
         tok.get_eol()
         # Nothing to assert here, as we're testing tok.get_eol() does NOT
         # raise.
 
     def testEOLAfterComment(self):
-        tok = dns.tokenizer.Tokenizer("; abc\n")
+        tok = self.Tokenizer("; abc\n")
         t = tok.get()
         self.assertTrue(t.is_eol())
 
     def testEOFAfterComment(self):
-        tok = dns.tokenizer.Tokenizer("; abc")
+        tok = self.Tokenizer("; abc")
         t = tok.get()
         self.assertTrue(t.is_eof())
 
     def testMultiLineWithEOFAfterComment(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("( ; abc")
+            tok = self.Tokenizer("( ; abc")
             tok.get_eol()
 
     def testEscapeUnexpectedEnd(self):
         with self.assertRaises(dns.exception.UnexpectedEnd):
-            tok = dns.tokenizer.Tokenizer("\\")
+            tok = self.Tokenizer("\\")
             tok.get()
 
     def testEscapeBounds(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("\\256")
+            tok = self.Tokenizer("\\256")
             tok.get().unescape()
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer("\\256")
+            tok = self.Tokenizer("\\256")
             tok.get().unescape_to_bytes()
 
     def testGetUngetRegetComment(self):
-        tok = dns.tokenizer.Tokenizer(";comment")
+        tok = self.Tokenizer(";comment")
         t1 = tok.get(want_comment=True)
         tok.unget(t1)
         t2 = tok.get(want_comment=True)
@@ -299,27 +301,27 @@ class TokenizerTestCase(unittest.TestCase):
 
     def testBadAsName(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer('"not an identifier"')
+            tok = self.Tokenizer('"not an identifier"')
             t = tok.get()
             tok.as_name(t)
 
     def testBadGetTTL(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer('"not an identifier"')
+            tok = self.Tokenizer('"not an identifier"')
             tok.get_ttl()
 
     def testBadGetEOL(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer('"not an identifier"')
+            tok = self.Tokenizer('"not an identifier"')
             tok.get_eol_as_token()
 
     def testDanglingEscapes(self):
         for text in ['"\\"', '"\\0"', '"\\00"', '"\\00a"']:
             with self.assertRaises(dns.exception.SyntaxError):
-                tok = dns.tokenizer.Tokenizer(text)
+                tok = self.Tokenizer(text)
                 tok.get().unescape()
             with self.assertRaises(dns.exception.SyntaxError):
-                tok = dns.tokenizer.Tokenizer(text)
+                tok = self.Tokenizer(text)
                 tok.get().unescape_to_bytes()
 
     def testTokenMisc(self):
@@ -334,22 +336,22 @@ class TokenizerTestCase(unittest.TestCase):
 
     def testBadConcatenateRemaining(self):
         with self.assertRaises(dns.exception.SyntaxError):
-            tok = dns.tokenizer.Tokenizer('a b "not an identifier" c')
+            tok = self.Tokenizer('a b "not an identifier" c')
             tok.concatenate_remaining_identifiers()
 
     def testStdinFilename(self):
-        tok = dns.tokenizer.Tokenizer()
+        tok = self.Tokenizer()
         self.assertEqual(tok.filename, "<stdin>")
 
     def testBytesLiteral(self):
-        tok = dns.tokenizer.Tokenizer(b"this is input")
+        tok = self.Tokenizer(b"this is input")
         self.assertEqual(tok.get().value, "this")
         self.assertEqual(tok.filename, "<string>")
-        tok = dns.tokenizer.Tokenizer(b"this is input", "myfilename")
+        tok = self.Tokenizer(b"this is input", "myfilename")
         self.assertEqual(tok.filename, "myfilename")
 
     def testUngetBranches(self):
-        tok = dns.tokenizer.Tokenizer(b"    this is input")
+        tok = self.Tokenizer(b"    this is input")
         t = tok.get(want_leading=True)
         tok.unget(t)
         t = tok.get(want_leading=True)
@@ -358,7 +360,7 @@ class TokenizerTestCase(unittest.TestCase):
         t = tok.get()
         self.assertEqual(t.ttype, dns.tokenizer.IDENTIFIER)
         self.assertEqual(t.value, "this")
-        tok = dns.tokenizer.Tokenizer(b";    this is input\n")
+        tok = self.Tokenizer(b";    this is input\n")
         t = tok.get(want_comment=True)
         tok.unget(t)
         t = tok.get(want_comment=True)
@@ -368,5 +370,64 @@ class TokenizerTestCase(unittest.TestCase):
         self.assertEqual(t.ttype, dns.tokenizer.EOL)
 
 
+class SmallBlockTokenizer(dns.tokenizer.BufferedTokenizer):
+    _block_size = 3
+
+
+class BufferedTokenizerTestCase(TokenizerTestCase):
+    Tokenizer = dns.tokenizer.BufferedTokenizer
+
+    text = (
+        "$ORIGIN example.\n"
+        "@ 300 IN SOA ns1 hostmaster ( 1 ; serial\n"
+        "  7200 900\n"
+        "  1209600 300 )\n"
+        "\t  NS ns1 ; a comment\n"
+        'txt TXT "a" "" "b\\"c" \\# "d e"\t"f"\n'
+        "\n"
+        "  ;  only a comment\n"
+        "esc\\.aped A 10.0.0.1\n"
+        "multi ( TXT\n"
+        ' "x" ; inner\n'
+        '   "y" )  ;trailing\n'
+        "last A 10.0.0.2"
+    )
+
+    def tokens(self, tok, want_leading, want_comment):
+        tokens = []
+        while True:
+            token = tok.get(want_leading, want_comment)
+            tokens.append(
+                (
+                    token.ttype,
+                    token.value,
+                    token.has_escape,
+                    token.comment,
+                    tok.where(),
+                )
+            )
+            if token.is_eof():
+                return tokens
+
+    def testSameAsTokenizer(self):
+        for want_leading in (False, True):
+            for want_comment in (False, True):
+                expected = self.tokens(
+                    dns.tokenizer.Tokenizer(self.text), want_leading, want_comment
+                )
+                for tokenizer_class in (self.Tokenizer, SmallBlockTokenizer):
+                    tok = tokenizer_class(self.text)
+                    self.assertEqual(
+                        self.tokens(tok, want_leading, want_comment), expected
+                    )
+
+    def testSameErrors(self):
+        for text in ('a "b\nc"', "a )", "( a", 'a "b', "a\\"):
+            for tokenizer_class in (dns.tokenizer.Tokenizer, self.Tokenizer):
+                tok = tokenizer_class(text)
+                with self.assertRaises(dns.exception.SyntaxError):
+                    self.tokens(tok, False, False)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -54,6 +54,19 @@ class BinaryTestCase(unittest.TestCase):
         # verify the restore_furthest()
         self.assertEqual(p.current, len(wire))
 
+    def test_skip_name(self):
+        wire = b"\x09dnspython\x03org\x00\x03www\xc0\x00\x00\x01"
+        p = dns.wire.Parser(wire)
+        p.skip_name()
+        self.assertEqual(p.current, 15)
+        p.skip_name()
+        self.assertEqual(p.current, 21)
+        self.assertEqual(p.get_uint16(), 1)
+        with self.assertRaises(dns.exception.FormError):
+            dns.wire.Parser(b"\x03www\x09dns").skip_name()
+        with self.assertRaises(dns.name.BadLabelType):
+            dns.wire.Parser(b"\x03www\x40").skip_name()
+
     def test_seek(self):
         wire = b"\x09dnspython\x03org\x00"
         p = dns.wire.Parser(wire)
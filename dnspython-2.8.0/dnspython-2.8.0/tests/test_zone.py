@@ -19,9 +19,11 @@
 import difflib
 import os
 import sys
+import tempfile
 import unittest
 from io import BytesIO, StringIO
 from typing import cast
+from unittest.mock import patch
 
 import dns.btreezone
 import dns.exception
@@ -34,7 +36,10 @@ import dns.rdataset
 import dns.rdatatype
 import dns.rrset
 import dns.versioned
+import dns.wire
 import dns.zone
+import dns.zonefile
+import dns.zonesnapshot
 from tests.util import here
 
 example_text = """$TTL 3600
@@ -449,6 +454,74 @@ class ZoneTestCase(unittest.TestCase):
                 os.unlink(here("example4-textual.out"))
         self.assertTrue(ok)
 
+    def testToFileSortChunkSize(self):
+        z = dns.zone.from_file(here("example"), "example")
+        text = z.to_text()
+        for chunk_size in (1, 2, 7, 10000):
+            f = StringIO()
+            z.to_file(f, sort_chunk_size=chunk_size)
+            self.assertEqual(f.getvalue(), text)
+
+    def testSortedNames(self):
+        names = [
+            dns.name.from_text(text, None)
+            for text in ("b", "A", "a.b", "\\000", "*", "z.A", "@", "b.b", "Z")
+        ] * 3
+        for chunk_size in (1, 2, 4, 100):
+            self.assertEqual(
+                list(dns.zone._sorted_names(names, chunk_size)), sorted(names)
+            )
+
+    def testSortedNamesMergePasses(self):
+        names = [dns.name.from_text(f"n{i}", None) for i in range(200)]
+        names.reverse()
+        # With a fan-in of 2, the 100 runs are merged in several passes.
+        with patch.object(dns.zone, "_MERGE_FAN_IN", 2):
+            with patch.object(dns.zone, "_RUN_BUFFER_SIZE", 5):
+                self.assertEqual(list(dns.zone._sorted_names(names, 2)), sorted(names))
+
+    def testToWire(self):
+        z = dns.zone.from_file(here("example"), "example")
+        f = BytesIO()
+        z.to_wire(f)
+        wire = f.getvalue()
+        origin = dns.name.from_text("example")
+        parser = dns.wire.Parser(wire)
+        names = []
+        rdatasets = {}
+        while parser.remaining() > 0:
+            name = dns.name.from_wire_parser(parser)
+            (rdtype, rdclass, ttl, rdlen) = parser.get_struct("!HHIH")
+            with parser.restrict_to(rdlen):
+                rd = dns.rdata.from_wire_parser(rdclass, rdtype, parser, origin)
+            if not names or names[-1] != name:
+                names.append(name)
+            rdataset = rdatasets.get((name, rd.rdtype, rd.covers()))
+            if rdataset is None:
+                rdataset = dns.rdataset.Rdataset(rdclass, rdtype, rd.covers(), ttl)
+                rdatasets[(name, rd.rdtype, rd.covers())] = rdataset
+            rdataset.add(rd)
+        self.assertEqual(names, sorted(name.derelativize(origin) for name in z.keys()))
+        self.assertEqual(len(rdatasets), len(list(z.iterate_rdatasets())))
+        for name, rdataset in z.iterate_rdatasets():
+            rdataset2 = rdatasets[
+                (name.derelativize(origin), rdataset.rdtype, rdataset.covers)
+            ]
+            self.assertEqual(rdataset2, rdataset)
+            self.assertEqual(rdataset2.ttl, rdataset.ttl)
+        f = BytesIO()
+        z.to_wire(f, sort_chunk_size=5)
+        self.assertEqual(f.getvalue(), wire)
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "example.wire")
+            z.to_wire(path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), wire)
+
+    def testToWireUnknownOrigin(self):
+        with self.assertRaises(dns.zone.UnknownOrigin):
+            dns.zone.Zone(None).to_wire(BytesIO())
+
     def testToFileBinaryWithOrigin(self):
         z = dns.zone.from_file(here("example"), "example")
         try:
@@ -1347,6 +1420,270 @@ class VersionedZoneTestCase(unittest.TestCase):
 class BTreeZoneTestCase(VersionedZoneTestCase):
     zone_factory = dns.btreezone.Zone
 
+    def testToFileInOrder(self):
+        z = dns.zone.from_file(here("example"), "example")
+        bz = dns.zone.from_file(
+            here("example"), "example", zone_factory=self.zone_factory
+        )
+        self.assertEqual(bz.to_text(), z.to_text())
+        f = StringIO()
+        bz.to_file(f, sort_chunk_size=1)
+        self.assertEqual(f.getvalue(), z.to_text())
+        (f, bf) = (BytesIO(), BytesIO())
+        z.to_wire(f)
+        bz.to_wire(bf)
+        self.assertEqual(bf.getvalue(), f.getvalue())
+
+
+parallel_text = """$ORIGIN example.
+@ 3600 soa foo bar (1 2 3 4 5)
+$TTL 300
+@ ns ns1
+@ ns ns2
+ns1 a 10.0.0.1
+ns2 a 10.0.0.2
+txt txt "a (" "b ;"
+    txt "c" ; )
+mx mx (
+    10
+    mail
+)
+$ORIGIN sub.example.
+www a 10.0.0.3
+$TTL 60
+www aaaa ::1
+mail a 10.0.0.4
+"""
+
+parallel_bad_text = """$TTL 300
+$ORIGIN example.
+@ soa foo bar 1 2 3 4 5
+@ ns ns1
+ns1 a 10.0.0.1
+www a 10.0.0.2
+bad a 10.0.0.3.4
+"""
+
+parallel_cname_and_other_data_text = """$TTL 3600
+$ORIGIN example.
+@ soa foo bar 1 2 3 4 5
+@ ns ns1
+ns1 a 10.0.0.1
+web a 10.0.0.4
+web cname www
+"""
+
+
+class ParallelZoneTestCase(unittest.TestCase):
+    zone_factory = dns.zone.Zone
+
+    def setUp(self):
+        # Split at every possible line, so small zones are read by several
+        # workers.
+        self.min_chunk_size = dns.zonefile._MIN_CHUNK_SIZE
+        dns.zonefile._MIN_CHUNK_SIZE = 1
+
+    def tearDown(self):
+        dns.zonefile._MIN_CHUNK_SIZE = self.min_chunk_size
+
+    def checkSame(self, text, origin="example.", **kwargs):
+        serial = dns.zone.from_text(
+            text, origin, zone_factory=self.zone_factory, **kwargs
+        )
+        parallel = dns.zone.from_text(
+            text, origin, zone_factory=self.zone_factory, processes=4, **kwargs
+        )
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel.to_text(), serial.to_text())
+
+    def testSplit(self):
+        chunks = dns.zonefile._split(
+            parallel_text, dns.name.from_text("example."), {"$ORIGIN", "$TTL"}, None, 1
+        )
+        self.assertEqual(
+            [(line, str(origin), ttl) for (_, line, origin, ttl) in chunks],
+            [
+                (1, "example.", -1),
+                (4, "example.", 300),
+                (5, "example.", 300),
+                (6, "example.", 300),
+                (7, "example.", 300),
+                (8, "example.", 300),
+                (10, "example.", 300),
+                (15, "sub.example.", 300),
+                (17, "sub.example.", 60),
+                (18, "sub.example.", 60),
+            ],
+        )
+        self.assertEqual("".join(chunk[0] for chunk in chunks), parallel_text)
+
+    def testSplitStops(self):
+        text = parallel_text.replace("www a 10.0.0.3", 'www txt "a\\\nb"')
+        chunks = dns.zonefile._split(
+            text, dns.name.from_text("example."), {"$ORIGIN", "$TTL"}, None, 1
+        )
+        self.assertEqual(len(chunks), 8)
+        self.assertEqual(chunks[-1][1], 15)
+
+    def testSameAsSerial(self):
+        self.checkSame(parallel_text)
+
+    def testSameAsSerialNotRelativized(self):
+        self.checkSame(parallel_text, relativize=False)
+
+    def testSameAsSerialExample(self):
+        with open(here("example")) as f:
+            text = f.read()
+        self.checkSame(text, "example")
+
+    def testFromFile(self):
+        serial = dns.zone.from_file(
+            here("example"), "example", zone_factory=self.zone_factory
+        )
+        parallel = dns.zone.from_file(
+            here("example"), "example", zone_factory=self.zone_factory, processes=2
+        )
+        self.assertEqual(parallel, serial)
+
+    def testSameError(self):
+        with self.assertRaises(dns.exception.SyntaxError) as serial:
+            dns.zone.from_text(
+                parallel_bad_text, "example.", zone_factory=self.zone_factory
+            )
+        with self.assertRaises(dns.exception.SyntaxError) as parallel:
+            dns.zone.from_text(
+                parallel_bad_text,
+                "example.",
+                zone_factory=self.zone_factory,
+                processes=4,
+            )
+        self.assertEqual(str(parallel.exception), str(serial.exception))
+        self.assertTrue(str(parallel.exception).startswith("<string>:8:"))
+
+    def testCNAMEAndOtherDataInDifferentChunks(self):
+        with self.assertRaises(dns.zonefile.CNAMEAndOtherData):
+            dns.zone.from_text(
+                parallel_cname_and_other_data_text,
+                "example.",
+                zone_factory=self.zone_factory,
+                processes=4,
+            )
+
+    def testNoOriginIsSerial(self):
+        z = dns.zone.from_text(
+            example_text, zone_factory=self.zone_factory, processes=4
+        )
+        self.assertEqual(z.origin, dns.name.from_text("example."))
+
+
+class VersionedParallelZoneTestCase(ParallelZoneTestCase):
+    zone_factory = dns.versioned.Zone
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.zone = dns.zone.from_file(here("example"), "example")
+
+    def snapshot(self, zone):
+        f = BytesIO()
+        zone.to_snapshot(f)
+        f.seek(0)
+        return f
+
+    def testRoundTrip(self):
+        z = dns.zone.from_snapshot(self.snapshot(self.zone))
+        self.assertIsInstance(z.nodes, dns.zonesnapshot.SnapshotNodes)
+        self.assertEqual(z.origin, self.zone.origin)
+        self.assertEqual(z.rdclass, self.zone.rdclass)
+        self.assertTrue(z.relativize)
+        self.assertEqual(len(z.nodes), len(self.zone.nodes))
+        self.assertEqual(set(z.keys()), set(self.zone.keys()))
+        self.assertEqual(z, self.zone)
+
+    def testRoundTripNotRelativized(self):
+        zone = dns.zone.from_file(here("example"), "example", relativize=False)
+        z = dns.zone.from_snapshot(self.snapshot(zone))
+        self.assertFalse(z.relativize)
+        self.assertEqual(z, zone)
+        self.assertIsNotNone(z.get_node("ns1.example."))
+        self.assertIs(z.get_node("ns1"), z.get_node("NS1.example."))
+
+    def testRoundTripFile(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "example.snapshot")
+            self.zone.to_snapshot(path)
+            z = dns.zone.from_snapshot(path)
+            self.assertEqual(z, self.zone)
+            with open(path, "rb") as f:
+                z = dns.zone.from_snapshot(f)
+            self.assertEqual(z, self.zone)
+
+    def testLazy(self):
+        z = dns.zone.from_snapshot(self.snapshot(self.zone))
+        names = list(z.nodes)
+        self.assertFalse(any(z.nodes.is_loaded(name) for name in names))
+        rds = z.get_rdataset("NS1", "A")
+        self.assertEqual(rds, self.zone.get_rdataset("ns1", "A"))
+        self.assertEqual(rds.ttl, self.zone.get_rdataset("ns1", "A").ttl)
+        self.assertTrue(z.nodes.is_loaded(dns.name.from_text("ns1", None)))
+        self.assertEqual(sum(z.nodes.is_loaded(name) for name in names), 1)
+        self.assertTrue("ns2" in z)
+        self.assertFalse("nonexistent" in z)
+        self.assertEqual(sum(z.nodes.is_loaded(name) for name in names), 1)
+        self.assertIs(z.find_node("ns1"), z.find_node("ns1"))
+        with self.assertRaises(KeyError):
+            z.find_node("nonexistent")
+
+    def testNotLazy(self):
+        z = dns.zone.from_snapshot(self.snapshot(self.zone), lazy=False)
+        self.assertIsInstance(z.nodes, dict)
+        self.assertEqual(z, self.zone)
+
+    def testVersioned(self):
+        z = dns.zone.from_snapshot(
+            self.snapshot(self.zone), zone_factory=dns.versioned.Zone
+        )
+        self.assertIsInstance(z, dns.versioned.Zone)
+        self.assertEqual(z, self.zone)
+
+    def testChanges(self):
+        z = dns.zone.from_snapshot(self.snapshot(self.zone))
+        count = len(z.nodes)
+        z.delete_node("ns1")
+        self.assertIsNone(z.get_node("ns1"))
+        self.assertEqual(len(z.nodes), count - 1)
+        node = z.find_node("new", create=True)
+        self.assertIs(z.find_node("new"), node)
+        self.assertEqual(len(z.nodes), count)
+        z.delete_node("new")
+        with self.assertRaises(KeyError):
+            del z.nodes[dns.name.from_text("new", None)]
+        z.replace_rdataset("ns1", self.zone.find_rdataset("ns2", "A"))
+        self.assertEqual(len(z.nodes), count)
+        self.assertEqual(z.find_rdataset("ns1", "A"), z.find_rdataset("ns2", "A"))
+        self.assertIn(dns.name.from_text("ns1", None), list(z.keys()))
+
+    def testWriter(self):
+        z = dns.zone.from_snapshot(self.snapshot(self.zone))
+        with z.writer() as txn:
+            txn.add("ns1", 3600, dns.rdata.from_text("IN", "A", "10.0.0.3"))
+        self.assertEqual(len(z.find_rdataset("ns1", "A")), 2)
+        self.assertEqual(len(z.nodes), len(self.zone.nodes))
+
+    def testUnknownOrigin(self):
+        with self.assertRaises(dns.zone.UnknownOrigin):
+            dns.zone.Zone(None).to_snapshot(BytesIO())
+
+    def testBadSnapshot(self):
+        wire = self.snapshot(self.zone).getvalue()
+        for bad in (b"", wire[:10], b"X" + wire[1:], wire[:9] + b"\x02" + wire[10:]):
+            with self.assertRaises(dns.zonesnapshot.BadSnapshot):
+                dns.zone.from_snapshot(BytesIO(bad))
+        # Truncate the last node.
+        z = dns.zone.from_snapshot(BytesIO(wire[:-1]))
+        with self.assertRaises(dns.zonesnapshot.BadSnapshot):
+            list(z.nodes.values())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Measure resolver cache throughput when many threads share one cache.
+#
+# usage: bench-cache-contention.py [threads] [operations-per-thread]
+
+import sys
+import threading
+import time
+
+import dns.message
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+
+THREADS = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+OPERATIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+NAMES = 10000
+
+keys = []
+answers = []
+for i in range(NAMES):
+    name = dns.name.from_text(f"host{i}.example.")
+    response = dns.message.from_text(
+        f"""id 1
+opcode QUERY
+rcode NOERROR
+flags QR RD RA
+;QUESTION
+{name} IN A
+;ANSWER
+{name} 3600 IN A 10.0.{i // 256 % 256}.{i % 256}
+"""
+    )
+    keys.append((name, dns.rdatatype.A, dns.rdataclass.IN))
+    answers.append(
+        dns.resolver.Answer(name, dns.rdatatype.A, dns.rdataclass.IN, response)
+    )
+
+
+def worker(cache, offset, barrier):
+    barrier.wait()
+    for i in range(OPERATIONS):
+        key = keys[(offset + i * 7) % NAMES]
+        if cache.get(key) is None:
+            cache.put(key, answers[(offset + i * 7) % NAMES])
+
+
+def run(label, cache):
+    for key, answer in zip(keys, answers, strict=True):
+        cache.put(key, answer)
+    cache.reset_statistics()
+    barrier = threading.Barrier(THREADS + 1)
+    threads = [
+        threading.Thread(target=worker, args=(cache, i * 997, barrier))
+        for i in range(THREADS)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total = THREADS * OPERATIONS
+    stats = cache.get_statistics_snapshot()
+    print(
+        f"{label:<24} {total / elapsed:>12,.0f} ops/s "
+        f"(hits {stats.hits}, misses {stats.misses})"
+    )
+
+
+print(f"{THREADS} threads, {OPERATIONS} operations per thread")
+run("Cache", dns.resolver.Cache())
+# Leave some headroom so uneven shard filling does not cause evictions.
+run("LRUCache", dns.resolver.LRUCache(2 * NAMES))
+for shards in (4, 16, 64):
+    run(f"ShardedLRUCache({shards})", dns.resolver.ShardedLRUCache(2 * NAMES, shards))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Compare DNS-over-HTTPS queries made with a new HTTP client for every query,
+# which is what dns.query.https() does without a session, with queries made by
+# a DoHNameserver, which shares one client and so reuses its connections and
+# multiplexes concurrent queries as HTTP/2 streams.
+#
+# usage: bench-doh-client.py [url] [queries] [concurrency] [--insecure]
+#
+# --insecure disables certificate verification, e.g. for a local test server.
+
+import asyncio
+import sys
+import threading
+import time
+
+import dns.asyncbackend
+import dns.asyncquery
+import dns.message
+import dns.nameserver
+import dns.query
+
+args = [arg for arg in sys.argv[1:] if arg != "--insecure"]
+VERIFY = "--insecure" not in sys.argv
+URL = args[0] if len(args) > 0 else "https://dns.google/dns-query"
+QUERIES = int(args[1]) if len(args) > 1 else 200
+CONCURRENCY = int(args[2]) if len(args) > 2 else 10
+TIMEOUT = 5.0
+
+
+def make_query(i):
+    return dns.message.make_query(f"host{i}.example.", "A")
+
+
+def report(label, elapsed):
+    print(f"{label:<40} {QUERIES / elapsed:>10,.1f} queries/s")
+
+
+def threaded(query):
+    per_thread = QUERIES // CONCURRENCY
+
+    def worker(offset):
+        for i in range(per_thread):
+            query(make_query(offset + i))
+
+    threads = [
+        threading.Thread(target=worker, args=(t * per_thread,))
+        for t in range(CONCURRENCY)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run_sync():
+    def new_client(q):
+        dns.query.https(q, URL, timeout=TIMEOUT, verify=VERIFY)
+
+    nameserver = dns.nameserver.DoHNameserver(URL, verify=VERIFY)
+
+    def shared_client(q):
+        nameserver.query(q, TIMEOUT, None, 0)
+
+    # Warm up, so both measurements see a resolved hostname and the shared
+    # client has its connection open.
+    shared_client(make_query(0))
+    report(f"sync, new client, {CONCURRENCY} threads", threaded(new_client))
+    report(f"sync, shared client, {CONCURRENCY} threads", threaded(shared_client))
+    nameserver.close()
+
+
+async def gathered(query):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def limited(i):
+        async with semaphore:
+            await query(make_query(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[limited(i) for i in range(QUERIES)])
+    return time.perf_counter() - start
+
+
+async def run_async():
+    backend = dns.asyncbackend.get_backend("asyncio")
+
+    async def new_client(q):
+        await dns.asyncquery.https(q, URL, timeout=TIMEOUT, verify=VERIFY)
+
+    nameserver = dns.nameserver.DoHNameserver(URL, verify=VERIFY)
+
+    async def shared_client(q):
+        await nameserver.async_query(q, TIMEOUT, None, 0, True, backend)
+
+    await shared_client(make_query(0))
+    report(f"async, new client, {CONCURRENCY} tasks", await gathered(new_client))
+    report(f"async, shared client, {CONCURRENCY} tasks", await gathered(shared_client))
+    await nameserver.async_close()
+
+
+print(f"{URL}, {QUERIES} queries")
+run_sync()
+asyncio.run(run_async())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Compare dns.message.from_wire() with dns.message.from_wire(lazy=True) when
+# only the answer section is read, as a stub resolver does, for a referral-like
+# response with a small answer and a large authority and additional section,
+# and for a response whose answer is most of the message.
+#
+# usage: bench-lazy-parse.py [iterations]
+
+import sys
+import time
+
+import dns.message
+import dns.rrset
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+
+def glue_heavy():
+    q = dns.message.make_query("www.example.", "A", want_dnssec=True)
+    r = dns.message.make_response(q)
+    r.answer.append(dns.rrset.from_text("www.example.", 300, "IN", "A", "10.0.0.1"))
+    r.answer.append(
+        dns.rrset.from_text(
+            "www.example.",
+            300,
+            "IN",
+            "RRSIG",
+            "A 13 2 300 20300101000000 20200101000000 12345 example. " + "A" * 88,
+        )
+    )
+    ns = [f"ns{i}.example." for i in range(13)]
+    r.authority.append(dns.rrset.from_text("example.", 300, "IN", "NS", *ns))
+    for name in ns:
+        r.additional.append(dns.rrset.from_text(name, 300, "IN", "A", "10.0.1.1"))
+        r.additional.append(dns.rrset.from_text(name, 300, "IN", "AAAA", "2001:db8::1"))
+    return r.to_wire()
+
+
+def answer_heavy():
+    q = dns.message.make_query("example.", "TXT")
+    r = dns.message.make_response(q)
+    txt = [f'"record {i} ' + "x" * 40 + '"' for i in range(100)]
+    r.answer.append(dns.rrset.from_text("example.", 300, "IN", "TXT", *txt))
+    return r.to_wire()
+
+
+def measure(wire, lazy):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        _ = dns.message.from_wire(wire, lazy=lazy).answer
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+for label, wire in (("glue heavy", glue_heavy()), ("answer heavy", answer_heavy())):
+    eager = measure(wire, False)
+    lazy = measure(wire, True)
+    print(
+        f"{label:<14} {len(wire):>5} bytes  eager {eager:>7.1f} us  "
+        f"lazy {lazy:>7.1f} us  ({eager / lazy:.1f}x)"
+    )
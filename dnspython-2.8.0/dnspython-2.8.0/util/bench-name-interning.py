@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Measure the memory used per owner name by a zone loaded with and without
+# dns.name.interning(), and by a set of parsed responses kept in memory, as a
+# cache would.  The zone is made of delegations to a few hosting nameservers,
+# mail exchangers and aliases, so the same names recur in the rdata.
+#
+# usage: bench-name-interning.py [delegations]
+
+import sys
+import time
+import tracemalloc
+
+import dns.message
+import dns.name
+import dns.rrset
+import dns.zone
+
+DELEGATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+
+def zone_text():
+    lines = [
+        "$ORIGIN example.",
+        "$TTL 300",
+        "@ SOA ns1.hosting.net. hostmaster 1 7200 900 1209600 300",
+        "@ NS ns1.hosting.net.",
+        "@ NS ns2.hosting.net.",
+        "mail A 10.0.0.25",
+    ]
+    for i in range(DELEGATIONS):
+        lines.append(f"customer{i} NS ns{i % 4}.hosting.net.")
+        lines.append(f"customer{i} NS ns{i % 4 + 4}.hosting.net.")
+        lines.append(f"customer{i} MX 10 mail.example.")
+        lines.append(f"www.customer{i} CNAME customer{i}.cdn.hosting.net.")
+    return "\n".join(lines) + "\n"
+
+
+def responses():
+    wires = []
+    for i in range(DELEGATIONS // 10):
+        q = dns.message.make_query(f"www.customer{i}.example.", "A")
+        r = dns.message.make_response(q)
+        r.authority.append(
+            dns.rrset.from_text(
+                f"customer{i}.example.",
+                300,
+                "IN",
+                "NS",
+                "ns1.hosting.net.",
+                "ns2.hosting.net.",
+            )
+        )
+        r.additional.append(
+            dns.rrset.from_text("ns1.hosting.net.", 300, "IN", "A", "10.0.0.1")
+        )
+        r.additional.append(
+            dns.rrset.from_text("ns2.hosting.net.", 300, "IN", "A", "10.0.0.2")
+        )
+        wires.append(r.to_wire())
+    return wires
+
+
+def measure(label, build, count, unit):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    (size, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} {size / count:>8,.0f} bytes per {unit:<10} {elapsed:>6.2f} s")
+    return result
+
+
+def interned(build):
+    def interned_build():
+        with dns.name.interning():
+            return build()
+
+    return interned_build
+
+
+text = zone_text()
+owners = 2 * DELEGATIONS + 2
+
+
+def load_zone():
+    return dns.zone.from_text(text)
+
+
+measure("zone", load_zone, owners, "name")
+measure("zone, interned", interned(load_zone), owners, "name")
+
+wires = responses()
+
+
+def parse_responses():
+    return [dns.message.from_wire(wire) for wire in wires]
+
+
+measure("responses", parse_responses, len(wires), "response")
+measure("responses, interned", interned(parse_responses), len(wires), "response")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Measure how fast large DNS-over-TCP and DNS-over-QUIC transfers can be
+# reassembled when the data arrives in small chunks, comparing the current
+# dns.query._net_read() and dns.quic._common.Buffer with the byte string
+# concatenation they used to do.  The TCP test reads length-prefixed 64 KiB
+# frames, as in a zone transfer, from a fake socket which returns at most one
+# TCP segment per call, so only the reassembly work is measured.
+#
+# usage: bench-net-read.py [megabytes] [chunk size]
+
+import struct
+import sys
+import time
+
+import dns._features
+import dns.query
+
+MEGABYTES = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+CHUNK = int(sys.argv[2]) if len(sys.argv) > 2 else 1448
+FRAME = 65535
+
+
+class ChunkedSocket:
+    """A socket which returns at most CHUNK bytes for each receive call."""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def _next(self, count):
+        count = min(count, CHUNK, len(self.data) - self.offset)
+        start = self.offset
+        self.offset += count
+        return self.data[start : self.offset]
+
+    def recv(self, count):
+        return bytes(self._next(count))
+
+    def recv_into(self, buffer):
+        chunk = self._next(len(buffer))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+def concatenating_read(sock, count, expiration):
+    # What dns.query._net_read() used to do.
+    s = b""
+    while count > 0:
+        n = sock.recv(count)
+        if n == b"":
+            raise EOFError("EOF")
+        count -= len(n)
+        s += n
+    return s
+
+
+class ConcatenatingBuffer:
+    # What dns.quic._common.Buffer used to do.
+    def __init__(self):
+        self._buffer = b""
+
+    def put(self, data, is_end):
+        self._buffer += data
+
+    def have(self, amount):
+        return len(self._buffer) >= amount
+
+    def get(self, amount):
+        data = self._buffer[:amount]
+        self._buffer = self._buffer[amount:]
+        return data
+
+
+def report(label, elapsed, size):
+    print(f"{label:<32} {size / elapsed / 1e6:>10,.1f} MB/s")
+
+
+frames = MEGABYTES * 1024 * 1024 // FRAME
+frame = struct.pack("!H", FRAME) + bytes(FRAME)
+stream = frame * frames
+
+for label, read in (
+    ("tcp, concatenating", concatenating_read),
+    ("tcp, _net_read()", dns.query._net_read),
+):
+    sock = ChunkedSocket(stream)
+    start = time.perf_counter()
+    for _ in range(frames):
+        (length,) = struct.unpack("!H", read(sock, 2, None))
+        read(sock, length, None)
+    report(label, time.perf_counter() - start, len(stream))
+
+if dns._features.have("doq"):
+    from dns.quic._common import Buffer
+
+    # QUIC delivers stream data in packet sized pieces.
+    pieces = [stream[i : i + 1200] for i in range(0, len(stream), 1200)]
+    for label, buffer_class in (
+        ("quic, concatenating", ConcatenatingBuffer),
+        ("quic, Buffer", Buffer),
+    ):
+        buffer = buffer_class()
+        start = time.perf_counter()
+        for piece in pieces:
+            buffer.put(piece, False)
+            while buffer.have(2):
+                (length,) = struct.unpack("!H", bytes(buffer._buffer[:2]))
+                if not buffer.have(2 + length):
+                    break
+                buffer.get(2)
+                buffer.get(length)
+        report(label, time.perf_counter() - start, len(stream))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Compare rendering queries with dns.message.make_query(...).to_wire() with
+# rendering them with a dns.message.QueryTemplate, both directly with its
+# to_wire() and via the queries its make_query() returns, as the resolver
+# does.  The queries use EDNS as the resolver's do by default.
+#
+# usage: bench-query-template.py [iterations]
+
+import sys
+import time
+
+import dns.message
+import dns.name
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+names = [dns.name.from_text(f"host{i}.example.com.") for i in range(1000)]
+template = dns.message.get_query_template("A", use_edns=0)
+
+
+def make_query():
+    for i in range(ITERATIONS):
+        dns.message.make_query(names[i % 1000], "A", use_edns=0).to_wire()
+
+
+def template_to_wire():
+    for i in range(ITERATIONS):
+        template.to_wire(names[i % 1000])
+
+
+def template_make_query():
+    for i in range(ITERATIONS):
+        template.make_query(names[i % 1000]).to_wire()
+
+
+baseline = None
+for label, run in (
+    ("make_query().to_wire()", make_query),
+    ("template.to_wire()", template_to_wire),
+    ("template.make_query().to_wire()", template_make_query),
+):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    if baseline is None:
+        baseline = elapsed
+    print(
+        f"{label:<36} {elapsed / ITERATIONS * 1e6:>8.2f} us each"
+        f" {baseline / elapsed:>6.1f}x"
+    )
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Measure operations which hash and sort rdata by their DNSSEC canonical form:
+# building rdatasets from existing rdata, sorting rdata, and computing the
+# ZONEMD digest of a synthetic zone, each twice.
+# Rdata keep their canonical form once it has been computed, so the repeated
+# runs show how much of the cost that saves.
+#
+# usage: bench-rdata-digestable.py [rdatasets] [rdatas per rdataset]
+
+import sys
+import time
+
+import dns.rdata
+import dns.rdataset
+import dns.zone
+from dns.zonetypes import DigestHashAlgorithm
+
+SHA384 = DigestHashAlgorithm.SHA384
+
+RDATASETS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+RDATAS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+
+def timed(label, function):
+    start = time.perf_counter()
+    result = function()
+    print(f"{label:<40} {time.perf_counter() - start:>8.3f} s")
+    return result
+
+
+def make_rdatas():
+    rdatas = []
+    for i in range(RDATASETS):
+        rdatas.append(
+            [
+                dns.rdata.from_text("IN", "MX", f"{j} mail{j}.host{i}.example.")
+                for j in range(RDATAS)
+            ]
+        )
+    return rdatas
+
+
+def build(rdatas):
+    rdatasets = []
+    for rds in rdatas:
+        rdataset = dns.rdataset.Rdataset(dns.rdataclass.IN, dns.rdatatype.MX)
+        for rd in rds:
+            rdataset.add(rd, 300)
+        rdatasets.append(rdataset)
+    return rdatasets
+
+
+def sort(rdatasets):
+    for rdataset in rdatasets:
+        sorted(rdataset)
+
+
+def make_zone():
+    lines = ["$ORIGIN example.", "$TTL 300", "@ SOA ns1 hostmaster 1 2 3 4 5"]
+    lines.append("@ NS ns1")
+    for i in range(RDATASETS):
+        for j in range(RDATAS):
+            lines.append(f"host{i} MX {j} mail{j}.host{i}")
+    return dns.zone.from_text("\n".join(lines), "example.")
+
+
+rdatas = timed("make rdata", make_rdatas)
+for run in ("first", "again"):
+    rdatasets = timed(f"build rdatasets, {run}", lambda: build(rdatas))
+    timed(f"sort rdatasets, {run}", lambda rdatasets=rdatasets: sort(rdatasets))
+zone = timed("make zone", make_zone)
+timed("compute_digest, first", lambda: zone.compute_digest(SHA384))
+timed("compute_digest, again", lambda: zone.compute_digest(SHA384))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Compare resolving many names one at a time with Resolver.resolve_many()
+# and dns.asyncresolver.Resolver.resolve_many(), against a local nameserver
+# which delays each answer to simulate the round trip to a real nameserver.
+# The nameserver answers over both UDP and TCP.
+#
+# usage: bench-resolve-many.py [names] [delay-in-milliseconds]
+
+import asyncio
+import heapq
+import socket
+import sys
+import threading
+import time
+
+import dns.asyncresolver
+import dns.message
+import dns.nameserver
+import dns.rdata
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+
+NAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+DELAY = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000.0
+
+A = dns.rdata.from_text(dns.rdataclass.IN, dns.rdatatype.A, "10.0.0.1")
+
+
+def make_response(wire):
+    query = dns.message.from_wire(wire)
+    response = dns.message.make_response(query)
+    rrset = response.find_rrset(
+        response.answer,
+        query.question[0].name,
+        dns.rdataclass.IN,
+        dns.rdatatype.A,
+        create=True,
+    )
+    rrset.update_ttl(300)
+    rrset.add(A)
+    return response
+
+
+def serve(sock):
+    # Answers are sent DELAY seconds after their queries arrive.
+    queue = []
+    while True:
+        now = time.time()
+        while queue and queue[0][0] <= now:
+            (_, wire, address) = heapq.heappop(queue)
+            sock.sendto(wire, address)
+        sock.settimeout(queue[0][0] - now if queue else None)
+        try:
+            (wire, address) = sock.recvfrom(65535)
+        except TimeoutError:
+            continue
+        response = make_response(wire)
+        heapq.heappush(queue, (time.time() + DELAY, response.to_wire(), address))
+
+
+def serve_connection(conn):
+    with conn:
+        while True:
+            ldata = conn.recv(2, socket.MSG_WAITALL)
+            if len(ldata) < 2:
+                return
+            wire = conn.recv(int.from_bytes(ldata, "big"), socket.MSG_WAITALL)
+            time.sleep(DELAY)
+            conn.sendall(make_response(wire).to_wire(prepend_length=True))
+
+
+def serve_tcp(listener):
+    while True:
+        (conn, _) = listener.accept()
+        threading.Thread(target=serve_connection, args=(conn,), daemon=True).start()
+
+
+sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+sock.bind(("127.0.0.1", 0))
+threading.Thread(target=serve, args=(sock,), daemon=True).start()
+listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+listener.bind(sock.getsockname())
+listener.listen(512)
+threading.Thread(target=serve_tcp, args=(listener,), daemon=True).start()
+
+resolver = dns.resolver.Resolver(configure=False)
+resolver.nameservers = [
+    dns.nameserver.Do53Nameserver("127.0.0.1", sock.getsockname()[1])
+]
+
+
+def report(label, elapsed, answers):
+    print(f"{label:<24} {elapsed:>8.3f} s {NAMES / elapsed:>10,.0f} names/s")
+    assert answers == NAMES
+
+
+print(f"{NAMES} names, {DELAY * 1000:.0f} ms answer delay")
+start = time.perf_counter()
+answers = 0
+for i in range(NAMES):
+    resolver.resolve(f"serial{i}.example.", "A")
+    answers += 1
+report("resolve() loop", time.perf_counter() - start, answers)
+
+for in_flight in (10, 100, 500):
+    queries = [(f"many{in_flight}-{i}.example.", "A") for i in range(NAMES)]
+    start = time.perf_counter()
+    answers = 0
+    for _, answer in resolver.resolve_many(queries, max_in_flight=in_flight):
+        assert isinstance(answer, dns.resolver.Answer)
+        answers += 1
+    report(f"resolve_many({in_flight})", time.perf_counter() - start, answers)
+
+for in_flight in (10, 100):
+    queries = [(f"tcp{in_flight}-{i}.example.", "A") for i in range(NAMES)]
+    start = time.perf_counter()
+    answers = 0
+    for _, answer in resolver.resolve_many(queries, tcp=True, max_in_flight=in_flight):
+        assert isinstance(answer, dns.resolver.Answer)
+        answers += 1
+    report(f"resolve_many({in_flight}, tcp)", time.perf_counter() - start, answers)
+
+aresolver = dns.asyncresolver.Resolver(configure=False)
+aresolver.nameservers = resolver.nameservers
+
+
+async def run_async(queries, in_flight):
+    return await aresolver.resolve_many(queries, max_in_flight=in_flight)
+
+
+for in_flight in (10, 100, 500):
+    queries = [(f"async{in_flight}-{i}.example.", "A") for i in range(NAMES)]
+    start = time.perf_counter()
+    answers = 0
+    for _, answer in asyncio.run(run_async(queries, in_flight)):
+        assert isinstance(answer, dns.resolver.Answer)
+        answers += 1
+    report(f"async resolve_many({in_flight})", time.perf_counter() - start, answers)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Compare the query rate of a loop over dns.query.udp() with that of
+# dns.query.udp_batch(), against a local nameserver running in another
+# process so that it does not compete with the client for the GIL.
+#
+# usage: bench-udp-batch.py [queries] [max_in_flight]
+
+import multiprocessing
+import socket
+import sys
+import time
+
+import dns.message
+import dns.query
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+MAX_IN_FLIGHT = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+
+
+def answer(sock):
+    # Build each response by hand, so the nameserver is fast enough that the
+    # client is what is measured.
+    while True:
+        (wire, address) = sock.recvfrom(65535)
+        flags = bytes([wire[2] | 0x80, 0x80])
+        sock.sendto(wire[:2] + flags + wire[4:], address)
+
+
+def report(label, elapsed):
+    print(f"{label:<36} {QUERIES / elapsed:>10,.0f} queries/s")
+
+
+if __name__ == "__main__":
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    process = multiprocessing.Process(target=answer, args=(server,), daemon=True)
+    process.start()
+    queries = [dns.message.make_query(f"host{i}.example.", "A") for i in range(QUERIES)]
+
+    start = time.perf_counter()
+    for q in queries:
+        dns.query.udp(q, "127.0.0.1", timeout=2, port=port)
+    report("udp() loop", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    responses = dns.query.udp_batch(
+        queries, "127.0.0.1", timeout=2, port=port, max_in_flight=MAX_IN_FLIGHT
+    )
+    report(f"udp_batch(), max_in_flight={MAX_IN_FLIGHT}", time.perf_counter() - start)
+    lost = sum(1 for r in responses if isinstance(r, Exception))
+    if lost:
+        print(f"{lost} queries got no response")
+    process.terminate()
+    server.close()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Measure what dns.query.UDPSocketPool saves.  The first part times only the
+# socket work done for each query: making a socket, sending a datagram from it
+# (which implicitly binds it), and closing it, versus taking a socket from a
+# pool, sending, and putting it back.  The second part times dns.query.udp()
+# against a local nameserver with and without a pool.
+#
+# usage: bench-udp-socket-pool.py [iterations]
+
+import socket
+import sys
+import threading
+import time
+
+import dns.message
+import dns.query
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def answer(sock):
+    while True:
+        try:
+            (wire, address) = sock.recvfrom(65535)
+        except OSError:
+            return
+        response = dns.message.make_response(dns.message.from_wire(wire))
+        sock.sendto(response.to_wire(), address)
+
+
+def report(label, count, elapsed):
+    print(f"{label:<36} {elapsed / count * 1e6:>8.2f} us each")
+
+
+# Nothing reads from this socket; datagrams sent to it are dropped once its
+# receive buffer is full.
+sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+sink.bind(("127.0.0.1", 0))
+destination = sink.getsockname()
+wire = dns.message.make_query("www.dnspython.org", "A").to_wire()
+
+
+def per_query_socket():
+    # What dns.query.udp() does without a pool.
+    with dns.query.make_socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.sendto(wire, destination)
+
+
+def pooled_socket(pool):
+    with pool.socket(socket.AF_INET) as s:
+        s.sendto(wire, destination)
+
+
+pool = dns.query.UDPSocketPool()
+start = time.perf_counter()
+for _ in range(ITERATIONS):
+    per_query_socket()
+report("socket, new per query", ITERATIONS, time.perf_counter() - start)
+start = time.perf_counter()
+for _ in range(ITERATIONS):
+    pooled_socket(pool)
+report(
+    f"socket, pooled (max_uses={pool.max_uses})",
+    ITERATIONS,
+    time.perf_counter() - start,
+)
+
+server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+server.bind(("127.0.0.1", 0))
+port = server.getsockname()[1]
+threading.Thread(target=answer, args=(server,), daemon=True).start()
+queries = ITERATIONS // 4
+q = dns.message.make_query("www.dnspython.org", "A")
+runs = (("udp(), new socket per query", None), ("udp(), pooled", pool))
+for label, socket_pool in runs:
+    dns.query.udp(q, "127.0.0.1", timeout=2, port=port, socket_pool=socket_pool)
+    start = time.perf_counter()
+    for _ in range(queries):
+        dns.query.udp(q, "127.0.0.1", timeout=2, port=port, socket_pool=socket_pool)
+    report(label, queries, time.perf_counter() - start)
+pool.close()
+sink.close()
+server.close()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Measure the time and the peak memory allocated (beyond the zone itself) when
+# writing a synthetic zone with Zone.to_file() and Zone.to_wire(), sorting all
+# of the names in memory, sorting them in chunks with sort_chunk_size, and
+# writing a dns.btreezone.Zone, whose nodes are already in order.  Memory is
+# measured with tracemalloc, which makes everything slower.
+#
+# usage: bench-zone-export.py [records] [sort_chunk_size]
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import dns.btreezone
+import dns.zone
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+CHUNK_SIZE = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+
+def make_text():
+    lines = ["$ORIGIN example.", "$TTL 300", "@ SOA ns1 hostmaster 1 2 3 4 5"]
+    lines.append("@ NS ns1")
+    for i in range(RECORDS - 2):
+        lines.append(f"host{i} A 10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}")
+    return "\n".join(lines) + "\n"
+
+
+def measure(label, function):
+    gc.collect()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - before
+    print(f"{label:<40} {elapsed:>8.2f} s  {peak / 1e6:>8.2f} MB")
+
+
+text = make_text()
+zone = dns.zone.from_text(text, "example.")
+btree_zone = dns.zone.from_text(text, "example.", zone_factory=dns.btreezone.Zone)
+del text
+print(f"{RECORDS:,} records, sort_chunk_size {CHUNK_SIZE:,}")
+tracemalloc.start()
+with open(os.devnull, "wb") as f:
+    measure("to_file", lambda: zone.to_file(f))
+    measure(
+        "to_file, sort_chunk_size",
+        lambda: zone.to_file(f, sort_chunk_size=CHUNK_SIZE),
+    )
+    measure("to_file, btreezone", lambda: btree_zone.to_file(f))
+    measure("to_wire", lambda: zone.to_wire(f))
+    measure(
+        "to_wire, sort_chunk_size",
+        lambda: zone.to_wire(f, sort_chunk_size=CHUNK_SIZE),
+    )
+    measure("to_wire, btreezone", lambda: btree_zone.to_wire(f))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Measure how loading a synthetic zone file with dns.zone.from_file() scales
+# with the number of worker processes, checking that each parallel load gives
+# the same zone as a serial one.  The zone has a mix of A, AAAA, MX, TXT and NS
+# records, some comments, and a multi-line SOA record.  Scaling is limited by
+# the number of CPUs, and by adding the records to the zone, which is done in
+# this process.
+#
+# usage: bench-zone-parallel.py [records] [processes ...]
+
+import gc
+import os
+import sys
+import tempfile
+import time
+
+import dns.zone
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+PROCESSES = [int(arg) for arg in sys.argv[2:]] or [1, 2, 4, 8, 16]
+
+
+def write_zone(f):
+    f.write("$ORIGIN example.\n$TTL 300\n")
+    f.write("@ SOA ns1 hostmaster (\n    1 ; serial\n    7200 900 1209600 300 )\n")
+    f.write("@ NS ns1\n@ NS ns2\n")
+    for i in range(RECORDS - 3):
+        kind = i % 5
+        if kind == 0:
+            f.write(f"host{i} A 10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}\n")
+        elif kind == 1:
+            f.write(f"host{i - 1} AAAA 2001:db8::{i & 0xFFFF:x}\n")
+        elif kind == 2:
+            f.write(f"host{i - 2} MX 10 mail{i % 7}\n")
+        elif kind == 3:
+            f.write(f'host{i - 3} TXT "v=spf1 -all" "record {i}"\n')
+        else:
+            f.write(f"; delegation {i}\nsub{i} 3600 IN NS ns{i % 4}.hosting.net.\n")
+
+
+with tempfile.NamedTemporaryFile("w", suffix=".db", delete=False) as f:
+    write_zone(f)
+path = f.name
+try:
+    print(
+        f"{RECORDS:,} records, {os.path.getsize(path) / 1e6:,.1f} MB, "
+        f"{os.cpu_count()} CPUs"
+    )
+    serial = None
+    serial_elapsed = 0.0
+    for processes in PROCESSES:
+        gc.collect()
+        start = time.perf_counter()
+        zone = dns.zone.from_file(path, "example.", processes=processes)
+        elapsed = time.perf_counter() - start
+        if serial is None:
+            (serial, serial_elapsed) = (zone, elapsed)
+        elif zone != serial:
+            sys.exit(f"{processes} processes: the zone is not the same")
+        print(
+            f"{processes:>3} processes {elapsed:>8.2f} s  "
+            f"{RECORDS / elapsed:>10,.0f} RRs/s  {serial_elapsed / elapsed:>5.2f}x"
+        )
+        del zone
+finally:
+    os.unlink(path)
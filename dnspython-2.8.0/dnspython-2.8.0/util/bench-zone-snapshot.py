@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Compare loading a synthetic zone from its zone file, from a pickle, and from
+# a snapshot written by dns.zone.Zone.to_snapshot(), and the sizes of each.
+# Loading a snapshot lazily only reads its header, so the time to look up some
+# names in it, and to read all of it, are measured too.
+#
+# usage: bench-zone-snapshot.py [records]
+
+import gc
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+import dns.name
+import dns.zone
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+LOOKUPS = 1000
+
+
+def write_zone(f):
+    f.write("$ORIGIN example.\n$TTL 300\n")
+    f.write("@ SOA ns1 hostmaster 1 7200 900 1209600 300\n")
+    f.write("@ NS ns1\n@ NS ns2\n")
+    for i in range(RECORDS - 3):
+        kind = i % 5
+        if kind == 0:
+            f.write(f"host{i} A 10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}\n")
+        elif kind == 1:
+            f.write(f"host{i - 1} AAAA 2001:db8::{i & 0xFFFF:x}\n")
+        elif kind == 2:
+            f.write(f"host{i - 2} MX 10 mail{i % 7}\n")
+        elif kind == 3:
+            f.write(f'host{i - 3} TXT "v=spf1 -all" "record {i}"\n')
+        else:
+            f.write(f"sub{i} 3600 IN NS ns{i % 4}.hosting.net.\n")
+
+
+def timed(label, function):
+    gc.collect()
+    start = time.perf_counter()
+    result = function()
+    print(f"{label:<32} {time.perf_counter() - start:>10.4f} s")
+    return result
+
+
+def load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def lookup(zone, names):
+    for name in names:
+        zone.find_rdataset(name, "A")
+
+
+with tempfile.TemporaryDirectory() as dir:
+    text_path = os.path.join(dir, "example.db")
+    pickle_path = os.path.join(dir, "example.pickle")
+    snapshot_path = os.path.join(dir, "example.snapshot")
+    with open(text_path, "w") as f:
+        write_zone(f)
+    zone = timed("from_file", lambda: dns.zone.from_file(text_path, "example."))
+    with open(pickle_path, "wb") as f:
+        timed("pickle.dump", lambda: pickle.dump(zone, f))
+    timed("to_snapshot", lambda: zone.to_snapshot(snapshot_path))
+    timed("pickle.load", lambda: load_pickle(pickle_path))
+    timed(
+        "from_snapshot, not lazy",
+        lambda: dns.zone.from_snapshot(snapshot_path, lazy=False),
+    )
+    snapshot = timed("from_snapshot", lambda: dns.zone.from_snapshot(snapshot_path))
+    names = [
+        dns.name.from_text(f"host{i}", None)
+        for i in random.sample(range(0, RECORDS - 3, 5), min(LOOKUPS, RECORDS // 5))
+    ]
+    timed(f"{len(names)} lookups, first", lambda: lookup(snapshot, names))
+    timed(f"{len(names)} lookups, again", lambda: lookup(snapshot, names))
+    timed("read the rest", lambda: list(snapshot.nodes.values()))
+    if snapshot != zone:
+        sys.exit("the snapshot is not the same as the zone")
+    print()
+    for label, path in (
+        ("zone file", text_path),
+        ("pickle", pickle_path),
+        ("snapshot", snapshot_path),
+    ):
+        print(f"{label:<32} {os.path.getsize(path) / 1e6:>10,.1f} MB")
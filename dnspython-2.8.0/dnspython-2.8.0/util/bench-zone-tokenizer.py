@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# Copyright (C) Dnspython Contributors, see LICENSE for text of ISC license
+
+# Compare dns.tokenizer.Tokenizer with dns.tokenizer.BufferedTokenizer on a
+# synthetic zone file, first tokenizing the whole file and then loading it as a
+# zone with a dns.zonefile.Reader using each tokenizer.  The zone has a mix of
+# A, AAAA, MX, TXT and NS records, some comments, and a multi-line SOA record.
+# Pass 5000000 to measure a 5M-RR zone, which needs a lot of memory and time.
+#
+# usage: bench-zone-tokenizer.py [records] [--tokenize-only]
+
+import gc
+import os
+import sys
+import tempfile
+import time
+
+import dns.name
+import dns.rdataclass
+import dns.tokenizer
+import dns.zone
+import dns.zonefile
+
+args = [arg for arg in sys.argv[1:] if arg != "--tokenize-only"]
+RECORDS = int(args[0]) if len(args) > 0 else 100000
+TOKENIZE_ONLY = "--tokenize-only" in sys.argv
+
+
+def write_zone(f):
+    f.write("$ORIGIN example.\n$TTL 300\n")
+    f.write("@ SOA ns1 hostmaster (\n    1 ; serial\n    7200 900 1209600 300 )\n")
+    f.write("@ NS ns1\n@ NS ns2\n")
+    for i in range(RECORDS - 3):
+        kind = i % 5
+        if kind == 0:
+            f.write(f"host{i} A 10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}\n")
+        elif kind == 1:
+            f.write(f"host{i - 1} AAAA 2001:db8::{i & 0xFFFF:x}\n")
+        elif kind == 2:
+            f.write(f"host{i - 2} MX 10 mail{i % 7}\n")
+        elif kind == 3:
+            f.write(f'host{i - 3} TXT "v=spf1 -all" "record {i}"\n')
+        else:
+            f.write(f"; delegation {i}\nsub{i} 3600 IN NS ns{i % 4}.hosting.net.\n")
+
+
+def tokenize(path, tokenizer_class):
+    with open(path, encoding="utf-8") as f:
+        tok = tokenizer_class(f, path)
+        count = 0
+        while not tok.get().is_eof():
+            count += 1
+    return count
+
+
+def load(path, tokenizer_class):
+    origin = dns.name.from_text("example.")
+    zone = dns.zone.Zone(origin)
+    with open(path, encoding="utf-8") as f:
+        with zone.writer(True) as txn:
+            reader = dns.zonefile.Reader(
+                tokenizer_class(f, path), dns.rdataclass.IN, txn
+            )
+            reader.read()
+    return zone
+
+
+def report(label, elapsed):
+    print(f"{label:<36} {elapsed:>8.2f} s  {RECORDS / elapsed:>10,.0f} RRs/s")
+
+
+with tempfile.NamedTemporaryFile("w", suffix=".db", delete=False) as f:
+    write_zone(f)
+path = f.name
+try:
+    print(f"{RECORDS:,} records, {os.path.getsize(path) / 1e6:,.1f} MB")
+    classes = (dns.tokenizer.Tokenizer, dns.tokenizer.BufferedTokenizer)
+    for tokenizer_class in classes:
+        start = time.perf_counter()
+        tokenize(path, tokenizer_class)
+        report(f"tokenize, {tokenizer_class.__name__}", time.perf_counter() - start)
+    if not TOKENIZE_ONLY:
+        for tokenizer_class in classes:
+            gc.collect()
+            start = time.perf_counter()
+            load(path, tokenizer_class)
+            report(f"load, {tokenizer_class.__name__}", time.perf_counter() - start)
+finally:
+    os.unlink(path)